@@ -0,0 +1,26 @@
+from intfar.api.config import Config
+from intfar.api.game_databases import get_database_client
+from intfar.api.util import SUPPORTED_GAMES
+
+conf = Config()
+
+for game in SUPPORTED_GAMES:
+    game_database = get_database_client(game, conf)
+
+    with game_database.get_connection() as game_db:
+        game_db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS [stat_records] (
+                [stat] NVARCHAR(32) NOT NULL,
+                [disc_id] INTEGER NOT NULL,
+                [maximize] INTEGER(1) NOT NULL,
+                [value],
+                [game_id] NVARCHAR(64),
+                PRIMARY KEY (stat, disc_id, maximize)
+            )
+            """
+        )
+        game_db.commit()
+
+    # Backfill records from all games played so far
+    game_database.rebuild_stat_records()
@@ -0,0 +1,53 @@
+from intfar.api.config import Config
+from intfar.api.meta_database import MetaDatabase
+from intfar.api.game_databases import get_database_client
+from intfar.api.util import SUPPORTED_GAMES
+
+conf = Config()
+
+META_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS [idx_users_secret] ON [users] (secret)",
+    "CREATE INDEX IF NOT EXISTS [idx_commendations_type] ON [commendations] (type, disc_id)",
+    "CREATE INDEX IF NOT EXISTS [idx_sound_hits_start_date] ON [sound_hits] (start_date)",
+    "CREATE INDEX IF NOT EXISTS [idx_shop_items_name] ON [shop_items] (name, price)",
+    "CREATE INDEX IF NOT EXISTS [idx_owned_items_owner_id] ON [owned_items] (owner_id)",
+]
+
+GAME_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS [idx_users_player_id] ON [users] (player_id)",
+    "CREATE INDEX IF NOT EXISTS [idx_games_timestamp] ON [games] (timestamp)",
+    "CREATE INDEX IF NOT EXISTS [idx_games_guild_id] ON [games] (guild_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS [idx_games_intfar_id] ON [games] (intfar_id)",
+    "CREATE INDEX IF NOT EXISTS [idx_participants_player_id] ON [participants] (player_id)",
+    "CREATE INDEX IF NOT EXISTS [idx_bets_better_id] ON [bets] (better_id, result)",
+]
+
+LOL_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS [idx_champ_lists_owner_id] ON [champ_lists] (owner_id)",
+    "CREATE INDEX IF NOT EXISTS [idx_list_items_list_id] ON [list_items] (list_id)",
+    "CREATE INDEX IF NOT EXISTS [idx_split_messages_disc_id] ON [split_messages] (disc_id)",
+]
+
+meta_database = MetaDatabase(conf)
+
+with meta_database.get_connection() as meta_db:
+    for query in META_INDEXES:
+        meta_db.execute(query)
+
+    # Steam commands are relayed over a socket by the ProxyManager instead
+    meta_db.execute("DROP TABLE IF EXISTS [command_queue]")
+
+    meta_db.execute("ANALYZE")
+    meta_db.commit()
+
+for game in SUPPORTED_GAMES:
+    game_database = get_database_client(game, conf)
+
+    game_indexes = GAME_INDEXES + LOL_INDEXES if game == "lol" else GAME_INDEXES
+
+    with game_database.get_connection() as game_db:
+        for query in game_indexes:
+            game_db.execute(query)
+
+        game_db.execute("ANALYZE")
+        game_db.commit()
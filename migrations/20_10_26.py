@@ -0,0 +1,20 @@
+from intfar.api.config import Config
+from intfar.api.game_databases import get_database_client
+from intfar.api.util import SUPPORTED_GAMES
+
+conf = Config()
+
+for game in SUPPORTED_GAMES:
+    game_database = get_database_client(game, conf)
+
+    # Snapshots are built again the first time a summary is requested
+    with game_database.get_connection() as game_db:
+        game_db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS [summary_snapshots] (
+                [disc_id] INTEGER PRIMARY KEY,
+                [data] TEXT NOT NULL
+            )
+            """
+        )
+        game_db.commit()
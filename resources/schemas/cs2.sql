@@ -84,4 +84,22 @@ CREATE TABLE [missed_games] (
     [game_id] NVARCHAR(64) PRIMARY KEY,
     [guild_id] INTEGER NOT NULL,
     [timestamp] INTEGER
-);
\ No newline at end of file
+);
+CREATE TABLE [stat_records] (
+    [stat] NVARCHAR(32) NOT NULL,
+    [disc_id] INTEGER NOT NULL,
+    [maximize] INTEGER(1) NOT NULL,
+    [value],
+    [game_id] NVARCHAR(64),
+    PRIMARY KEY (stat, disc_id, maximize)
+);
+CREATE TABLE [summary_snapshots] (
+    [disc_id] INTEGER PRIMARY KEY,
+    [data] TEXT NOT NULL
+);
+CREATE INDEX [idx_users_player_id] ON [users] (player_id);
+CREATE INDEX [idx_games_timestamp] ON [games] (timestamp);
+CREATE INDEX [idx_games_guild_id] ON [games] (guild_id, timestamp);
+CREATE INDEX [idx_games_intfar_id] ON [games] (intfar_id);
+CREATE INDEX [idx_participants_player_id] ON [participants] (player_id);
+CREATE INDEX [idx_bets_better_id] ON [bets] (better_id, result);
\ No newline at end of file
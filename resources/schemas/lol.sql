@@ -78,6 +78,18 @@ CREATE TABLE [missed_games] (
     [guild_id] INTEGER NOT NULL,
     [timestamp] INTEGER
 );
+CREATE TABLE [stat_records] (
+    [stat] NVARCHAR(32) NOT NULL,
+    [disc_id] INTEGER NOT NULL,
+    [maximize] INTEGER(1) NOT NULL,
+    [value],
+    [game_id] NVARCHAR(64),
+    PRIMARY KEY (stat, disc_id, maximize)
+);
+CREATE TABLE [summary_snapshots] (
+    [disc_id] INTEGER PRIMARY KEY,
+    [data] TEXT NOT NULL
+);
 CREATE TABLE [lan_bingo] (
     [id] NVARCHAR(32) NOT NULL,
     [name] NVARCHAR(64) NOT NULL,
@@ -94,4 +106,13 @@ CREATE TABLE [lan_bingo] (
 CREATE TABLE [split_messages] (
     [disc_id] INTEGER NOT NULL,
     [timestamp] INTEGER
-);
\ No newline at end of file
+);
+CREATE INDEX [idx_users_player_id] ON [users] (player_id);
+CREATE INDEX [idx_games_timestamp] ON [games] (timestamp);
+CREATE INDEX [idx_games_guild_id] ON [games] (guild_id, timestamp);
+CREATE INDEX [idx_games_intfar_id] ON [games] (intfar_id);
+CREATE INDEX [idx_participants_player_id] ON [participants] (player_id);
+CREATE INDEX [idx_bets_better_id] ON [bets] (better_id, result);
+CREATE INDEX [idx_champ_lists_owner_id] ON [champ_lists] (owner_id);
+CREATE INDEX [idx_list_items_list_id] ON [list_items] (list_id);
+CREATE INDEX [idx_split_messages_disc_id] ON [split_messages] (disc_id);
\ No newline at end of file
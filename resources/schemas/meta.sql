@@ -44,10 +44,8 @@ CREATE TABLE [default_game] (
     [disc_id] INTEGER PRIMARY KEY,
     [game] NVARCHAR(64) NULL
 );
-CREATE TABLE [command_queue] (
-    [id] INTEGER NOT NULL,
-    [target] NVARCHAR(64) NOT NULL,
-    [command] NVARCHAR(64) NOT NULL,
-    [arguments] BLOB NOT NULL,
-    [result] BLOB NULL
-);
\ No newline at end of file
+CREATE INDEX [idx_users_secret] ON [users] (secret);
+CREATE INDEX [idx_commendations_type] ON [commendations] (type, disc_id);
+CREATE INDEX [idx_sound_hits_start_date] ON [sound_hits] (start_date);
+CREATE INDEX [idx_shop_items_name] ON [shop_items] (name, price);
+CREATE INDEX [idx_owned_items_owner_id] ON [owned_items] (owner_id);
\ No newline at end of file
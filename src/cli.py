@@ -37,6 +37,12 @@ class TestFuncs:
         for stuff in self.game_databases["lol"].get_performance_score()():
             print(stuff)
 
+    def rebuild_stat_records(self, game=None):
+        games = util.SUPPORTED_GAMES if game is None else [game]
+        for game in games:
+            print(f"Rebuilding stat records for {game}...")
+            self.game_databases[game].rebuild_stat_records()
+
     def test_cool_stats(self):
         game_ids = self.game_databases["lol"].get_game_ids()
 
@@ -431,6 +437,14 @@ class TestFuncs:
         print("Success:", success)
         print(result)
 
+    def encode_sounds(self, workers=4):
+        audio_handler = AudioHandler(self.config, self.meta_database)
+        sounds = [sound for sound, _, _, _ in audio_handler.get_sounds("alphabetical")]
+
+        print(f"Encoding {len(sounds)} sounds as Opus...")
+        encoded = audio_handler.sound_cache.encode_missing(sounds, int(workers))
+        print(f"Encoded {len(encoded)} sounds that were missing or out of date")
+
     async def test_yt_dlp(self):
         audio_handler = AudioHandler(self.config, self.meta_database)
         await audio_handler.refresh_youtube_cookies()
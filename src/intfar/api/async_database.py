@@ -0,0 +1,108 @@
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from queue import Queue
+from typing import Callable
+
+from mhooge_flask.database import SQLiteDatabase
+
+# Methods with these prefixes only read from the database
+_READ_PREFIXES = ("get_",)
+
+class AsyncDatabase:
+    """
+    Wrapper around a SQLiteDatabase that runs its methods in threads,
+    so that queries don't block the event loop of the Discord bot.
+
+    Reads are run in a pool of threads, each using its own copy of the
+    database (and thereby its own connection) which is not allowed to write.
+    Writes are run one at a time in a single thread, on another copy of the
+    database. The wrapped database itself is left for synchronous use, as
+    its connection can't be shared with the threads.
+
+    Methods of the database can be awaited directly on the wrapper, fx.
+    `await database.get_intfar_stats(disc_id)`. Methods starting with 'get_'
+    are treated as reads, everything else as writes. `read` and `write` can be
+    used to choose explicitly. Queries that are returned by a method (as a
+    `Query` or function) are run in the thread as well. Other attributes,
+    like `game_users`, are returned from the wrapped database as they are.
+    """
+    def __init__(self, database: SQLiteDatabase, max_readers: int = 4):
+        """
+        Initialize the AsyncDatabase.
+
+        ### Parameters
+        :param database:    Database to wrap
+        :param max_readers: Amount of threads (and connections) used for reading
+        """
+        self.database = database
+        self.max_readers = max_readers
+
+        # Copies are made up front, while the database is not in use
+        self._writer = copy.copy(database)
+        self._readers = Queue()
+        for _ in range(max_readers):
+            self._readers.put(copy.copy(database))
+
+        self._read_executor = ThreadPoolExecutor(max_readers, thread_name_prefix="db_reader")
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="db_writer")
+
+    def _run(self, database: SQLiteDatabase, method: str | Callable, args, kwargs):
+        if callable(method):
+            result = method(database, *args, **kwargs)
+        else:
+            result = getattr(database, method)(*args, **kwargs)
+
+        if callable(result):
+            result = result()
+
+        return result
+
+    def _read(self, method: str | Callable, args, kwargs):
+        reader = self._readers.get()
+        try:
+            with reader:
+                reader.execute_query("PRAGMA query_only = ON")
+                return self._run(reader, method, args, kwargs)
+        finally:
+            self._readers.put(reader)
+
+    def _write(self, method: str | Callable, args, kwargs):
+        with self._writer:
+            return self._run(self._writer, method, args, kwargs)
+
+    async def read(self, method: str | Callable, *args, **kwargs):
+        """
+        Run the given method of the database in one of the reader threads.
+        `method` is either the name of a method of the database, or a function
+        that takes the database as its first argument.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self._read, method, args, kwargs)
+
+    async def write(self, method: str | Callable, *args, **kwargs):
+        """
+        Run the given method of the database in the writer thread.
+        `method` is either the name of a method of the database, or a function
+        that takes the database as its first argument.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._write_executor, self._write, method, args, kwargs)
+
+    def __getattr__(self, attr: str):
+        if attr.startswith("_") or attr == "database":
+            raise AttributeError(attr)
+
+        value = getattr(self.database, attr)
+        if not callable(value):
+            return value
+
+        if attr.startswith(_READ_PREFIXES):
+            return partial(self.read, attr)
+
+        return partial(self.write, attr)
+
+    def close(self):
+        self._read_executor.shutdown(wait=False, cancel_futures=True)
+        self._write_executor.shutdown(wait=True)
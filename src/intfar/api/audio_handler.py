@@ -2,7 +2,6 @@ import asyncio
 import math
 from datetime import datetime
 import os
-from subprocess import Popen, PIPE
 from time import time
 from typing import Any, Dict
 
@@ -12,10 +11,12 @@ from playwright.async_api import async_playwright
 
 from mhooge_flask.logging import logger
 
+from intfar.api.audio_ingestion import AudioIngestion, run_process
 from intfar.api.config import Config
 from intfar.api.meta_database import MetaDatabase
+from intfar.api.sound_cache import OggOpusFileAudio, SoundCache
 from intfar.api.youtube_api import YouTubeAPIClient, NUM_SEARCH_RESULTS
-from intfar.api.util import get_closest_match
+from intfar.api.util import SearchIndex
 
 def _get_time_str(seconds):
     secs = int(seconds)
@@ -49,9 +50,12 @@ class AudioStream:
         self.status = "Starting..."
         self.message: Message | None = None
         self.progress: float = 0.0
+        self.finished = asyncio.Event()
 
     def start(self, source: AudioSource):
-        self.client.play(source)
+        event_loop = asyncio.get_running_loop()
+        # The callback is called from the thread of the audio player when the audio has stopped playing
+        self.client.play(source, after=lambda _: event_loop.call_soon_threadsafe(self.finished.set))
         self.last_resume = time()
         self.status = "Now Playing"
 
@@ -74,18 +78,22 @@ class AudioHandler:
         self.meta_database = meta_database
         self.config = config
         self.sounds_path = f"{config.static_folder}/sounds"
+        self.sound_cache = SoundCache(self.sounds_path)
         self.youtube_api = YouTubeAPIClient(config)
         self.voice_streams: Dict[int, VoiceClient] = {} # Keep track of connections to voice channels
         self.audio_streams: Dict[int, AudioStream] = {} # Keep track of playing audio
         self.sound_queue = {}
         self.active_youtube_suggestions = {}
         self.youtube_suggestions_msg = {}
+        self.ingestion = AudioIngestion(self._download_sound, self._get_sound_duration)
+        self._sound_index: tuple[tuple, SearchIndex] | None = None
+        self._cookies_lock = asyncio.Lock()
 
-    async def _download_from_url(self, url: str):
+    async def _download_from_url(self, url: str, folder: str | None = None):
         with open(f"{self.config.resources_folder}/user_agent.txt", "r", encoding="utf-8") as fp:
             user_agent = fp.read().strip()
 
-        filename = '%(title)s.mp3'
+        filename = '%(title)s.mp3' if folder is None else f"{folder}/%(title)s.mp3"
         args = [
             "yt-dlp",
             "-x",
@@ -105,11 +113,9 @@ class AudioHandler:
             "after_move:filepath",
             url,
         ]
-        process = Popen(args, stdout=PIPE, stderr=PIPE, text=True)
+        returncode, stdout, stderr = await run_process(*args)
 
-        stdout, stderr = process.communicate()
-
-        if not stdout or process.returncode != 0:
+        if not stdout or returncode != 0:
             # Error when downloading video with yt-dlp
             logger.bind(
                 event="yt_dlp_error", stdout=stdout, stderr=stderr
@@ -126,12 +132,18 @@ class AudioHandler:
 
         return True, filename
 
-    def _get_sound_duration(self, sound_path: str) -> float | None:
+    async def _download_sound(self, url: str, folder: str):
+        # Sounds can be downloaded concurrently, so only refresh the cookies for one at a time
+        async with self._cookies_lock:
+            await self.refresh_youtube_cookies()
+
+        return await self._download_from_url(url, folder)
+
+    async def _get_sound_duration(self, sound_path: str) -> float | None:
         args = ["ffprobe", "-show_entries", "format=duration", "-v", "quiet", "-print_format", "compact=print_section=0:nokey=1:escape=csv", sound_path]
-        process = Popen(args, stdout=PIPE, stderr=PIPE, text=True)
+        returncode, stdout, stderr = await run_process(*args)
 
-        stdout, stderr = process.communicate()
-        if stdout == "" or process.returncode != 0:
+        if stdout == "" or returncode != 0:
             # Error when getting duration of sound with ffbrope
             logger.bind(
                 event="ffprobe_error", stdout=stdout, stderr=stderr
@@ -149,9 +161,21 @@ class AudioHandler:
             except Exception:
                 return
 
+    def _get_queued_urls(self, guild_id: int):
+        return [entry for entry in self.sound_queue.get(guild_id, []) if entry[2] != "file"]
+
     async def _play_loop(self, guild_id: int, user_triggered: bool = False):
+        playback_ended = None
         while (sound_queue := self.sound_queue.get(guild_id, [])) != []:
-            sound_name, message, sound_type = sound_queue.pop(0)
+            entry = sound_queue.pop(0)
+            sound_name, message, sound_type = entry
+
+            # Download the next URLs in the queue while this sound is downloaded and played
+            if sound_type != "file":
+                self.ingestion.start(entry)
+
+            self.ingestion.prefetch(self._get_queued_urls(guild_id))
+
             if sound_type == "search":
                 del self.active_youtube_suggestions[guild_id]
                 await self.youtube_suggestions_msg[guild_id].delete()
@@ -160,9 +184,15 @@ class AudioHandler:
 
             sound_path = None
             title = None
+            duration = None
+            is_opus = False
             if sound_type == "file":
-                # Stream audio from a file
-                sound_path = f"{self.sounds_path}/{sound_name}.mp3"
+                # Stream audio from a file, pre-encoded as Opus if possible
+                if (cached_sound := self.sound_cache.get(sound_name)) is not None:
+                    sound_path, duration = cached_sound
+                    is_opus = True
+                else:
+                    sound_path = self.sound_cache.get_sound_path(sound_name)
 
                 if user_triggered:
                     title = f'"{sound_name}"'
@@ -171,10 +201,13 @@ class AudioHandler:
                         title += f" by {member.nick}"
 
                 volume = 1
+
+                # Get duration of sound
+                if user_triggered and not is_opus:
+                    duration = await self._get_sound_duration(sound_path)
             else:
-                # Stream audio from a URL
-                await self.refresh_youtube_cookies()
-                success, path_or_error = await self._download_from_url(sound_name)
+                # Stream audio from a URL, which is downloaded and probed in the background
+                success, path_or_error, duration = await self.ingestion.get(entry)
 
                 if success:
                     sound_path = path_or_error
@@ -182,18 +215,21 @@ class AudioHandler:
                     title = f'"{title}"'
                     volume = 0.2
                 else:
+                    self.ingestion.release(entry)
                     await message.channel.send(path_or_error)
 
             if sound_path is None:
                 continue
 
             try:
-                # Get duration of sound
-                duration = self._get_sound_duration(sound_path) if user_triggered else None
                 show_status = user_triggered and (duration is None or duration > 5)
 
-                # Create volume controlled FFMPEG player from sound file.
-                audio_source = PCMVolumeTransformer(FFmpegPCMAudio(sound_path, executable="ffmpeg"), volume=volume)
+                if is_opus:
+                    # Send the Opus packets of the sound as they are, without volume control
+                    audio_source = OggOpusFileAudio(sound_path)
+                else:
+                    # Create volume controlled FFMPEG player from sound file.
+                    audio_source = PCMVolumeTransformer(FFmpegPCMAudio(sound_path, executable="ffmpeg"), volume=volume)
 
                 # Start the player and wait until it is done.
                 voice_stream = self.voice_streams[guild_id]
@@ -206,20 +242,31 @@ class AudioHandler:
 
                 audio_stream.start(audio_source)
 
+                if playback_ended is not None:
+                    # Measure the silence between the previous sound in the queue and this one
+                    self.ingestion.add_gap_time(time() - playback_ended)
+                    logger.bind(event="sound_gap", guild_id=guild_id, **self.ingestion.get_metrics()).debug(
+                        "Started next sound in queue"
+                    )
+
                 # Play loop. Wait for sound to finish and update progress and status, if relevant
-                while voice_stream.is_playing() or voice_stream.is_paused():
-                    await asyncio.sleep(1)
+                while not audio_stream.finished.is_set() and (voice_stream.is_playing() or voice_stream.is_paused()):
+                    try:
+                        await asyncio.wait_for(audio_stream.finished.wait(), 1)
+                    except TimeoutError:
+                        pass
 
                     if show_status and audio_stream.message is not None:
                         new_content = self._get_playback_str(guild_id)
                         if new_content != audio_stream.message.content:
                             await audio_stream.message.edit(content=new_content)
 
+                playback_ended = time()
                 await asyncio.sleep(0.5)
 
             finally:
-                if sound_type == "url" and os.path.exists(sound_path):
-                    os.remove(sound_path)
+                if sound_type == "url":
+                    self.ingestion.release(entry)
 
                 if (
                     user_triggered
@@ -284,7 +331,7 @@ class AudioHandler:
             # Check if 'sound' is a sound file or a URL to a valid website
             if len(sounds) == 1:
                 # Check if given sound closely matches an actual sound
-                sound_match = get_closest_match(sound, [t[0] for t in self.get_sounds()])
+                sound_match = self.get_sound_index().find_closest(sound)
                 if sound_match is not None:
                     err_msg = f"Can't play sound `{sound}`, did you mean `{sound_match}`?"
                     return False, err_msg
@@ -326,6 +373,7 @@ class AudioHandler:
                 self.sound_queue[guild_id] = []
 
             self.sound_queue[guild_id].extend(validated_sounds)
+            self.ingestion.prefetch(self._get_queued_urls(guild_id))
 
             if guild_id not in self.voice_streams:
                 self.voice_streams[guild_id] = await voice_channel.connect(timeout=5)
@@ -450,6 +498,9 @@ class AudioHandler:
                 else f" and clearing queue of **{len(sound_queue)}** other {sound_quantifier}..."
             )
             msg = f"Stopping sound{queue_len_str}"
+            for entry in self._get_queued_urls(guild_id):
+                self.ingestion.release(entry)
+
             del self.sound_queue[guild_id]
             audio_stream.client.stop()
             return msg
@@ -483,6 +534,18 @@ class AudioHandler:
 
         return sounds
 
+    def get_sound_index(self) -> SearchIndex:
+        """
+        Get an index of the names of all sounds, newest first. The index is
+        only rebuilt when sounds have been added or removed since it was built.
+        """
+        version = self.meta_database.get_sounds_version()
+        if self._sound_index is None or self._sound_index[0] != version:
+            sounds = [sound for sound, _, _, _ in self.meta_database.get_sounds("newest")]
+            self._sound_index = (version, SearchIndex(sounds))
+
+        return self._sound_index[1]
+
     def is_valid_sound(self, sound):
         return self.meta_database.is_valid_sound(sound)
 
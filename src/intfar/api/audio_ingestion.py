@@ -0,0 +1,182 @@
+import asyncio
+from collections import deque
+import os
+import shutil
+from subprocess import PIPE
+from tempfile import mkdtemp
+from typing import Awaitable, Callable
+
+async def run_process(*args: str) -> tuple[int, str, str]:
+    """
+    Run a process and wait for it to finish without blocking the event loop.
+    The process is killed if the waiting coroutine is cancelled.
+
+    ### Returns
+    Tuple of the return code of the process and what it wrote to stdout and stderr
+    """
+    process = await asyncio.create_subprocess_exec(*args, stdout=PIPE, stderr=PIPE)
+
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+        raise
+
+    return process.returncode, stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace")
+
+class SoundDownload:
+    """
+    A sound from the sound queue that is downloaded into its own temporary folder.
+    """
+    def __init__(self, entry: tuple):
+        self.entry = entry
+        self.url = entry[0]
+        self.folder: str | None = None
+        self.size = 0
+        self.task: asyncio.Task | None = None
+
+class AudioIngestion:
+    """
+    Downloads and probes sounds from URLs in the background, so that the next sounds
+    in a sound queue are ready to be played when the current sound is done.
+
+    Downloads are started for the first few URLs in a sound queue, at most
+    `max_downloads` run at the same time, and no more downloads are started ahead of
+    time while the downloaded files that have not been played take up more than
+    `disk_budget` bytes. A sound that is about to be played is always downloaded.
+    """
+    def __init__(
+        self,
+        download: Callable[[str, str], Awaitable[tuple[bool, str]]],
+        probe: Callable[[str], Awaitable[float | None]],
+        prefetch_count: int = 2,
+        max_downloads: int = 2,
+        disk_budget: int = 200 * 1024 * 1024,
+        temp_folder: str | None = None
+    ):
+        """
+        Initialize the ingestion stage.
+
+        ### Parameters
+        :param download:        Coroutine function that downloads the sound at a URL into
+                                a folder and returns whether it succeeded and either the path
+                                of the downloaded file or an error message
+        :param probe:           Coroutine function that returns the duration of a sound file
+        :param prefetch_count:  How many of the next URLs in a queue to download ahead of time
+        :param max_downloads:   Maximum number of downloads that run at the same time
+        :param disk_budget:     Bytes that downloaded sounds can use before no more
+                                sounds are downloaded ahead of time
+        :param temp_folder:     Folder to download sounds into, defaults to the system temp folder
+        """
+        self.download = download
+        self.probe = probe
+        self.prefetch_count = prefetch_count
+        self.disk_budget = disk_budget
+        self.temp_folder = temp_folder
+        self.disk_used = 0
+        self.gap_times = deque(maxlen=100)
+        self._semaphore = asyncio.Semaphore(max_downloads)
+        # Keyed on the identity of queue entries, as the same URL can be queued several times
+        self._downloads: dict[int, SoundDownload] = {}
+
+    def start(self, entry: tuple) -> SoundDownload:
+        """
+        Start downloading the sound of the given queue entry, if it is not already started.
+        """
+        if (download := self._downloads.get(id(entry))) is not None:
+            return download
+
+        download = SoundDownload(entry)
+        download.task = asyncio.create_task(self._download(download))
+        self._downloads[id(entry)] = download
+
+        return download
+
+    async def _download(self, download: SoundDownload) -> tuple[bool, str, float | None]:
+        try:
+            async with self._semaphore:
+                download.folder = mkdtemp(prefix="intfar_sound_", dir=self.temp_folder)
+                success, path_or_error = await self.download(download.url, download.folder)
+                if not success:
+                    return False, path_or_error, None
+
+                download.size = os.path.getsize(path_or_error)
+                self.disk_used += download.size
+
+            duration = await self.probe(path_or_error)
+        except BaseException:
+            # Remove partial downloads if the download fails or is cancelled
+            self._remove_files(download)
+            raise
+
+        return True, path_or_error, duration
+
+    def _remove_files(self, download: SoundDownload):
+        if download.folder is not None:
+            shutil.rmtree(download.folder, ignore_errors=True)
+            download.folder = None
+
+        self.disk_used -= download.size
+        download.size = 0
+
+    def is_started(self, entry: tuple) -> bool:
+        return id(entry) in self._downloads
+
+    def prefetch(self, entries: list[tuple]):
+        """
+        Start downloading the first `prefetch_count` of the given queue entries
+        that are not already downloaded, as long as the disk budget allows it.
+
+        ### Parameters
+        :param entries: Entries of a sound queue with URLs as their first element
+        """
+        for entry in entries[:self.prefetch_count]:
+            if self.disk_used >= self.disk_budget:
+                break
+
+            self.start(entry)
+
+    async def get(self, entry: tuple) -> tuple[bool, str, float | None]:
+        """
+        Wait for the sound of the given queue entry to be downloaded,
+        starting the download if it was not prefetched.
+
+        ### Returns
+        Tuple of whether the download succeeded, either the path of the
+        downloaded file or an error message, and the duration of the sound
+        """
+        return await asyncio.shield(self.start(entry).task)
+
+    def release(self, entry: tuple):
+        """
+        Delete the downloaded sound of the given queue entry,
+        or cancel its download if it is not done yet.
+        """
+        download = self._downloads.pop(id(entry), None)
+        if download is None:
+            return
+
+        if download.task.done():
+            if not download.task.cancelled() and download.task.exception() is None:
+                self._remove_files(download)
+        else:
+            # The download task removes its own files when cancelled
+            download.task.cancel()
+
+    def add_gap_time(self, gap: float):
+        self.gap_times.append(gap)
+
+    def get_metrics(self) -> dict[str, float | int]:
+        """
+        Get the amount of active downloads, the bytes used by downloaded sounds,
+        and the average and longest gap between sounds in a queue.
+        """
+        return {
+            "downloads": len(self._downloads),
+            "disk_used": self.disk_used,
+            "avg_gap_time": sum(self.gap_times) / len(self.gap_times) if self.gap_times else 0.0,
+            "max_gap_time": max(self.gap_times, default=0.0),
+        }
@@ -27,6 +27,33 @@ class Bet:
     target_required: int
     base_return: float
 
+@dataclass
+class ResolvedBet:
+    """
+    A bet (or multi-bet) that was resolved after a game.
+    """
+    disc_id: int
+    bet_ids: list[int]
+    amounts: list[int]
+    events: list[str]
+    targets: list[int]
+    success: bool
+    payout: int
+
+@dataclass
+class BetResolutionReport:
+    """
+    Result of resolving all active bets after a game, used to write the post-game message.
+
+    `tokens_for_playing` contains the tokens each player got for playing the game,
+    `balances` the token balance of each user after getting those tokens but before
+    any bets were won, and `bets` the resolved bets of each user that had any.
+    """
+    game_id: str
+    tokens_for_playing: dict[int, int]
+    balances: dict[int, int]
+    bets: dict[int, list[ResolvedBet]]
+
 class BetResolver(ABC):
     def __init__(self, bet: Bet, game_stats: GameStats, target_id: int=None):
         self.bet = bet
@@ -110,6 +137,84 @@ class BetResolver(ABC):
 
         raise ValueError("Could not match bet with the proper resolver!")
 
+class BetOddsCache:
+    """
+    Caches the amount of times an event has happened and the amount of games
+    it could have happened in, which the return of bets is calculated from,
+    for every (event, target) pair that has been looked up.
+
+    The cache is refreshed whenever the games or users in the database change.
+    When new games are added, only the odds that these games can change
+    are removed (the odds of bets without a target and bets targeting someone
+    who played in or was Int-Far in the new games), everything else stays cached.
+    Any other change clears the cache. Removed odds are calculated again
+    the next time they are looked up.
+    """
+    def __init__(self, database: GameDatabase):
+        """
+        Initialize the BetOddsCache.
+
+        ### Parameters
+        :param database:    GameDatabase to calculate bet odds from
+        """
+        self.database = database
+        self._signature = None
+        self._odds: dict[tuple[str, int], tuple[int, int]] = {}
+
+    def refresh(self):
+        """
+        Remove any cached odds that are outdated.
+        """
+        signature = self.database.get_performance_signature()
+        if signature == self._signature:
+            return
+
+        prev_signature = self._signature
+        self._signature = signature
+
+        if prev_signature is None:
+            self._odds = {}
+            return
+
+        count, _, users = signature
+        prev_count, prev_max_timestamp, prev_users = prev_signature
+
+        if users != prev_users or prev_max_timestamp is None or count <= prev_count:
+            self._odds = {}
+            return
+
+        new_games = set()
+        affected_ids = set()
+        for game_id, _, intfar_id, _, disc_id, _ in self.database.get_streak_facts(prev_max_timestamp):
+            new_games.add(game_id)
+            affected_ids.update((disc_id, intfar_id))
+
+        if len(new_games) != count - prev_count:
+            # Games were both added and removed, or a game was added in the past
+            self._odds = {}
+            return
+
+        affected_ids.discard(None)
+        self._odds = {
+            (event_id, target_id): odds
+            for (event_id, target_id), odds in self._odds.items()
+            if target_id is not None and target_id not in affected_ids
+        }
+
+    def get_odds(self, event_id: str, target_id: int, calculate) -> tuple[int, int]:
+        """
+        Get the amount of times the given event has happened and the amount
+        of games it could have happened in, calculating it with `calculate`
+        if it is not cached.
+        """
+        self.refresh()
+
+        key = (event_id, target_id)
+        if key not in self._odds:
+            self._odds[key] = calculate()
+
+        return self._odds[key]
+
 class BettingHandler(ABC):
     def __init__(self, game: str, config: Config, meta_database: MetaDatabase, game_database: GameDatabase):
         self.game = game
@@ -119,6 +224,7 @@ class BettingHandler(ABC):
 
         self.betting_tokens_for_win = config.betting_tokens_for_win
         self.betting_tokens_for_loss = config.betting_tokens_for_loss
+        self.odds_cache = BetOddsCache(game_database)
 
     @property
     def all_bets(self) -> list[Bet]:
@@ -243,6 +349,31 @@ class BettingHandler(ABC):
         :param target:      Discord ID of person to target with the bet or None
                             if the bet has no target
         """
+        if bet.target_required == Bet.TARGET_INVALID:
+            # The odds of these bets don't depend on a target
+            target_id = None
+
+        count, num_games = self.odds_cache.get_odds(
+            bet.event_id, target_id, lambda: self.get_bet_odds(bet, target_id)
+        )
+
+        if num_games == 0: # No games has been played for given target, ratio is 0
+            return bet.base_return
+        if count == 0: # Event never happened, set ratio to amount of games played
+            return max(num_games, 1)
+
+        return num_games / count
+
+    def get_bet_odds(self, bet: Bet, target_id: int) -> tuple[int, int]:
+        """
+        Calculate how many times the event of a bet has happened for a given target
+        and how many games it could have happened in. `get_dynamic_bet_return`
+        gets these from `odds_cache`, which calls this if they are not cached.
+
+        :param bet:         The bet to calculate odds for
+        :param target_id:   Discord ID of person to target with the bet or None
+                            if the bet has no target
+        """
         resolver = self.get_bet_resolver(bet, None, target_id)
 
         count = 0
@@ -262,12 +393,7 @@ class BettingHandler(ABC):
             stat = resolver.should_resolve_with_stats[stat_index].split("_")[1]
             count, num_games = self.get_stats_return(stat, target_id)
 
-        if num_games == 0: # No games has been played for given target, ratio is 0
-            return bet.base_return
-        if count == 0: # Event never happened, set ratio to amount of games played
-            return max(num_games, 1)
-
-        return num_games / count
+        return count, num_games
 
     def get_bet_value(self, bet_amount: int, event_id: str, bet_timestamp: int, target_id: int):
         bet = self.get_bet(event_id)
@@ -314,6 +440,38 @@ class BettingHandler(ABC):
         Tuple containing a boolean indicating whether the bet was won and an
         integer indicating the total tokens won from the bet.
         """
+        all_success, total_value = self.get_bet_outcome(
+            amounts, bet_timestamp, events, targets, game_stats, bet_multiplier
+        )
+        timestamp = int(time())
+
+        for bet_id in bet_ids:
+            try:
+                self.game_database.mark_bet_as_resolved(
+                    bet_id, game_stats.game_id, timestamp, all_success, total_value
+                )
+            except DBException:
+                logger.exception("Database error during bet resolution!")
+                return
+
+        if all_success: # Only award points if all bets were won
+            self.meta_database.update_token_balance(disc_id, total_value, True)
+
+        return all_success, total_value
+
+    def get_bet_outcome(
+        self,
+        amounts: list[int],
+        bet_timestamp: int,
+        events: list[str],
+        targets: list[int],
+        game_stats: GameStats,
+        bet_multiplier: int = 1
+    ) -> tuple[bool, int]:
+        """
+        Determine whether the given bet was won and how many tokens it awards,
+        without saving anything to the database. See `resolve_bet` for parameters.
+        """
         # Multiplier for betting on a specific person to do something. If more people are
         # in the game, the multiplier is higher.
         person_multiplier = len(game_stats.filtered_player_stats)
@@ -341,21 +499,70 @@ class BettingHandler(ABC):
             total_value += bet_value
 
         total_value = total_value * amount_multiplier * bet_multiplier
-        timestamp = int(time())
 
-        for bet_id in bet_ids:
-            try:
-                self.game_database.mark_bet_as_resolved(
-                    bet_id, game_stats.game_id, timestamp, all_success, total_value
+        return all_success, total_value
+
+    def resolve_bets(self, game_stats: GameStats, tokens_gained: int, bet_multiplier: int = 1) -> BetResolutionReport:
+        """
+        Resolve all active bets made in the server where the given game was played
+        and award tokens to the players in the game for playing and getting doinks.
+
+        All bets are resolved in memory first. The results of the bets are then
+        saved in a single transaction in the game database and the changes to
+        token balances in a single transaction in the meta database.
+
+        ### Parameters
+        :param game_stats:      Data about the completed game
+        :param tokens_gained:   Tokens every player in the game gets for playing
+        :param bet_multiplier:  Multiplier for the tokens won by bets (fx. for clash games)
+
+        ### Returns
+        :result:
+
+        Report with the tokens given for playing, the token balances of users before
+        bets were resolved, and all resolved bets. None if the results of the bets
+        could not be saved, in which case no tokens are awarded.
+        """
+        active_bets = self.game_database.get_bets(True, guild_id=game_stats.guild_id)
+        balances = {disc_id: tokens for tokens, disc_id in self.meta_database.get_token_balance()}
+
+        balance_changes = {}
+        tokens_for_playing = {}
+        for player_stats in game_stats.filtered_player_stats:
+            gain_for_user = tokens_gained
+            if player_stats.doinks is not None: # If user was awarded doinks, they get more tokens.
+                number_of_doinks = sum(map(int, player_stats.doinks))
+                gain_for_user += self.config.betting_tokens_for_doinks * number_of_doinks
+
+            tokens_for_playing[player_stats.disc_id] = gain_for_user
+            balance_changes[player_stats.disc_id] = gain_for_user
+            balances[player_stats.disc_id] = balances.get(player_stats.disc_id, 0) + gain_for_user
+
+        resolved_bets = {}
+        bet_results = []
+        for disc_id in self.game_database.game_users:
+            for bet_ids, _, _, amounts, events, targets, bet_timestamp, _, _ in active_bets.get(disc_id, []):
+                success, payout = self.get_bet_outcome(
+                    amounts, bet_timestamp, events, targets, game_stats, bet_multiplier
                 )
-            except DBException:
-                logger.exception("Database error during bet resolution!")
-                return
 
-        if all_success: # Only award points if all bets were won
-            self.meta_database.update_token_balance(disc_id, total_value, True)
+                resolved_bets.setdefault(disc_id, []).append(
+                    ResolvedBet(disc_id, bet_ids, amounts, events, targets, success, payout)
+                )
+                bet_results.extend((bet_id, success, payout) for bet_id in bet_ids)
 
-        return all_success, total_value
+                if success: # Only award points if all bets were won
+                    balance_changes[disc_id] = balance_changes.get(disc_id, 0) + payout
+
+        try:
+            self.game_database.mark_bets_as_resolved(bet_results, game_stats.game_id, int(time()))
+        except DBException:
+            logger.exception("Database error during bet resolution!")
+            return None
+
+        self.meta_database.update_token_balances(balance_changes)
+
+        return BetResolutionReport(game_stats.game_id, tokens_for_playing, balances, resolved_bets)
 
     def _get_bet_placed_text(
         self,
@@ -34,6 +34,7 @@ class Config:
         self.env = Environment(auth["env"])
         self.database_folder = f"{self.resources_folder}/databases"
         self.schema_folder = f"{self.resources_folder}/schemas"
+        self.member_snapshot_file = f"{self.resources_folder}/member_snapshot.json"
         self.generate_predictions_img = False
         self.performance_mimimum_games = 10
 
@@ -0,0 +1,250 @@
+import os
+import json
+import asyncio
+from hashlib import sha256
+from dataclasses import dataclass
+from time import monotonic
+
+from mhooge_flask.logging import logger
+import httpx
+
+_CHUNK_SIZE = 64 * 1024
+
+@dataclass
+class Asset:
+    url: str
+    filename: str
+    description: str = None
+
+class RateLimiter:
+    """
+    Token bucket that allows `rate` requests per second on average
+    with bursts of at most `capacity` requests.
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+
+            self._tokens -= 1
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for the given amount of seconds,
+        fx. when the server responds with 429 Too Many Requests.
+        """
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+class AssetManifest:
+    """
+    Keeps track of which assets have been downloaded, where they were downloaded
+    from, and the SHA-256 hash of their content. Assets in the manifest are
+    considered up to date, so they don't have to be looked up on disk.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.patch = None
+        self.assets: dict[str, dict] = {}
+
+        if os.path.exists(filename):
+            try:
+                with open(filename, encoding="utf-8") as fp:
+                    data = json.load(fp)
+
+                self.patch = data["patch"]
+                self.assets = data["assets"]
+            except (ValueError, KeyError):
+                logger.warning(f"Asset manifest '{filename}' is corrupt, starting from scratch")
+
+    def __contains__(self, filename: str):
+        return filename in self.assets
+
+    def add(self, asset: Asset, content_hash: str):
+        self.assets[asset.filename] = {"url": asset.url, "sha256": content_hash}
+
+    def remove(self, filename: str):
+        self.assets.pop(filename, None)
+
+    def save(self):
+        temp_file = f"{self.filename}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as fp:
+            json.dump({"patch": self.patch, "assets": self.assets}, fp)
+
+        os.replace(temp_file, self.filename)
+
+def _hash_file(filename: str) -> str:
+    content_hash = sha256()
+    with open(filename, "rb") as fp:
+        for chunk in iter(lambda: fp.read(_CHUNK_SIZE), b""):
+            content_hash.update(chunk)
+
+    return content_hash.hexdigest()
+
+class AssetSynchronizer:
+    """
+    Downloads assets (images, data files, etc.) concurrently with a limit
+    on both the amount of requests in flight and the amount of requests per second.
+
+    Downloads are written to a '.part' file first and moved into place when done.
+    If a download is interrupted, it is resumed from where it stopped using
+    a HTTP range request the next time it is attempted.
+    """
+    def __init__(
+        self,
+        manifest: AssetManifest,
+        max_concurrent: int = 8,
+        requests_per_second: float = 20,
+        tries: int = 3,
+        http_client: httpx.AsyncClient = None
+    ):
+        """
+        Initialize the AssetSynchronizer.
+
+        ### Parameters
+        :param manifest:            Manifest of the assets that are already downloaded
+        :param max_concurrent:      Maximum amount of downloads in progress at once
+        :param requests_per_second: Maximum amount of requests per second on average
+        :param tries:               Amount of times to try downloading each asset
+        :param http_client:         HTTP client to use, a new one is created if not given
+        """
+        self.manifest = manifest
+        self.max_concurrent = max_concurrent
+        self.requests_per_second = requests_per_second
+        self.tries = tries
+        self.http_client = http_client
+
+    def _get_missing_assets(self, assets: list[Asset]) -> list[Asset]:
+        missing = []
+        folder_contents = {}
+        for asset in assets:
+            if asset.filename in self.manifest:
+                continue
+
+            # Assets downloaded before the manifest existed are added to it instead.
+            # This lists each folder once instead of checking every file.
+            folder, name = os.path.split(asset.filename)
+            if folder not in folder_contents:
+                os.makedirs(folder, exist_ok=True)
+                folder_contents[folder] = set(os.listdir(folder))
+
+            if name in folder_contents[folder]:
+                self.manifest.add(asset, _hash_file(asset.filename))
+            else:
+                missing.append(asset)
+
+        return missing
+
+    async def _download(self, client: httpx.AsyncClient, limiter: RateLimiter, asset: Asset):
+        part_file = f"{asset.filename}.part"
+        content_hash = sha256()
+        headers = {}
+
+        if os.path.exists(part_file):
+            with open(part_file, "rb") as fp:
+                for chunk in iter(lambda: fp.read(_CHUNK_SIZE), b""):
+                    content_hash.update(chunk)
+
+            headers["Range"] = f"bytes={os.path.getsize(part_file)}-"
+
+        await limiter.acquire()
+        async with client.stream("GET", asset.url, headers=headers) as response:
+            if response.status_code == 429:
+                limiter.pause(float(response.headers.get("Retry-After", 1)))
+            elif response.status_code == 416:
+                # Partial download is no good, start over next time
+                os.remove(part_file)
+
+            if response.status_code == 200:
+                # Server doesn't support resuming, start over
+                content_hash = sha256()
+                mode = "wb"
+            elif response.status_code == 206:
+                mode = "ab"
+            else:
+                response.raise_for_status()
+                raise httpx.HTTPStatusError(
+                    f"Unexpected status code {response.status_code}", request=response.request, response=response
+                )
+
+            with open(part_file, mode) as fp:
+                async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                    content_hash.update(chunk)
+                    fp.write(chunk)
+
+        os.replace(part_file, asset.filename)
+
+        return content_hash.hexdigest()
+
+    async def _download_with_retries(self, client: httpx.AsyncClient, limiter: RateLimiter, asset: Asset):
+        for attempt in range(self.tries):
+            try:
+                return await self._download(client, limiter, asset)
+
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code == 404:
+                    break
+
+                logger.warning(f"Status {exc.response.status_code} when downloading '{asset.url}'")
+
+            except httpx.HTTPError:
+                logger.warning(f"Error when downloading '{asset.url}' (attempt {attempt + 1}/{self.tries})")
+
+            await asyncio.sleep(2 ** attempt)
+
+        logger.error(f"Could not download {asset.description or asset.url}")
+        return None
+
+    async def sync(self, assets: list[Asset]) -> list[Asset]:
+        """
+        Download the given assets that aren't in the manifest already.
+
+        ### Returns
+        `list[Asset]`: The assets that were downloaded
+        """
+        missing = self._get_missing_assets(assets)
+        if missing == []:
+            return []
+
+        logger.info(f"Downloading {len(missing)} assets")
+
+        limiter = RateLimiter(self.requests_per_second, self.max_concurrent)
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        downloaded = []
+
+        async def download(client, asset):
+            async with semaphore:
+                content_hash = await self._download_with_retries(client, limiter, asset)
+
+            if content_hash is not None:
+                self.manifest.add(asset, content_hash)
+                downloaded.append(asset)
+
+                if len(downloaded) % 100 == 0:
+                    # Save progress now and then, in case we get interrupted
+                    self.manifest.save()
+
+        client = self.http_client or httpx.AsyncClient(timeout=30, follow_redirects=True)
+        try:
+            await asyncio.gather(*[download(client, asset) for asset in missing])
+        finally:
+            if self.http_client is None:
+                await client.aclose()
+
+            self.manifest.save()
+
+        return downloaded
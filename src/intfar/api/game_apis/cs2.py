@@ -1,7 +1,7 @@
 import asyncio
 import json
-import bz2
 import os
+from time import perf_counter
 from uuid import uuid4
 import subprocess
 
@@ -23,8 +23,11 @@ from gevent.event import AsyncResult
 
 from intfar.api.config import Config
 from intfar.api.game_api_client import GameAPIClient
+from intfar.api.game_apis.demo_cache import ParsedDemoCache
+from intfar.api.game_apis.demo_stream import DemoStats, download_demo, get_peak_rss
 from intfar.api.user import User
-from intfar.api.util import run_async_in_thread
+from intfar.api.util import SearchIndex
+from intfar.api.game_apis.demo_parse_service import DemoParseService
 
 _ENDPOINT_NEXT_MATCH = (
     "https://api.steampowered.com/ICSGOPlayers_730/GetNextMatchSharingCode/v1"
@@ -39,6 +42,12 @@ _ENDPOINT_PLAYER_SUMMARY = (
     "&steamids=[steam_id]"
 )
 
+def parse_demo_file(demo_file: str) -> dict:
+    # Parse the demo using awpy. This runs in a DemoParseService worker process
+    parser = DemoParser(demofile=demo_file)
+
+    return parser.parse()
+
 class SteamAPIClient(GameAPIClient):
     """
     Class for interacting with Steam and CS2 web and Game Coordinator APIs.
@@ -49,6 +58,7 @@ class SteamAPIClient(GameAPIClient):
         self._logging_on = False
 
         self.map_names = {}
+        self._map_indexes = None
         self.game_types = {
             1048584: "cache",
             8200: "nuke",
@@ -66,6 +76,9 @@ class SteamAPIClient(GameAPIClient):
 
         #self.get_latest_data()
 
+        self.demo_parser = DemoParseService(parse_demo_file)
+        self.demo_cache = ParsedDemoCache(f"{self.config.resources_folder}/data/cs2/cache")
+
         self._init_clients()
         self.login()
 
@@ -139,59 +152,66 @@ class SteamAPIClient(GameAPIClient):
                 logger.exception(f"Exception when downloading CS2 maps from {url}")
                 sleep(2 + attempt)
 
-    async def download_demo_file(self, filename: str, url: str):
+    async def download_demo_file(self, filename: str, url: str) -> DemoStats:
         try:
-            data = await self.httpx_client.get(url)
+            stats = await download_demo(self.httpx_client, url, f"{filename}.dem")
 
-            if data.status_code == 404:
+            if stats is None:
                 logger.bind(demo_url=url).error("CS Demo file was not found on Valve's servers!")
-                return None
 
-            with open(f"{filename}.dem.bz2", "wb") as fp:
-                async for chunk in data.aiter_bytes(chunk_size=128):
-                    fp.write(chunk)
+            return stats
 
         except httpx.RequestError:
             logger.exception("Exception when downloading CS2 demo file from", url)
             return None
 
-        return filename
-
-    def _parse_in_thread(self, demo_file: str, demo_bytes: bytes):
-        # Decompress the gz2 compressed demo file
-        decompressed = bz2.decompress(demo_bytes)
-        with open(demo_file, "wb") as fp:
-            fp.write(decompressed)
-
-        # Parse the demo using awpy
-        parser = DemoParser(demofile=demo_file)
-
-        return parser.parse()
-
-    async def parse_demo(self, demo_url: str):
+    async def parse_demo(self, demo_url: str, match_sharecode: str = None):
         """
         Download and parse demo file from the given URL using awpy.
+        The demo is decompressed while it is being downloaded.
+        If a sharecode is given, the parsed demo is cached for that sharecode
+        and later calls return the cached data without downloading anything.
         """
+        if match_sharecode is not None:
+            demo_game_data = await asyncio.to_thread(self.demo_cache.get, match_sharecode)
+            if demo_game_data is not None:
+                logger.bind(sharecode=match_sharecode).info("Using cached CS2 demo")
+                demo_game_data["demo_parse_status"] = "parsed"
+                return demo_game_data
+
         demo_file = uuid4().hex
 
-        demo_bz2_file = f"{demo_file}.dem.bz2"
         demo_dem_file = f"{demo_file}.dem"
         demo_json_file = f"{demo_file}.json"
 
         try:
-            # Download and save the demo file to disk
+            job = self.demo_parser.get_active_job(demo_url)
+            if job is not None:
+                # Demo is already being parsed (fx. if an earlier call timed out)
+                logger.info("Waiting for CS2 demo that is already being parsed...")
+                demo_game_data = dict(await self.demo_parser.wait(job))
+                demo_game_data["demo_parse_status"] = "parsed"
+                return demo_game_data
+
+            # Download and decompress the demo file to disk
             logger.info("Downloading CS2 demo...")
-            demo_file = await self.download_demo_file(demo_file, demo_url)
+            stats = await self.download_demo_file(demo_file, demo_url)
 
-            if demo_file is None:
+            if stats is None:
                 demo_game_data = {"demo_parse_status": "missing"}
 
             else:
-                with open(demo_bz2_file, "rb") as fp:
-                    all_bytes = fp.read()
-
                 logger.info("Parsing CS2 demo...")
-                demo_game_data = await run_async_in_thread(self._parse_in_thread, demo_dem_file, all_bytes)
+                start = perf_counter()
+                demo_game_data = dict(await self.demo_parser.parse(demo_dem_file, key=demo_url))
+
+                stats.parse_time = perf_counter() - start
+                stats.peak_rss = get_peak_rss()
+                logger.bind(demo_url=demo_url, **stats.to_dict()).info("Parsed CS2 demo")
+
+                if match_sharecode is not None:
+                    await asyncio.to_thread(self.demo_cache.put, match_sharecode, demo_game_data)
+
                 demo_game_data["demo_parse_status"] = "parsed"
 
         except OSError: # Demo file was corrupt
@@ -205,7 +225,7 @@ class SteamAPIClient(GameAPIClient):
 
         finally:
             # Clean up the files after use
-            for filename in (demo_bz2_file, demo_dem_file, demo_json_file):
+            for filename in (demo_dem_file, demo_json_file):
                 if os.path.exists(filename):
                     os.remove(filename)
 
@@ -236,7 +256,7 @@ class SteamAPIClient(GameAPIClient):
 
         demo_url = round_stats[-1]["map"]
 
-        game_info.update(await self.parse_demo(demo_url))
+        game_info.update(await self.parse_demo(demo_url, match_sharecode))
 
         if game_info["demo_parse_status"] == "error":
             return None
@@ -369,6 +389,19 @@ class SteamAPIClient(GameAPIClient):
 
         return False
 
+    def _get_map_indexes(self):
+        # Map names are filled in place when they are downloaded, so rebuild the indexes when they change
+        key = (id(self.map_names), len(self.map_names))
+        if self._map_indexes is None or self._map_indexes[0] != key:
+            map_names = list(self.map_names.items())
+            self._map_indexes = (
+                key,
+                SearchIndex((map_id, map_name.lower()) for map_id, map_name in map_names),
+                SearchIndex((map_id, map_name.lower().replace("'", "").replace(".", "")) for map_id, map_name in map_names),
+            )
+
+        return self._map_indexes[1:]
+
     def try_find_playable_id(self, search_term):
         """
         Search for the ID of a map by name.
@@ -380,23 +413,17 @@ class SteamAPIClient(GameAPIClient):
         :param search_term: The search term to try and match map against.
         """
         search_name = search_term.strip().lower()
-        candidates = []
-
-        # Try to find candidates that have the search_term in ther name.
-        for map_id in self.map_names:
-            lowered = self.map_names[map_id].lower()
-            if search_name == lowered:
-                return map_id
+        names_index, stripped_names_index = self._get_map_indexes()
 
-            if search_name in lowered:
-                candidates.append(map_id)
-                continue
+        if (map_id := names_index.find_exact(search_name)) is not None:
+            return map_id
 
-            # Remove apostrophe and period from name.
-            if search_name in lowered.replace("'", "").replace(".", ""):
-                candidates.append(map_id)
+        # Try to find candidates that have the search_term in their name,
+        # with or without apostrophes and periods.
+        candidates = set(names_index.find_substring(search_name))
+        candidates.update(stripped_names_index.find_substring(search_name))
 
-        return candidates[0] if len(candidates) == 1 else None
+        return candidates.pop() if len(candidates) == 1 else None
 
     async def send_friend_request(self, steam_id: str):
         try:
@@ -529,7 +556,15 @@ class SteamAPIClient(GameAPIClient):
     def is_logged_in(self):
         return self.steam_client.logged_on
 
+    def get_demo_parse_jobs(self) -> list[dict]:
+        """
+        Get the state of demos that are queued, being parsed, or were recently parsed.
+        """
+        return self.demo_parser.get_jobs()
+
     def close(self):
+        self.demo_parser.close()
+
         if self.steam_client.logged_on:
             self.logged_on_once = False
             self.steam_client.logout()
@@ -0,0 +1,86 @@
+import os
+import pickle
+import zlib
+from hashlib import sha256
+
+from mhooge_flask.logging import logger
+
+class ParsedDemoCache:
+    """
+    On-disk cache of parsed demos, so that a demo only has to be downloaded
+    and parsed once, even if the game is retried or saved again manually.
+
+    Each parsed demo is stored as a compressed pickle, named by the hash of its
+    sharecode. Pickling keeps the data exactly as awpy returned it, including
+    NaN values and rows that don't all have the same keys. When the
+    total size of the cache goes above `max_size`, the least recently used
+    entries are deleted.
+    """
+    def __init__(self, folder: str, max_size: int = 1024 ** 3):
+        """
+        Initialize the ParsedDemoCache.
+
+        ### Parameters
+        :param folder:      Folder to store the cached demos in
+        :param max_size:    Maximum total size of the cached demos in bytes
+        """
+        self.folder = folder
+        self.max_size = max_size
+
+    def _get_path(self, key: str) -> str:
+        return f"{self.folder}/{sha256(key.encode('utf-8')).hexdigest()}.pickle"
+
+    def get(self, key: str) -> dict:
+        """
+        Get the parsed demo with the given key (sharecode), or None if it isn't cached.
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as fp:
+                data = pickle.loads(zlib.decompress(fp.read()))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.bind(key=key).exception("Cached demo could not be read, removing it")
+            os.remove(path)
+            return None
+
+        # Bump the modification time, which is used to find the least recently used entries
+        os.utime(path)
+
+        return data
+
+    def put(self, key: str, data: dict) -> bool:
+        """
+        Save the parsed demo with the given key (sharecode) to the cache.
+        Returns whether the demo could be saved.
+        """
+        try:
+            serialized = zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as exc:
+            logger.bind(key=key, reason=repr(exc)).warning("Parsed demo could not be pickled, it is not cached")
+            return False
+
+        os.makedirs(self.folder, exist_ok=True)
+
+        path = self._get_path(key)
+        with open(f"{path}.tmp", "wb") as fp:
+            fp.write(serialized)
+
+        os.replace(f"{path}.tmp", path)
+
+        self._evict()
+
+        return True
+
+    def _evict(self):
+        entries = [entry for entry in os.scandir(self.folder) if entry.name.endswith(".pickle")]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+
+        total_size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries[:-1]:
+            if total_size <= self.max_size:
+                break
+
+            total_size -= entry.stat().st_size
+            os.remove(entry.path)
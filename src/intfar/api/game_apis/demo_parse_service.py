@@ -0,0 +1,274 @@
+import os
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import count
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from time import time
+from typing import Any, Callable
+
+from mhooge_flask.logging import logger
+
+class DemoParseError(Exception):
+    pass
+
+class DemoParseQueueFullError(DemoParseError):
+    pass
+
+class DemoParseTimeoutError(DemoParseError):
+    pass
+
+class DemoParseCancelledError(DemoParseError):
+    pass
+
+@dataclass
+class ParseJob:
+    job_id: int
+    key: str
+    demo_file: str
+    timeout: float
+    state: str = "queued"
+    submitted: float = field(default_factory=time)
+    started: float = None
+    finished: float = None
+    error: str = None
+    future: asyncio.Future = field(default=None, repr=False)
+
+    @property
+    def active(self):
+        return self.state in ("queued", "running")
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "key": self.key,
+            "state": self.state,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+def _run_worker(conn: Connection, parse_func: Callable[[str], Any]):
+    while True:
+        try:
+            job_id, demo_file = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        try:
+            conn.send((job_id, True, parse_func(demo_file)))
+        except Exception as exc:
+            try:
+                conn.send((job_id, False, exc))
+            except Exception:
+                # Exception can't be pickled
+                conn.send((job_id, False, DemoParseError(repr(exc))))
+
+class _Worker:
+    def __init__(self, context, parse_func: Callable[[str], Any]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_run_worker, args=(child_conn, parse_func), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+        self.job: ParseJob = None
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+class DemoParseService:
+    """
+    Parses demos in a pool of worker processes, so that parsing doesn't hold
+    the GIL of the process that handles Steam commands, and several demos can be
+    parsed at once. Worker processes are started when needed and reused for
+    later jobs. A worker is killed (and replaced later) if its job times out
+    or is cancelled.
+
+    Jobs are waited for with asyncio. The state of current and recent jobs
+    can be fetched with `get_jobs`.
+    """
+    def __init__(
+        self,
+        parse_func: Callable[[str], Any],
+        max_workers: int = None,
+        max_queued: int = 16,
+        timeout: float = 150,
+        history_size: int = 20
+    ):
+        """
+        Initialize the DemoParseService.
+
+        ### Parameters
+        :param parse_func:      Module-level function that parses a demo file and returns the result
+        :param max_workers:     Maximum amount of worker processes (defaults to CPU count, at most 4)
+        :param max_queued:      Maximum amount of jobs waiting for a worker
+        :param timeout:         Default time in seconds a job is allowed to run for
+        :param history_size:    Amount of finished jobs to keep track of
+        """
+        self.parse_func = parse_func
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 4)
+        self.max_queued = max_queued
+        self.timeout = timeout
+
+        self._context = get_context("spawn")
+        self._workers: list[_Worker] = []
+        self._queue: deque[ParseJob] = deque()
+        self._history: deque[ParseJob] = deque(maxlen=history_size)
+        self._job_ids = count()
+        self._dispatcher: asyncio.Task = None
+
+    def submit(self, demo_file: str, key: str = None, timeout: float = None) -> ParseJob:
+        """
+        Add a job for parsing the given demo file to the queue.
+        Raises DemoParseQueueFullError if too many jobs are queued already.
+        """
+        if len(self._queue) >= self.max_queued:
+            raise DemoParseQueueFullError(f"{len(self._queue)} demos are already waiting to be parsed")
+
+        job = ParseJob(
+            next(self._job_ids),
+            key or demo_file,
+            demo_file,
+            timeout or self.timeout,
+            future=asyncio.get_running_loop().create_future()
+        )
+        self._queue.append(job)
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        return job
+
+    async def wait(self, job: ParseJob):
+        """
+        Wait for the given job to finish and return the result of parsing the demo.
+        Cancelling the wait cancels the job as well.
+        """
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            self.cancel(job.job_id)
+            raise
+
+    async def parse(self, demo_file: str, key: str = None, timeout: float = None):
+        return await self.wait(self.submit(demo_file, key, timeout))
+
+    def get_active_job(self, key: str) -> ParseJob:
+        for job in self._active_jobs():
+            if job.key == key:
+                return job
+
+        return None
+
+    def get_jobs(self) -> list[dict]:
+        """
+        Get the state of all queued, running, and recently finished jobs.
+        """
+        jobs = list(self._history) + self._active_jobs()
+        return [job.to_dict() for job in sorted(jobs, key=lambda job: job.job_id)]
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel the job with the given ID, killing the worker that runs it if needed.
+        Returns whether the job was found and cancelled.
+        """
+        for job in self._queue:
+            if job.job_id == job_id:
+                self._queue.remove(job)
+                self._finish(job, "cancelled", DemoParseCancelledError("Job was cancelled"))
+                return True
+
+        for worker in self._workers:
+            if worker.job is not None and worker.job.job_id == job_id:
+                self._kill_worker(worker, "cancelled", DemoParseCancelledError("Job was cancelled"))
+                return True
+
+        return False
+
+    def close(self):
+        for job in list(self._queue):
+            self.cancel(job.job_id)
+
+        for worker in list(self._workers):
+            if worker.job is not None:
+                self._kill_worker(worker, "cancelled", DemoParseCancelledError("Service was closed"))
+            else:
+                self._workers.remove(worker)
+                worker.kill()
+
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+
+    def _active_jobs(self) -> list[ParseJob]:
+        return [worker.job for worker in self._workers if worker.job is not None] + list(self._queue)
+
+    def _finish(self, job: ParseJob, state: str, result):
+        job.state = state
+        job.finished = time()
+        self._history.append(job)
+
+        if isinstance(result, BaseException):
+            job.error = repr(result)
+            if not job.future.done():
+                job.future.set_exception(result)
+
+        elif not job.future.done():
+            job.future.set_result(result)
+
+    def _kill_worker(self, worker: _Worker, state: str, exception: Exception):
+        job = worker.job
+        worker.job = None
+        self._workers.remove(worker)
+        worker.kill()
+
+        self._finish(job, state, exception)
+
+    def _collect_results(self):
+        for worker in list(self._workers):
+            job = worker.job
+            if job is None:
+                continue
+
+            try:
+                if not worker.conn.poll():
+                    if time() - job.started > job.timeout:
+                        logger.bind(demo_file=job.demo_file).warning("Demo parsing timed out, killing worker")
+                        self._kill_worker(worker, "timed_out", DemoParseTimeoutError(f"Parsing took over {job.timeout} seconds"))
+
+                    continue
+
+                _, success, result = worker.conn.recv()
+
+            except (EOFError, OSError):
+                self._kill_worker(worker, "failed", DemoParseError("Worker process died"))
+                continue
+
+            worker.job = None
+            self._finish(job, "done" if success else "failed", result)
+
+    def _assign_jobs(self):
+        for worker in self._workers:
+            if worker.job is None and self._queue:
+                self._start_job(worker, self._queue.popleft())
+
+        while self._queue and len(self._workers) < self.max_workers:
+            worker = _Worker(self._context, self.parse_func)
+            self._workers.append(worker)
+            self._start_job(worker, self._queue.popleft())
+
+    def _start_job(self, worker: _Worker, job: ParseJob):
+        job.state = "running"
+        job.started = time()
+        worker.job = job
+        worker.conn.send((job.job_id, job.demo_file))
+
+    async def _dispatch(self):
+        while self._active_jobs() != []:
+            self._collect_results()
+            self._assign_jobs()
+
+            await asyncio.sleep(0.05)
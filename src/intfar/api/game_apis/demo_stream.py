@@ -0,0 +1,115 @@
+import asyncio
+import bz2
+from dataclasses import dataclass
+from time import perf_counter
+
+import httpx
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+# Size of chunks read from the network and of the write buffer for the demo file
+_CHUNK_SIZE = 1024 * 1024
+_WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+
+def get_peak_rss() -> int:
+    """
+    Get the peak resident set size of the current process in bytes,
+    or None if it can't be measured on this platform.
+    """
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+@dataclass
+class DemoStats:
+    compressed_size: int = 0
+    demo_size: int = 0
+    download_time: float = 0
+    parse_time: float = 0
+    peak_rss: int = None
+
+    def to_dict(self):
+        return {
+            "compressed_mb": round(self.compressed_size / 1024 ** 2, 1),
+            "demo_mb": round(self.demo_size / 1024 ** 2, 1),
+            "download_secs": round(self.download_time, 2),
+            "parse_secs": round(self.parse_time, 2),
+            "peak_rss_mb": None if self.peak_rss is None else round(self.peak_rss / 1024 ** 2, 1),
+        }
+
+class DemoWriter:
+    """
+    Decompresses a bz2 compressed demo one chunk at a time and writes
+    the decompressed data straight to the demo file, so neither the compressed
+    nor the decompressed demo has to be kept in memory.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.compressed_size = 0
+        self.demo_size = 0
+
+        self._decompressor = bz2.BZ2Decompressor()
+        self._fp = open(filename, "wb", buffering=_WRITE_BUFFER_SIZE)
+
+    def write(self, chunk: bytes):
+        self.compressed_size += len(chunk)
+
+        while chunk:
+            if self._decompressor.eof:
+                # bz2 files can consist of several streams after each other
+                self._decompressor = bz2.BZ2Decompressor()
+
+            data = self._decompressor.decompress(chunk)
+            self.demo_size += len(data)
+            self._fp.write(data)
+
+            chunk = self._decompressor.unused_data if self._decompressor.eof else b""
+
+    def close(self):
+        self._fp.close()
+
+        if not self._decompressor.eof:
+            raise OSError("Compressed demo file ended before the end-of-stream marker was reached")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is not None:
+            self._fp.close()
+            return False
+
+        self.close()
+
+async def download_demo(http_client: httpx.AsyncClient, url: str, filename: str) -> DemoStats:
+    """
+    Download the bz2 compressed demo at the given URL and decompress it to the
+    given file while it is downloading.
+
+    ### Returns
+    `DemoStats`: Sizes and time spent on the download, or None if the demo doesn't exist
+    """
+    stats = DemoStats()
+    start = perf_counter()
+
+    async with http_client.stream("GET", url) as response:
+        if response.status_code == 404:
+            return None
+
+        response.raise_for_status()
+
+        with DemoWriter(filename) as writer:
+            async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                # Decompressing and writing a chunk would block the event loop
+                await asyncio.to_thread(writer.write, chunk)
+
+    stats.compressed_size = writer.compressed_size
+    stats.demo_size = writer.demo_size
+    stats.download_time = perf_counter() - start
+
+    return stats
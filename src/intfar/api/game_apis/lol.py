@@ -1,7 +1,8 @@
-from time import sleep
+from time import sleep, time
 from glob import glob
-from os import remove, mkdir
-from os.path import exists
+from os import remove, replace, makedirs
+from os.path import exists, basename
+from threading import Thread
 import json
 import asyncio
 from typing import Literal
@@ -10,11 +11,18 @@ from mhooge_flask.logging import logger
 import httpx
 
 from intfar.api.game_api_client import GameAPIClient
+from intfar.api.game_apis.asset_sync import Asset, AssetManifest, AssetSynchronizer
+from intfar.api.game_apis.riot_rate_limit import RiotRateLimiter
 from intfar.api.user import User
 from intfar.api.config import Config
+from intfar.api.util import SearchIndex
 
 API_PLATFORM = "https://euw1.api.riotgames.com"
 API_REGION = "https://europe.api.riotgames.com"
+DDRAGON_URL = "https://ddragon.leagueoflegends.com"
+
+# How often to look for data from a new patch, in seconds
+PATCH_CHECK_INTERVAL = 60
 
 class RiotAPIClient(GameAPIClient):
     """
@@ -24,17 +32,22 @@ class RiotAPIClient(GameAPIClient):
         super().__init__(game, config)
         self.champ_names = {}
         self.champ_ids = {}
+        self._champ_indexes = (SearchIndex([]), SearchIndex([]))
         self.champ_portraits_path = f"{config.static_folder}/img/champions/portraits"
         self.champ_splash_path = f"{config.static_folder}/img/champions/splashes"
         self.champ_abilities_path = f"{config.static_folder}/img/champions/abilities"
         self.item_icons_path = f"{config.static_folder}/img/items"
         self.champ_data_path = f"{config.static_folder}/champ_data"
         self.latest_patch = None
+        self._sync_thread = None
+        self._patch_checked = 0
+        self.rate_limiter = RiotRateLimiter()
 
         self.get_latest_data()
 
     @property
     def playable_count(self):
+        self._check_for_new_patch()
         return len(self.champ_ids)
 
     @property
@@ -53,43 +66,91 @@ class RiotAPIClient(GameAPIClient):
     def maps_file(self):
         return f"{self.data_path}/maps.json"
 
+    @property
+    def manifest_file(self):
+        return f"{self.data_path}/assets.json"
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["_sync_thread"] = None
+        return state
+
+    def _get_local_patch(self):
+        patches = [
+            basename(filename).removeprefix("champions-").removesuffix(".json")
+            for filename in glob(f"{self.data_path}/champions-*.json")
+        ]
+        if patches == []:
+            return None
+
+        return max(patches, key=lambda patch: tuple(int(x) for x in patch.split(".") if x.isdigit()))
+
+    def _check_for_new_patch(self):
+        # Assets are synced in the background, possibly by another process,
+        # so look for data from a newer patch once in a while
+        if time() - self._patch_checked < PATCH_CHECK_INTERVAL:
+            return
+
+        self._patch_checked = time()
+        patch = self._get_local_patch()
+        if patch is not None and patch != self.latest_patch:
+            self.latest_patch = patch
+            self.initialize_champ_dicts()
+
     def get_latest_data(self):
         """
         Fetch information about the latest League of Legends patch.
-        First, fetches what the latest patch is,
-        then downloads champion metadata, splashes, and portraits.
+        Champion metadata, splashes, portraits, etc. for the patch are
+        downloaded in the background while the data from the previous patch
+        is used. If there is no data from a previous patch, this waits for
+        the download to finish.
         """
-        if not exists(self.data_path):
-            mkdir(self.data_path)
+        makedirs(self.data_path, exist_ok=True)
 
-        self.latest_patch = self.get_latest_patch()
-        if not exists(self.champions_file):
-            self.get_latest_champions_file()
+        local_patch = self._get_local_patch()
+        if local_patch is not None and local_patch != self.latest_patch:
+            self.latest_patch = local_patch
+            self.initialize_champ_dicts()
 
-        if not exists(self.items_file):
-            self.get_latest_items_file()
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return
 
-        self.initialize_champ_dicts()
-        self.get_champion_portraits()
-        self.get_champion_splashes()
-        self.get_champion_data()
+        self._sync_thread = Thread(target=self._run_asset_sync, daemon=True)
+        self._sync_thread.start()
+
+        if local_patch is None:
+            self._sync_thread.join()
 
     def initialize_champ_dicts(self):
         champions_file = self.champions_file
         if champions_file is None:
             return
 
+        champ_names = {}
         with open(champions_file, encoding="utf-8") as fp:
             champion_data = json.load(fp)
             for champ_name in champion_data["data"]:
                 data_for_champ = champion_data["data"][champ_name]
-                self.champ_names[int(data_for_champ["key"])] = data_for_champ["name"]
+                champ_names[int(data_for_champ["key"])] = data_for_champ["name"]
+
+        name_order_champs = sorted(list(champ_names.items()), key=lambda x: x[1])
+
+        # Indexes of lowercased champion names, with and without apostrophes and periods
+        champ_indexes = (
+            SearchIndex((champ_id, champ_name.lower()) for champ_id, champ_name in champ_names.items()),
+            SearchIndex(
+                (champ_id, champ_name.lower().replace("'", "").replace(".", "")) for champ_id, champ_name in champ_names.items()
+            ),
+        )
 
-        name_order_champs = sorted(list(self.champ_names.items()), key=lambda x: x[1])
+        # Swap in the new data at once, as it might be read from another thread
+        self.champ_names = champ_names
+        self._champ_indexes = champ_indexes
         self.champ_ids = {kv[0]: index for index, kv in enumerate(name_order_champs)}
+        self._patch_checked = time()
 
     def get_latest_patch(self):
-        url = "https://ddragon.leagueoflegends.com/api/versions.json"
+        url = f"{DDRAGON_URL}/api/versions.json"
         try:
             response_json = httpx.get(url).json()
             return response_json[0]
@@ -97,181 +158,137 @@ class RiotAPIClient(GameAPIClient):
             logger.exception("Exception when getting newest game version from Riot API!")
             return None
 
-    def get_latest_champions_file(self):
-        url = f"http://ddragon.leagueoflegends.com/cdn/{self.latest_patch}/data/en_US/champion.json"
-        logger.info(f"Downloading latest champions file: '{self.champions_file}'")
-
-        old_files = glob(f"{self.data_path}/champions-*.json")
-
-        try:
-            response_json = httpx.get(url).json()
-            f_out = open(self.champions_file, "w", encoding="utf-8")
-            json.dump(response_json, f_out)
-            for old_file in old_files:
-                remove(old_file)
-        except httpx.RequestError:
-            logger.exception("Exception when getting newest champion.json file from Riot API.")
-
-    def get_latest_items_file(self):
-        url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_patch}/data/en_US/item.json"
-        logger.info(f"Downloading latest item file: '{self.items_file}'")
-
-        old_files = glob(f"{self.data_path}/items-*.json")
-
+    def _run_asset_sync(self):
         try:
-            response_json = httpx.get(url).json()
-            f_out = open(self.items_file, "w", encoding="utf-8")
-            json.dump(response_json, f_out)
-            for old_file in old_files:
-                remove(old_file)
-        except httpx.RequestError:
-            logger.exception("Exception when getting newest item.json file from Riot API.")
-
-    def get_champion_portraits(self):
-        base_url = f"http://ddragon.leagueoflegends.com/cdn/{self.latest_patch}/img/champion"
-
-        with open(self.champions_file, encoding="utf-8") as fp:
-            champion_data = json.load(fp)
-
-        for champ_name in champion_data["data"]:
-            champ_id = int(champion_data["data"][champ_name]["key"])
-            filename = self.get_champ_portrait_path(champ_id)
-            if exists(filename):
-                continue
-
-            url = f"{base_url}/{champ_name}.png"
-            logger.info(f"Downloading champion portrait for '{champ_name}'")
-
-            try:
-                data = httpx.get(url)
-                with open(filename, "wb") as fp_out:
-                    for chunk in data.iter_bytes(chunk_size=128):
-                        fp_out.write(chunk)
-
-            except httpx.RequestError:
-                logger.exception(f"Exception when getting champion portrait for {champ_name} from Riot API.")
-
-            sleep(0.5)
-
-    def get_champion_splashes(self):
-        base_url = f"http://ddragon.leagueoflegends.com/cdn/img/champion/loading"
-
-        with open(self.champions_file, encoding="utf-8") as fp:
-            champion_data = json.load(fp)
+            asyncio.run(self.sync_assets())
+        except Exception:
+            logger.exception("Exception when downloading latest data from Riot API!")
 
+    def _get_champion_assets(self, patch: str, champion_data: dict) -> list[Asset]:
+        assets = []
         for champ_name in champion_data["data"]:
             champ_id = int(champion_data["data"][champ_name]["key"])
-            filename = self.get_champ_splash_path(champ_id)
-            if exists(filename):
-                continue
-
-            url = f"{base_url}/{champ_name}_0.jpg"
-            logger.info(f"Downloading champion splash for '{champ_name}'")
-
-            try:
-                data = httpx.get(url)
-                with open(filename, "wb") as fp_out:
-                    for chunk in data.iter_bytes(chunk_size=128):
-                        fp_out.write(chunk)
-
-            except httpx.RequestError:
-                logger.exception(f"Exception when getting champion splash for {champ_name} from Riot API.")
-
-            sleep(0.5)
-
-    def get_champion_abilities(self):
-        base_url_passives = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_patch}/img/passive"
-        base_url_actives = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_patch}/img/spell"
-
-        with open(self.champions_file, encoding="utf-8") as fp:
-            champion_data = json.load(fp)
-
+            assets.extend([
+                Asset(
+                    f"{DDRAGON_URL}/cdn/{patch}/img/champion/{champ_name}.png",
+                    self.get_champ_portrait_path(champ_id),
+                    f"champion portrait for '{champ_name}'"
+                ),
+                Asset(
+                    f"{DDRAGON_URL}/cdn/img/champion/loading/{champ_name}_0.jpg",
+                    self.get_champ_splash_path(champ_id),
+                    f"champion splash for '{champ_name}'"
+                ),
+                Asset(
+                    f"{DDRAGON_URL}/cdn/{patch}/data/en_US/champion/{champ_name}.json",
+                    self.get_champ_data_path(champ_id),
+                    f"champion data for '{champ_name}'"
+                ),
+            ])
+
+        return assets
+
+    def _get_ability_assets(self, patch: str, champion_data: dict) -> list[Asset]:
+        assets = []
         for champ_name in champion_data["data"]:
             champ_id = int(champion_data["data"][champ_name]["key"])
             champ_data_file = self.get_champ_data_path(champ_id)
+            if not exists(champ_data_file):
+                continue
 
             with open(champ_data_file, "r", encoding="utf-8") as fp:
                 champ_data = json.load(fp)
 
-            logger.info(f"Downloading ability icons for '{champ_name}'")
-
             abilities = [champ_data["data"][champ_name]["passive"]] + champ_data["data"][champ_name]["spells"]
 
             for index, ability in enumerate(abilities):
-                base_url = base_url_passives if index == 0 else base_url_actives
+                image_type = "passive" if index == 0 else "spell"
                 ability_id = ability["id"] if "id" in ability else "passive"
-
-                filename = self.get_champ_abilities_path(champ_id, ability_id)
-                if exists(filename):
-                    continue
-
                 image_name = ability["image"]["full"]
-                url = f"{base_url}/{image_name}"
-
-                try:
-                    data = httpx.get(url)
-                    with open(filename, "wb") as fp:
-                        for chunk in data.iter_bytes(chunk_size=128):
-                            fp.write(chunk)
 
-                except httpx.RequestError:
-                    logger.exception(f"Exception when getting ability icon for {ability['name']} for {champ_name} from Riot API.")
-
-                sleep(0.5)
-
-    def get_champion_data(self):
-        base_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_patch}/data/en_US/champion"
+                assets.append(
+                    Asset(
+                        f"{DDRAGON_URL}/cdn/{patch}/img/{image_type}/{image_name}",
+                        self.get_champ_abilities_path(champ_id, ability_id),
+                        f"ability icon for {ability['name']} for '{champ_name}'"
+                    )
+                )
+
+        return assets
+
+    def _get_item_assets(self, patch: str, item_data: dict) -> list[Asset]:
+        return [
+            Asset(
+                f"{DDRAGON_URL}/cdn/{patch}/img/item/{item_id}.png",
+                f"{self.item_icons_path}/{item_id}.png",
+                f"item icon for '{item_data['data'][item_id]['name']}'"
+            )
+            for item_id in item_data["data"]
+        ]
+
+    async def sync_assets(self):
+        """
+        Download champion and item metadata for the latest patch, followed by
+        all the portraits, splashes, ability icons, etc. that are not downloaded yet.
+        When done, the data for the new patch is used instead of the previous one.
+        """
+        patch = self.get_latest_patch()
+        if patch is None:
+            return
 
-        with open(self.champions_file, encoding="utf-8") as fp:
-            champion_data = json.load(fp)
+        manifest = AssetManifest(self.manifest_file)
+        if manifest.patch == patch and patch == self.latest_patch:
+            return
 
-        for champ_name in champion_data["data"]:
-            champ_id = int(champion_data["data"][champ_name]["key"])
+        synchronizer = AssetSynchronizer(manifest)
 
-            filename = self.get_champ_data_path(champ_id)
-            if exists(filename):
-                continue
+        # The metadata is downloaded under a temporary name, so the previous
+        # patch is used until all assets for the new one are downloaded
+        champions_file = f"{self.data_path}/champions-{patch}.json"
+        items_file = f"{self.data_path}/items-{patch}.json"
+        metadata = [
+            Asset(f"{DDRAGON_URL}/cdn/{patch}/data/en_US/champion.json", f"{champions_file}.next", "champions file"),
+            Asset(f"{DDRAGON_URL}/cdn/{patch}/data/en_US/item.json", f"{items_file}.next", "items file"),
+        ]
+        if patch != self._get_local_patch():
+            logger.info(f"Downloading data for League of Legends patch {patch}")
+            await synchronizer.sync(metadata)
 
-            url = f"{base_url}/{champ_name}.json"
-            logger.info(f"Downloading champion data for '{champ_name}'")
+            if not all(exists(asset.filename) for asset in metadata):
+                logger.error(f"Could not download metadata for patch {patch}")
+                return
 
-            try:
-                data = httpx.get(url)
-                with open(filename, "wb") as fp_out:
-                    for chunk in data.iter_bytes(chunk_size=128):
-                        fp_out.write(chunk)
+            champions_file, items_file = (asset.filename for asset in metadata)
 
-            except httpx.RequestError:
-                logger.exception(f"Exception when getting champion data for {champ_name} from Riot API.")
+        with open(champions_file, encoding="utf-8") as fp:
+            champion_data = json.load(fp)
 
-            sleep(0.5)
+        with open(items_file, encoding="utf-8") as fp:
+            item_data = json.load(fp)
 
-    def get_item_icons(self):
-        base_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_patch}/img/item"
+        await synchronizer.sync(self._get_champion_assets(patch, champion_data) + self._get_item_assets(patch, item_data))
 
-        with open(self.items_file, encoding="utf-8") as fp:
-            item_data = json.load(fp)
+        # Ability icons are listed in the champion data files downloaded above
+        await synchronizer.sync(self._get_ability_assets(patch, champion_data))
 
-        for item_id in item_data["data"]:
-            filename = f"{self.item_icons_path}/{item_id}.png"
-            if exists(filename):
-                continue
+        old_files = glob(f"{self.data_path}/champions-*.json") + glob(f"{self.data_path}/items-*.json")
 
-            url = f"{base_url}/{item_id}.png"
-            logger.info(f"Downloading item icon for '{item_data['data'][item_id]['name']}'")
+        for asset in metadata:
+            if exists(asset.filename):
+                replace(asset.filename, asset.filename.removesuffix(".next"))
+                manifest.remove(asset.filename)
 
-            try:
-                data = httpx.get(url)
-                with open(filename, "wb") as fp_out:
-                    for chunk in data.iter_bytes(chunk_size=128):
-                        fp_out.write(chunk)
+        for old_file in old_files:
+            if not old_file.endswith(f"-{patch}.json"):
+                remove(old_file)
 
-            except httpx.RequestError:
-                logger.exception(f"Exception when getting item icon for {item_id} from Riot API.")
+        manifest.patch = patch
+        manifest.save()
 
-            sleep(0.5)
+        self.latest_patch = patch
+        self.initialize_champ_dicts()
 
-    async def make_request(self, endpoint, api_route, *params, ignore_errors=[]):
+    async def make_request(self, endpoint, api_route, *params, ignore_errors=[], retries=2):
         req_string = endpoint
         for index, param in enumerate(params):
             req_string = req_string.replace("{" + str(index) + "}", str(param))
@@ -279,6 +296,7 @@ class RiotAPIClient(GameAPIClient):
         full_url = api_route + req_string
 
         token_header = {"X-Riot-Token": self.config.riot_key}
+        await self.rate_limiter.acquire()
         try:
             response = await self.httpx_client.get(full_url, headers=token_header)
         except httpx.ConnectTimeout:
@@ -288,6 +306,18 @@ class RiotAPIClient(GameAPIClient):
             ).error("Connection timeout during Riot API request")
             return None
 
+        self.rate_limiter.update(response.headers)
+
+        if response.status_code == 429 and retries > 0:
+            # Rate limit exceeded, wait for as long as Riot tells us to and try again
+            retry_after = int(response.headers.get("Retry-After", 1))
+            logger.bind(event="riot_api_rate_limit", url=full_url, retry_after=retry_after).warning(
+                "Riot API rate limit exceeded, retrying request"
+            )
+            self.rate_limiter.pause(retry_after)
+
+            return await self.make_request(endpoint, api_route, *params, ignore_errors=ignore_errors, retries=retries - 1)
+
         if response.status_code != 200 and response.status_code not in ignore_errors:
             logger.bind(
                 event="riot_api_error",
@@ -443,6 +473,7 @@ class RiotAPIClient(GameAPIClient):
         return response.json()
 
     def get_champ_name(self, champ_id):
+        self._check_for_new_patch()
         return self.champ_names.get(champ_id)
 
     def get_playable_name(self, champ_id):
@@ -472,35 +503,25 @@ class RiotAPIClient(GameAPIClient):
         Should use _ in place of spaces and should not include
         . or ' (fx. Kai'sa should be Kaisa, Dr. Mundo should be Dr_Mundo)
         """
+        self._check_for_new_patch()
         search_name = search_term.strip().lower().replace("_", " ").replace("'", "")
-        candidates = {
-            0: [],
-            1: []
-        }
-
-        # Try to find candidates that have the search_term in ther name.
-        for champ_id in self.champ_names:
-            lowered = self.champ_names[champ_id].lower()
-            if search_name == lowered:
-                return champ_id
-
-            if lowered.startswith(search_name):
-                candidates[0].append(champ_id)
-                continue
+        names_index, stripped_names_index = self._champ_indexes
 
-            if search_name in lowered:
-                candidates[1].append(champ_id)
-                continue
+        if (champ_id := names_index.find_exact(search_name)) is not None:
+            return champ_id
 
-            # Remove apostrophe and period from name.
-            if search_name in lowered.replace("'", "").replace(".", ""):
-                candidates[1].append(champ_id)
+        # Champions with names starting with search_term are preferred
+        prefix_candidates = names_index.find_prefix(search_name)
+        if len(prefix_candidates) == 1:
+            return prefix_candidates[0]
 
-        for priority in candidates:
-            if len(candidates[priority]) == 1:
-                return candidates[priority][0]
+        # Otherwise, try to find champions with search_term in their name,
+        # with or without apostrophes and periods.
+        candidates = set(names_index.find_substring(search_name))
+        candidates.update(stripped_names_index.find_substring(search_name))
+        candidates.difference_update(prefix_candidates)
 
-        return None
+        return candidates.pop() if len(candidates) == 1 else None
 
     def get_map_name(self, map_id):
         """
@@ -4,6 +4,7 @@ class MockResponse:
     def __init__(self) -> None:
         self.status_code = 200
         self.text = ""
+        self.headers = {}
 
     def json(self):
         return {}
@@ -0,0 +1,115 @@
+import asyncio
+from collections import deque
+from time import monotonic
+
+# Limits of a development API key, used until Riot tells us the limits of our key
+DEFAULT_LIMITS = [(20, 1), (100, 120)]
+
+def parse_rate_limits(header: str) -> list[tuple[int, int]]:
+    """
+    Parse a rate limit header from the Riot API, fx. '20:1,100:120',
+    into a list of (requests, seconds) pairs.
+    """
+    limits = []
+    for limit in header.split(","):
+        count, seconds = limit.strip().split(":")
+        limits.append((int(count), int(seconds)))
+
+    return limits
+
+class RiotRateLimiter:
+    """
+    Keeps track of the application rate limits of the Riot API, so that
+    concurrent requests share the same budget instead of running into
+    '429 Too Many Requests' errors.
+
+    Every limit is enforced as a sliding window over the times of recent requests.
+    The limits themselves, as well as the amount of requests that Riot has counted
+    (which includes requests from other processes using the same key), are read
+    from the headers of every response. Requests counted by Riot that were not made
+    by us are kept per window, and count against that window only until it has
+    passed since they were observed.
+    """
+    def __init__(self, limits: list[tuple[int, int]] = None):
+        """
+        Initialize the RiotRateLimiter.
+
+        ### Parameters
+        :param limits:  List of (requests, seconds) pairs to use until limits
+                        are received from the Riot API
+        """
+        self.limits = limits or list(DEFAULT_LIMITS)
+        self._requests = deque()
+        self._remote_counts: dict[int, tuple[int, float]] = {}
+        self._paused_until = 0
+
+    def _get_wait_time(self, now: float) -> float:
+        longest_window = max(seconds for _, seconds in self.limits)
+        while self._requests and self._requests[0] <= now - longest_window:
+            self._requests.popleft()
+
+        for seconds, (_, observed_at) in list(self._remote_counts.items()):
+            if observed_at <= now - seconds:
+                del self._remote_counts[seconds]
+
+        wait_time = self._paused_until - now
+        for count, seconds in self.limits:
+            # Times at which the requests that count against the limit leave the window
+            expiry_times = [timestamp + seconds for timestamp in self._requests if timestamp > now - seconds]
+            if seconds in self._remote_counts:
+                # We don't know when requests made by others were made, so they
+                # are assumed to stay in the window for as long as possible
+                remote_count, observed_at = self._remote_counts[seconds]
+                expiry_times.extend([observed_at + seconds] * remote_count)
+
+            if len(expiry_times) >= count:
+                # Wait for enough requests to leave the window to get below the limit
+                expiry_times.sort()
+                wait_time = max(wait_time, expiry_times[len(expiry_times) - count] - now)
+
+        return wait_time
+
+    async def acquire(self):
+        """
+        Wait until a request can be made without exceeding any rate limits
+        and reserve it.
+        """
+        while True:
+            now = monotonic()
+            wait_time = self._get_wait_time(now)
+            if wait_time <= 0:
+                self._requests.append(now)
+                return
+
+            await asyncio.sleep(wait_time)
+
+    def get_min_interval(self, requests: int, share: float = 0.5) -> float:
+        """
+        Get the shortest interval in seconds at which the given amount of
+        requests can be made repeatedly, while using at most `share` of
+        the rate limits.
+        """
+        return max(requests * seconds / (count * share) for count, seconds in self.limits)
+
+    def update(self, headers):
+        """
+        Update the limits and request counts from the headers of a response.
+        """
+        if "X-App-Rate-Limit" in headers:
+            self.limits = parse_rate_limits(headers["X-App-Rate-Limit"])
+
+        if "X-App-Rate-Limit-Count" not in headers:
+            return
+
+        now = monotonic()
+        for count, seconds in parse_rate_limits(headers["X-App-Rate-Limit-Count"]):
+            # Keep the amount of requests in the window that were made by others
+            local_count = sum(1 for timestamp in self._requests if timestamp > now - seconds)
+            self._remote_counts[seconds] = (max(count - local_count, 0), now)
+
+    def pause(self, seconds: float):
+        """
+        Don't allow any requests for the given amount of seconds,
+        fx. after Riot has responded with a 'Retry-After' header.
+        """
+        self._paused_until = max(self._paused_until, monotonic() + seconds)
@@ -875,6 +875,24 @@ class CS2GameStatsParser(GameStatsParser[CS2GameStats, SteamAPIClient]):
         """
         all_game_stats, all_player_stats = CS2GameStats.get_stats_from_db(database, CS2PlayerStats, game_id)
 
+        return self._stats_from_dicts(database, all_game_stats, all_player_stats)
+
+    def parse_player_games_from_database(
+        self,
+        database,
+        disc_id: int,
+        before: tuple[int, int] | None = None,
+        limit: int | None = None
+    ) -> list[CS2GameStats]:
+        """
+        Get data for games that the given player played in, newest first, from the
+        database and return a list of GameStats objects with the game data.
+        """
+        all_game_stats, all_player_stats = CS2GameStats.get_player_games_from_db(database, CS2PlayerStats, disc_id, before, limit)
+
+        return self._stats_from_dicts(database, all_game_stats, all_player_stats)
+
+    def _stats_from_dicts(self, database, all_game_stats: list[dict], all_player_stats: list[dict]) -> list[CS2GameStats]:
         map_names = self.api_client.map_names
         all_stats = []
         for game_stats, player_stats in zip(all_game_stats, all_player_stats):
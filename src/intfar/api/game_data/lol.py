@@ -411,6 +411,24 @@ class LoLGameStatsParser(GameStatsParser[LoLGameStats, RiotAPIClient]):
         """
         all_game_stats, all_player_stats = LoLGameStats.get_stats_from_db(database, LoLPlayerStats, game_id)
 
+        return self._stats_from_dicts(database, all_game_stats, all_player_stats)
+
+    def parse_player_games_from_database(
+        self,
+        database,
+        disc_id: int,
+        before: tuple[int, int] | None = None,
+        limit: int | None = None
+    ) -> list[LoLGameStats]:
+        """
+        Get data for games that the given player played in, newest first, from the
+        database and return a list of GameStats objects with the game data.
+        """
+        all_game_stats, all_player_stats = LoLGameStats.get_player_games_from_db(database, LoLPlayerStats, disc_id, before, limit)
+
+        return self._stats_from_dicts(database, all_game_stats, all_player_stats)
+
+    def _stats_from_dicts(self, database, all_game_stats: list[dict], all_player_stats: list[dict]) -> list[LoLGameStats]:
         all_stats = []
         for game_stats, player_stats in zip(all_game_stats, all_player_stats):
             all_player_stats = []
@@ -1,5 +1,6 @@
 from abc import abstractmethod
 from datetime import datetime
+import json
 from sqlite3 import Cursor
 from typing import Any, Dict
 
@@ -11,6 +12,17 @@ from intfar.api.game_data import get_stat_quantity_descriptions
 from intfar.api.game_stats import GameStats, get_outlier_stat
 from intfar.api.config import Config
 from intfar.api.user import User
+from intfar.api.streaks import StreakEngine
+from intfar.api.performance import (
+    PerformanceScoreEngine,
+    INTFAR_WEIGHT,
+    DOINKS_WEIGHT,
+    WINRATE_WEIGHT,
+    GAMES_WEIGHT,
+    STATS_WEIGHT,
+    PERFORMANCE_RANGE,
+    get_performance_total
+)
 
 class GameDatabase(SQLiteDatabase):
     def __init__(self, game: str, config: Config):
@@ -20,7 +32,20 @@ class GameDatabase(SQLiteDatabase):
 
         self.game = game
         self.config = config
+
         self.game_users = self.get_all_registered_users()
+        self.performance_engine = PerformanceScoreEngine(self)
+        self.streak_engine = StreakEngine(self)
+
+    def __copy__(self):
+        # Copies are used to query the database from other threads (see AsyncDatabase),
+        # so they need their own performance and streak engines
+        database = self.__class__.__new__(self.__class__)
+        database.__dict__.update(self.__dict__)
+        database.performance_engine = self.performance_engine.copy(database)
+        database.streak_engine = self.streak_engine.copy(database)
+
+        return database
 
     @property
     def game_user_params(self):
@@ -75,6 +100,8 @@ class GameDatabase(SQLiteDatabase):
                     status = f"Welcome back to the Int-Far:tm: Tracker:tm: for {game_name}:tm:, my lost son :hearts:"
 
                     self.game_users[discord_id] = self.get_all_registered_users()[discord_id]
+                    self.rebuild_stat_records()
+                    self.invalidate_summary_snapshots()
                     status_code = 3 # User reactivated
 
                 else:
@@ -130,6 +157,10 @@ class GameDatabase(SQLiteDatabase):
             self.execute_query(query, disc_id)
 
         del self.game_users[disc_id]
+        self.rebuild_stat_records()
+
+        # Stats with other players are part of everyone's summary
+        self.invalidate_summary_snapshots()
 
     def set_user_name(self, disc_id, player_id, player_name):
         with self:
@@ -162,9 +193,23 @@ class GameDatabase(SQLiteDatabase):
         with self:
             query_1 = f"DELETE FROM games WHERE game_id=?"
             query_2 = f"DELETE FROM participants WHERE game_id=?"
+            query_3 = f"""
+                DELETE FROM summary_snapshots
+                WHERE disc_id IN (
+                    SELECT u.disc_id
+                    FROM participants AS p
+                    INNER JOIN users AS u
+                        ON u.player_id = p.player_id
+                    WHERE p.game_id = ?
+                )
+            """
+            self.execute_query(query_3, game_id, commit=False)
             self.execute_query(query_1, game_id, commit=False)
             self.execute_query(query_2, game_id)
 
+        # The deleted game might have held a stat record
+        self.rebuild_stat_records()
+
     def get_delim_clause(self, params: Dict[str, Any]):
         clauses = ""
         param_values = []
@@ -287,6 +332,45 @@ class GameDatabase(SQLiteDatabase):
 
             return self.execute_query(query).fetchone()
 
+    def _get_game_extremes_query(self, stat: str, maximize: bool, conditions: str = "") -> str:
+        """
+        Get a query that selects the highest/lowest value of `stat` among active
+        users in each game, along with the Discord ID of the user who got it.
+        If several users share that value, the one with the lowest Discord ID
+        is credited, so the result doesn't depend on the query plan.
+        `conditions` are added to the WHERE clause when finding the values.
+        """
+        aggregator = "MAX" if maximize else "MIN"
+
+        return f"""
+            SELECT
+                extremes.value,
+                extremes.game_id,
+                MIN(u.disc_id) AS disc_id
+            FROM (
+                SELECT
+                    {aggregator}(p.{stat}) AS value,
+                    p.game_id
+                FROM participants AS p
+                INNER JOIN games AS g
+                    ON g.game_id = p.game_id
+                INNER JOIN users AS u
+                    ON u.player_id = p.player_id
+                WHERE
+                    u.active = 1
+                    AND p.{stat} IS NOT NULL
+                    {conditions}
+                GROUP BY p.game_id
+            ) extremes
+            INNER JOIN participants AS p
+                ON p.game_id = extremes.game_id
+                AND p.{stat} = extremes.value
+            INNER JOIN users AS u
+                ON u.player_id = p.player_id
+                AND u.active = 1
+            GROUP BY extremes.game_id
+        """
+
     def get_best_or_worst_stat(self, stat, disc_id=None, maximize=True, time_after: int = None, time_before: int = None):
         delim_str, params = self.get_delimeter(time_after, time_before, prefix="AND")
         aggregator = "MAX" if maximize else "MIN"
@@ -353,28 +437,15 @@ class GameDatabase(SQLiteDatabase):
                         sub.game_id
                     FROM (
                         SELECT
-                            sub_sub.agg AS c,
+                            sub_sub.value AS c,
                             p.game_id,
                             sub_sub.disc_id
                         FROM participants AS p
                         INNER JOIN (
-                            SELECT
-                                {aggregator}({stat}) AS agg,
-                                p.game_id,
-                                u.disc_id
-                            FROM participants AS p
-                            INNER JOIN games AS g
-                                ON g.game_id = p.game_id
-                            INNER JOIN users AS u
-                                ON u.player_id = p.player_id
-                            WHERE
-                                u.active = 1
-                                AND {stat} IS NOT NULL
-                                {delim_str}
-                            GROUP BY p.game_id
+                            {self._get_game_extremes_query(stat, maximize, delim_str)}
                         ) sub_sub
                             ON sub_sub.game_id = p.game_id
-                        WHERE {stat} = sub_sub.agg
+                        WHERE p.{stat} = sub_sub.value
                     ) sub
                     GROUP BY sub.disc_id
                 ) best
@@ -937,158 +1008,53 @@ class GameDatabase(SQLiteDatabase):
 
             return sorted(pct_intfars, key=lambda x: (x[3], x[2]), reverse=True)
 
-    def get_longest_intfar_streak(self, disc_id):
+    def get_streak_facts(self, time_after: int = None) -> list[tuple]:
+        """
+        Get the ID, timestamp, Int-Far, and result of every game, along with
+        the Discord ID of every registered account in the game and whether
+        that account is active. Used by the streak engine and the bet odds cache.
+        """
         query = """
             SELECT
-                intfar_id,
-                timestamp
-            FROM games
-            GROUP BY game_id
-            ORDER BY game_id
+                g.game_id,
+                g.timestamp,
+                g.intfar_id,
+                g.win,
+                u.disc_id,
+                u.active
+            FROM games AS g
+            LEFT JOIN participants AS p
+                ON p.game_id = g.game_id
+            LEFT JOIN users AS u
+                ON u.player_id = p.player_id
         """
+        params = []
+        if time_after is not None:
+            query += "WHERE g.timestamp > ?\n"
+            params.append(time_after)
 
-        with self:
-            int_fars = self.execute_query(query).fetchall()
-            max_count = 0
-            timestamp_ended = None
-            count = 0
-            for int_far, timestamp in int_fars:
-                if int_far is None or disc_id != int_far:
-                    count = 0
-                else:
-                    count += 1
-
-                if count > max_count:
-                    max_count = count
-                    timestamp_ended = timestamp
+        query += "ORDER BY g.timestamp, g.game_id"
 
-            if timestamp_ended is not None:
-                timestamp_ended = datetime.fromtimestamp(timestamp_ended).strftime("%Y-%m-%d")
+        with self:
+            return self.execute_query(query, *params).fetchall()
 
-            return max_count, timestamp_ended
+    def get_longest_intfar_streak(self, disc_id):
+        return self.streak_engine.get_longest_intfar_streak(disc_id)
 
     def get_longest_no_intfar_streak(self, disc_id):
         if not self.user_exists(disc_id):
             return 0
 
-        query = """
-            SELECT
-                intfar_id,
-                timestamp
-            FROM participants AS p
-            INNER JOIN games AS g
-                ON g.game_id = p.game_id
-            INNER JOIN users AS u
-                ON u.player_id = p.player_id
-            WHERE u.disc_id = ?
-            ORDER BY g.game_id ASC
-        """
-
-        with self:
-            int_fars = self.execute_query(query, disc_id).fetchall()
-            max_count = 0
-            timestamp_ended = None
-            count = 0
-            for int_far, timestamp in int_fars:
-                if disc_id == int_far:
-                    count = 0
-                else:
-                    count += 1
-
-                if count > max_count:
-                    max_count = count
-                    timestamp_ended = timestamp
-
-            if timestamp_ended is not None:
-                if timestamp_ended == timestamp:
-                    # Streak is ongoing
-                    timestamp_ended = None
-                else:
-                    timestamp_ended = datetime.fromtimestamp(timestamp_ended).strftime("%Y-%m-%d")
-
-            return max_count, timestamp_ended
+        return self.streak_engine.get_longest_no_intfar_streak(disc_id)
 
     def get_current_intfar_streak(self):
-        query = f"""
-            SELECT g.intfar_id
-            FROM games AS g
-            LEFT JOIN users AS u
-                ON g.intfar_id = u.disc_id
-            WHERE u.active = 1
-            GROUP BY game_id
-            ORDER BY game_id DESC
-        """
-
-        with self:
-            int_fars = self.execute_query(query).fetchall()
-            if int_fars == []:
-                return 0, None
-
-            prev_intfar = int_fars[0][0]
-            for count, int_far in enumerate(int_fars[1:], start=1):
-                if int_far[0] is None or prev_intfar != int_far[0]:
-                    return count, prev_intfar
-
-            return len(int_fars), prev_intfar # All the Int-Fars is the current int-far!
+        return self.streak_engine.get_current_intfar_streak()
 
     def get_longest_win_or_loss_streak(self, disc_id: int, win: int):
-        query = f"""
-            SELECT g.win
-            FROM games AS g
-            INNER JOIN participants AS p
-                ON p.game_id = g.game_id
-            INNER JOIN users AS u
-                ON p.player_id = u.player_id
-            WHERE
-                u.disc_id = ?
-                AND u.active
-            GROUP BY g.game_id
-            ORDER BY g.game_id DESC
-        """
-
-        with self:
-            games = self.execute_query(query, disc_id).fetchall()
-
-            max_count = 0
-            count = 0
-            for row in games:
-                if win != row[0]:
-                    count = 0
-                else:
-                    count += 1
-
-                if count > max_count:
-                    max_count = count
-
-            return max_count
+        return self.streak_engine.get_longest_win_or_loss_streak(disc_id, win)
 
     def get_current_win_or_loss_streak(self, disc_id: int, win: int, offset=0):
-        query = f"""
-            SELECT g.win
-            FROM games AS g
-            INNER JOIN participants AS p
-                ON p.game_id = g.game_id
-            INNER JOIN users AS u
-                ON p.player_id = u.player_id
-            WHERE
-                u.disc_id = ?
-                AND u.active = 1
-            GROUP BY g.game_id
-            ORDER BY timestamp DESC
-        """
-
-        with self:
-            games = self.execute_query(query, disc_id).fetchall()
-
-            count_offset = 1 if offset == 0 else 0
-
-            for count, row in enumerate(games[offset:], start=count_offset):
-                if row[0] != win:
-                    return count
-
-            total_offset = -offset if offset > 0 else 1
-
-            return len(games) + total_offset
+        return self.streak_engine.get_current_win_or_loss_streak(disc_id, win, offset)
 
     def get_max_intfar_details(self):
         query = f"""
@@ -1312,11 +1278,264 @@ class GameDatabase(SQLiteDatabase):
         with self:
             return self.execute_query(query, *params).fetchone()[0]
 
+    def get_performance_facts(self, stats: list[str], time_after: int = None) -> dict[str, Any]:
+        """
+        Get the values per user per game that go into the performance score,
+        optionally only for games played after `time_after`.
+        Used by the `PerformanceScoreEngine`.
+        """
+        delim_str, params = self.get_delimeter(time_after, prefix="AND")
+
+        # Select the games by ID, so only the new games are looked at when time_after is given
+        game_clause = ""
+        if time_after is not None:
+            game_clause = "AND p.game_id IN (SELECT game_id FROM games WHERE timestamp > ?)"
+
+        stat_selects = [
+            f"MAX(u.active = 1 AND p.{stat} IS NOT NULL)"
+            for stat in stats if stat != "first_blood"
+        ]
+        if "first_blood" in stats:
+            stat_selects.extend([
+                "MAX(u.active = 1 AND u.disc_id = g.first_blood)",
+                "MAX(CASE WHEN u.active = 1 AND u.disc_id = g.first_blood THEN CAST(p.player_id AS TEXT) END)",
+            ])
+        else:
+            stat_selects.extend(["0", "NULL"])
+
+        stat_selects_str = ",\n".join(stat_selects)
+
+        query_participations = f"""
+            SELECT
+                CAST(g.game_id AS TEXT),
+                u.disc_id,
+                MAX(g.timestamp),
+                1,
+                MAX(g.win = 1),
+                SUM(u.active = 1),
+                {stat_selects_str}
+            FROM games AS g
+            INNER JOIN participants AS p
+                ON p.game_id = g.game_id
+            INNER JOIN users AS u
+                ON u.player_id = p.player_id
+            WHERE 1=1
+            {game_clause}
+            GROUP BY g.game_id, u.disc_id
+        """
+
+        query_intfars = f"""
+            SELECT
+                CAST(game_id AS TEXT),
+                intfar_id,
+                timestamp,
+                1
+            FROM games
+            WHERE
+                intfar_id IS NOT NULL
+                {delim_str}
+        """
+
+        query_doinks = f"""
+            SELECT
+                CAST(doinks_sub.game_id AS TEXT),
+                doinks_sub.disc_id,
+                SUM(LENGTH(REPLACE(doinks_sub.doinks, '0', ''))),
+                COUNT(*)
+            FROM (
+                SELECT
+                    DISTINCT p.game_id,
+                    p.doinks,
+                    u.disc_id
+                FROM participants AS p
+                INNER JOIN games AS g
+                    ON g.game_id = p.game_id
+                INNER JOIN users AS u
+                    ON u.player_id = p.player_id
+                WHERE
+                    doinks IS NOT NULL
+                    {game_clause}
+            ) doinks_sub
+            GROUP BY doinks_sub.game_id, doinks_sub.disc_id
+        """
+
+        query_player_games = f"""
+            SELECT
+                CAST(p.player_id AS TEXT),
+                COUNT(*)
+            FROM games AS g
+            INNER JOIN participants AS p
+                ON p.game_id = g.game_id
+            WHERE 1=1
+            {game_clause}
+            GROUP BY p.player_id
+        """
+
+        query_count = f"SELECT COUNT(*) FROM games WHERE 1=1 {delim_str}"
+
+        with self:
+            facts = {
+                "participations": self.execute_query(query_participations, *params).fetchall(),
+                "intfars": self.execute_query(query_intfars, *params).fetchall(),
+                "doinks": self.execute_query(query_doinks, *params).fetchall(),
+                "player_games": self.execute_query(query_player_games, *params).fetchall(),
+                "game_count": self.execute_query(query_count, *params).fetchone()[0],
+                "best": {},
+            }
+
+            for stat in stats:
+                if stat == "first_blood":
+                    continue
+
+                # Who was best at the stat in each game and how many players shared that value
+                query_best = f"""
+                    SELECT
+                        CAST(sub_sub.game_id AS TEXT),
+                        sub_sub.disc_id,
+                        COUNT(*)
+                    FROM participants AS p
+                    INNER JOIN (
+                        {self._get_game_extremes_query(stat, stat != "deaths", game_clause)}
+                    ) sub_sub
+                        ON sub_sub.game_id = p.game_id
+                    WHERE p.{stat} = sub_sub.value
+                    GROUP BY sub_sub.game_id
+                """
+                facts["best"][stat] = self.execute_query(query_best, *params).fetchall()
+
+        return facts
+
+    def get_summary_data(self, disc_id: int) -> dict[str, Any]:
+        """
+        Calculate the stats that summarize how a player has done across all their
+        games, which are shown by the !summary command and on the player's page
+        on the website. Stats that change when other players play games, like
+        performance scores, are not included.
+        """
+        with self:
+            games_played, intfar_reason_ids = self.get_intfar_stats(disc_id)
+
+            # Winrates are None if the person has not played enough games with any champ/on any map
+            best_playable = self.get_min_or_max_winrate_played(disc_id, True) or (None, None, None)
+            worst_playable = self.get_min_or_max_winrate_played(disc_id, False) or (None, None, None)
+            if best_playable[2] == worst_playable[2]:
+                # Person has not played 10 games with any champ/on any map. Try to get stats with 5 minimum games.
+                worst_playable = self.get_min_or_max_winrate_played(disc_id, False, min_games=5) or (None, None, None)
+
+            best_person = self.get_winrate_relation(disc_id, True)
+            worst_person = self.get_winrate_relation(disc_id, False)
+            if best_person[0] == worst_person[0]:
+                worst_person = self.get_winrate_relation(disc_id, False, min_games=5)
+
+            return {
+                "signature": self.get_performance_signature()[:2],
+                "games_played": games_played,
+                "intfar_reason_ids": intfar_reason_ids,
+                "num_played_ids": len(self.get_played_ids(disc_id)),
+                "total_winrate": self.get_total_winrate(disc_id),
+                "longest_win_streak": self.get_longest_win_or_loss_streak(disc_id, 1),
+                "longest_loss_streak": self.get_longest_win_or_loss_streak(disc_id, -1),
+                "best_playable": best_playable,
+                "worst_playable": worst_playable,
+                "best_person": best_person,
+                "worst_person": worst_person,
+                "doinks_reason_ids": self.get_doinks_stats(disc_id),
+                "doinks_count": self.get_doinks_count(disc_id),
+            }
+
+    def get_summary_snapshot(self, disc_id: int) -> dict[str, Any] | None:
+        """
+        Get the saved summary of stats for a player, as calculated by `get_summary_data`,
+        or None if there is no summary saved, or it has been invalidated by a change to
+        the games or user.
+        """
+        query = "SELECT data FROM summary_snapshots WHERE disc_id = ?"
+
+        with self:
+            row = self.execute_query(query, disc_id).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def save_summary_snapshot(self, disc_id: int, summary: dict[str, Any]) -> bool:
+        """
+        Save a summary of stats for a player, as calculated by `get_summary_data`.
+        The summary is not saved if games have been saved or deleted since it was
+        calculated. Returns whether the summary was saved.
+        """
+        query = "REPLACE INTO summary_snapshots(disc_id, data) VALUES (?, ?)"
+
+        with self:
+            if list(self.get_performance_signature()[:2]) != list(summary["signature"]):
+                return False
+
+            self.execute_query(query, disc_id, json.dumps(summary))
+
+        return True
+
+    def invalidate_summary_snapshots(self, disc_ids: list[int] | None = None, commit: bool = True):
+        """
+        Delete the saved summaries of the given players, or of all players
+        if `disc_ids` is None.
+        """
+        if disc_ids is None:
+            query = "DELETE FROM summary_snapshots"
+            params = []
+        else:
+            params = [disc_id for disc_id in disc_ids if disc_id is not None]
+            query = f"DELETE FROM summary_snapshots WHERE disc_id IN ({', '.join('?' for _ in params)})"
+
+        with self:
+            self.execute_query(query, *params, commit=commit)
+
+    def get_performance_signature(self) -> tuple[int, int, tuple]:
+        """
+        Get a cheap summary of the games and users in the database,
+        used to detect whether cached performance scores, streaks, or bet odds are outdated.
+        """
+        with self:
+            games_count, max_timestamp = self.execute_query("SELECT COUNT(*), MAX(timestamp) FROM games").fetchone()
+            users = self.execute_query(
+                "SELECT disc_id, player_id, active FROM users ORDER BY disc_id, player_id"
+            ).fetchall()
+
+        return games_count, max_timestamp, tuple(users)
+
+    def _format_performance_scores(self, performance_scores: list[tuple], disc_id: int | None = None):
+        if disc_id is None:
+            return performance_scores
+
+        rank = len(self.game_users) - 1
+        score = 0
+        for index, (score_id, score_value) in enumerate(performance_scores):
+            if score_id == disc_id:
+                rank = index
+                score = score_value
+                break
+
+        return score, rank + 1, len(performance_scores)
+
     def get_performance_score(self, disc_id: int | None = None, time_after: int = None, time_before: int = None, minimum_games: int = None):
-        intfar_weight = 1
-        doinks_weight = 1
-        winrate_weight = 2
-        stats_weight = 0.25
+        """
+        Get the performance score of all active users or, if `disc_id` is given,
+        the score and rank of that user along with the total number of scores.
+        Scores are calculated by the `PerformanceScoreEngine`, which gives the same
+        results as `get_performance_score_query` but without the large query.
+
+        Returns a function that calculates the scores when called.
+        """
+        min_games = self.config.performance_mimimum_games if minimum_games is None else minimum_games
+
+        def get_scores():
+            performance_scores = self.performance_engine.get_scores(time_after, time_before, min_games)
+            return self._format_performance_scores(performance_scores, disc_id)
+
+        return get_scores
+
+    def get_performance_score_query(self, disc_id: int | None = None, time_after: int = None, time_before: int = None, minimum_games: int = None):
+        intfar_weight = INTFAR_WEIGHT
+        doinks_weight = DOINKS_WEIGHT
+        winrate_weight = WINRATE_WEIGHT
+        stats_weight = STATS_WEIGHT
 
         stat_keys = get_stat_quantity_descriptions(self.game)
         stat_joins = []
@@ -1330,8 +1549,8 @@ class GameDatabase(SQLiteDatabase):
             time_clause += " AND g.timestamp < ?"
             params.append(time_before)
 
-        if params != []:
-            params = params * 4
+        time_params = list(params)
+        params = time_params * 4
 
         prev_join = "doinks.disc_id"
         for stat in stat_keys:
@@ -1340,8 +1559,8 @@ class GameDatabase(SQLiteDatabase):
             stat_joins.append(f"LEFT JOIN ({query_best}) {stat}_best\nON {stat}_best.disc_id = {prev_join}")
             prev_join = f"{stat}_best.disc_id"
 
-        if time_after is not None and time_before is not None:
-            params.extend([time_after, time_before] * ((len(stat_keys) * 2) - 1))
+            # The first blood query uses the time parameters once, all other stat queries use them twice
+            params.extend(time_params * (1 if stat == "first_blood" else 2))
 
         stat_join_queries = "\n".join(stat_joins)
 
@@ -1352,10 +1571,10 @@ class GameDatabase(SQLiteDatabase):
         stat_equations_str = " + ".join(stat_equations)
 
         most_games = self.get_max_games_count(time_after, time_before) or 1
-        games_weight = 0.25
+        games_weight = GAMES_WEIGHT
 
-        total = (intfar_weight + doinks_weight + winrate_weight + games_weight + (len(stat_keys) * stats_weight)) / 2
-        performance_range = 10
+        total = get_performance_total(self.game)
+        performance_range = PERFORMANCE_RANGE
 
         equation = (
             f"(((1 - COALESCE(intfars.c / played.c, 0)) * {intfar_weight} + " +
@@ -1457,21 +1676,127 @@ class GameDatabase(SQLiteDatabase):
         """
 
         def format_result(cursor: Cursor):
-            performance_scores = cursor.fetchall()
-            if disc_id is None:
-                return performance_scores
+            return self._format_performance_scores(cursor.fetchall(), disc_id)
 
-            rank = len(self.game_users) - 1
-            score = 0
-            for index, (score_id, score_value) in enumerate(performance_scores):
-                if score_id == disc_id:
-                    rank = index
-                    score = score_value
-                    break
+        return self.query(query, *params, format_func=format_result)
 
-            return score, rank + 1, len(performance_scores)
+    def _get_record_stats(self) -> list[str]:
+        return [stat for stat in get_stat_quantity_descriptions(self.game) if stat != "first_blood"]
 
-        return self.query(query, *params, format_func=format_result)
+    def _update_stat_records(self, stat: str, maximize: bool, game_id: int = None):
+        """
+        Update the `stat_records` table with the most extreme value of `stat` that each
+        active user has had in a game where they were the best/worst of the group.
+        If `game_id` is given, only that game is considered and a record is only
+        overwritten if the new value beats it. Otherwise all games are considered.
+
+        Should be called inside an open connection, changes are not committed.
+        """
+        aggregator = "MAX" if maximize else "MIN"
+        params = [stat, int(maximize)]
+
+        game_clause = ""
+        if game_id is not None:
+            game_clause = "AND p.game_id = ?"
+            params.append(game_id)
+
+        query = f"""
+            INSERT INTO stat_records (stat, disc_id, maximize, value, game_id)
+            SELECT
+                ?,
+                extremes.disc_id,
+                ?,
+                {aggregator}(extremes.value),
+                extremes.game_id
+            FROM (
+                {self._get_game_extremes_query(stat, maximize, game_clause)}
+            ) extremes
+            GROUP BY extremes.disc_id
+            ON CONFLICT (stat, disc_id, maximize) DO UPDATE
+            SET
+                value = excluded.value,
+                game_id = excluded.game_id
+            WHERE
+                (excluded.maximize = 1 AND excluded.value > stat_records.value)
+                OR (excluded.maximize = 0 AND excluded.value < stat_records.value)
+        """
+
+        self.execute_query(query, *params, commit=False)
+
+    def rebuild_stat_records(self):
+        """
+        Recalculate all personal and global stat records from scratch.
+        """
+        with self:
+            self.execute_query("DELETE FROM stat_records", commit=False)
+
+            for stat in self._get_record_stats():
+                self._update_stat_records(stat, True)
+                self._update_stat_records(stat, False)
+
+            self.connection.commit()
+
+    def get_stat_records(self, stat: str, maximize: bool = True) -> dict[int, tuple[Any, str]]:
+        """
+        Get the personal record in the given stat for each active user,
+        i.e. the highest/lowest value they have had in a game where they
+        were the best/worst in that stat.
+
+        ### Returns
+        `dict[int, tuple[Any, str]]`: Mapping of disc_id -> (record value, ID of the game where it was set)
+        """
+        query = """
+            SELECT
+                disc_id,
+                value,
+                game_id
+            FROM stat_records
+            WHERE
+                stat = ?
+                AND maximize = ?
+                AND disc_id IN (
+                    SELECT disc_id
+                    FROM users
+                    WHERE active = 1
+                )
+            ORDER BY disc_id
+        """
+
+        with self:
+            return {
+                disc_id: (value, game_id)
+                for disc_id, value, game_id in self.execute_query(query, stat, int(maximize)).fetchall()
+            }
+
+    def get_global_stat_record(self, stat: str, maximize: bool = True) -> tuple[int, Any, str]:
+        """
+        Get the most extreme value of the given stat across all active users.
+        Gives the same result as `get_most_extreme_stat` but reads from the
+        `stat_records` table instead of scanning all participants.
+
+        ### Returns
+        `tuple[int, Any, str]`: Discord ID of the record holder, the record value, and the game it was set in
+        """
+        aggregator = "MAX" if maximize else "MIN"
+
+        query = f"""
+            SELECT
+                disc_id,
+                {aggregator}(value),
+                game_id
+            FROM stat_records
+            WHERE
+                stat = ?
+                AND maximize = ?
+                AND disc_id IN (
+                    SELECT disc_id
+                    FROM users
+                    WHERE active = 1
+                )
+        """
+
+        with self:
+            return self.execute_query(query, stat, int(maximize)).fetchone()
 
     def _was_stat_beaten(self, prev_val, curr_val, best, reverse):
         if None in (prev_val, curr_val):
@@ -1517,14 +1842,14 @@ class GameDatabase(SQLiteDatabase):
             )
 
             # Check whether player has beaten their own record in a stat
-            for disc_id, _, _, players_best, _ in self.get_best_or_worst_stat(stat, maximize=not reverse_order)():
+            for disc_id, (players_best, _) in self.get_stat_records(stat, maximize=not reverse_order).items():
                 if disc_id in players_in_game and self._was_stat_beaten(players_best, best_value, True, reverse_order):
                     # Player has set a new personal best for a stat
                     player_records_best.append(
                         (stat, best_value, best_id, players_best, None)
                     )
 
-            for disc_id, _, _, players_worst, _ in self.get_best_or_worst_stat(stat, maximize=reverse_order)():
+            for disc_id, (players_worst, _) in self.get_stat_records(stat, maximize=reverse_order).items():
                 if disc_id in players_in_game and self._was_stat_beaten(players_worst, worst_value, False, reverse_order):
                     # Player has set a new personal worst for a stat
                     player_records_worst.append(
@@ -1532,8 +1857,8 @@ class GameDatabase(SQLiteDatabase):
                     )
 
             # Check once whether anyone has beaten the global record in a stat
-            prev_best_id,  prev_best, _ = self.get_most_extreme_stat(stat, not reverse_order)
-            prev_worst_id, prev_worst, _ = self.get_most_extreme_stat(stat, reverse_order)
+            prev_best_id,  prev_best, _ = self.get_global_stat_record(stat, not reverse_order)
+            prev_worst_id, prev_worst, _ = self.get_global_stat_record(stat, reverse_order)
 
             if self._was_stat_beaten(prev_best, best_value, True, reverse_order):
                 # A new best has been set for a stat
@@ -1553,7 +1878,8 @@ class GameDatabase(SQLiteDatabase):
         Save all the stats in the given GameStats object to the database.
         Also determines whether any stat "records" have been beaten (i.e. whether
         someone has gotten a new lowest or highest value for a stat) and returns
-        those stats along with who beat set the new record.
+        those stats along with who beat set the new record. The `stat_records`
+        table is updated in the same transaction as the game is saved.
         """
         (
             global_records_best, 
@@ -1579,7 +1905,7 @@ class GameDatabase(SQLiteDatabase):
             """
 
             self.execute_query(
-                query_game, *game_insert_values
+                query_game, *game_insert_values, commit=False
             )
 
             query = f"""
@@ -1593,7 +1919,22 @@ class GameDatabase(SQLiteDatabase):
                 stat_insert_values = [getattr(player_stats, stat) for stat in player_stats.stats_to_save()]
                 logger.debug(f"Saving participant data:\n", stat_insert_values)
 
-                self.execute_query(query, *stat_insert_values)
+                self.execute_query(query, *stat_insert_values, commit=False)
+
+            # Update stat records with the values from this game
+            for stat in self._get_record_stats():
+                self._update_stat_records(stat, True, parsed_game_stats.game_id)
+                self._update_stat_records(stat, False, parsed_game_stats.game_id)
+
+            self.invalidate_summary_snapshots(
+                [player_stats.disc_id for player_stats in parsed_game_stats.filtered_player_stats],
+                commit=False
+            )
+
+            self.connection.commit()
+
+        # Continue the streaks of the players with the saved game
+        self.streak_engine.refresh()
 
         return global_records_best, global_records_worst, player_records_best, player_records_worst
 
@@ -1644,11 +1985,60 @@ class GameDatabase(SQLiteDatabase):
         with self:
             return self.execute_query(query, *params).fetchall()
 
+    def get_game_stats_for_player(self, stats, disc_id, before=None, limit=None):
+        """
+        Get stats for the games that the given player played in, newest first.
+
+        ### Parameters
+        :param stats:   Names of the game stats to select
+        :param disc_id: Discord ID of the player
+        :param before:  (timestamp, game_id) of a game, only games played before it
+                        are returned. Used to get the next page of games
+        :param limit:   Maximum amount of games to return
+        """
+        stats_to_select = ", ".join(f"g.{stat}" for stat in stats)
+        params = [disc_id]
+
+        before_delimeter = ""
+        if before is not None:
+            before_delimeter = "AND (g.timestamp, g.game_id) < (?, ?)"
+            params.extend(before)
+
+        limit_str = ""
+        if limit is not None:
+            limit_str = "LIMIT ?"
+            params.append(limit)
+
+        query = f"""
+            SELECT
+                {stats_to_select}
+            FROM games AS g
+            WHERE EXISTS (
+                SELECT 1
+                FROM participants AS p
+                INNER JOIN users AS u
+                    ON u.player_id = p.player_id
+                WHERE
+                    p.game_id = g.game_id
+                    AND u.disc_id = ?
+                    AND u.active = 1
+            )
+            {before_delimeter}
+            ORDER BY g.timestamp DESC, g.game_id DESC
+            {limit_str}
+        """
+
+        with self:
+            return self.execute_query(query, *params).fetchall()
+
     def get_player_stats(self, stats, game_id=None, disc_id=None, time_after=None, time_before=None, guild_id=None):
         prefix = "AND"
         game_id_delimeter = ""
         params = []
-        if game_id is not None:
+        if isinstance(game_id, list):
+            game_id_delimeter = f"AND g.game_id IN ({', '.join('?' for _ in game_id)})"
+            params = list(game_id)
+        elif game_id is not None:
             game_id_delimeter = "AND g.game_id=?"
             params = [game_id]
  
@@ -1922,6 +2312,25 @@ class GameDatabase(SQLiteDatabase):
         with self:
             self.execute_query(query_bet, game_id, timestamp, result_val, payout, bet_id)
 
+    def mark_bets_as_resolved(self, bet_results: list[tuple[int, bool, int]], game_id, timestamp):
+        """
+        Mark several bets as resolved in a single transaction.
+
+        ### Parameters
+        :param bet_results: List of (bet ID, whether the bet was won, payout of the bet)
+        :param game_id:     ID of the game that the bets were resolved in
+        :param timestamp:   UNIX timestamp of when the bets were resolved
+        """
+        query_bet = "UPDATE bets SET game_id=?, timestamp=?, result=?, payout=? WHERE id=?"
+
+        with self:
+            for bet_id, success, value in bet_results:
+                result_val = 1 if success else -1
+                payout = value if success else None
+                self.execute_query(query_bet, game_id, timestamp, result_val, payout, bet_id, commit=False)
+
+            self.connection.commit()
+
     def reset_bets(self):
         query_bets = "DELETE FROM bets WHERE result=0"
         query_balance = "UPDATE betting_balance SET tokens=100"
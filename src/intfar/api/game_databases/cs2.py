@@ -180,9 +180,9 @@ class CS2GameDatabase(GameDatabase):
         """
 
         def format_result(cursor):
-            return cursor.fetchone()[1] if map_id is not None else cursor.fetchall()
+            return cursor.fetchone()[0] if map_id is not None else cursor.fetchall()
 
-        return self.query(query, disc_id, map_id, format_func=format_result)
+        return self.query(query, *parameters, format_func=format_result)
 
     def get_played_with_most_doinks(self, disc_id):
         doinks_query = self.get_played_doinks_count(disc_id).query
@@ -346,6 +346,12 @@ class CS2GameDatabase(GameDatabase):
         with self:
             return self.execute_query(query, player_id).fetchone()
 
+    def get_summary_data(self, disc_id):
+        summary = super().get_summary_data(disc_id)
+        summary["overtime_winrate"] = self.get_overtime_winrate(disc_id)
+
+        return summary
+
     def get_overtime_winrate(self, disc_id):
         query = """
             SELECT
@@ -5,6 +5,8 @@ from intfar.api.config import Config
 from sqlite3 import IntegrityError
 from intfar.api.game_data.lol import get_rank_value
 
+import polars as pl
+
 class LoLGameDatabase(GameDatabase):
     def __init__(self, game: str, config: Config):
         super().__init__(game, config)
@@ -492,6 +494,12 @@ class LoLGameDatabase(GameDatabase):
 
             return result if result[0] is not None else (None, None, None)
 
+    def get_summary_data(self, disc_id):
+        summary = super().get_summary_data(disc_id)
+        summary["role_winrates"] = self.get_role_winrate(disc_id)
+
+        return summary
+
     def get_role_winrate(self, disc_id, time_after=None, time_before=None):
         delim_str, params = self.get_delimeter(time_after, time_before, None, "u.disc_id", disc_id)
         query = f"""
@@ -645,64 +653,297 @@ class LoLGameDatabase(GameDatabase):
         - Highest rank
         - New champs played
         """
+        return self.get_split_summaries([disc_id], stats, prev_split_start, curr_split_start)[disc_id]
+
+    def _get_split_frames(self, disc_ids, stats, prev_split_start):
+        # Get a row per player per game since the start of the previous split,
+        # as well as the Int-Fars awarded to the players since then
+        stat_columns = [stat for stat in stats if stat != "first_blood"]
+        id_qms = ", ".join("?" for _ in disc_ids)
+
+        participant_schema = {
+            "disc_id": pl.Int64,
+            "active": pl.Int64,
+            "player_id": pl.String,
+            "game_id": pl.String,
+            "timestamp": pl.Int64,
+            "duration": pl.Int64,
+            "win": pl.Int64,
+            "guild_id": pl.Int64,
+            "first_blood": pl.Int64,
+            "champ_id": pl.Int64,
+            "role": pl.String,
+            "doinks": pl.String,
+            "rank_solo": pl.String,
+            "rank_flex": pl.String,
+        }
+        participant_schema.update({stat: pl.Float64 for stat in stat_columns})
+
+        query_participants = f"""
+            SELECT
+                u.disc_id,
+                u.active,
+                p.player_id,
+                g.game_id,
+                g.timestamp,
+                g.duration,
+                g.win,
+                g.guild_id,
+                g.first_blood,
+                p.champ_id,
+                p.role,
+                p.doinks,
+                p.rank_solo,
+                p.rank_flex{"".join(f", p.{stat}" for stat in stat_columns)}
+            FROM games AS g
+            INNER JOIN participants AS p
+                ON p.game_id = g.game_id
+            INNER JOIN users AS u
+                ON u.player_id = p.player_id
+            WHERE
+                g.timestamp > ?
+                AND u.disc_id IN ({id_qms})
+        """
+
+        query_intfars = f"""
+            SELECT
+                game_id,
+                timestamp,
+                intfar_id
+            FROM games
+            WHERE
+                timestamp > ?
+                AND intfar_id IN ({id_qms})
+        """
+
+        with self:
+            participant_rows = self.execute_query(query_participants, prev_split_start, *disc_ids).fetchall()
+            intfar_rows = self.execute_query(query_intfars, prev_split_start, *disc_ids).fetchall()
+            user_rows = self.execute_query("SELECT disc_id, player_id, active, rank_solo, rank_flex FROM users").fetchall()
+
+        participants = pl.DataFrame(participant_rows, schema=participant_schema, orient="row")
+        intfars = pl.DataFrame(
+            intfar_rows, schema={"game_id": pl.String, "timestamp": pl.Int64, "intfar_id": pl.Int64}, orient="row"
+        )
+
+        return participants, intfars, user_rows
+
+    def _get_split_window_stats(self, participants: pl.DataFrame, intfars: pl.DataFrame, stat_columns: list[str]):
+        # Aggregate the games of one split for every player, the same way
+        # as get_average_stat, get_doinks_count, get_games_count, etc. do
+        def sum_or_null(column):
+            # SUM in SQL is NULL if every value is NULL
+            return pl.when(pl.col(column).count() > 0).then(pl.col(column).sum())
+
+        played = participants.group_by("disc_id").agg(
+            pl.col("game_id").n_unique().alias("games"),
+            pl.col("game_id").filter(pl.col("first_blood") == pl.col("disc_id")).n_unique().alias("first_bloods"),
+            pl.col("champ_id").n_unique().alias("played_ids"),
+            *(sum_or_null(stat).alias(stat) for stat in stat_columns),
+        )
+
+        # Games and doinks are only counted for the accounts of players that are active
+        active_participants = participants.filter(pl.col("active") == 1)
+        games = active_participants.group_by("disc_id").agg(
+            pl.col("game_id").n_unique().alias("games"),
+            pl.col("timestamp").min().alias("time_min"),
+            pl.col("timestamp").max().alias("time_max"),
+            sum_or_null("duration").alias("duration"),
+            pl.col("game_id").filter(pl.col("win") == 1).n_unique().alias("wins"),
+            pl.col("guild_id").drop_nulls().n_unique().alias("guilds"),
+        )
+
+        doinks = (
+            active_participants
+            .filter(pl.col("doinks").is_not_null())
+            .unique(["game_id", "disc_id", "doinks", "timestamp"])
+            .group_by("disc_id")
+            .agg(
+                pl.len().alias("doinks_games"),
+                pl.col("doinks").str.replace_all("0", "").str.len_chars().sum().alias("doinks_total"),
+            )
+        )
+
+        intfar_counts = intfars.group_by("intfar_id").agg(pl.col("game_id").n_unique().alias("intfars"))
+
+        return (
+            {row["disc_id"]: row for row in played.iter_rows(named=True)},
+            {row["disc_id"]: row for row in games.iter_rows(named=True)},
+            {row["disc_id"]: row for row in doinks.iter_rows(named=True)},
+            dict(intfar_counts.iter_rows()),
+        )
+
+    def _get_winrates_by(self, participants: pl.DataFrame, column: str, min_games: int = 0) -> pl.DataFrame:
+        # Winrates of every player with each champ or role they have won a game with,
+        # the same way as get_min_or_max_winrate_played and get_role_winrate
+        return (
+            participants
+            .filter(pl.col(column).is_not_null())
+            .group_by("disc_id", column)
+            .agg(
+                pl.col("game_id").n_unique().alias("games"),
+                pl.col("game_id").filter(pl.col("win") == 1).n_unique().alias("wins"),
+            )
+            .filter((pl.col("wins") > 0) & (pl.col("games") > min_games))
+            .with_columns(((pl.col("wins") / pl.col("games")) * 100).alias("winrate"))
+        )
+
+    def _get_highest_ranks(self, participants: pl.DataFrame, main_player_ids: dict[int, str]):
+        # Same as get_highest_rank for the main account of every player
+        if participants.is_empty():
+            return {}
+
+        rank_values = {}
+        for column in ("rank_solo", "rank_flex"):
+            for rank in participants[column].unique():
+                rank_values[rank] = get_rank_value(rank)
+
+        def highest_rank(column):
+            values = pl.col(column).replace_strict(rank_values, return_dtype=pl.Int64).sort_by("timestamp")
+            return (
+                pl.when(values.max() > 0)
+                .then(pl.col(column).sort_by("timestamp").get(values.arg_max()))
+                .otherwise(pl.lit("Unranked"))
+            )
+
+        main_accounts = pl.DataFrame(
+            list(main_player_ids.items()), schema={"disc_id": pl.Int64, "player_id": pl.String}, orient="row"
+        )
+        highest_ranks = participants.join(main_accounts, on=["disc_id", "player_id"]).group_by("disc_id").agg(
+            highest_rank("rank_solo").alias("solo_highest"),
+            highest_rank("rank_flex").alias("flex_highest"),
+        )
+
+        return {disc_id: (solo, flex) for disc_id, solo, flex in highest_ranks.iter_rows()}
+
+    def get_split_summaries(self, disc_ids, stats, prev_split_start, curr_split_start) -> dict[int, dict]:
+        """
+        Get the split summaries of several players, the same as `get_split_summary_data`
+        returns for each of them. The games of both splits are loaded in one query and
+        the stats of every player are aggregated with Polars, instead of running several
+        queries per stat per player.
+
+        ### Parameters
+        :param disc_ids:            Discord IDs of the players to summarize
+        :param stats:               Stats to compare the averages of between splits
+        :param prev_split_start:    UNIX timestamp of when the previous split started
+        :param curr_split_start:    UNIX timestamp of when the current split started
+
+        ### Returns
+        `dict[int, dict]`: Mapping of Discord ID -> split summary of that player
+        """
+        disc_ids = list(disc_ids)
         no_previous = curr_split_start == prev_split_start
+        stat_columns = [stat for stat in stats if stat != "first_blood"]
+
+        participants, intfars, user_rows = self._get_split_frames(disc_ids, stats, prev_split_start)
+        active_users = set(disc_id for disc_id, _, active, _, _ in user_rows if active == 1)
+        current_ranks = {}
+        for _, player_id, _, rank_solo, rank_flex in user_rows:
+            current_ranks.setdefault(player_id, (rank_solo, rank_flex))
+
+        prev_participants = participants.filter(pl.col("timestamp") < curr_split_start)
+        curr_participants = participants.filter(pl.col("timestamp") > curr_split_start)
+        prev_stats = self._get_split_window_stats(
+            prev_participants, intfars.filter(pl.col("timestamp") < curr_split_start), stat_columns
+        )
+        curr_stats = self._get_split_window_stats(
+            curr_participants, intfars.filter(pl.col("timestamp") > curr_split_start), stat_columns
+        )
 
-        # Get average stats for prev split and this split
-        avg_stats_before = {}
-        avg_stats_now = {}
-        for stat in stats:
-            avg_prev_split = None if no_previous else self.get_average_stat(stat, disc_id, time_after=prev_split_start, time_before=curr_split_start)()
-            avg_curr_split = self.get_average_stat(stat, disc_id, time_after=curr_split_start)()
-
-            avg_stats_before[stat] = avg_prev_split[0] if avg_prev_split else (None, None, None)
-            avg_stats_now[stat] = avg_curr_split[0]
-
-        # Get Int-Fars & doinks for prev split and this split
-        intfars_before = None if no_previous else self.get_intfar_count(disc_id, prev_split_start, curr_split_start)
-        intfars_after = self.get_intfar_count(disc_id, curr_split_start)
-
-        doinks_before = None if no_previous else self.get_doinks_count(disc_id, prev_split_start, curr_split_start)
-        doinks_after = self.get_doinks_count(disc_id, curr_split_start)
-
-        # Get games played prev split and this split
-        games_played_before = None if no_previous else self.get_games_count(disc_id, prev_split_start, curr_split_start)
-        games_played_after = self.get_games_count(disc_id, curr_split_start)
-
-        # Get best and worst performing champ this split
-        best_wr_info = self.get_min_or_max_winrate_played(disc_id, True, min_games=5, time_after=prev_split_start)
-        worst_wr_info = self.get_min_or_max_winrate_played(disc_id, False, min_games=5, time_after=prev_split_start)
-
-        # Get role performance
-        role_winrates = self.get_role_winrate(disc_id, curr_split_start)
-
-        # Get highest rank
-        main_player_id = self.game_users[disc_id].player_id[0]
-        solo_current, flex_current = self.get_current_rank(main_player_id)
-        solo_highest, flex_highest = self.get_highest_rank(main_player_id, curr_split_start)
-
-        # Get new champs played prev split and this split
-        played_before = None if no_previous else len(self.get_played_ids(disc_id, prev_split_start, curr_split_start))
-        played_after = len(self.get_played_ids(disc_id, curr_split_start))
-
-        return {
-            "avg_stats_before": avg_stats_before,
-            "avg_stats_now": avg_stats_now,
-            "intfars_before": intfars_before,
-            "intfars_after": intfars_after,
-            "doinks_before": doinks_before,
-            "doinks_after": doinks_after,
-            "games_before": games_played_before,
-            "games_after": games_played_after,
-            "best_wr_champ": best_wr_info,
-            "worst_wr_champ": worst_wr_info,
-            "role_winrates": role_winrates,
-            "solo_current": solo_current,
-            "solo_highest": solo_highest,
-            "flex_current": flex_current,
-            "flex_highest": flex_highest,
-            "played_before": played_before,
-            "played_after": played_after
-        }
+        # Best and worst champs are found for both splits, and roles for this split
+        champ_winrates = self._get_winrates_by(participants, "champ_id", min_games=5)
+        best_champs, worst_champs = (
+            {
+                disc_id: (winrate, games, champ_id)
+                for disc_id, champ_id, games, _, winrate in champ_winrates.sort(
+                    ["disc_id", "winrate", "games", "champ_id"], descending=[False, best, True, False]
+                ).group_by("disc_id", maintain_order=True).first().iter_rows()
+            }
+            for best in (True, False)
+        )
+
+        role_winrates = {}
+        role_frame = self._get_winrates_by(curr_participants, "role").sort(
+            ["disc_id", "winrate", "role"], descending=[False, True, False]
+        )
+        for row in role_frame.iter_rows(named=True):
+            role_winrates.setdefault(row["disc_id"], []).append((row["winrate"], row["games"], row["role"]))
+
+        main_player_ids = {disc_id: self.game_users[disc_id].player_id[0] for disc_id in disc_ids}
+        highest_ranks = self._get_highest_ranks(curr_participants, main_player_ids)
+
+        def get_average_stat(window_stats, stat, disc_id):
+            played = window_stats[0].get(disc_id)
+            if played is None or disc_id not in active_users or played["games"] < 10:
+                return (disc_id, None, None)
+
+            if stat == "first_blood":
+                # Players with no first bloods are left out, like in get_average_stat
+                if played["first_bloods"] == 0:
+                    return (disc_id, None, None)
+
+                return (disc_id, played["first_bloods"] / played["games"], played["games"])
+
+            value = played[stat]
+            return (disc_id, None if value is None else value / played["games"], played["games"])
+
+        def get_counts(window_stats, disc_id):
+            _, games, doinks, intfar_counts = window_stats
+            intfar_count = intfar_counts.get(disc_id, 0) if disc_id in active_users else 0
+
+            doinks_row = doinks.get(disc_id)
+            doinks_count = (0, 0) if doinks_row is None else (doinks_row["doinks_games"], doinks_row["doinks_total"])
+
+            games_row = games.get(disc_id)
+            if games_row is None:
+                games_count = (0, None, None, None, 0, 0)
+            else:
+                games_count = tuple(
+                    games_row[column] for column in ("games", "time_min", "time_max", "duration", "wins", "guilds")
+                )
+
+            played = window_stats[0].get(disc_id)
+            played_ids = 0 if played is None else played["played_ids"]
+
+            return intfar_count, doinks_count, games_count, played_ids
+
+        summaries = {}
+        for disc_id in disc_ids:
+            intfars_after, doinks_after, games_after, played_after = get_counts(curr_stats, disc_id)
+            if no_previous:
+                intfars_before = doinks_before = games_before = played_before = None
+            else:
+                intfars_before, doinks_before, games_before, played_before = get_counts(prev_stats, disc_id)
+
+            main_player_id = main_player_ids[disc_id]
+            solo_current, flex_current = current_ranks.get(main_player_id, (None, None))
+            solo_highest, flex_highest = highest_ranks.get(disc_id, ("Unranked", "Unranked"))
+
+            summaries[disc_id] = {
+                "avg_stats_before": {
+                    stat: (None, None, None) if no_previous else get_average_stat(prev_stats, stat, disc_id)
+                    for stat in stats
+                },
+                "avg_stats_now": {stat: get_average_stat(curr_stats, stat, disc_id) for stat in stats},
+                "intfars_before": intfars_before,
+                "intfars_after": intfars_after,
+                "doinks_before": doinks_before,
+                "doinks_after": doinks_after,
+                "games_before": games_before,
+                "games_after": games_after,
+                "best_wr_champ": best_champs.get(disc_id, (None, None, None)),
+                "worst_wr_champ": worst_champs.get(disc_id, (None, None, None)),
+                "role_winrates": role_winrates.get(disc_id, [(None, None, None)]),
+                "solo_current": solo_current,
+                "solo_highest": solo_highest,
+                "flex_current": flex_current,
+                "flex_highest": flex_highest,
+                "played_before": played_before,
+                "played_after": played_after
+            }
+
+        return summaries
 
     def create_list(self, disc_id, name):
         query = "INSERT INTO champ_lists(name, owner_id) VALUES (?, ?)"
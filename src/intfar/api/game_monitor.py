@@ -126,6 +126,14 @@ class GameMonitor(Generic[GameDatabaseType, GameAPIType, GameStatsType, PlayerSt
 
         return self.GAME_STATUS_NOCHANGE
 
+    def get_poll_interval(self, guild_id: int) -> float:
+        """
+        Get the amount of seconds to wait between each check for a new game.
+
+        :param guild_id:    ID of the Discord server where we are polling for a game
+        """
+        return self.config.status_interval_dormant
+
     async def poll_for_new_game(self, guild_id: int, immediately: bool = False):
         """
         Periodically poll the API for the relevant game to check if any users in
@@ -138,7 +146,7 @@ class GameMonitor(Generic[GameDatabaseType, GameAPIType, GameStatsType, PlayerSt
         while True:
             if not immediately:
                 try:
-                    await asyncio.sleep(self.config.status_interval_dormant)
+                    await asyncio.sleep(self.get_poll_interval(guild_id))
                 except KeyboardInterrupt:
                     self.polling_active[guild_id] = False
                     return
@@ -52,6 +52,13 @@ class CS2GameMonitor(GameMonitor[CS2GameDatabase, SteamAPIClient, CS2GameStats,
 
         return None
 
+    def get_demo_parse_jobs(self) -> list[dict]:
+        """
+        Get the state of CS2 demos that are queued, being parsed,
+        or were recently parsed by the Steam API client.
+        """
+        return self.api_client.get_demo_parse_jobs() or []
+
     def get_users_in_game(self, user_dict: dict[int, User], raw_game_data: dict):
         users_in_game = {}
         round_stats = raw_game_data["matches"][0]["roundstatsall"]
@@ -188,7 +195,7 @@ class CS2GameMonitor(GameMonitor[CS2GameDatabase, SteamAPIClient, CS2GameStats,
             if game_info is None and status_code != self.POSTGAME_STATUS_DUPLICATE:
                 game_info = {"gameId": next_code}
                 if status_code != self.POSTGAME_STATUS_SOLO:
-                    logger.bind(game_id=next_code, guild_id=guild_id).error(
+                    logger.bind(game_id=next_code, guild_id=guild_id, demo_parse_jobs=self.get_demo_parse_jobs()).error(
                         "Game info is STILL None after 5 retries! Saving to missing games..."
                     )
                     status_code = self.POSTGAME_STATUS_MISSING
@@ -12,6 +12,13 @@ from intfar.api.game_apis.lol import RiotAPIClient
 from intfar.api.game_databases.lol import LoLGameDatabase
 from intfar.api.util import GUILD_IDS
 
+# How long match histories are reused for, fx. when the same players are in voice in several servers
+MATCH_HISTORY_TTL = 20
+
+# How long to poll more often for after a new match has been played, and how often to poll
+ACTIVE_PERIOD = 60 * 60
+ACTIVE_POLL_INTERVAL = 60
+
 class LoLGameMonitor(GameMonitor[LoLGameDatabase, RiotAPIClient, LoLGameStats, LoLPlayerStats]):
     POSTGAME_STATUS_CUSTOM_GAME = 5
     POSTGAME_STATUS_URF = 6
@@ -23,6 +30,9 @@ class LoLGameMonitor(GameMonitor[LoLGameDatabase, RiotAPIClient, LoLGameStats, L
         self.polling_stop_delay = 300
         self.latest_game_timestamp: Dict[int, int] = {}
         self.latest_game_id: Dict[int, List[int]] = {}
+        self.last_activity: Dict[int, float] = {}
+        self.seen_game_ids: Dict[int, set[str]] = {}
+        self._match_histories: Dict[tuple, tuple[float, asyncio.Future]] = {}
         self._get_latest_game()
 
     @property
@@ -60,39 +70,87 @@ class LoLGameMonitor(GameMonitor[LoLGameDatabase, RiotAPIClient, LoLGameStats, L
 
         return users_in_game
 
+    async def _fetch_match_history(self, puuid: str, date_from: int):
+        ranked, normal = await asyncio.gather(
+            self.api_client.get_match_history(puuid, date_from),
+            self.api_client.get_match_history(puuid, date_from, game_type="normal")
+        )
+
+        return sorted(set(ranked + normal))
+
+    def get_match_history(self, puuid: str, date_from: int) -> asyncio.Future:
+        """
+        Get ranked and normal matches played by the given player since `date_from`.
+        Players who are in voice in several servers are only looked up once,
+        as requests are shared while they are in progress and for
+        MATCH_HISTORY_TTL seconds after they were made.
+        """
+        now = time()
+        for key, (timestamp, request) in list(self._match_histories.items()):
+            if request.done() and (now - timestamp > MATCH_HISTORY_TTL or request.exception() is not None):
+                del self._match_histories[key]
+
+        key = (puuid, date_from)
+        if key not in self._match_histories:
+            request = asyncio.ensure_future(self._fetch_match_history(puuid, date_from))
+            self._match_histories[key] = (now, request)
+
+        return self._match_histories[key][1]
+
+    def get_poll_interval(self, guild_id: int) -> float:
+        interval = self.config.status_interval_dormant
+
+        # Poll more often for a while after users in voice have played a game
+        last_activity = self.last_activity.get(guild_id)
+        if last_activity is not None and time() - last_activity < ACTIVE_PERIOD:
+            interval = ACTIVE_POLL_INTERVAL
+
+        # Don't use more than a share of the rate limits on polling
+        requests = 2 * sum(len(user.player_id) for user in self.users_in_voice.get(guild_id, {}).values())
+        if requests == 0:
+            return interval
+
+        return max(interval, self.api_client.rate_limiter.get_min_interval(requests))
+
     async def get_active_game_info(self, guild_id: int):
         # First check if users are in the same game (or all are in no games).
         user_dict = dict(self.users_in_voice.get(guild_id, {}))
+        date_from = self.latest_game_timestamp.get(guild_id)
 
-        game_ids = {}
-        for disc_id in user_dict:
-            user_data = user_dict[disc_id]
+        accounts = [
+            (disc_id, puuid, name)
+            for disc_id, user_data in user_dict.items()
+            for puuid, name in zip(user_data.player_id, user_data.player_name)
+        ]
 
-            for puuid, name in zip(user_data.player_id, user_data.player_name):
-                matches = await self.api_client.get_match_history(puuid, self.latest_game_timestamp.get(guild_id))
-                await asyncio.sleep(0.5)
-                matches += await self.api_client.get_match_history(puuid, self.latest_game_timestamp.get(guild_id), game_type="normal")
-                matches = sorted(set(matches))
+        # Get match histories of all accounts at once
+        match_histories = await asyncio.gather(
+            *[self.get_match_history(puuid, date_from) for _, puuid, _ in accounts]
+        )
 
-                if not matches:
-                    continue
+        game_ids = {}
+        for (disc_id, puuid, name), matches in zip(accounts, match_histories):
+            if not matches:
+                continue
 
-                for game_id in matches:
-                    if game_id in self.latest_game_id[guild_id]:
-                        continue
+            for game_id in matches:
+                if game_id in self.latest_game_id[guild_id]:
+                    continue
 
-                    game_id_str = str(game_id)
-                    if game_id_str not in game_ids:
-                        game_ids[game_id_str] = []
+                game_id_str = str(game_id)
+                if game_id_str not in game_ids:
+                    game_ids[game_id_str] = []
 
-                    game_ids[game_id_str].append(User(disc_id, user_data.secret, name, puuid))
+                game_ids[game_id_str].append(User(disc_id, user_dict[disc_id].secret, name, puuid))
 
-                if game_ids != {}:
-                    logger.bind(event="monitor_match_history", matches=matches).info(f"League match list for {name}: {matches}")
+            if game_ids != {}:
+                logger.bind(event="monitor_match_history", matches=matches).info(f"League match list for {name}: {matches}")
 
-                await asyncio.sleep(1)
+        new_game_ids = set(game_ids) - self.seen_game_ids.get(guild_id, set())
+        if new_game_ids:
+            self.last_activity[guild_id] = time()
 
-            await asyncio.sleep(2)
+        self.seen_game_ids[guild_id] = set(game_ids)
 
         elligible_game_id = None
         users_in_current_game = {}
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Generic, TypeVar
+from typing import Dict, Generic, Iterator, TypeVar
 from dataclasses import dataclass, field
 
 from intfar.api.user import User
@@ -141,6 +141,36 @@ class GameStats(Generic[PlayerStatsType]):
 
         return game_stats_dicts, player_stats_dicts
 
+    @classmethod
+    def get_player_games_from_db(
+        cls,
+        database,
+        player_stats_cls: type[PlayerStatsType],
+        disc_id: int,
+        before: tuple[int, int] | None = None,
+        limit: int | None = None
+    ) -> tuple[list[dict], list[dict]]:
+        """
+        Load stats from the database for the games that the given player played in,
+        newest first, as well as stats for players in those games. Only games played
+        before the (timestamp, game_id) pair given by `before` are loaded, if given.
+        """
+        game_stats_to_save = cls.stats_to_save()
+        player_stats_to_save = player_stats_cls.stats_to_save()
+
+        game_stats = database.get_game_stats_for_player(game_stats_to_save, disc_id, before, limit)
+        game_stats_dicts = [dict(zip(game_stats_to_save, stats)) for stats in game_stats]
+        if game_stats_dicts == []:
+            return [], []
+
+        player_stats_by_game_id = {stats["game_id"]: {} for stats in game_stats_dicts}
+        player_stats = database.get_player_stats(player_stats_to_save, list(player_stats_by_game_id))
+
+        for tup in player_stats:
+            player_stats_by_game_id[tup[0]][int(tup[1])] = dict(zip(player_stats_to_save, tup))
+
+        return game_stats_dicts, list(player_stats_by_game_id.values())
+
     @classmethod
     def find_player_stats(cls, disc_id: int, player_list: list[PlayerStatsType]) -> PlayerStatsType | None:
         """
@@ -195,6 +225,60 @@ class GameStatsParser(Generic[GameStatsType, GameAPIType]):
         """
         ...
 
+    @abstractmethod
+    def parse_player_games_from_database(
+        self,
+        database,
+        disc_id: int,
+        before: tuple[int, int] | None = None,
+        limit: int | None = None
+    ) -> list[GameStatsType]:
+        """
+        Get data for games that the given player played in, newest first, from the
+        database and return a list of GameStats objects with the game data.
+        """
+        ...
+
+    def get_player_games_page(
+        self,
+        database,
+        disc_id: int,
+        before: tuple[int, int] | None = None,
+        page_size: int = 10
+    ) -> tuple[list[GameStatsType], tuple[int, int] | None]:
+        """
+        Get a page of games that the given player played in, newest first.
+
+        ### Parameters
+        :param database:    Game database to load the games from
+        :param disc_id:     Discord ID of the player
+        :param before:      Key of the page to get, as returned by the previous page,
+                            or None to get the first page
+        :param page_size:   Amount of games on each page
+
+        ### Returns
+        Tuple of the games on the page and the key of the next page,
+        which is None if this is the last page.
+        """
+        games = self.parse_player_games_from_database(database, disc_id, before, page_size)
+        if len(games) < page_size:
+            return games, None
+
+        return games, (games[-1].timestamp, games[-1].game_id)
+
+    def iter_player_games(self, database, disc_id: int, page_size: int = 10) -> Iterator[GameStatsType]:
+        """
+        Iterate over all games that the given player played in, newest first,
+        loading `page_size` games from the database at a time.
+        """
+        before = None
+        while True:
+            games, before = self.get_player_games_page(database, disc_id, before, page_size)
+            yield from games
+
+            if before is None:
+                break
+
 @dataclass
 class PostGameStats(Generic[GameStatsType, PlayerStatsType]):
     game: str
@@ -0,0 +1,111 @@
+import json
+import os
+
+from mhooge_flask.logging import logger
+
+class MemberSnapshot:
+    """
+    Snapshot of the Discord nicknames, avatars and guild memberships of users,
+    published by the Discord bot and read by the web app, so that the web app
+    can look these up without a round-trip to the process running the bot.
+
+    The snapshot is stored as a JSON file. The bot writes a new version of it
+    whenever members change, by writing to a temporary file and moving it in
+    place, so readers never see a partially written snapshot. Readers reload
+    the file whenever it has been modified since they last read it.
+    """
+    def __init__(self, path: str):
+        """
+        Initialize the snapshot.
+
+        ### Parameters
+        :param path:    Path to the file that the snapshot is stored in
+        """
+        self.path = path
+        self.version = 0
+        self.nicknames: dict[int, str | None] = {}
+        self.avatars: dict[int, str] = {}
+        self.guilds: dict[int, list[int]] = {}
+        self.guild_names: dict[int, str] = {}
+        self._modified = None
+
+    def _get_file_state(self) -> tuple[int, int]:
+        # The file is replaced on every publish, so its inode changes even if
+        # two versions are written within the resolution of the modified time
+        stat = os.stat(self.path)
+        return stat.st_ino, stat.st_mtime_ns
+
+    @property
+    def loaded(self) -> bool:
+        return self._modified is not None
+
+    def publish(
+        self,
+        nicknames: dict[int, str | None],
+        avatars: dict[int, str],
+        guilds: dict[int, list[int]],
+        guild_names: dict[int, str]
+    ) -> int:
+        """
+        Write a new version of the snapshot and return its version number.
+
+        ### Parameters
+        :param nicknames:   Dictionary of Discord ID -> nickname for each user,
+                            or None if the user was not found in any guild
+        :param avatars:     Dictionary of Discord ID -> path to avatar for each user
+        :param guilds:      Dictionary of Discord ID -> IDs of the guilds the user is in
+        :param guild_names: Dictionary of guild ID -> name of the guild
+        """
+        self.refresh()
+        self.version += 1
+        self.nicknames = dict(nicknames)
+        self.avatars = dict(avatars)
+        self.guilds = {disc_id: list(guild_ids) for disc_id, guild_ids in guilds.items()}
+        self.guild_names = dict(guild_names)
+
+        data = {
+            "version": self.version,
+            "nicknames": self.nicknames,
+            "avatars": self.avatars,
+            "guilds": self.guilds,
+            "guild_names": self.guild_names,
+        }
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as fp:
+            json.dump(data, fp)
+
+        os.replace(temp_path, self.path)
+        self._modified = self._get_file_state()
+
+        return self.version
+
+    def refresh(self) -> bool:
+        """
+        Reload the snapshot if the file has been modified since it was last read.
+        Returns whether the snapshot was reloaded.
+        """
+        try:
+            modified = self._get_file_state()
+        except FileNotFoundError:
+            return False
+
+        if modified == self._modified:
+            return False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            logger.bind(path=self.path).exception("Could not load member snapshot")
+            return False
+
+        # JSON object keys are strings, so Discord IDs are converted back to ints
+        self.version = data["version"]
+        self.nicknames = {int(disc_id): name for disc_id, name in data["nicknames"].items()}
+        self.avatars = {int(disc_id): path for disc_id, path in data["avatars"].items()}
+        self.guilds = {int(disc_id): guild_ids for disc_id, guild_ids in data["guilds"].items()}
+        self.guild_names = {int(guild_id): name for guild_id, name in data["guild_names"].items()}
+        self._modified = modified
+
+        return True
@@ -1,5 +1,4 @@
 from datetime import datetime
-import pickle
 from typing import Literal
 
 from dateutil.relativedelta import relativedelta
@@ -7,7 +6,8 @@ from mhooge_flask.database import SQLiteDatabase
 
 from intfar.api.user import User
 from intfar.api.config import Config
-from intfar.api.util import generate_user_secret
+from intfar.api.sound_hits import SoundHitBuffer
+from intfar.api.util import generate_user_secret, get_hashed_secret
 
 DEFAULT_GAME = "lol"
 
@@ -19,6 +19,10 @@ class MetaDatabase(SQLiteDatabase):
         self.config = config
 
         self.all_users = self.get_base_users()
+        # Maps hashed secrets, which are saved as cookies on the website, to Discord IDs
+        self.hashed_secrets = self._get_hashed_secrets()
+        # Plays of sounds that are not yet written to the database
+        self.sound_hit_buffer = SoundHitBuffer()
 
     def get_base_users(self):
         query = """
@@ -33,6 +37,9 @@ class MetaDatabase(SQLiteDatabase):
         with self:
             return {x[0]: User(x[0], x[1], default_game=x[2] or DEFAULT_GAME) for x in self.execute_query(query).fetchall()}
 
+    def _get_hashed_secrets(self):
+        return {get_hashed_secret(user.secret): disc_id for disc_id, user in self.all_users.items()}
+
     def user_exists(self, discord_id):
         return discord_id in self.all_users
 
@@ -49,6 +56,7 @@ class MetaDatabase(SQLiteDatabase):
             self.execute_query(query, discord_id, 100)
 
             self.all_users[discord_id] = User(discord_id, secret)
+            self.hashed_secrets[get_hashed_secret(secret)] = discord_id
 
     def get_client_secret(self, disc_id):
         query = "SELECT secret FROM users WHERE disc_id=?"
@@ -63,6 +71,16 @@ class MetaDatabase(SQLiteDatabase):
             result = self.execute_query(query, secret).fetchone()
             return result[0] if result is not None else None
 
+    def get_user_from_hashed_secret(self, hashed_secret):
+        disc_id = self.hashed_secrets.get(hashed_secret)
+        if disc_id is None and len(self.hashed_secrets) != len(self.all_users):
+            # The user might have been added by another process. Those share
+            # all_users through the sync manager, but not the index of secrets
+            self.hashed_secrets = self._get_hashed_secrets()
+            disc_id = self.hashed_secrets.get(hashed_secret)
+
+        return disc_id
+
     def set_default_game(self, disc_id, game):
         with self:
             self.all_users[disc_id]["default_game"] = game
@@ -79,9 +97,10 @@ class MetaDatabase(SQLiteDatabase):
     def remove_sound(self, sound):
         query_sound = "DELETE FROM sounds WHERE sound = ?"
         query_hits = "DELETE FROM sound_hits WHERE sound = ?"
-        with self:
+        with self.sound_hit_buffer.lock, self:
             self.execute_query(query_sound, sound, commit=False)
             self.execute_query(query_hits, sound)
+            self.sound_hit_buffer.remove_sound(sound)
 
     def get_weekly_timestamp(self, timestamp: datetime, week_offset: int = 1):
         days = timestamp.weekday()
@@ -100,28 +119,66 @@ class MetaDatabase(SQLiteDatabase):
         return int(start_date.timestamp()), int(end_date.timestamp())
 
     def add_sound_hit(self, sound: str, timestamp: datetime = None):
+        """
+        Count a play of the given sound. Plays are kept in memory
+        and written to the database when `flush_sound_hits` is called.
+        Reads of plays from this database include the buffered plays,
+        but other processes only see them after they are flushed.
+        """
         if timestamp is None:
             timestamp = datetime.now()
 
         date_start, date_end = self.get_weekly_timestamp(timestamp, 0)
+        self.sound_hit_buffer.add(sound, date_start, date_end)
+
+    def flush_sound_hits(self, max_rows: int = 200):
+        """
+        Write the buffered plays of sounds to the database in one transaction,
+        adding them to the plays already saved for the same sound and week.
+        If writing fails, nothing is written and the plays are kept in the buffer.
+
+        ### Parameters
+        :param max_rows:    Maximum amount of rows to insert per query
+
+        ### Returns
+        The amount of rows of sound and week that were written
+        """
+        with self.sound_hit_buffer.lock:
+            hits = self.sound_hit_buffer.get_hits()
+            if hits == {}:
+                return 0
+
+            rows = [(*key, plays) for key, plays in hits.items()]
+            with self:
+                try:
+                    for index in range(0, len(rows), max_rows):
+                        chunk = rows[index:index + max_rows]
+                        query = f"""
+                            INSERT INTO sound_hits (sound, start_date, end_date, plays)
+                            VALUES {", ".join("(?, ?, ?, ?)" for _ in chunk)}
+                            ON CONFLICT (sound, start_date) DO UPDATE
+                            SET plays = COALESCE(sound_hits.plays, 0) + excluded.plays
+                        """
+                        params = [value for row in chunk for value in row]
+                        self.execute_query(query, *params, commit=False)
+
+                    self.connection.commit()
+                except Exception:
+                    self.connection.rollback()
+                    raise
+
+            self.sound_hit_buffer.subtract(hits)
+
+        return len(rows)
+
+    def get_sounds_version(self) -> tuple[int, int | None]:
+        """
+        Get the number of sounds and the timestamp of the newest one,
+        which together change when sounds are added or removed.
+        """
+        query = "SELECT COUNT(*), MAX(timestamp) FROM sounds"
         with self:
-            query_select = "SELECT plays FROM sound_hits WHERE sound = ? AND start_date = ? AND end_date = ?"
-
-            result = self.execute_query(query_select, sound, date_start, date_end).fetchone()
-
-            if result is None or result[0] is None:
-                query = """
-                    INSERT INTO sound_hits (sound, start_date, end_date, plays)
-                    VALUES (?, ?, ?, 1)
-                """
-            else:
-                query = """
-                    UPDATE sound_hits
-                    SET plays = plays + 1
-                    WHERE sound = ? AND start_date = ? AND end_date = ?
-                """
-    
-            self.execute_query(query, sound, date_start, date_end)
+            return self.execute_query(query).fetchone()
 
     def get_sounds(self, ordering):
         order_by = "sounds.sound ASC"
@@ -146,8 +203,26 @@ class MetaDatabase(SQLiteDatabase):
             GROUP BY sounds.sound
             ORDER BY {order_by}
         """
-        with self:
-            return self.execute_query(query).fetchall()
+        with self.sound_hit_buffer.lock:
+            with self:
+                sounds = self.execute_query(query).fetchall()
+
+            buffered_plays = {}
+            for (sound, _, _), plays in self.sound_hit_buffer.get_hits().items():
+                buffered_plays[sound] = buffered_plays.get(sound, 0) + plays
+
+        if buffered_plays == {}:
+            return sounds
+
+        # Add the plays that are not flushed yet to the totals
+        sounds = [
+            (sound, owner_id, total_plays + buffered_plays.get(sound, 0), timestamp)
+            for sound, owner_id, total_plays, timestamp in sounds
+        ]
+        if ordering in ("most_played", "least_played"):
+            sounds.sort(key=lambda sound_data: sound_data[2], reverse=ordering == "most_played")
+
+        return sounds
 
     def get_sound_owner(self, sound: str):
         query = "SELECT owner_id FROM sounds WHERE sound = ?"
@@ -160,48 +235,77 @@ class MetaDatabase(SQLiteDatabase):
         with self:
             return self.execute_query(query, sound).fetchone() is not None
 
-    def get_sound_hits(self, sound=None, date_from: int = None, date_to: int = None):
-        query = "SELECT "
+    def _get_sound_hits_query(self, sound=None, date_from: int = None, date_to: int = None):
+        conditions = []
         params = []
-        if sound is None:
-            query += "sound, "
-
-        query += "plays FROM sound_hits "
         if date_from is not None:
-            query += "WHERE start_date >= ? "
+            conditions.append("start_date >= ?")
             params.append(date_from)
 
         if date_to is not None:
-            query += f"{'AND' if date_from else 'WHERE'} end_date <= ? "
+            conditions.append("end_date <= ?")
             params.append(date_to)
 
         if sound is not None:
-            query += f"{'AND' if date_to else 'WHERE'} sound = ? "
+            conditions.append("sound = ?")
             params.append(sound)
 
-        def format_result(cursor):
-            return cursor.fetchone() if sound is not None else cursor.fetchall()
+        where_clause = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        sound_column = "sound, " if sound is None else ""
+
+        # Plays that are not flushed yet, filtered the same way as the saved ones
+        buffered_hits = [
+            (hit_sound, start_date, plays)
+            for (hit_sound, start_date, end_date), plays in self.sound_hit_buffer.get_hits().items()
+            if (
+                (date_from is None or start_date >= date_from)
+                and (date_to is None or end_date <= date_to)
+                and (sound is None or hit_sound == sound)
+            )
+        ]
 
-        return self.query(query, *params, format_func=format_result)
+        if buffered_hits == []:
+            return f"SELECT {sound_column}plays FROM sound_hits {where_clause}", params
 
-    def get_weekly_sound_hits(self, date_start, date_end, sound=None):
-        query_week = f"""
-            WITH hits AS (
-                {self.get_sound_hits(sound, date_start, date_end).query}
+        query = f"""
+            SELECT {sound_column}SUM(plays) AS plays
+            FROM (
+                SELECT sound, start_date, plays FROM sound_hits {where_clause}
+                UNION ALL
+                VALUES {", ".join("(?, ?, ?)" for _ in buffered_hits)}
             )
-            SELECT
-                hits.sound,
-                hits.plays,
-                ROW_NUMBER() OVER (ORDER BY hits.plays DESC) AS rank
-            FROM hits
+            GROUP BY sound, start_date
         """
+        params.extend(value for hit in buffered_hits for value in hit)
 
-        params = [date_start, date_end]
-        if sound is not None:
-            params.append(sound)
+        return query, params
 
-        with self:
-            return self.execute_query(query_week, *params).fetchall()
+    def get_sound_hits(self, sound=None, date_from: int = None, date_to: int = None):
+        # The buffered hits are read and the query is run while holding the lock,
+        # so hits that are flushed in between are not counted twice
+        with self.sound_hit_buffer.lock:
+            query, params = self._get_sound_hits_query(sound, date_from, date_to)
+
+            with self:
+                cursor = self.execute_query(query, *params)
+                return cursor.fetchone() if sound is not None else cursor.fetchall()
+
+    def get_weekly_sound_hits(self, date_start, date_end, sound=None):
+        with self.sound_hit_buffer.lock:
+            query_hits, params = self._get_sound_hits_query(sound, date_start, date_end)
+            query_week = f"""
+                WITH hits AS (
+                    {query_hits}
+                )
+                SELECT
+                    hits.sound,
+                    hits.plays,
+                    ROW_NUMBER() OVER (ORDER BY hits.plays DESC) AS rank
+                FROM hits
+            """
+
+            with self:
+                return self.execute_query(query_week, *params).fetchall()
 
     def get_total_sound_hits(self, sound=None):
         query = "SELECT "
@@ -209,11 +313,13 @@ class MetaDatabase(SQLiteDatabase):
             query += "sound, "
 
         params = []
-        query += "SUM(plays) FROM sound_hits GROUP BY sound"
+        query += "SUM(plays) FROM sound_hits"
         if sound is not None:
-            query += f"WHERE sound = ?"
+            query += " WHERE sound = ?"
             params.append(sound)
 
+        query += " GROUP BY sound"
+
         def format_result(cursor):
             return cursor.fetchone() if sound is not None else cursor.fetchall()
 
@@ -274,6 +380,17 @@ class MetaDatabase(SQLiteDatabase):
             query = f"UPDATE betting_balance SET tokens=tokens{sign_str}? WHERE disc_id=?"
             self.execute_query(query, amount, disc_id)
 
+    def update_token_balances(self, amounts: dict[int, int]):
+        """
+        Add the given amount of tokens to the balance of each user in a single transaction.
+        """
+        with self:
+            query = "UPDATE betting_balance SET tokens=tokens+? WHERE disc_id=?"
+            for disc_id, amount in amounts.items():
+                self.execute_query(query, amount, disc_id, commit=False)
+
+            self.connection.commit()
+
     def give_tokens(self, sender, amount, receiver):
         self.update_token_balance(sender, amount, increment=False)
         self.update_token_balance(receiver, amount, increment=True)
@@ -498,48 +615,6 @@ class MetaDatabase(SQLiteDatabase):
         with self:
             return self.execute_query(query).fetchall()
 
-    def get_command_result(self, cmd_id, target):
-        with self:
-            query = "SELECT result, IIF(result IS NULL, 0, 1) FROM command_queue WHERE id=? AND target=?"
-            result = self.execute_query(query, cmd_id, target).fetchone()
-
-            done = result is not None and result[1] == 1
-
-            if done:
-                result = pickle.loads(result[0])
-                query_delete = "DELETE FROM command_queue WHERE id=? AND target=?"
-                self.execute_query(query_delete, cmd_id, target)
-            else:
-                result = None
-
-            return result, done
-
-    def set_command_result(self, cmd_id, target, result):
-        with self:
-            query = "UPDATE command_queue SET result=? WHERE id=? AND target=?"
-            self.execute_query(query, pickle.dumps(result), cmd_id, target)
-
-    def get_queued_commands(self, target):
-        with self:
-            query = "SELECT id, command, arguments FROM command_queue WHERE target=? AND result IS NULL"
-            commands = [
-                (command_id, command, pickle.loads(args))
-                for command_id, command, args in self.execute_query(query, target)
-            ]
-
-            return commands
-
-    def enqueue_command(self, cmd_id, target, command, *arguments):
-        with self:
-            query = "INSERT INTO command_queue(id, target, command, arguments) VALUES (?, ?, ?, ?)"
-            serialized_args = pickle.dumps(list(arguments))
-
-            self.execute_query(query, cmd_id, target, command, serialized_args)
-
-    def clear_command_queue(self):
-        with self:
-            self.execute_query("DELETE FROM command_queue")
-
     def clear_tables(self):
         with self:
             query_tables = "SELECT name FROM sqlite_master WHERE type='table'"
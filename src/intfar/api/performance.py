@@ -0,0 +1,236 @@
+import copy
+
+import polars as pl
+
+from intfar.api.game_data import get_stat_quantity_descriptions
+
+INTFAR_WEIGHT = 1
+DOINKS_WEIGHT = 1
+WINRATE_WEIGHT = 2
+GAMES_WEIGHT = 0.25
+STATS_WEIGHT = 0.25
+PERFORMANCE_RANGE = 10
+
+def get_performance_stats(game: str) -> list[str]:
+    return list(get_stat_quantity_descriptions(game))
+
+def get_performance_total(game: str) -> float:
+    num_stats = len(get_performance_stats(game))
+    return (INTFAR_WEIGHT + DOINKS_WEIGHT + WINRATE_WEIGHT + GAMES_WEIGHT + (num_stats * STATS_WEIGHT)) / 2
+
+class PerformanceScoreEngine:
+    """
+    Calculates the performance scores of users from aggregated game data,
+    instead of running the (very large) performance score query every time.
+
+    The engine keeps a row per user per game with everything that goes into
+    the score (games played, wins, Int-Fars, doinks, times being best at each stat)
+    as well as the sum of these rows for each user per time bucket. Scores for a
+    time window are calculated by summing the buckets that are fully inside the
+    window and the games in the buckets at the edges of it.
+
+    The aggregated data is refreshed whenever the games or users in the database
+    change. New games are added incrementally, everything else triggers a rebuild.
+    """
+    def __init__(self, database, bucket_size: int = 60 * 60 * 24):
+        """
+        Initialize the engine.
+
+        ### Parameters
+        :param database:        GameDatabase to calculate performance scores for
+        :param bucket_size:     Size of the time buckets in seconds (defaults to a day)
+        """
+        self.database = database
+        self.bucket_size = bucket_size
+        self.stats = get_performance_stats(database.game)
+        self.total = get_performance_total(database.game)
+
+        self._sum_columns = (
+            ["played", "wins", "intfars", "doinks", "doinks_games", "active_games"]
+            + [f"{stat}_best" for stat in self.stats]
+            + [f"{stat}_games" for stat in self.stats if stat != "first_blood"]
+        )
+        self._signature = None
+        self._games: pl.DataFrame = None
+        self._buckets: pl.DataFrame = None
+        self._player_games: dict[str, int] = {}
+        self._active_users: set[int] = set()
+
+    def copy(self, database) -> "PerformanceScoreEngine":
+        """
+        Get a copy of the engine, with the aggregated data so far, that uses the given database.
+        """
+        engine = copy.copy(self)
+        engine.database = database
+        engine._player_games = dict(self._player_games)
+
+        return engine
+
+    def _to_frame(self, rows: list[tuple], columns: list[str]) -> pl.DataFrame:
+        overrides = {
+            column: pl.String if column in ("game_id", "first_blood_player") else pl.Int64
+            for column in columns
+        }
+        return pl.DataFrame(rows, schema=columns, schema_overrides=overrides, orient="row")
+
+    def _aggregate(self, frame: pl.DataFrame, keys: list[str]) -> pl.DataFrame:
+        return frame.group_by(keys).agg(
+            pl.col(self._sum_columns).sum(),
+            pl.col("first_blood_player").sort_by("first_blood_time").drop_nulls().last(),
+            pl.col("first_blood_time").max(),
+        )
+
+    def _load_games(self, time_after: int = None) -> tuple[pl.DataFrame, int]:
+        facts = self.database.get_performance_facts(self.stats, time_after)
+        stat_games = [f"{stat}_games" for stat in self.stats if stat != "first_blood"]
+
+        frames = [
+            self._to_frame(
+                facts["participations"],
+                ["game_id", "disc_id", "timestamp", "played", "wins", "active_games"] + stat_games + ["first_blood_best", "first_blood_player"]
+            ),
+            self._to_frame(facts["intfars"], ["game_id", "disc_id", "timestamp", "intfars"]),
+            self._to_frame(facts["doinks"], ["game_id", "disc_id", "doinks", "doinks_games"]),
+        ]
+        for stat in self.stats:
+            if stat != "first_blood":
+                frames.append(self._to_frame(facts["best"][stat], ["game_id", "disc_id", f"{stat}_best"]))
+
+        for player_id, count in facts["player_games"]:
+            self._player_games[player_id] = self._player_games.get(player_id, 0) + count
+
+        combined = pl.concat(frames, how="diagonal")
+        for column in self._sum_columns + ["first_blood_player"]:
+            if column not in combined.columns:
+                combined = combined.with_columns(pl.lit(None, pl.String if column == "first_blood_player" else pl.Int64).alias(column))
+
+        games = combined.group_by("game_id", "disc_id").agg(
+            pl.col("timestamp").max(),
+            pl.col(self._sum_columns).sum(),
+            pl.col("first_blood_player").max(),
+        )
+        games = games.with_columns(
+            (pl.col("timestamp") // self.bucket_size).alias("bucket"),
+            pl.when(pl.col("first_blood_player").is_not_null()).then(pl.col("timestamp")).alias("first_blood_time"),
+        )
+
+        return games, facts["game_count"]
+
+    def rebuild(self):
+        """
+        Load all games from the database and aggregate them into time buckets.
+        """
+        self._signature = self.database.get_performance_signature()
+        self._player_games = {}
+        self._games, _ = self._load_games()
+        self._buckets = self._aggregate(self._games, ["disc_id", "bucket"])
+        self._active_users = {disc_id for disc_id, _, active in self._signature[2] if active == 1}
+
+    def refresh(self):
+        """
+        Bring the aggregated data up to date with the database. Games that
+        are newer than any game seen so far are added to the existing buckets,
+        any other change to the games or users causes a full rebuild.
+        """
+        if self._signature is None:
+            self.rebuild()
+            return
+
+        signature = self.database.get_performance_signature()
+        if signature == self._signature:
+            return
+
+        count, max_timestamp, users = signature
+        prev_count, prev_max_timestamp, prev_users = self._signature
+
+        if users != prev_users or prev_max_timestamp is None or count <= prev_count:
+            self.rebuild()
+            return
+
+        new_games, new_count = self._load_games(prev_max_timestamp)
+        if new_count != count - prev_count:
+            # Games were both added and removed, or a game was added in the past
+            self.rebuild()
+            return
+
+        self._games = pl.concat([self._games, new_games], how="vertical_relaxed")
+        new_buckets = self._aggregate(new_games, ["disc_id", "bucket"])
+        self._buckets = self._aggregate(pl.concat([self._buckets, new_buckets], how="vertical_relaxed"), ["disc_id", "bucket"])
+        self._signature = (count, max_timestamp, users)
+
+    def _get_totals(self, time_after: int = None, time_before: int = None) -> pl.DataFrame:
+        # Timestamps are integers, so the window includes [first, last]
+        in_window = pl.lit(True)
+        in_full_bucket = pl.lit(True)
+        if time_after is not None:
+            first = int(time_after // 1) + 1
+            in_window = in_window & (pl.col("timestamp") > time_after)
+            in_full_bucket = in_full_bucket & (pl.col("bucket") >= -(-first // self.bucket_size))
+        if time_before is not None:
+            last = -int(-time_before // 1) - 1
+            in_window = in_window & (pl.col("timestamp") < time_before)
+            in_full_bucket = in_full_bucket & (pl.col("bucket") <= (last + 1) // self.bucket_size - 1)
+
+        columns = ["disc_id", *self._sum_columns, "first_blood_player", "first_blood_time"]
+        full_buckets = self._buckets.filter(in_full_bucket).select(columns)
+        edge_games = self._games.filter(in_window & ~in_full_bucket).select(columns)
+
+        return self._aggregate(pl.concat([full_buckets, edge_games], how="vertical_relaxed"), ["disc_id"])
+
+    def get_scores(self, time_after: int = None, time_before: int = None, minimum_games: int = 0) -> list[tuple[int, float]]:
+        """
+        Get the performance scores of all active users that have played more
+        than `minimum_games` games between `time_after` and `time_before`.
+
+        ### Returns
+        `list[tuple[int, float]]`: Discord ID and score of each user, sorted by score (descending)
+        """
+        self.refresh()
+        totals = self._get_totals(time_after, time_before)
+
+        most_games = totals.filter(pl.col("active_games") > 0)["active_games"].max() or 1
+
+        player_games = self._to_frame(list(self._player_games.items()), ["first_blood_player", "first_blood_games"])
+        totals = (
+            totals.filter(
+                (pl.col("played") > 0)
+                & (pl.col("played") > minimum_games)
+                & pl.col("disc_id").is_in(list(self._active_users))
+            )
+            .join(player_games, on="first_blood_player", how="left")
+        )
+
+        # The heavy lifting is done, there is only a row per user left. The score
+        # itself is calculated in Python with the terms added in the same order as
+        # in the SQL query, as vectorized float operations can differ in the last bit.
+        scores = []
+        for row in totals.iter_rows(named=True):
+            played = float(row["played"])
+            has_wins = row["wins"] > 0
+            has_doinks = has_wins and row["doinks_games"] > 0
+
+            intfar_ratio = row["intfars"] / played if has_wins else 0
+            doinks_ratio = row["doinks"] / played if has_doinks else 0
+            win_ratio = row["wins"] / played if has_wins else 0
+
+            score = (
+                (1 - intfar_ratio) * INTFAR_WEIGHT
+                + doinks_ratio * DOINKS_WEIGHT
+                + win_ratio * WINRATE_WEIGHT
+                + (played / most_games) * GAMES_WEIGHT
+            )
+
+            # Each stat only counts if the user has values for all the previous stats as well
+            has_stat = has_doinks
+            for stat in self.stats:
+                best = row[f"{stat}_best"]
+                games = row[f"{stat}_games"] or 0
+                has_stat = has_stat and best > 0 and games > 0
+                score = score + (best // games if has_stat else 0) * STATS_WEIGHT
+
+            scores.append((row["disc_id"], (score / self.total) * PERFORMANCE_RANGE))
+
+        # Ties are ordered like SQLite orders them, by descending Discord ID
+        scores.sort(key=lambda x: (x[1], x[0]), reverse=True)
+
+        return [(disc_id, min(score, PERFORMANCE_RANGE)) for disc_id, score in scores]
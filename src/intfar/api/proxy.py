@@ -1,25 +1,46 @@
+import os
 import inspect
+import shlex
 import subprocess
 import asyncio
-from time import sleep
-from multiprocessing import Pipe
-from multiprocessing.connection import Connection, wait
-from threading import Thread, Event
+from itertools import count
+from time import sleep, monotonic
+from multiprocessing.connection import Connection, Listener, Client, wait
+from threading import Condition, Thread, Event, Lock
 from typing import Dict, Type
 
 from mhooge_flask.logging import logger
 
-from intfar.api.meta_database import MetaDatabase
-
 _DEFAULT_TIMEOUT = 60
 
+# Extra time a proxy waits for a response after the command has timed out,
+# in case the ProxyManager isn't around to tell it that it did.
+_RESPONSE_GRACE = 5
+
+# Environment variable used to pass the authentication key to the worker process
+AUTHKEY_ENV = "INTFAR_PROXY_AUTHKEY"
+
+def connect_worker(address: str, target_name: str) -> Connection:
+    """
+    Connect to a ProxyManager from the worker process that it started.
+    Commands are received from the returned connection as tuples of
+    `(request_id, command, args)` and the result of each command should
+    be sent back as `(request_id, result)`.
+    """
+    conn = Client(address, authkey=bytes.fromhex(os.environ[AUTHKEY_ENV]))
+    conn.send(("worker", target_name))
+
+    return conn
+
 class Proxy(object):
-    def __init__(self, conn: Connection, target_cls: Type[object], func_timeouts: Dict[str, int]):
-        self.conn = conn
+    def __init__(self, address: str, authkey: bytes, target_cls: Type[object], func_timeouts: Dict[str, int]):
+        self.address = address
+        self.authkey = authkey
         self.target_cls = target_cls
         self.func_timeouts = func_timeouts
 
         self._set_attributes()
+        self._reset_connection()
 
     def _set_attributes(self):
         for attr in dir(self.target_cls):
@@ -33,117 +54,272 @@ class Proxy(object):
                 elif inspect.isfunction(getattr(self.target_cls, attr)):
                     def call(*args, _x=attr):
                         return self.__getattribute__("_call_proxy")(_x, *args)
-    
+
                     setattr(self, attr, call)
 
+    def _reset_connection(self):
+        self._conn = None
+        self._pid = None
+        self._send_lock = Lock()
+        self._recv_cond = Condition()
+        self._receiving = False
+        self._request_ids = count()
+        self._responses = {}
+
     def __getattr__(self, name):
         return self._call_proxy(name)
 
     def __getstate__(self):
-        return {"conn": self.conn, "target_cls": self.target_cls, "func_timeouts": self.func_timeouts}
+        return {
+            "address": self.address,
+            "authkey": self.authkey,
+            "target_cls": self.target_cls,
+            "func_timeouts": self.func_timeouts
+        }
 
     def __setstate__(self, state):
-        self.__dict__ = {"conn": state["conn"], "target_cls": state["target_cls"], "func_timeouts": state["func_timeouts"]}
+        self.__dict__ = dict(state)
         self._set_attributes()
+        self._reset_connection()
+
+    def _send(self, command, args):
+        if self._pid != os.getpid():
+            # Proxies are shared between processes, each of which needs its own connection
+            self._reset_connection()
 
-    def _call_proxy(self, command, *args):
         timeout = self.func_timeouts.get(command, _DEFAULT_TIMEOUT)
-        self.conn.send((command, timeout, *args))
-        return self.conn.recv()
+
+        with self._send_lock:
+            if self._conn is None:
+                self._conn = Client(self.address, authkey=self.authkey)
+                self._conn.send(("proxy",))
+                self._pid = os.getpid()
+
+            request_id = next(self._request_ids)
+            self._conn.send((request_id, command, timeout, args))
+
+        return request_id, monotonic() + timeout + _RESPONSE_GRACE
+
+    def _wait_response(self, request_id, deadline):
+        with self._recv_cond:
+            while request_id not in self._responses:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return False, None
+
+                if self._receiving:
+                    # Another thread is reading from the connection and wakes this one when it gets a response
+                    self._recv_cond.wait(remaining)
+                    continue
+
+                # Block on the connection without holding the lock, so the responses
+                # that this thread receives for other threads can be picked up by them
+                self._receiving = True
+                self._recv_cond.release()
+                try:
+                    message = self._conn.recv() if self._conn.poll(remaining) else None
+                finally:
+                    self._recv_cond.acquire()
+                    self._receiving = False
+                    self._recv_cond.notify_all()
+
+                if message is not None:
+                    response_id, result = message
+                    self._responses[response_id] = result
+
+            return True, self._responses.pop(request_id)
+
+    def _handle_error(self, command):
+        logger.bind(command=command).exception("Could not reach ProxyManager!")
+        self._pid = None
+
+    def _call_proxy(self, command, *args):
+        try:
+            request_id, deadline = self._send(command, args)
+            done, result = self._wait_response(request_id, deadline)
+            if done:
+                return result
+
+        except (OSError, EOFError):
+            self._handle_error(command)
+
+        return None
 
     async def _acall_proxy(self, command, *args):
-        timeout = self.func_timeouts.get(command, _DEFAULT_TIMEOUT)
-        self.conn.send((command, timeout, *args))
+        try:
+            request_id, deadline = self._send(command, args)
+            done, result = await asyncio.to_thread(self._wait_response, request_id, deadline)
+            if done:
+                return result
 
-        while not self.conn.poll():
-            await asyncio.sleep(0.01)
+        except (OSError, EOFError):
+            self._handle_error(command)
 
-        return self.conn.recv()
+        return None
 
 class ProxyManager(object):
-    def __init__(self, target_cls, game: str, meta_database: MetaDatabase):
-        self.proxies = []
-        self.database = meta_database
-
+    """
+    Runs a class in a separate worker process (fx. the SteamAPIClient in run_steam.py)
+    and relays calls to it from any number of Proxy objects in other processes.
+
+    Proxies and the worker connect to the manager over a local socket (or named pipe
+    on Windows). Every call is tagged with a request ID, so many calls can be in
+    flight at once and their results are sent back to whichever proxy made them.
+    """
+    def __init__(self, target_cls, game: str, worker_command: str = None):
+        """
+        Initialize the ProxyManager and start the worker process.
+
+        ### Parameters
+        :param target_cls:      Class that the worker process runs commands on
+        :param game:            Game that the worker process should handle
+        :param worker_command:  Shell command that starts the worker process.
+                                The address to connect to is added as `--address`
+        """
         self.target_cls = target_cls
         self.target_name = self.target_cls.__name__
 
+        self._authkey = os.urandom(32)
+        self.listener = Listener(authkey=self._authkey)
+        self.address = self.listener.address
+
+        self.proxies: list[Connection] = []
+        self.worker: Connection = None
+        self._request_ids = count()
+        self._pending = {}
+        self._backlog = []
+        self._lock = Lock()
+
+        if worker_command is None:
+            worker_command = f"uv run run_steam.py {game}"
+
         self.steam_process = subprocess.Popen(
-            f"uv run run_steam.py {game}",
+            f"{worker_command} --address {shlex.quote(self.address)}",
             executable="/bin/bash",
             shell=True,
-            text=True
+            text=True,
+            env={**os.environ, AUTHKEY_ENV: self._authkey.hex()}
         )
 
         self._stop_event = Event()
+        self.accept_thread = Thread(target=self._accept, daemon=True)
+        self.accept_thread.start()
         self.listen_thread = Thread(target=self._listen)
         self.listen_thread.start()
 
-    def _listen(self):
-        command_id = 0
-        time_to_sleep = 0.5
-
+    def _accept(self):
         while not self._stop_event.is_set():
             try:
-                for proxy in wait(self.proxies, timeout=0.01):
-                    try:
-                        command, timeout, *args = proxy.recv()
-                    except (OSError, BrokenPipeError):
-                        self.kill()
-                        break
-
-                    if self.steam_process.poll() is not None:
-                        # Steam process isn't running, no point in sending commands
-                        proxy.send(None)
-                        continue
-
-                    result = None
-                    done = False
-                    self.database.enqueue_command(command_id, self.target_name, command, *args)
-
-                    if command == "close":
-                        proxy.send("exiting...")
-                        break
-
-                    wait_time = 0
-                    while wait_time < timeout:
-                        result, done = self.database.get_command_result(command_id, self.target_name)
+                conn = self.listener.accept()
+                role, *_ = conn.recv()
+            except (OSError, EOFError):
+                if self._stop_event.is_set():
+                    break
+
+                logger.exception("Error when accepting proxy connection")
+                continue
+
+            with self._lock:
+                if role == "worker":
+                    self.worker = conn
+                else:
+                    self.proxies.append(conn)
+
+    def _drop_connection(self, conn: Connection):
+        with self._lock:
+            if conn is self.worker:
+                self.worker = None
+            elif conn in self.proxies:
+                self.proxies.remove(conn)
+
+        conn.close()
+
+    def _respond(self, manager_id, result):
+        request = self._pending.pop(manager_id, None)
+        if request is None:
+            # The command has already timed out
+            return
+
+        conn, request_id, _, _ = request
+        try:
+            conn.send((request_id, result))
+        except OSError:
+            self._drop_connection(conn)
+
+    def _forward(self, conn: Connection, request_id, command, timeout, args):
+        if self.steam_process.poll() is not None:
+            # Steam process isn't running, no point in sending commands
+            conn.send((request_id, None))
+            return
+
+        manager_id = next(self._request_ids)
+        self._pending[manager_id] = (conn, request_id, command, monotonic() + timeout)
+        self._backlog.append((manager_id, command, args))
+
+    def _send_backlog(self, worker: Connection):
+        # Commands are held back until the worker has connected
+        for manager_id, command, args in self._backlog:
+            if manager_id in self._pending:
+                worker.send((manager_id, command, args))
+
+        self._backlog = []
+
+    def _expire_requests(self):
+        now = monotonic()
+        for manager_id, (_, _, command, deadline) in list(self._pending.items()):
+            if now > deadline:
+                logger.bind(command=command).warning("Steam command timed out!")
+                self._respond(manager_id, None)
 
-                        if done:
-                            break
-
-                        wait_time += time_to_sleep
-                        sleep(time_to_sleep)
-
-                    if not done:
-                        logger.bind(command=command, args=args).warning("Steam command timed out!")
-
-                    proxy.send(result)
-                    command_id += 1
-            except OSError:
-                break
+    def _listen(self):
+        while not self._stop_event.is_set():
+            with self._lock:
+                worker = self.worker
+                connections = list(self.proxies) + ([worker] if worker is not None else [])
+
+            if connections == []:
+                self._stop_event.wait(0.05)
+                continue
+
+            for conn in wait(connections, timeout=0.05):
+                try:
+                    message = conn.recv()
+                except (OSError, EOFError):
+                    self._drop_connection(conn)
+                    if conn is worker:
+                        # Worker process is gone, nothing will answer the pending commands
+                        for manager_id in list(self._pending):
+                            self._respond(manager_id, None)
+                    continue
+
+                if conn is worker:
+                    self._respond(*message)
+                else:
+                    self._forward(conn, *message)
+
+            if worker is not None and self._backlog != []:
+                try:
+                    self._send_backlog(worker)
+                except OSError:
+                    self._drop_connection(worker)
+
+            self._expire_requests()
 
     def create_proxy(self, func_timeouts={}):
-        conn_1, conn_2 = Pipe(True)
-        self.proxies.append(conn_1)
-
-        proxy = Proxy(conn_2, self.target_cls, func_timeouts)
-
-        return proxy
+        return Proxy(self.address, self._authkey, self.target_cls, func_timeouts)
 
     def is_alive(self):
         return not self._stop_event.is_set()
 
     def kill(self):
         self._stop_event.set()
-        for proxy in self.proxies:
-            proxy.close()
 
         if self.steam_process.poll() is None:
             logger.info("Shutting down Steam process...")
             try:
                 # Try to shut down steam process gracefully via a command
-                self.database.enqueue_command(-1, self.target_name, "close")
+                if self.worker is not None:
+                    self.worker.send((-1, "close", []))
 
                 max_sleep = 10
                 time_slept = 0
@@ -160,3 +336,8 @@ class ProxyManager(object):
                     # Diplomacy failed, seems we have to do things the hard away!
                     logger.info("Killing Steam process...")
                     self.steam_process.kill()
+
+        self.listener.close()
+        with self._lock:
+            for conn in self.proxies + ([self.worker] if self.worker is not None else []):
+                conn.close()
@@ -0,0 +1,141 @@
+import re
+import sys
+
+from mhooge_flask.database import SQLiteDatabase
+
+_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$")
+_TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+\[?(\w+)\]?(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_KEYWORDS = {
+    "where", "on", "inner", "left", "right", "cross", "join", "group", "order",
+    "limit", "union", "having", "set", "values", "using", "natural", "outer"
+}
+
+class QueryPlanAuditor:
+    """
+    Records every query emitted by the methods of a database while active
+    and runs `EXPLAIN QUERY PLAN` on them to find full table scans.
+
+    Use as a context manager around the code that should be audited:
+    ```
+    with QueryPlanAuditor(database) as auditor:
+        database.get_games_count()
+
+    print(auditor.get_full_scans())
+    ```
+    """
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+        self.recorded_queries: dict[str, dict[str, tuple]] = {}
+        self._query_owners: dict[str, str] = {}
+        self._base_names = set(dir(SQLiteDatabase))
+
+    def _get_calling_method(self, query: str) -> str:
+        frame = sys._getframe(2)
+        while frame is not None:
+            name = frame.f_code.co_name
+            if (
+                frame.f_locals.get("self") is self.database
+                and name not in self._base_names
+                and hasattr(type(self.database), name)
+            ):
+                return name
+
+            frame = frame.f_back
+
+        # Query objects are executed after the method that created them has returned
+        return self._query_owners.get(query, "<unknown>")
+
+    def __enter__(self):
+        execute_query = self.database.execute_query
+        create_query = self.database.query
+
+        def recording_execute_query(query, *params, **kwargs):
+            method = self._get_calling_method(query)
+            query_params = params[0] if params and isinstance(params[0], (tuple, list)) else params
+            self.recorded_queries.setdefault(method, {})[query] = tuple(query_params)
+
+            return execute_query(query, *params, **kwargs)
+
+        def recording_query(query, *params, **kwargs):
+            self._query_owners[query] = self._get_calling_method(query)
+
+            return create_query(query, *params, **kwargs)
+
+        self.database.execute_query = recording_execute_query
+        self.database.query = recording_query
+
+        return self
+
+    def __exit__(self, *args):
+        del self.database.execute_query
+        del self.database.query
+
+    def _get_table_aliases(self, query: str, tables: set[str]) -> dict[str, str]:
+        # Query plans refer to tables by their alias, if they have one. Names
+        # that are not resolved here are subqueries or CTEs, not actual tables.
+        aliases = {}
+        for table, alias in _TABLE_PATTERN.findall(query):
+            if table not in tables:
+                continue
+
+            if alias and alias.lower() not in _KEYWORDS:
+                aliases[alias] = table
+            else:
+                aliases[table] = table
+
+        return aliases
+
+    def explain_query(self, query: str, params: tuple = ()) -> list[str]:
+        """
+        Get the lines of the query plan that SQLite would use for the given query.
+        Raises a DBException if the query can't be prepared.
+        """
+        with self.database:
+            plan = self.database.execute_query(f"EXPLAIN QUERY PLAN {query}", *params).fetchall()
+
+        return [row[-1] for row in plan]
+
+    def find_full_scans(self, query: str, params: tuple, tables: set[str]) -> set[str]:
+        """
+        Get the names of tables that would be fully scanned, without
+        the use of an index, when executing the given query.
+        """
+        aliases = self._get_table_aliases(query, tables)
+        scanned = set()
+
+        for line in self.explain_query(query, params):
+            match = _SCAN_PATTERN.match(line.strip())
+            if match is None:
+                continue
+
+            name, explicit_alias, rest = match.groups()
+            if "USING" in rest: # Index is used for the scan
+                continue
+
+            table = name if explicit_alias is not None else aliases.get(name)
+            if table in tables:
+                scanned.add(table)
+
+        return scanned
+
+    def get_full_scans(self) -> dict[str, set[str]]:
+        """
+        Get the tables that are fully scanned by any of the queries recorded so far.
+
+        ### Returns
+        `dict[str, set[str]]`: Mapping of method name -> names of tables it fully scans
+        """
+        with self.database:
+            tables = {
+                row[0] for row in
+                self.database.execute_query("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+            }
+
+        full_scans = {}
+        for method, queries in self.recorded_queries.items():
+            for query, params in queries.items():
+                scanned = self.find_full_scans(query, params, tables)
+                if scanned:
+                    full_scans.setdefault(method, set()).update(scanned)
+
+        return full_scans
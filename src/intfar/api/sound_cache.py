@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import subprocess
+
+from discord.oggparse import OggPage, OggStream
+from discord.player import AudioSource
+
+from mhooge_flask.logging import logger
+
+OPUS_SAMPLE_RATE = 48000
+OPUS_BITRATE = "96k"
+
+def get_ogg_opus_duration(path: str) -> float | None:
+    """
+    Get the duration in seconds of an Ogg Opus file from the granule position
+    of its last page, without decoding it.
+    """
+    pre_skip = None
+    granule_pos = None
+    with open(path, "rb") as fp:
+        while fp.read(4) == b"OggS":
+            page = OggPage(fp)
+            if pre_skip is None and page.data.startswith(b"OpusHead"):
+                pre_skip = int.from_bytes(page.data[10:12], "little")
+
+            granule_pos = page.gran_pos
+
+    if pre_skip is None or granule_pos is None:
+        return None
+
+    return max(granule_pos - pre_skip, 0) / OPUS_SAMPLE_RATE
+
+class OggOpusFileAudio(AudioSource):
+    """
+    Audio source that reads Opus packets directly from an Ogg Opus file.
+    Unlike FFmpegPCMAudio, this runs no FFmpeg process and does not encode
+    the audio to Opus again while it is played.
+    """
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._packet_iter = OggStream(self._file).iter_packets()
+
+    def read(self) -> bytes:
+        return next(self._packet_iter, b"")
+
+    def is_opus(self) -> bool:
+        return True
+
+    def cleanup(self):
+        self._file.close()
+
+class SoundCache:
+    """
+    Cache of soundboard sounds encoded as Ogg Opus, stored next to the mp3 files
+    of the sounds together with their duration. A cached sound is only used if
+    its mp3 file has not changed since it was encoded.
+    """
+    def __init__(self, sounds_path: str, ffmpeg: str = "ffmpeg"):
+        self.sounds_path = sounds_path
+        self.cache_path = f"{sounds_path}/opus"
+        self.ffmpeg = ffmpeg
+
+    def get_sound_path(self, sound: str) -> str:
+        return f"{self.sounds_path}/{sound}.mp3"
+
+    def get_opus_path(self, sound: str) -> str:
+        return f"{self.cache_path}/{sound}.ogg"
+
+    def _get_metadata_path(self, sound: str) -> str:
+        return f"{self.cache_path}/{sound}.json"
+
+    def get(self, sound: str) -> tuple[str, float | None] | None:
+        """
+        Get the path and duration of the encoded version of the given sound,
+        or None if it has not been encoded since its mp3 file last changed.
+        """
+        try:
+            with open(self._get_metadata_path(sound), "r", encoding="utf-8") as fp:
+                metadata = json.load(fp)
+
+            if metadata["source_mtime"] != os.stat(self.get_sound_path(sound)).st_mtime_ns:
+                return None
+        except (OSError, ValueError, KeyError):
+            return None
+
+        opus_path = self.get_opus_path(sound)
+        if not os.path.exists(opus_path):
+            return None
+
+        return opus_path, metadata["duration"]
+
+    def encode(self, sound: str) -> bool:
+        """
+        Encode the mp3 file of the given sound as Ogg Opus and save its duration.
+        The mp3 file should already be loudness normalized.
+
+        ### Returns
+        Whether the sound was encoded
+        """
+        os.makedirs(self.cache_path, exist_ok=True)
+
+        sound_path = self.get_sound_path(sound)
+        opus_path = self.get_opus_path(sound)
+        temp_path = f"{opus_path}.tmp"
+        source_mtime = os.stat(sound_path).st_mtime_ns
+
+        args = [
+            self.ffmpeg,
+            "-y",
+            "-v",
+            "error",
+            "-i",
+            sound_path,
+            "-vn",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            OPUS_BITRATE,
+            "-ar",
+            str(OPUS_SAMPLE_RATE),
+            "-ac",
+            "2",
+            "-frame_duration",
+            "20", # Discord plays one 20 ms packet at a time
+            "-f",
+            "ogg",
+            temp_path
+        ]
+        process = subprocess.run(args, capture_output=True, text=True)
+
+        if process.returncode != 0:
+            logger.bind(
+                event="opus_encode_error", sound=sound, stderr=process.stderr
+            ).error(f"Error when encoding sound '{sound}' as Opus: {process.stderr}")
+
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+            return False
+
+        metadata = {"duration": get_ogg_opus_duration(temp_path), "source_mtime": source_mtime}
+        os.replace(temp_path, opus_path)
+
+        with open(f"{self._get_metadata_path(sound)}.tmp", "w", encoding="utf-8") as fp:
+            json.dump(metadata, fp)
+
+        os.replace(f"{self._get_metadata_path(sound)}.tmp", self._get_metadata_path(sound))
+
+        return True
+
+    def remove(self, sound: str):
+        for path in (self.get_opus_path(sound), self._get_metadata_path(sound)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def encode_missing(self, sounds: list[str], workers: int = 4) -> list[str]:
+        """
+        Encode the given sounds that are not already encoded, with `workers`
+        FFmpeg processes running at a time.
+
+        ### Returns
+        The sounds that were encoded
+        """
+        missing = [sound for sound in sounds if self.get(sound) is None and os.path.exists(self.get_sound_path(sound))]
+
+        with ThreadPoolExecutor(workers) as executor:
+            encoded = list(executor.map(self.encode, missing))
+
+        return [sound for sound, success in zip(missing, encoded) if success]
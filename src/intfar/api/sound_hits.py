@@ -0,0 +1,49 @@
+from threading import RLock
+
+class SoundHitBuffer:
+    """
+    In-memory counts of sound plays that have not yet been written to the database,
+    aggregated by sound and week. The buffer is shared between the copies of a
+    database that AsyncDatabase reads with, so `lock` is held both when changing
+    the counts and when reading them together with the flushed counts.
+
+    Sounds are only played by the Discord bot, so only its process has buffered
+    plays. The web app runs in another process, and asks the bot to flush
+    its buffer before reading plays from the database.
+    """
+    def __init__(self):
+        self.lock = RLock()
+        self._hits: dict[tuple[str, int, int], int] = {}
+
+    def __len__(self):
+        return len(self._hits)
+
+    def add(self, sound: str, start_date: int, end_date: int, plays: int = 1):
+        with self.lock:
+            key = (sound, start_date, end_date)
+            self._hits[key] = self._hits.get(key, 0) + plays
+
+    def get_hits(self) -> dict[tuple[str, int, int], int]:
+        """
+        Get a copy of the buffered plays, keyed by sound, start date, and end date.
+        """
+        with self.lock:
+            return dict(self._hits)
+
+    def remove_sound(self, sound: str):
+        with self.lock:
+            for key in [key for key in self._hits if key[0] == sound]:
+                del self._hits[key]
+
+    def subtract(self, hits: dict[tuple[str, int, int], int]):
+        """
+        Remove the given plays from the buffer, after they have been flushed.
+        Plays that were added after `hits` was copied are kept.
+        """
+        with self.lock:
+            for key, plays in hits.items():
+                remaining = self._hits.get(key, 0) - plays
+                if remaining > 0:
+                    self._hits[key] = remaining
+                else:
+                    self._hits.pop(key, None)
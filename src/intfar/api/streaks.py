@@ -0,0 +1,237 @@
+import copy
+from datetime import datetime
+
+def _format_date(timestamp: int | None) -> str | None:
+    if timestamp is None:
+        return None
+
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+def _game_order(game: tuple) -> tuple:
+    # Games are ordered by when they were played, with the game ID breaking ties.
+    # Game IDs alone don't give the order, CS2 sharecodes don't increase over time.
+    # Games without a timestamp come first, like they do when sorted by SQLite.
+    game_id, timestamp = game[:2]
+    return (timestamp is not None, timestamp or 0, game_id)
+
+class StreakEngine:
+    """
+    Keeps track of the Int-Far streaks and win/loss streaks of all users,
+    so that they can be looked up without walking through every game.
+
+    Games are processed once, in the order they were played, and the running
+    and longest streaks are saved for each user. Current
+    win/loss streaks are saved as a list of (result, length) runs, so that
+    streaks from before the most recent games can also be found.
+
+    The streaks are refreshed whenever the games or users in the database change.
+    New games that were played after every game seen so far are added incrementally,
+    everything else triggers a rebuild.
+    """
+    def __init__(self, database):
+        """
+        Initialize the engine.
+
+        ### Parameters
+        :param database:    GameDatabase to keep track of streaks for
+        """
+        self.database = database
+
+        self._signature = None
+        self._last_game: tuple = None
+        self._active_users: set[int] = set()
+
+        # Int-Far streaks
+        self._intfar_run: list = [None, 0]
+        self._longest_intfar: dict[int, tuple[int, int]] = {}
+        self._current_intfar: list = [None, 0]
+        self._no_intfar: dict[int, list] = {}
+
+        # Win/loss streaks
+        self._result_run: dict[int, list] = {}
+        self._longest_results: dict[int, dict[int, int]] = {}
+        self._result_runs: dict[int, list[list]] = {}
+        self._result_counts: dict[int, int] = {}
+
+    def copy(self, database) -> "StreakEngine":
+        """
+        Get a copy of the engine, with the streaks so far, that uses the given database.
+        """
+        engine = copy.copy(self)
+        engine.database = database
+        for attr in (
+            "_intfar_run", "_longest_intfar", "_current_intfar", "_no_intfar",
+            "_result_run", "_longest_results", "_result_runs", "_result_counts"
+        ):
+            setattr(engine, attr, copy.deepcopy(getattr(self, attr)))
+
+        return engine
+
+    def _group_games(self, rows: list[tuple]) -> list[tuple]:
+        games = {}
+        for game_id, timestamp, intfar_id, win, disc_id, active in rows:
+            if game_id not in games:
+                games[game_id] = (game_id, timestamp, intfar_id, win, [])
+
+            if disc_id is not None:
+                games[game_id][4].append((disc_id, active))
+
+        return list(games.values())
+
+    def _add_games(self, games: list[tuple]):
+        for game in sorted(games, key=_game_order):
+            _, timestamp, intfar_id, win, players = game
+
+            # Longest Int-Far streak, counted across all games
+            if intfar_id is None:
+                self._intfar_run = [None, 0]
+            elif intfar_id == self._intfar_run[0]:
+                self._intfar_run[1] += 1
+            else:
+                self._intfar_run = [intfar_id, 1]
+
+            holder, count = self._intfar_run
+            if holder is not None and count > self._longest_intfar.get(holder, (0, None))[0]:
+                self._longest_intfar[holder] = (count, timestamp)
+
+            # Current Int-Far streak, only counting games where an active user was Int-Far
+            if intfar_id in self._active_users:
+                if intfar_id == self._current_intfar[0]:
+                    self._current_intfar[1] += 1
+                else:
+                    self._current_intfar = [intfar_id, 1]
+
+            # Longest streak without Int-Far, counted for every account of a user in the game
+            for disc_id, _ in players:
+                state = self._no_intfar.setdefault(disc_id, [0, 0, None, None])
+                state[0] = 0 if disc_id == intfar_id else state[0] + 1
+                if state[0] > state[1]:
+                    state[1] = state[0]
+                    state[2] = timestamp
+
+                state[3] = timestamp
+
+            # Longest win/loss streaks, counted once per game for active users
+            for disc_id in {disc_id for disc_id, active in players if active}:
+                run = self._result_run.get(disc_id)
+                if run is not None and run[0] == win:
+                    run[1] += 1
+                else:
+                    run = [win, 1]
+                    self._result_run[disc_id] = run
+
+                longest = self._longest_results.setdefault(disc_id, {})
+                if run[1] > longest.get(win, 0):
+                    longest[win] = run[1]
+
+            # Current win/loss streaks
+            for disc_id in {disc_id for disc_id, active in players if active == 1}:
+                runs = self._result_runs.setdefault(disc_id, [])
+                if runs and runs[-1][0] == win:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([win, 1])
+
+                self._result_counts[disc_id] = self._result_counts.get(disc_id, 0) + 1
+
+            self._last_game = _game_order(game)
+
+    def rebuild(self):
+        """
+        Load all games from the database and calculate the streaks of every user.
+        """
+        self._signature = self.database.get_performance_signature()
+        self._active_users = {disc_id for disc_id, _, active in self._signature[2] if active == 1}
+
+        self._last_game = None
+        self._intfar_run = [None, 0]
+        self._longest_intfar = {}
+        self._current_intfar = [None, 0]
+        self._no_intfar = {}
+        self._result_run = {}
+        self._longest_results = {}
+        self._result_runs = {}
+        self._result_counts = {}
+
+        games = self._group_games(self.database.get_streak_facts())
+        self._add_games(games)
+
+    def refresh(self):
+        """
+        Bring the streaks up to date with the database. Games that were played
+        after every game seen so far continue the existing streaks, any other
+        change to the games or users causes a full rebuild.
+        """
+        if self._signature is None:
+            self.rebuild()
+            return
+
+        signature = self.database.get_performance_signature()
+        if signature == self._signature:
+            return
+
+        count, _, users = signature
+        prev_count, prev_max_timestamp, prev_users = self._signature
+
+        if users != prev_users or prev_max_timestamp is None or count <= prev_count:
+            self.rebuild()
+            return
+
+        new_games = self._group_games(self.database.get_streak_facts(prev_max_timestamp))
+        if (
+            len(new_games) != count - prev_count
+            or any(_game_order(game) <= self._last_game for game in new_games)
+        ):
+            # Games were both added and removed, or added before games seen so far
+            self.rebuild()
+            return
+
+        self._add_games(new_games)
+        self._signature = signature
+
+    def get_longest_intfar_streak(self, disc_id: int) -> tuple[int, str | None]:
+        self.refresh()
+        count, timestamp = self._longest_intfar.get(disc_id, (0, None))
+
+        return count, _format_date(timestamp)
+
+    def get_longest_no_intfar_streak(self, disc_id: int) -> tuple[int, str | None]:
+        self.refresh()
+        _, max_count, timestamp_ended, last_timestamp = self._no_intfar.get(disc_id, (0, 0, None, None))
+        if timestamp_ended == last_timestamp:
+            # Streak is ongoing
+            timestamp_ended = None
+
+        return max_count, _format_date(timestamp_ended)
+
+    def get_current_intfar_streak(self) -> tuple[int, int | None]:
+        self.refresh()
+        intfar_id, count = self._current_intfar
+
+        return count, intfar_id
+
+    def get_longest_win_or_loss_streak(self, disc_id: int, win: int) -> int:
+        self.refresh()
+        return self._longest_results.get(disc_id, {}).get(win, 0)
+
+    def get_current_win_or_loss_streak(self, disc_id: int, win: int, offset: int = 0) -> int:
+        self.refresh()
+        total = self._result_counts.get(disc_id, 0)
+        if offset > 0 and offset >= total:
+            return total - offset
+
+        # Walk back through the runs of results, skipping the `offset` latest games
+        count = 0
+        skip = offset
+        for result, length in reversed(self._result_runs.get(disc_id, [])):
+            if skip >= length:
+                skip -= length
+                continue
+
+            if result != win:
+                break
+
+            count += length - skip
+            skip = 0
+
+        return count + 1 if offset == 0 else count
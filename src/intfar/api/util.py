@@ -1,6 +1,8 @@
 import asyncio
 from datetime import datetime
+from bisect import bisect_left, bisect_right
 from glob import glob
+from hashlib import sha256
 from threading import Thread
 from dateutil.relativedelta import relativedelta
 import importlib
@@ -11,6 +13,7 @@ import math
 from intfar.api.config import Config, Environment
 
 import Levenshtein
+from rapidfuzz import process
 
 MAIN_GUILD_ID = 619073595561213953
 MY_GUILD_ID  = 512363920044982272
@@ -147,6 +150,9 @@ def parse_amount_str(amount_str, balance=None):
 def generate_user_secret():
     return secrets.token_hex(nbytes=32)
 
+def get_hashed_secret(secret):
+    return sha256(bytes(secret, encoding="utf-8")).hexdigest()
+
 def get_guild_abbreviation(guild_id):
     return GUILD_ABBREVIATIONS.get(guild_id, "")
 
@@ -206,6 +212,118 @@ def get_closest_match(search_str: str, possible_matches: list[str], max_score: i
 
     return closest_match
 
+class SearchIndex:
+    """
+    Index of names, such as sound names or champion names, that is built once
+    and then searched many times for exact names, prefixes, substrings, and
+    the closest name by Levenshtein distance.
+
+    Names are given as (value, name) pairs, and searches return the values of
+    matching names in the order they were given. Names are matched as they are,
+    so callers should normalize names and search strings the same way, fx.
+    by lowercasing them. Prefix and substring searches bisect sorted lists of
+    every name and of every suffix of every name, and closest matches are
+    found with RapidFuzz, which compares names to the search string in C.
+    """
+    # Sorts after any string that starts with the search string. This is a
+    # noncharacter in Unicode, so it never appears in names.
+    _MAX_CHAR = "\U0010ffff"
+
+    def __init__(self, names):
+        """
+        Build the index.
+
+        ### Parameters
+        :param names:   Iterable of (value, name) pairs to index, or of names
+                        if the names themselves should be returned
+        """
+        self.values = []
+        self._first_index: dict[str, int] = {}
+        prefixes = []
+        suffixes = []
+
+        for index, entry in enumerate(names):
+            value, name = (entry, entry) if isinstance(entry, str) else entry
+            self.values.append(value)
+            self._first_index.setdefault(name, index)
+            prefixes.append((name, index))
+            for offset in range(len(name) + 1):
+                suffixes.append((name[offset:], index))
+
+        prefixes.sort()
+        suffixes.sort()
+
+        # Names and suffixes are kept apart from the indices of their names,
+        # so ranges of them can be bisected and sliced without any Python loops
+        self._names = [name for name, _ in prefixes]
+        self._name_indices = [index for _, index in prefixes]
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._suffix_indices = [index for _, index in suffixes]
+
+        self._unique_names = list(self._first_index)
+
+    def __len__(self):
+        return len(self.values)
+
+    def _get_values(self, indices) -> list:
+        return list(dict.fromkeys(self.values[index] for index in sorted(set(indices))))
+
+    def _get_range(self, sorted_strings: list[str], search_str: str) -> tuple[int, int]:
+        # All strings starting with 'search_str' are next to each other in the sorted list
+        start = bisect_left(sorted_strings, search_str)
+        return start, bisect_left(sorted_strings, search_str + self._MAX_CHAR, start)
+
+    def find_exact(self, name: str):
+        """
+        Get the value of the first name that is equal to `name`, or None.
+        """
+        index = self._first_index.get(name)
+        return None if index is None else self.values[index]
+
+    def find_prefix(self, prefix: str) -> list:
+        """
+        Get the values of all names starting with `prefix`.
+        """
+        start, end = self._get_range(self._names, prefix)
+        return self._get_values(self._name_indices[start:end])
+
+    def find_substring(self, search_str: str) -> list:
+        """
+        Get the values of all names containing `search_str`.
+        """
+        start, end = self._get_range(self._suffixes, search_str)
+        return self._get_values(self._suffix_indices[start:end])
+
+    def find_closest(self, search_str: str, max_score: int = 8):
+        """
+        Find the value of the name that closest matches `search_str`, the same way as
+        `get_closest_match`. The first name starting or ending with `search_str` is
+        returned if there is one, otherwise the first of the names with the lowest
+        Levenshtein distance to `search_str`, if that distance is less than `max_score`.
+        """
+        start, end = self._get_range(self._names, search_str)
+        affix_matches = self._name_indices[start:end]
+
+        # Names ending with 'search_str' have it as a suffix
+        start = bisect_left(self._suffixes, search_str)
+        end = bisect_right(self._suffixes, search_str, start)
+        affix_matches.extend(self._suffix_indices[start:end])
+
+        if affix_matches:
+            return self.values[min(affix_matches)]
+
+        # The first of the names with the lowest distance is returned
+        match = process.extractOne(
+            search_str,
+            self._unique_names,
+            scorer=Levenshtein.distance,
+            score_cutoff=max_score - 1 if max_score else None
+        )
+        if match is None:
+            return None
+
+        return self.values[self._first_index[match[0]]]
+
 def _run_task_in_thread(func, result, exception, *args):
     try:
         result.append(func(*args))
@@ -225,3 +343,43 @@ async def run_async_in_thread(func, *args, sleep_time=0.1):
         raise exception.pop()
 
     return result.pop()
+
+class EventLoopBlockingMonitor:
+    """
+    Measures how long the event loop is blocked (by code that doesn't await)
+    while the monitor is running. A background task sleeps for `interval`
+    seconds at a time, and any extra time it takes to wake up again is
+    counted as blocking. Delays shorter than `interval` are ignored, as they
+    can't be told apart from the normal overhead of the event loop.
+    """
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.blocked_time = 0
+        self.max_blocked_time = 0
+        self._loop = None
+        self._task = None
+        self._sleep_started = None
+
+    def _add_blocked_time(self):
+        now = self._loop.time()
+        blocked = now - self._sleep_started - self.interval
+        if blocked > self.interval:
+            self.blocked_time += blocked
+            self.max_blocked_time = max(self.max_blocked_time, blocked)
+
+        self._sleep_started = now
+
+    async def _measure(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self._add_blocked_time()
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._sleep_started = self._loop.time()
+        self._task = asyncio.create_task(self._measure())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._task.cancel()
+        self._add_blocked_time()
@@ -21,7 +21,7 @@ def home():
 
     guilds_for_user = None
     if logged_in_user is not None:
-       guilds_for_user = app_util.discord_request("func", "get_guilds_for_user", logged_in_user)
+       guilds_for_user = app_util.get_guilds_for_user(logged_in_user)
 
     if commands_util.COMMANDS == []:
         initialize_commands(flask.current_app.config["APP_CONFIG"])
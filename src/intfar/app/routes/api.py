@@ -48,9 +48,10 @@ def get_statistics():
                 tied_intfars.append(monthly_intfars[index])
                 index += 1
 
+            tied_names = app_util.get_discord_nick([disc_id for disc_id, *_ in tied_intfars])
             tied_intfars = [
-                (app_util.discord_request("func", "get_discord_nick", disc_id), games, intfars, ratio)
-                for (disc_id, games, intfars, ratio) in tied_intfars
+                (name, games, intfars, ratio)
+                for name, (_, games, intfars, ratio) in zip(tied_names, tied_intfars)
             ]
         else:
             tied_intfars = []
@@ -7,8 +7,8 @@ from intfar.api.betting import MAX_BETTING_THRESHOLD
 betting_page = flask.Blueprint("betting", __name__, template_folder="templates")
 
 def get_bets(database, bet_handler, only_active):
-    names = app_util.discord_request("func", "get_discord_nick", None)
-    avatars = app_util.discord_request("func", "get_discord_avatar", None)
+    names = app_util.get_discord_nick()
+    avatars = app_util.get_discord_avatar()
     avatars = {
         disc_id: flask.url_for("static", _external=True, filename=app_util.get_relative_static_folder(avatars[disc_id], database.config))
         for disc_id in avatars
@@ -53,9 +53,9 @@ def home():
     logged_in_user = app_util.get_user_details()[0]
 
     all_events = [(bet.event_id, bet.event_id.replace("_", " ").capitalize()) for bet in betting_handler.all_bets]
-    all_names = app_util.discord_request("func", "get_discord_nick", None)
-    all_avatars = app_util.discord_request("func", "get_discord_avatar", None)
-    guild_names = app_util.discord_request("func", "get_guild_name", None)
+    all_names = app_util.get_discord_nick()
+    all_avatars = app_util.get_discord_avatar()
+    guild_names = app_util.get_guild_name()
 
     user_token_balance = "?"
     all_balances = meta_database.get_token_balance()
@@ -71,7 +71,7 @@ def home():
 
     all_guild_data = []
     if logged_in_user is not None:
-        guilds_for_user = app_util.discord_request("func", "get_guilds_for_user", logged_in_user)
+        guilds_for_user = app_util.get_guilds_for_user(logged_in_user)
         for guild_id in guild_names:
             if guild_id in guilds_for_user:
                 all_guild_data.append((guild_id, guild_names[guild_id]))
@@ -1,5 +1,5 @@
 import flask
-from intfar.app.util import make_template_context, discord_request, get_relative_static_folder
+from intfar.app.util import make_template_context, get_discord_nick, get_discord_avatar, get_relative_static_folder
 from intfar.api.awards import get_doinks_reasons
 
 doinks_page = flask.Blueprint("doinks", __name__, template_folder="templates")
@@ -10,16 +10,12 @@ def get_doinks_awards(game, database):
     doinks_counts = [0 for _ in doinks_reasons_dict]
     doinks_for_person = []
 
-    avatars = discord_request(
-        "func", "get_discord_avatar", None
-    )
+    avatars = get_discord_avatar()
     avatars = {
         disc_id: flask.url_for("static", _external=True, filename=get_relative_static_folder(avatars[disc_id], database.config))
         for disc_id in avatars
     }
-    nicknames = discord_request(
-        "func", "get_discord_nick", None
-    )
+    nicknames = get_discord_nick()
 
     for disc_id in database.game_users.keys():
         doinks_reasons = database.get_doinks_stats(disc_id)
@@ -44,7 +44,7 @@ def get_intfar_desc(game, game_data):
     response_list = None
 
     if disc_id == intfar_id:
-        name = app_util.discord_request("func", "get_discord_nick", disc_id)
+        name = app_util.get_discord_nick(disc_id)
         response_list = [
             ("name", name), ("regular", "got"),
             ("feed-award", "Int-Far"), ("regular", "for")
@@ -65,7 +65,7 @@ def get_doinks_desc(game, game_data):
     response_list = None
 
     if doinks_str is not None:
-        name = app_util.discord_request("func", "get_discord_nick", disc_id)
+        name = app_util.get_discord_nick(disc_id)
         response_list = [
             ("name", name), ("regular", "got"),
             ("feed-award", "Big Doinks"), ("regular", "for")
@@ -90,7 +90,7 @@ def get_stat_desc(game, game_data, best_stats, worst_stats):
                 stat_fmt = api_util.round_digits(stat_value)
                 stat_name_fmt = stat.replace("_", " ")
                 readable_stat = stats[stat][i] + " " + stat_name_fmt
-                name = app_util.discord_request("func", "get_discord_nick", disc_id)
+                name = app_util.get_discord_nick(disc_id)
                 response_list = [
                     ("name", name), ("regular", "got the"), ("feed-award", readable_stat),
                     ("regular", "ever with"), ("bold", f"{stat_fmt} {stat_name_fmt}")
@@ -110,9 +110,8 @@ def get_game_desc(game, game_data, best_stats, worst_stats):
 def get_bet_desc(game, bet_data):
     betting_handler = flask.current_app.config["BET_HANDLERS"][game]
     disc_id, _, guild_id, timestamp, amounts, events, targets, _, result, payout = bet_data
-    disc_data = app_util.discord_request("func", ["get_discord_nick", "get_guild_name"], [disc_id, guild_id])
-    name = disc_data[0]
-    guild = disc_data[1]
+    name = app_util.get_discord_nick(disc_id)
+    guild = app_util.get_guild_name(guild_id)
     result_desc = "Won" if result == 1 else "Lost"
     tokens = (
         api_util.format_tokens_amount(payout) if result == 1
@@ -125,7 +124,7 @@ def get_bet_desc(game, bet_data):
     for i, (event, target) in enumerate(zip(events, targets)):
         target_name = (
             None if target is None
-            else app_util.discord_request("func", "get_discord_nick", target)
+            else app_util.get_discord_nick(target)
         )
         dynamic_desc = betting_handler.get_dynamic_bet_desc(event, target_name)
         if i != 0:
@@ -223,17 +222,17 @@ def index():
             games_played_monthly, len(intfar_reason_ids_monthly), f"{pct_intfar_monthly:.2f}"
         )
 
-    avatars = app_util.discord_request("func", "get_discord_avatar", None)
+    avatars = app_util.get_discord_avatar()
     if not avatars:
         sleep(1)
-        avatars = app_util.discord_request("func", "get_discord_avatar", None)
+        avatars = app_util.get_discord_avatar()
 
     if avatars:
         avatars = {
             disc_id: flask.url_for("static", _external=True, filename=app_util.get_relative_static_folder(avatars[disc_id], config))
             for disc_id in avatars
         }
-    nicknames = app_util.discord_request("func", "get_discord_nick", None)
+    nicknames = app_util.get_discord_nick()
 
     intfar_all_data = [
         (nicknames[disc_id], disc_id) + intfar_all_data[disc_id] + (avatars[disc_id],)
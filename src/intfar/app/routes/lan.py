@@ -288,14 +288,14 @@ def get_data(lan_info, database, lan_date):
         intfar_reasons = get_intfar_reasons(_GAME)
         latest_intfar_name = None
         if latest_intfar_id is not None:
-            latest_intfar_name = app_util.discord_request("func", "get_discord_nick", latest_intfar_id)
+            latest_intfar_name = app_util.get_discord_nick(latest_intfar_id)
             latest_intfar_reason = list(intfar_reasons.values())[latest_intfar_reason.index("1")]
 
         # Doinks from latest game.
         doinks_reasons = get_doinks_reasons(_GAME)
         latest_doinks = []
         if latest_doinks_data is not None:
-            doinks_names = app_util.discord_request("func", "get_discord_nick", [x[1] for x in latest_doinks_data])
+            doinks_names = app_util.get_discord_nick([x[1] for x in latest_doinks_data])
             for doinks_name, doinks_data in zip(doinks_names, latest_doinks_data):
                 doinks_reason = ""
                 any_doinks = False
@@ -13,7 +13,7 @@ def home(error_msg=None, status=200):
 
     list_data = []
     for list_id, owner_id, list_name, list_count in lists:
-        user_data = app_util.discord_request("func", ["get_discord_nick", "get_discord_avatar"],  owner_id)
+        user_data = (app_util.get_discord_nick(owner_id), app_util.get_discord_avatar(owner_id))
         avatar = flask.url_for("static", _external=True, filename=app_util.get_relative_static_folder(user_data[1], config))
         count_fmt = str(list_count) + (" champion" if list_count == 1 else " champions")
         list_data.append((list_id, list_name, owner_id, user_data[0], avatar, count_fmt))
@@ -1,5 +1,6 @@
 import os
 import shutil
+import subprocess
 from time import time
 
 import flask
@@ -32,14 +33,18 @@ def soundboard_template(sounds, success=False, status_msg=None):
         sounds=sounds
     )
 
+def get_sounds(audio_handler: AudioHandler):
+    # Plays of sounds are buffered in the memory of the Discord bot process,
+    # so we ask it to flush them before reading them from the database
+    app_util.discord_request("func", "flush_sound_hits", None)
+    return audio_handler.get_sounds()
+
 def normalize_sound_volume(filename):
     filename_no_ext = ".".join(filename.split(".")[:-1])
 
     new_filename = f"{filename_no_ext}_normed.mp3"
 
-    command = f"ffmpeg -i {filename} -filter:a loudnorm {new_filename}"
-
-    os.system(command)
+    subprocess.run(["ffmpeg", "-y", "-v", "error", "-i", filename, "-filter:a", "loudnorm", new_filename])
 
     os.remove(filename)
     shutil.move(new_filename, filename)
@@ -49,7 +54,7 @@ def home():
     config = flask.current_app.config["APP_CONFIG"]
     database = flask.current_app.config["DATABASE"]
     audio_handler = AudioHandler(config, database)
-    sounds = audio_handler.get_sounds()
+    sounds = get_sounds(audio_handler)
 
     if flask.request.method == "POST":
         if "file" not in flask.request.files:
@@ -92,11 +97,14 @@ def home():
         # Normalize sound volumne
         normalize_sound_volume(path)
 
+        # Encode the normalized sound as Opus, so it can be played without transcoding
+        base_name = os.path.basename(secure_name).split(".")[0]
+        audio_handler.sound_cache.encode(base_name)
+
         # Add sound to database
-        base_name = os.path.basename(secure_name).split(".")[0]    
         database.add_sound(base_name, logged_in_user, int(time()))
 
-        sounds = audio_handler.get_sounds()
+        sounds = get_sounds(audio_handler)
 
         return soundboard_template(sounds, True, f"'{secure_name}' successfully uploaded.")
 
@@ -111,7 +119,7 @@ def delete():
     config = flask.current_app.config["APP_CONFIG"]
     database = flask.current_app.config["DATABASE"]
     audio_handler = AudioHandler(config, database)
-    sounds = audio_handler.get_sounds()
+    sounds = get_sounds(audio_handler)
 
     data = flask.request.form
     if "filename" not in data:
@@ -139,13 +147,14 @@ def delete():
     try:
         database.remove_sound(filename)
         os.remove(path)
+        audio_handler.sound_cache.remove(filename)
     except Exception:
         logger.bind(filename=filename, user_id=logged_in_user).exception("Could not delete sound file on website!")
         return soundboard_template(
             sounds, False, "File could not be deleted, an error occured."
         )
 
-    sounds = audio_handler.get_sounds()
+    sounds = get_sounds(audio_handler)
 
     return soundboard_template(sounds, True, f"'{filename}.mp3' successfully deleted.")
 
@@ -1,6 +1,6 @@
 import flask
 
-from intfar.app.util import make_template_context, discord_request, get_relative_static_folder
+from intfar.app.util import make_template_context, get_discord_nick, get_discord_avatar, get_relative_static_folder
 from intfar.api import util as api_util
 from intfar.api.game_data import get_stat_quantity_descriptions
 
@@ -22,10 +22,7 @@ def get_stats(game, config):
                 _
             ) = database.get_most_extreme_stat(stat, maximize)
 
-            user_data = discord_request(
-                "func", ["get_discord_nick", "get_discord_avatar"],
-                best_or_worst_ever_id
-            )
+            user_data = (get_discord_nick(best_or_worst_ever_id), get_discord_avatar(best_or_worst_ever_id))
 
             pretty_stat = stat.replace("_", " ").capitalize() if len(stat) > 3 else stat.upper()
             quantity_type = 0 if best else 1
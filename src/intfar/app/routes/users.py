@@ -11,6 +11,15 @@ user_page = flask.Blueprint("users", __name__, template_folder="templates")
 def user_unknown():
     return app_util.make_template_context("no_user.html")
 
+def get_summary(disc_id, database):
+    # The summary is shared with the !summary command and saved until the player's games change
+    summary = database.get_summary_snapshot(disc_id)
+    if summary is None:
+        summary = database.get_summary_data(disc_id)
+        database.save_summary_snapshot(disc_id, summary)
+
+    return summary
+
 def get_intfar_relations_data(disc_id, database):
     relations_data = []
     games_relations, intfars_relations = database.get_intfar_relations(disc_id)
@@ -22,16 +31,12 @@ def get_intfar_relations_data(disc_id, database):
 
     relations_data.sort(key=lambda x: x[2], reverse=True)
 
-    avatars = app_util.discord_request(
-        "func", "get_discord_avatar", [x[0] for x in relations_data]
-    )
+    avatars = app_util.get_discord_avatar([x[0] for x in relations_data])
     avatars = [
         flask.url_for("static", _external=True, filename=app_util.get_relative_static_folder(avatar, database.config))
         for avatar in avatars
     ]
-    nicknames = app_util.discord_request(
-        "func", "get_discord_nick", [x[0] for x in relations_data]
-    )
+    nicknames = app_util.get_discord_nick([x[0] for x in relations_data])
     full_data = [
         (x,) + y + (z,)
         for (x, y, z) in zip(nicknames, relations_data, avatars)
@@ -39,10 +44,10 @@ def get_intfar_relations_data(disc_id, database):
 
     return {"intfar_relations": full_data}
 
-def get_intfar_data(game, disc_id, database):
+def get_intfar_data(game, disc_id, database, summary):
     curr_month = api_util.current_month()
     intfar_reasons = get_intfar_reasons(game).values()
-    games_played, intfar_reason_ids = database.get_intfar_stats(disc_id, False)
+    games_played, intfar_reason_ids = summary["games_played"], summary["intfar_reason_ids"]
     games_all, intfars_all, intfar_counts, pct_all = organize_intfar_stats(game, games_played, intfar_reason_ids)
 
     criteria_stats = []
@@ -85,16 +90,12 @@ def get_doinks_relations_data(disc_id, database):
 
     relations_data.sort(key=lambda x: x[2], reverse=True)
 
-    avatars = app_util.discord_request(
-        "func", "get_discord_avatar", [x[0] for x in relations_data]
-    )
+    avatars = app_util.get_discord_avatar([x[0] for x in relations_data])
     avatars = [
         flask.url_for("static", _external=True, filename=app_util.get_relative_static_folder(avatar, database.config))
         for avatar in avatars
     ]
-    nicknames = app_util.discord_request(
-        "func", "get_discord_nick", [x[0] for x in relations_data]
-    )
+    nicknames = app_util.get_discord_nick([x[0] for x in relations_data])
     full_data = [
         (x,) + y + (z,)
         for (x, y, z) in zip(nicknames, relations_data, avatars)
@@ -102,10 +103,10 @@ def get_doinks_relations_data(disc_id, database):
 
     return {"doinks_relations": full_data}
 
-def get_doinks_data(game, disc_id, database):
+def get_doinks_data(game, disc_id, database, summary):
     doinks_reasons = get_doinks_reasons(game).values()
-    doinks_reason_ids = database.get_doinks_stats(disc_id)
-    total_doinks = database.get_doinks_count(disc_id)[1]
+    doinks_reason_ids = summary["doinks_reason_ids"]
+    total_doinks = summary["doinks_count"][1]
     doinks_counts = organize_doinks_stats(game, doinks_reason_ids)
     criteria_stats = []
     for reason_id, reason in enumerate(doinks_reasons):
@@ -124,7 +125,7 @@ def get_bets(disc_id, database, betting_handler, only_active):
     if bets is None:
         return []
 
-    names = app_util.discord_request("func", "get_discord_nick", None)
+    names = app_util.get_discord_nick()
     presentable_data = []
 
     for bet_ids, _, timestamp, amounts, events, targets, _, result_or_ticket, payout in bets:
@@ -205,9 +206,7 @@ def get_betting_data(game, disc_id, database):
 
         most_often_target, most_often_target_count = max(target_counts.items(), key=lambda x: x[1])
         if most_often_target_count > 0:
-            most_often_target_name = app_util.discord_request(
-                "func", "get_discord_nick", most_often_target
-            )
+            most_often_target_name = app_util.get_discord_nick(most_often_target)
             most_often_target_desc = f"{most_often_target_name} ({most_often_target_count} times)"
         else:
             most_often_target_desc = "No one"
@@ -325,18 +324,16 @@ def user(disc_id):
     if not game_database.user_exists(disc_id):
         flask.abort(404)
 
-    discord_data = app_util.discord_request(
-        ["func", "func"], ["get_discord_nick", "get_discord_avatar"], [disc_id, (disc_id, 128)]
-    )
-    nickname = discord_data[0]
-    avatar = discord_data[1]
+    nickname = app_util.get_discord_nick(disc_id)
+    avatar = app_util.get_discord_avatar(disc_id, 128)
     if avatar is not None:
         avatar = flask.url_for("static", _external=True, filename=app_util.get_relative_static_folder(avatar, meta_database.config))
 
     with game_database:
-        intfar_data = get_intfar_data(game, disc_id, game_database)
+        summary = get_summary(disc_id, game_database)
+        intfar_data = get_intfar_data(game, disc_id, game_database, summary)
         intfar_relation_data = get_intfar_relations_data(disc_id, game_database)
-        doinks_data = get_doinks_data(game, disc_id, game_database)
+        doinks_data = get_doinks_data(game, disc_id, game_database, summary)
         doinks_relation_data = get_doinks_relations_data(disc_id, game_database)
         betting_data = get_betting_data(game, disc_id, game_database)
         game_stat_data = get_game_stats(game, disc_id, game_database)
@@ -1,34 +1,20 @@
 import json
+from collections import OrderedDict
 from time import time
 from datetime import datetime
-from hashlib import sha256
 from typing import Any, List, Literal, Tuple
 
 from mhooge_flask.logging import logger
 import flask
 
 from intfar.api.config import Config, Environment
-from intfar.api.util import GUILD_IDS, SUPPORTED_GAMES
+from intfar.api.util import GUILD_IDS, SUPPORTED_GAMES, get_hashed_secret
 from intfar.api.meta_database import DEFAULT_GAME
+from intfar.api.member_snapshot import MemberSnapshot
 from intfar.discbot.commands.util import ADMIN_DISC_ID
 
 _GAME_SPECIFIC_ROUTES = ["index", "users", "betting", "doinks", "stats", "api", "register"]
 
-def register_discord_connection():
-    bot_conn = flask.current_app.config["BOT_CONN"]
-    conn_map = flask.current_app.config["CONN_MAP"]
-    conn_lock = flask.current_app.config["CONN_LOCK"]
-    sess_id = flask.session["user_id"]
-
-    lock_success = conn_lock.acquire(timeout=3)
-    if not lock_success:
-        exit(3)
-
-    new_conn = discord_request("register", None, None, bot_conn)
-    conn_lock.release()
-
-    conn_map[sess_id] = new_conn
-
 def check_and_set_game():
     """
     Gets the game that the current page responds to, if any, based on the URL.
@@ -106,14 +92,14 @@ def get_relative_static_folder(filename: str, config: Config):
 def discord_request(
     command_types: Literal["func", "bot_command"] | List[Literal["func", "bot_command"]],
     commands: str | List[str],
-    params: Any | Tuple[Any] | List[Any] | List[Tuple[Any]],
-    pipe=None
+    params: Any | Tuple[Any] | List[Any] | List[Tuple[Any]]
 ):
     """
     Request some information from the Discord API.
-    This is done by using a pipe to the separate process hosting the Discord Bot.
+    This is done by sending a request to the separate process hosting the Discord Bot,
+    through the AppRequestClient shared by all sessions. Several commands given as lists
+    are sent in one request.
 
-    @param pipe Multiprocessing Pipe object connecting to the process running the Discord Bot.
     @param command_types Type of command to execute in the other process ('func' or 'bot_command').
     Can either be a string or a list of strings.
     @param commands Command to execute, if 'command_types' is 'func' this should be the name of
@@ -149,47 +135,150 @@ def discord_request(
 
     if flask.current_app.config["BOT_CONN"] is None:
         return_value = [None for _ in command_list]
-        return return_value[0] if len(return_value) == 1 else return_value
+        return return_value if any_list else return_value[0]
+
+    # Count round-trips to the bot for each request, see 'log_discord_round_trips'
+    flask.g.discord_round_trips = flask.g.get("discord_round_trips", 0) + 1
+
+    result = flask.current_app.config["BOT_CONN"].request(command_type_list, command_list, tuple_params)
+    if result is None:
+        result = [None for _ in command_list]
 
-    conn_map = flask.current_app.config["CONN_MAP"]
-    if flask.session["user_id"] not in conn_map and command_types != "register":
-        register_discord_connection()
+    return result if any_list else result[0]
 
-    sess_id = flask.session["user_id"]
-    if pipe is None:
-        pipe = conn_map[sess_id]
+def log_discord_round_trips(response):
+    """
+    Log how many round-trips were made to the Discord bot while handling the request.
+    """
+    round_trips = flask.g.get("discord_round_trips", 0)
+    logger.bind(
+        event="discord_ipc",
+        path=flask.request.path,
+        round_trips=round_trips
+    ).debug(f"Made {round_trips} request(s) to Discord bot for page")
+
+    return response
 
-    try:
-        pipe.send((sess_id, command_type_list, command_list, tuple_params))
-        conn_received = pipe.poll(15)
-        if not conn_received:
-            logger.warning("Connection to App Listener timed out!")
-            raise ConnectionError()
+def get_member_snapshot() -> MemberSnapshot:
+    """
+    Get the snapshot of Discord members published by the Discord bot.
+    The snapshot is reloaded at most once per request, if the bot has published a new one.
+    """
+    snapshot = flask.current_app.config["MEMBER_SNAPSHOT"]
+    if not flask.g.get("member_snapshot_refreshed", False):
+        snapshot.refresh()
+        flask.g.member_snapshot_refreshed = True
 
-        result = pipe.recv()
-        return result if any_list else result[0]
+    return snapshot
 
-    except (EOFError, BrokenPipeError, ConnectionError, ConnectionResetError):
-        register_discord_connection() # We timed out. Re-establish connection and try again.
-        return discord_request(command_types, commands, params, conn_map[sess_id])
+def _lookup_members(values: dict, command: str, disc_ids: list[int], *params) -> dict:
+    """
+    Look up the given Discord IDs in a dictionary from the member snapshot.
+    Any IDs missing from the snapshot are requested from the Discord bot
+    with the given command, in a single round-trip.
+    """
+    found = {}
+    missing = []
+    for disc_id in disc_ids:
+        if int(disc_id) in values:
+            found[disc_id] = values[int(disc_id)]
+        elif disc_id not in missing:
+            missing.append(disc_id)
+
+    if missing:
+        results = discord_request("func", command, [(disc_id,) + params for disc_id in missing])
+        found.update(zip(missing, results))
+
+    return found
+
+def get_discord_nick(disc_id: int | list[int] = None):
+    """
+    Get the Discord nickname of one or more users, from the member snapshot if possible.
+    If `disc_id` is None, nicknames for all users are returned, like `DiscordClient.get_discord_nick`.
+
+    ### Parameters
+    :param disc_id: Discord ID or list of Discord IDs to get nicknames for, or None
+    """
+    snapshot = get_member_snapshot()
+    if disc_id is None:
+        all_users = list(flask.current_app.config["DATABASE"].all_users.keys())
+        nicknames = _lookup_members(snapshot.nicknames, "get_discord_nick", all_users)
+        return {user_id: "Unnamed" if name is None else name for user_id, name in nicknames.items()}
+
+    disc_ids = disc_id if isinstance(disc_id, list) else [disc_id]
+    nicknames = _lookup_members(snapshot.nicknames, "get_discord_nick", disc_ids)
+
+    return [nicknames[user_id] for user_id in disc_ids] if isinstance(disc_id, list) else nicknames[disc_id]
+
+def get_discord_avatar(disc_id: int | list[int] = None, size: int = 64):
+    """
+    Get the path to the Discord avatar of one or more users, from the member snapshot if possible.
+    The snapshot only contains avatars of size 64, other sizes are always requested from the bot.
+    If `disc_id` is None, avatars for all users are returned, like `DiscordClient.get_discord_avatar`.
+
+    ### Parameters
+    :param disc_id: Discord ID or list of Discord IDs to get avatars for, or None
+    :param size:    Size of the avatars in pixels
+    """
+    avatars = get_member_snapshot().avatars if size == 64 else {}
+    if disc_id is None:
+        all_users = list(flask.current_app.config["DATABASE"].all_users.keys())
+        return _lookup_members(avatars, "get_discord_avatar", all_users, size)
+
+    disc_ids = disc_id if isinstance(disc_id, list) else [disc_id]
+    paths = _lookup_members(avatars, "get_discord_avatar", disc_ids, size)
+
+    return [paths[user_id] for user_id in disc_ids] if isinstance(disc_id, list) else paths[disc_id]
+
+def get_guilds_for_user(disc_id: int) -> list[int]:
+    """
+    Get the IDs of the guilds that the given user is in, from the member snapshot if possible.
+    """
+    guilds = _lookup_members(get_member_snapshot().guilds, "get_guilds_for_user", [disc_id])
+    return guilds[disc_id]
+
+def get_guild_name(guild_id: int = None):
+    """
+    Get the name of the given guild, or names of all guilds if `guild_id` is None,
+    from the member snapshot if possible.
+    """
+    guild_names = get_member_snapshot().guild_names
+    if guild_id is None:
+        return dict(guild_names) if guild_names else discord_request("func", "get_guild_name", None)
+
+    if guild_id in guild_names:
+        return guild_names[guild_id]
+
+    return discord_request("func", "get_guild_name", guild_id)
 
 def filter_hidden_games(active_games, logged_in_user):
     shown_games = []
     if logged_in_user is None:
         return shown_games
 
-    guilds_for_user = discord_request("func", "get_guilds_for_user", logged_in_user)
+    guilds_for_user = get_guilds_for_user(logged_in_user)
     for data in active_games:
         if data[-1] in guilds_for_user:
             shown_games.append(data[:-1])
     return shown_games
 
 def get_game_info(game):
+    # Request active games that are not known yet from the Discord bot in one batch
+    missing_guilds = [
+        guild_id for guild_id in GUILD_IDS
+        if flask.current_app.config["ACTIVE_GAME"].get(guild_id, {}).get(game) is None
+    ]
+    requested_games = {}
+    if missing_guilds:
+        requested_games = dict(
+            zip(missing_guilds, discord_request("func", "get_active_game", [(game, guild_id) for guild_id in missing_guilds]))
+        )
+
     active_games = []
     for guild_id in GUILD_IDS:
         active_game = flask.current_app.config["ACTIVE_GAME"].get(guild_id, {}).get(game)
         if active_game is None:
-            active_game = discord_request("func", "get_active_game", (game, guild_id))
+            active_game = requested_games.get(guild_id)
             if active_game is None:
                 continue
 
@@ -210,37 +299,62 @@ def get_game_info(game):
 
     return active_games
 
-def get_hashed_secret(secret):
-    return sha256(bytes(secret, encoding="utf-8")).hexdigest()
+class UserDetailsCache:
+    """
+    Caches the Discord name and avatar of logged in users, so they don't have to be
+    requested from the Discord bot on every page load. Details are kept for `ttl`
+    seconds, so changes to names and avatars are eventually shown, and at most
+    `max_entries` users are kept, removing the least recently used ones.
+    """
+    def __init__(self, max_entries: int = 256, ttl: int = 60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, tuple[str, str]]] = OrderedDict()
+
+    def get(self, disc_id: int) -> tuple[str, str] | None:
+        entry = self._entries.get(disc_id)
+        if entry is None:
+            return None
+
+        timestamp, details = entry
+        if time() - timestamp > self.ttl:
+            del self._entries[disc_id]
+            return None
+
+        self._entries.move_to_end(disc_id)
+        return details
+
+    def put(self, disc_id: int, details: tuple[str, str]):
+        self._entries[disc_id] = (time(), details)
+        self._entries.move_to_end(disc_id)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
 
 def get_logged_in_user(database, user_id):
     if user_id is None:
         return None
 
-    for disc_id in database.all_users.keys():
-        if get_hashed_secret(database.all_users[disc_id].secret) == user_id:
-            return disc_id
-
-    return None
+    return database.get_user_from_hashed_secret(user_id)
 
 def get_user_details():
     config = flask.current_app.config["APP_CONFIG"]
     database = flask.current_app.config["DATABASE"]
     logged_in_user = get_logged_in_user(database, flask.request.cookies.get("user_id"))
 
-    if flask.current_app.config["LOGGED_IN_USERS"].get(logged_in_user) is not None:
-        return (logged_in_user,) + flask.current_app.config["LOGGED_IN_USERS"][logged_in_user]
+    user_details = flask.current_app.config["LOGGED_IN_USERS"].get(logged_in_user)
+    if user_details is not None:
+        return (logged_in_user,) + user_details
 
     logged_in_name = "Unknown"
     logged_in_avatar = None
     if logged_in_user is not None:
-        discord_data = discord_request("func", ["get_discord_nick", "get_discord_avatar"], logged_in_user)
-        logged_in_name = discord_data[0]
-        avatar = discord_data[1]
+        logged_in_name = get_discord_nick(logged_in_user)
+        avatar = get_discord_avatar(logged_in_user)
         if avatar is not None:
             logged_in_avatar = flask.url_for("static", _external=True, filename=get_relative_static_folder(avatar, config))
 
-        flask.current_app.config["LOGGED_IN_USERS"][logged_in_user] = (logged_in_name, logged_in_avatar)
+        flask.current_app.config["LOGGED_IN_USERS"].put(logged_in_user, (logged_in_name, logged_in_avatar))
 
     return logged_in_user, logged_in_name, logged_in_avatar
 
@@ -1,98 +1,312 @@
 import asyncio
-from concurrent.futures import TimeoutError as FutureTimeout, CancelledError
-from time import time, sleep
-from multiprocessing import Pipe
-from multiprocessing.connection import wait
+import hashlib
+import hmac
+import os
+import pickle
+import socket
+import struct
+from itertools import count
+from multiprocessing.connection import Connection
+from threading import Event, Lock, Thread
 
 from mhooge_flask.logging import logger
 
-def listen_for_request(disc_client, event_loop):
-    max_timeout = 60
-    max_connections = 100
-    timeouts = {}
-    connections = {0: disc_client.flask_conn}
+# Every message is prefixed with its length
+_HEADER = struct.Struct("!I")
 
-    while not disc_client.is_closed():
-        conns_to_remove = []
+_CHALLENGE_SIZE = 32
 
-        for conn in wait(connections.values(), 0.001): # Loop through pending connections.
+# Result of requests where the connection was lost before a response was received
+_CONNECTION_LOST = object()
+
+def _encode_message(message) -> bytes:
+    data = pickle.dumps(message)
+    return _HEADER.pack(len(data)) + data
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError("Connection to app request server closed")
+
+        data += chunk
+
+    return data
+
+def _get_digest(authkey: bytes, challenge: bytes) -> bytes:
+    return hmac.new(authkey, challenge, hashlib.sha256).digest()
+
+class AppRequestServer:
+    """
+    Handles requests from the web app for information from the Discord client,
+    fx. nicknames or avatars of users. The server runs in the event loop of the
+    Discord client and listens on a local socket, which the web app connects to
+    with an `AppRequestClient`.
+
+    Every request is tagged with a request ID and handled in its own task, so many
+    requests from one connection can be handled at once and a slow request, fx.
+    one that downloads an avatar, does not hold up the rest. Connections must
+    answer a challenge with the authentication key before sending requests.
+    """
+    def __init__(self, disc_client, host: str = "127.0.0.1", request_timeout: int = 5):
+        """
+        Initialize the AppRequestServer.
+
+        ### Parameters
+        :param disc_client:     Discord client to run requested functions on
+        :param host:            Host to listen on
+        :param request_timeout: Seconds to wait for async functions before giving up
+        """
+        self.disc_client = disc_client
+        self.host = host
+        self.request_timeout = request_timeout
+        self.authkey = os.urandom(32)
+        self.address = None
+        self.requests_handled = 0
+        self._server = None
+
+    async def start(self) -> tuple[str, int]:
+        """
+        Start listening for connections and return the address to connect to.
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, 0)
+        self.address = self._server.sockets[0].getsockname()[:2]
+
+        return self.address
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+    async def _authenticate(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        challenge = os.urandom(_CHALLENGE_SIZE)
+        writer.write(challenge)
+        await writer.drain()
+
+        response = await asyncio.wait_for(reader.readexactly(_CHALLENGE_SIZE), self.request_timeout)
+        return hmac.compare_digest(response, _get_digest(self.authkey, challenge))
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        try:
+            if not await self._authenticate(reader, writer):
+                logger.warning("App request connection failed authentication")
+                return
+
+            while True:
+                header = await reader.readexactly(_HEADER.size)
+                request = pickle.loads(await reader.readexactly(_HEADER.unpack(header)[0]))
+
+                task = asyncio.create_task(self._handle_request(writer, write_lock, *request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            # Connection to the web app has stopped
+            pass
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            writer.close()
+
+    async def _run_command(self, command_type: str, command: str, params: tuple):
+        if command_type != "func":
+            return None
+
+        try:
+            if params[0] is None and len(params) == 1:
+                result = getattr(self.disc_client, command)()
+            else:
+                result = getattr(self.disc_client, command)(*params)
+
+            if asyncio.iscoroutine(result):
+                result = await asyncio.wait_for(result, self.request_timeout)
+
+            return result
+
+        except asyncio.TimeoutError:
+            logger.bind(command=command, params=params).exception("Timeout error during Discord async request")
+
+        except Exception:
+            logger.bind(command=command, params=params).exception("Exception during Discord request")
+
+        return None
+
+    async def _handle_request(self, writer, write_lock, request_id, command_types, commands, paramses):
+        results = await asyncio.gather(
+            *(
+                self._run_command(command_type, command, params)
+                for command_type, command, params in zip(command_types, commands, paramses)
+            )
+        )
+
+        try:
+            response = _encode_message((request_id, list(results)))
+        except Exception:
+            logger.bind(commands=commands).exception("Could not send result of Discord request")
+            response = _encode_message((request_id, [None for _ in results]))
+
+        self.requests_handled += 1
+
+        async with write_lock:
+            writer.write(response)
+            await writer.drain()
+
+class AppRequestClient:
+    """
+    Sends requests from the web app to the `AppRequestServer` in the Discord bot process.
+
+    A single connection is shared by every session and thread of the web app.
+    Responses are received by a separate thread, which wakes up whichever thread
+    made the request. The address of the server and its authentication key are
+    sent by the Discord client over `bootstrap_conn` when the server has started.
+    """
+    def __init__(self, bootstrap_conn: Connection, timeout: int = 15):
+        """
+        Initialize the AppRequestClient.
+
+        ### Parameters
+        :param bootstrap_conn:  Pipe that the address and authentication key
+                                of the server is received from
+        :param timeout:         Seconds to wait for the result of a request
+        """
+        self.bootstrap_conn = bootstrap_conn
+        self.timeout = timeout
+        self.address = None
+        self._authkey = None
+        self._sock = None
+        self._send_lock = Lock()
+        self._lock = Lock()
+        self._request_ids = count()
+        self._waiters = {}
+
+    def _read_bootstrap(self, wait_time: float):
+        # The server sends its address again if it is restarted, so use the latest one
+        try:
+            while self.bootstrap_conn.poll(wait_time):
+                self.address, self._authkey = self.bootstrap_conn.recv()
+                wait_time = 0
+        except (EOFError, OSError):
+            # The Discord client process has closed its end of the pipe
+            pass
+
+    def _connect(self) -> socket.socket:
+        self._read_bootstrap(0 if self.address is not None else self.timeout)
+        if self.address is None:
+            raise ConnectionError("Address of app request server was never received")
+
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            challenge = _recv_exactly(sock, _CHALLENGE_SIZE)
+            sock.sendall(_get_digest(self._authkey, challenge))
+            sock.settimeout(None)
+        except Exception:
+            sock.close()
+            raise
+
+        self._sock = sock
+        Thread(target=self._receive, args=(sock,), daemon=True).start()
+
+        return sock
+
+    def _receive(self, sock: socket.socket):
+        try:
+            while True:
+                size = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))[0]
+                response_id, results = pickle.loads(_recv_exactly(sock, size))
+
+                with self._lock:
+                    waiter = self._waiters.pop(response_id, None)
+
+                if waiter is not None: # Request might have timed out
+                    waiter[1] = results
+                    waiter[0].set()
+
+        except (OSError, EOFError):
+            pass
+
+        finally:
+            with self._lock:
+                if self._sock is sock:
+                    self._sock = None
+
+                waiters = self._waiters
+                self._waiters = {}
+
+            sock.close()
+
+            # Wake up the requests that were waiting, they will be sent again
+            for event, _ in waiters.values():
+                event.set()
+
+    def close(self):
+        with self._send_lock:
+            sock = self._sock
+            self._sock = None
+
+        if sock is not None:
             try:
-                conn_id, command_types, commands, paramses = conn.recv()
-                results = []
-
-                for (command_type, command, params) in zip(command_types, commands, paramses):
-                    result = None
-
-                    if command_type == "register": # Register new connection.
-                        our_conn, new_conn = Pipe()
-                        connections[conn_id] = our_conn
-
-                        if len(connections) > max_connections:
-                            # If number of connection exceed 'max_connections', we halve
-                            # the time it takes for connections to time out to free up space.
-                            max_timeout = max_timeout // 2
-    
-                        timeouts[conn_id] = time()
-                        logger.debug(f"Session ID {conn_id} connection.")
-                        result = new_conn
-
-                    elif command_type == "func": # Return data from Discord client to a user.
-                        try:
-                            if params[0] is None and len(params) == 1:
-                                result = disc_client.__getattribute__(command)()
-                            else:
-                                result = disc_client.__getattribute__(command)(*params)
-
-                            if asyncio.iscoroutine(result):
-                                try:
-                                    future = asyncio.run_coroutine_threadsafe(result, event_loop)
-                                    result = future.result(5)
-                                except (FutureTimeout, CancelledError):
-                                    # Log error
-                                    logger.bind(
-                                        command_type=command_type,
-                                        command=command,
-                                        params=params
-                                    ).exception(f"Timeout error during Discord async request")
-
-                                    result = None
-                        except Exception:
-                            # Log error
-                            logger.bind(
-                                command_type=command_type,
-                                command=command,
-                                params=params
-                            ).exception(f"Exception during Discord request")
-                            result = None
-
-                    elif command_type == "bot_command":
-                        pass # Do bot command.
-
-                    results.append(result)
-
-                conn.send(results)
-
-            except (EOFError, BrokenPipeError, ConnectionResetError):
-                # Connection to user has stopped.
-                logger.error(f"App Listener Exception")
-
-                # Add crashed connection to those that should be removed.
-                for conn_id in connections:
-                    if connections[conn_id] == conn:
-                        conns_to_remove.append(conn_id)
-
-        now = time()
-        for conn_id in timeouts: # Check to see if any connection has timed out.
-            if now - timeouts[conn_id] > max_timeout:
-                conns_to_remove.append(conn_id)
-
-        for conn_id in conns_to_remove: # Remove/forget timed out connections.
-            logger.debug(f"Session ID {conn_id} timed out.")
-
-            if conn_id in timeouts:
-                del timeouts[conn_id]
-
-            connections[conn_id].close()
-            del connections[conn_id]
-
-        sleep(0.01)
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+            sock.close()
+
+    def _send(self, waiter: list, command_types, commands, paramses) -> int:
+        with self._send_lock:
+            sock = self._sock
+            if sock is None:
+                sock = self._connect()
+
+            request_id = next(self._request_ids)
+            with self._lock:
+                # The receiving thread closes the socket if the server drops the connection,
+                # which can happen as soon as it is connected, e.g. if authentication failed
+                if self._sock is not sock or sock.fileno() == -1:
+                    raise ConnectionError("Connection to app request server closed")
+
+                self._waiters[request_id] = waiter
+
+            sock.sendall(_encode_message((request_id, command_types, commands, paramses)))
+
+        return request_id
+
+    def request(self, command_types: list[str], commands: list[str], paramses: list[tuple]) -> list | None:
+        """
+        Send a request to the Discord client and wait for the results.
+        Returns None if the server could not be reached or did not respond in time.
+
+        ### Parameters
+        :param command_types:   Type of each command ('func' or 'bot_command')
+        :param commands:        Name of each function on the Discord client to call
+        :param paramses:        Tuple of parameters for each function
+        """
+        for attempt in range(2):
+            waiter = [Event(), _CONNECTION_LOST]
+            try:
+                request_id = self._send(waiter, command_types, commands, paramses)
+            except (OSError, EOFError, ConnectionError):
+                logger.bind(commands=commands, attempt=attempt).exception("Could not reach Discord client")
+                self.close()
+                continue
+
+            if not waiter[0].wait(self.timeout):
+                with self._lock:
+                    self._waiters.pop(request_id, None)
+
+                logger.bind(commands=commands).warning("Request to Discord client timed out!")
+                return None
+
+            if waiter[1] is not _CONNECTION_LOST:
+                return waiter[1]
+
+            # Connection was lost before the response came, reconnect and try again
+            logger.bind(commands=commands, attempt=attempt).warning("Connection to Discord client was lost")
+
+        return None
@@ -5,7 +5,7 @@ from discord import Message
 from intfar.discbot.commands import util as commands_util
 from intfar.discbot.discord_bot import DiscordClient
 from intfar.api.meta_database import DEFAULT_GAME
-from intfar.api.util import SUPPORTED_GAMES
+from intfar.api.util import SUPPORTED_GAMES, EventLoopBlockingMonitor
 
 from mhooge_flask.logging import logger
 from mhooge_flask.database import DBException
@@ -228,7 +228,15 @@ class Command:
             except ValueError:
                 return
 
-            await self.handle(*parsed_args) # Execute command using handler.
+            # Execute command using handler, while measuring how long it blocks the event loop
+            async with EventLoopBlockingMonitor() as monitor:
+                await self.handle(*parsed_args)
+
+            logger.bind(
+                command=self.NAME,
+                blocked_time=monitor.blocked_time,
+                max_blocked_time=monitor.max_blocked_time
+            ).debug("Discord command handled")
 
         except CommandParsingError as arg_exception:
             # Log error during command handling
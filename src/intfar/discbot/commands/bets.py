@@ -162,13 +162,13 @@ class GiveTokensCommand(Command):
     async def handle(self, amount: str, target_id: int):
         target_name = self.client.get_discord_nick(target_id, self.message.guild.id)
 
-        max_tokens_before, max_tokens_holder = self.client.meta_database.get_max_tokens_details()
+        max_tokens_before, max_tokens_holder = await self.client.async_meta_database.get_max_tokens_details()
 
         response = self.client.betting_handlers[DEFAULT_GAME].give_tokens(
             self.message.author.id, amount, target_id, target_name
         )[1]
 
-        balance_after = self.client.meta_database.get_token_balance(target_id)
+        balance_after = await self.client.async_meta_database.get_token_balance(target_id)
 
         if balance_after > max_tokens_before and target_id != max_tokens_holder:
             # This person now has the most tokens of all users!
@@ -186,8 +186,8 @@ class ActiveBetCommand(Command):
     OPTIONAL_PARAMS = [GameParam("game", default=None), TargetParam("person")]
 
     async def handle(self, game: str, target_id: int):
-        def get_bet_description(game: str, disc_id: int, single_person :bool = True):
-            active_bets = self.client.game_databases[game].get_bets(True, disc_id)
+        async def get_bet_description(game: str, disc_id: int, single_person :bool = True):
+            active_bets = await self.client.async_game_databases[game].get_bets(True, disc_id)
             recepient = self.client.get_discord_nick(disc_id, self.message.guild.id)
 
             response = ""
@@ -241,7 +241,7 @@ class ActiveBetCommand(Command):
                 # Check active bets for everyone
                 any_bet = False
                 for disc_id in self.client.game_databases[game].game_users.keys():
-                    bets_for_person = get_bet_description(game, disc_id, False)
+                    bets_for_person = await get_bet_description(game, disc_id, False)
                     if bets_for_person is not None:
                         if any_bet:
                             bets_for_person = "\n" + bets_for_person
@@ -256,7 +256,7 @@ class ActiveBetCommand(Command):
 
             else:
                 # Check active bets for a single person
-                game_response += get_bet_description(game, target_id)
+                game_response += await get_bet_description(game, target_id)
                 if response != "":
                     game_response = "\n" + game_response
 
@@ -275,7 +275,7 @@ class AllBetsCommand(Command):
 
     async def handle(self, game: str, target_id: int):
         game_name = api_util.SUPPORTED_GAMES[game]
-        all_bets = self.client.game_databases[game].get_bets(False, target_id)
+        all_bets = await self.client.async_game_databases[game].get_bets(False, target_id)
         tokens_name = self.client.config.betting_tokens
         bets_won = 0
         had_target = 0
@@ -334,9 +334,9 @@ class TokenBalanceCommand(Command):
     ALIASES = ["gbp", "balance"]
 
     async def handle(self, target_id: int):
-        def get_token_balance(disc_id):
+        async def get_token_balance(disc_id):
             name = self.client.get_discord_nick(disc_id, self.message.guild.id)
-            balance = self.client.meta_database.get_token_balance(disc_id)
+            balance = await self.client.async_meta_database.get_token_balance(disc_id)
             return balance, name
 
         tokens_name = self.client.config.betting_tokens
@@ -345,7 +345,7 @@ class TokenBalanceCommand(Command):
         if target_id is None: # Get betting balance for all.
             balances = []
             for disc_id in self.client.meta_database.all_users.keys():
-                balance, name = get_token_balance(disc_id)
+                balance, name = await get_token_balance(disc_id)
                 balances.append((balance, name))
 
             balances = [
@@ -356,7 +356,7 @@ class TokenBalanceCommand(Command):
 
             response = "\n".join(balances)
         else:
-            balance, name = get_token_balance(target_id)
+            balance, name = await get_token_balance(target_id)
             response = f"{name} has **{api_util.format_tokens_amount(balance)}** {tokens_name}"
 
         await self.message.channel.send(response)
@@ -13,16 +13,16 @@ class DoinksCommand(Command):
     OPTIONAL_PARAMS = [GameParam("game"), TargetParam("person")]
 
     async def handle(self, game: str, target_id: int):
-        database = self.client.game_databases[game]
+        database = self.client.async_game_databases[game]
         doinks_reasons = get_doinks_reasons(game)
 
-        def get_doinks_stats(disc_id, expanded=True):
+        async def get_doinks_stats(disc_id, expanded=True):
             person_to_check = self.client.get_discord_nick(disc_id, self.message.guild.id)
-            doinks_reason_ids = database.get_doinks_stats(disc_id)
-            total_doinks = database.get_doinks_count(disc_id)[1]
+            doinks_reason_ids = await database.get_doinks_stats(disc_id)
+            total_doinks = (await database.get_doinks_count(disc_id))[1]
             doinks_counts = organize_doinks_stats(game, doinks_reason_ids)
 
-            played_id, played_count = database.get_played_with_most_doinks(disc_id)()
+            played_id, played_count = await database.get_played_with_most_doinks(disc_id)
             played_name = self.client.api_clients[game].get_playable_name(played_id)
 
             msg = f"{person_to_check} has earned {total_doinks} " + "{emote_Doinks}"
@@ -42,7 +42,7 @@ class DoinksCommand(Command):
         if target_id is None: # Check doinks for everyone.
             messages = []
             for disc_id in database.game_users.keys():
-                resp_str, doinks = get_doinks_stats(disc_id, expanded=False)
+                resp_str, doinks = await get_doinks_stats(disc_id, expanded=False)
                 messages.append((resp_str, doinks))
 
             messages.sort(key=lambda x: x[1], reverse=True)
@@ -50,7 +50,7 @@ class DoinksCommand(Command):
                 response += "- " + resp_str + "\n"
 
         else: # Check doinks for a specific person.
-            response = get_doinks_stats(target_id)[0]
+            response = (await get_doinks_stats(target_id))[0]
 
         await self.message.channel.send(response)
 
@@ -60,11 +60,11 @@ class DoinksRelationsCommand(Command):
     ACCESS_LEVEL = "self"
     OPTIONAL_PARAMS = [GameParam("game"), TargetParam("person")]
 
-    def _get_doinks_relation_stats(self, game: str, target_id: int):
-        database = self.client.game_databases[game]
+    async def _get_doinks_relation_stats(self, game: str, target_id: int):
+        database = self.client.async_game_databases[game]
         data = []
-        games_relations, doinks_relations = database.get_doinks_relations(target_id)
-        doinks_games = database.get_doinks_count(target_id)[0]
+        games_relations, doinks_relations = await database.get_doinks_relations(target_id)
+        doinks_games = (await database.get_doinks_count(target_id))[0]
         for disc_id, total_games in games_relations.items():
             doinks = doinks_relations.get(disc_id, 0)
             data.append(
@@ -77,11 +77,11 @@ class DoinksRelationsCommand(Command):
         return sorted(data, key=lambda x: x[2], reverse=True)
 
     async def handle(self, game: str, target_id: int):
-        database = self.client.game_databases[game]
+        database = self.client.async_game_databases[game]
 
         data = []
-        games_relations, doinks_relations = database.get_doinks_relations(target_id)
-        doinks_games = database.get_doinks_count(target_id)[0]
+        games_relations, doinks_relations = await database.get_doinks_relations(target_id)
+        doinks_games = (await database.get_doinks_count(target_id))[0]
         for disc_id, total_games in games_relations.items():
             doinks = doinks_relations.get(disc_id, 0)
             data.append(
@@ -2,11 +2,11 @@ from intfar.api import util as api_util
 from intfar.api.awards import get_intfar_reasons, get_intfar_criterias_desc, organize_intfar_stats
 from intfar.discbot.commands.base import *
 
-def get_intfar_relation_stats(client: DiscordClient, game: str, target_id: int):
-    database = client.game_databases[game]
+async def get_intfar_relation_stats(client: DiscordClient, game: str, target_id: int):
+    database = client.async_game_databases[game]
     data = []
-    games_relations, intfars_relations = database.get_intfar_relations(target_id)
-    total_intfars = len(database.get_intfar_stats(target_id)[1])
+    games_relations, intfars_relations = await database.get_intfar_relations(target_id)
+    total_intfars = len((await database.get_intfar_stats(target_id))[1])
     for disc_id, total_games in games_relations.items():
         intfars = intfars_relations.get(disc_id, 0)
         data.append(
@@ -29,27 +29,27 @@ class IntfarCommand(Command):
     OPTIONAL_PARAMS = [GameParam("game"), TargetParam("person")]
 
     async def handle(self, game, target_id):
-        database = self.client.game_databases[game]
+        database = self.client.async_game_databases[game]
         current_month = api_util.current_month()
         intfar_reasons = get_intfar_reasons(game)
 
-        def format_for_all(disc_id, monthly=False):
+        async def format_for_all(disc_id, monthly=False):
             person_to_check = self.client.get_discord_nick(disc_id, self.message.guild.id)
-            games_played, intfar_reason_ids = database.get_intfar_stats(disc_id, monthly)
+            games_played, intfar_reason_ids = await database.get_intfar_stats(disc_id, monthly)
             games_played, intfars, _, pct_intfar = organize_intfar_stats(game, games_played, intfar_reason_ids)
             msg = f"{person_to_check}: Int-Far **{intfars}** times "
             msg += f"**({pct_intfar:.2f}%** of {games_played} games) "
             msg = self.client.insert_emotes(msg)
             return msg, intfars, pct_intfar, games_played
 
-        def format_for_single(disc_id):
+        async def format_for_single(disc_id):
             person_to_check = self.client.get_discord_nick(disc_id, self.message.guild.id)
-            games_played, intfar_reason_ids = database.get_intfar_stats(disc_id, False)
+            games_played, intfar_reason_ids = await database.get_intfar_stats(disc_id, False)
             games_played, intfars, intfar_counts, pct_intfar = organize_intfar_stats(game, games_played, intfar_reason_ids)
-            intfars_of_the_month = database.get_intfars_of_the_month()
+            intfars_of_the_month = await database.get_intfars_of_the_month()
             user_is_ifotm = intfars_of_the_month != [] and intfars_of_the_month[0][0] == disc_id
 
-            played_id, played_count = database.get_played_with_most_intfars(disc_id)()
+            played_id, played_count = await database.get_played_with_most_intfars(disc_id)
             if game == "lol":
                 played_name = self.client.api_clients["lol"].get_champ_name(played_id)
             elif game == "cs2":
@@ -58,7 +58,7 @@ class IntfarCommand(Command):
             msg = f"{person_to_check} has been Int-Far **{intfars}** times "
             msg += "{emote_unlimited_chins}"
             if intfars > 0:
-                monthly_games, monthly_infar_ids = database.get_intfar_stats(disc_id, True)
+                monthly_games, monthly_infar_ids = await database.get_intfar_stats(disc_id, True)
                 monthly_games, monthly_intfars, _, pct_monthly = organize_intfar_stats(game, monthly_games, monthly_infar_ids)
 
                 ratio_desc = f"\nHe has inted the most when playing **{played_name}** (**{played_count}** times).\n"
@@ -71,19 +71,19 @@ class IntfarCommand(Command):
                 for reason_id, reason in enumerate(intfar_reasons):
                     reason_desc += f"- {reason}: **{intfar_counts[reason_id]}**\n"
 
-                longest_streak, date_ended = database.get_longest_intfar_streak(disc_id)
+                longest_streak, date_ended = await database.get_longest_intfar_streak(disc_id)
                 streak_desc = f"His longest Int-Far streak was **{longest_streak}** games in a row "
                 if date_ended is not None:
                     streak_desc += f"(ended **{date_ended}**) "
                 streak_desc += "{emote_suk_a_hotdok}\n"
 
-                longest_non_streak, date_ended = database.get_longest_no_intfar_streak(disc_id)
+                longest_non_streak, date_ended = await database.get_longest_no_intfar_streak(disc_id)
                 no_streak_desc = f"His longest streak of *not* being Int-Far was **{longest_non_streak}** games in a row "
                 if date_ended is not None:
                     no_streak_desc += f"(ended **{date_ended})** "
                 no_streak_desc += "{emote_pog}\n"
 
-                relations_data = get_intfar_relation_stats(self.client, game, disc_id)[0]
+                relations_data = (await get_intfar_relation_stats(self.client, game, disc_id))[0]
                 most_intfars_nick = self.client.get_discord_nick(relations_data[0], self.message.guild.id)
                 relations_desc = f"He has inted the most when playing with {most_intfars_nick} "
                 relations_desc += f"where he inted **{relations_data[2]}** games (out of a total **{relations_data[1]}** "
@@ -103,8 +103,8 @@ class IntfarCommand(Command):
             messages_all_time = []
             messages_monthly = []
             for disc_id in database.game_users.keys():
-                resp_str_all_time, intfars, pct_all_time, _ = format_for_all(disc_id)
-                resp_str_month, intfars_month, pct_month, games_played = format_for_all(disc_id, monthly=True)
+                resp_str_all_time, intfars, pct_all_time, _ = await format_for_all(disc_id)
+                resp_str_month, intfars_month, pct_month, games_played = await format_for_all(disc_id, monthly=True)
 
                 messages_all_time.append((resp_str_all_time, intfars, pct_all_time))
                 if games_played > 0: # Don't include users with no games this month.
@@ -128,7 +128,7 @@ class IntfarCommand(Command):
                     response += f"\n- {data[0]}"
 
         else: # Check intfar stats for a specific person.
-            response = format_for_single(target_id)
+            response = await format_for_single(target_id)
 
         await self.message.channel.send(response)
 
@@ -139,7 +139,7 @@ class IntfarRelationsCommand(Command):
     OPTIONAL_PARAMS = [GameParam("game"), TargetParam("person")]
 
     async def handle(self, game: str, target_id: int):
-        data = get_intfar_relation_stats(self.client, game, target_id)
+        data = await get_intfar_relation_stats(self.client, game, target_id)
 
         response = (
             f"Breakdown of players {self.client.get_discord_nick(target_id, self.message.guild.id)} "
@@ -51,10 +51,10 @@ class LANCommand(BaseLANCommand):
             await self.send_lan_not_started_msg()
             return
 
-        database = self.client.game_databases[_GAME]
+        database = self.client.async_game_databases[_GAME]
 
         # General info about how the current LAN is going.
-        games_stats = database.get_games_count(
+        games_stats = await database.get_games_count(
             time_after=self.lan_party.start_time, time_before=self.lan_party.end_time, guild_id=self.lan_party.guild_id
         )
 
@@ -73,19 +73,19 @@ class LANCommand(BaseLANCommand):
             duration = api_util.format_duration(dt_start, dt_now)
 
             champs_played = len(
-                database.get_played_ids(
+                await database.get_played_ids(
                     time_after=self.lan_party.start_time, time_before=self.lan_party.end_time, guild_id=self.lan_party.guild_id
                 )
             )
 
-            intfars = database.get_intfar_count(
+            intfars = await database.get_intfar_count(
                 time_after=self.lan_party.start_time, time_before=self.lan_party.end_time, guild_id=self.lan_party.guild_id
             )
-            doinks = database.get_doinks_count(
+            doinks = (await database.get_doinks_count(
                 time_after=self.lan_party.start_time, time_before=self.lan_party.end_time, guild_id=self.lan_party.guild_id
-            )[1]
+            ))[1]
 
-            longest_game_duration, longest_game_time = database.get_longest_game(
+            longest_game_duration, longest_game_time = await database.get_longest_game(
                 time_after=self.lan_party.start_time, time_before=self.lan_party.end_time, guild_id=self.lan_party.guild_id
             )
             longest_game_start = datetime.fromtimestamp(longest_game_time)
@@ -120,8 +120,8 @@ class LANPerformanceCommand(BaseLANCommand):
             return
 
         # Info about various stats for a person at the current LAN.
-        database = self.client.game_databases[_GAME]
-        all_avg_stats = lan_api.get_average_stats(database, self.lan_party)
+        database = self.client.async_game_databases[_GAME]
+        all_avg_stats = await database.read(lan_api.get_average_stats, self.lan_party)
 
         if all_avg_stats is None:
             response = "No games have yet been played at this LAN."
@@ -144,7 +144,7 @@ class LANPerformanceCommand(BaseLANCommand):
 
             response += f"\n{readable_name}: **{get_formatted_stat_value(_GAME, stat_name, user_value)}**"
 
-        score, rank, _ = database.get_performance_score(target_id, self.lan_party.start_time, self.lan_party.end_time, 1)()
+        score, rank, _ = await database.get_performance_score(target_id, self.lan_party.start_time, self.lan_party.end_time, 1)
         if score is not None:
             response += "\n---------------------------------------------"
             response += f"\nTotal rank: **{rank}**/**{len(self.lan_party.participants)}** (score: **{score:.2f}**/**10**)"
@@ -161,11 +161,11 @@ class LANIntfarCommand(BaseLANCommand):
     ACCESS_LEVEL = "all"
     OPTIONAL_PARAMS = [TargetParam("person")]
 
-    def _format_intfar(self, disc_id: int, expanded: bool):
-        database = self.client.game_databases[_GAME]
+    async def _format_intfar(self, disc_id: int, expanded: bool):
+        database = self.client.async_game_databases[_GAME]
         person_to_check = self.client.get_discord_nick(disc_id, self.message.guild.id)
 
-        games_played, intfar_reason_ids = database.get_intfar_stats(
+        games_played, intfar_reason_ids = await database.get_intfar_stats(
             disc_id, time_after=self.lan_party.start_time, time_before=self.lan_party.end_time, guild_id=self.lan_party.guild_id
         )
         games_played, intfars, intfar_counts, pct_intfar = organize_intfar_stats(_GAME, games_played, intfar_reason_ids)
@@ -201,7 +201,7 @@ class LANIntfarCommand(BaseLANCommand):
         targets = self.lan_party.participants if target_id is None else [target_id]
         messages = []
         for target in targets:
-            resp_str, intfars, pct = self._format_intfar(target, target_id is not None)
+            resp_str, intfars, pct = await self._format_intfar(target, target_id is not None)
             messages.append((resp_str, intfars, pct))
         
         messages.sort(key=lambda x: (x[1], x[2]), reverse=True)
@@ -217,16 +217,16 @@ class LANDoinksCommand(BaseLANCommand):
     ACCESS_LEVEL = "all"
     OPTIONAL_PARAMS = [TargetParam("person")]
 
-    def _format_doinks(self, disc_id: int, expanded: bool):
-        database = self.client.game_databases[_GAME]
+    async def _format_doinks(self, disc_id: int, expanded: bool):
+        database = self.client.async_game_databases[_GAME]
         person_to_check = self.client.get_discord_nick(disc_id, self.message.guild.id)
 
-        doinks_reason_ids = database.get_doinks_stats(
+        doinks_reason_ids = await database.get_doinks_stats(
             disc_id, time_after=self.lan_party.start_time, time_before=self.lan_party.end_time, guild_id=self.lan_party.guild_id
         )
-        total_doinks = database.get_doinks_count(
+        total_doinks = (await database.get_doinks_count(
             disc_id, time_after=self.lan_party.start_time, time_before=self.lan_party.end_time, guild_id=self.lan_party.guild_id
-        )[1]
+        ))[1]
         doinks_counts = organize_doinks_stats(_GAME, doinks_reason_ids)
 
         if expanded:
@@ -257,7 +257,7 @@ class LANDoinksCommand(BaseLANCommand):
         targets = self.lan_party.participants if target_id is None else [target_id]
         messages = []
         for target in targets:
-            resp_str, doinks = self._format_doinks(target, target_id is not None)
+            resp_str, doinks = await self._format_doinks(target, target_id is not None)
             messages.append((resp_str, doinks))
 
         messages.sort(key=lambda x: x[1], reverse=True)
@@ -277,7 +277,7 @@ class JeopardyJoinCommand(BaseLANCommand):
         if author_id not in self.lan_party.participants:
             return
 
-        client_secret = self.client.meta_database.get_client_secret(author_id)
+        client_secret = await self.client.async_meta_database.get_client_secret(author_id)
 
         hostname_url = f"{api_util.get_website_link(self.client.config)}/lan/get_jeoparty_info/{client_secret}"
         response = httpx.get(hostname_url)
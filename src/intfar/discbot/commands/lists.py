@@ -18,7 +18,7 @@ class RandomChampCommand(Command):
         if list_name is None:
             champ_list = list(self.client.api_clients[_GAME].champ_names.values())
         else:
-            champ_list = self.client.game_databases[_GAME].get_list_by_name(list_name)[1]
+            champ_list = (await self.client.async_game_databases[_GAME].get_list_by_name(list_name))[1]
             if champ_list is not None:
                 champ_list = [self.client.api_clients[_GAME].champ_names[tup[1]] for tup in champ_list]
 
@@ -43,7 +43,7 @@ class RandomUnplayedCommand(Command):
 
     async def handle(self, target_id: int):
         all_champs = set(self.client.api_clients[_GAME].champ_names.keys())
-        played_champs = set(x[0] for x in self.client.game_databases[_GAME].get_played_ids(target_id))
+        played_champs = set(x[0] for x in await self.client.async_game_databases[_GAME].get_played_ids(target_id))
 
         unplayed_champs = [self.client.api_clients[_GAME].get_champ_name(champ) for champ in (all_champs - played_champs)]
         if len(unplayed_champs) == 0: # All champs have been played.
@@ -64,7 +64,7 @@ class ChampListsCommand(Command):
     OPTIONAL_PARAMS = [TargetParam("person", None)]
 
     async def handle(self, target_id: int = None): 
-        lists = self.client.game_databases[_GAME].get_lists(target_id)
+        lists = await self.client.async_game_databases[_GAME].get_lists(target_id)
         website_url = get_website_link(self.client.config, 'lol')
 
         if lists == []:
@@ -100,11 +100,11 @@ class ChampsCommand(Command):
     MANDATORY_PARAMS = [CommandParam("list")]
 
     async def handle(self, list_name: str):
-        list_id, champ_list = self.client.game_databases[_GAME].get_list_by_name(list_name)
+        list_id, champ_list = await self.client.async_game_databases[_GAME].get_list_by_name(list_name)
         if champ_list is None:
             response = f"No champion list found with the name `{list_name}` " + "{emote_sadge}"
         else:
-            name, owner_id = self.client.game_databases[_GAME].get_list_data(list_id)
+            name, owner_id = await self.client.async_game_databases[_GAME].get_list_data(list_id)
             owner_name = self.client.get_discord_nick(owner_id, self.message.guild.id)
             list_desc = f"The list `{name}` by {owner_name} "
 
@@ -133,7 +133,9 @@ class CreateListCommand(Command):
     MANDATORY_PARAMS = [CommandParam("name")]
 
     async def handle_create_list_msg(self, list_name):
-        success, response = lists.create_list(self.message.author.id, list_name, self.client.game_databases[_GAME])
+        success, response = await self.client.async_game_databases[_GAME].write(
+            lambda database: lists.create_list(self.message.author.id, list_name, database)
+        )
 
         if success:
             response = f"Champion list `{list_name}` has been created " + "{emote_poggers}"
@@ -148,7 +150,7 @@ class AddOrRemoveCommand(Command):
     async def parse_args(self, args: List[str]):
         list_name = args[0]
 
-        list_id = self.client.game_databases[_GAME].get_list_by_name(list_name)[0]
+        list_id = (await self.client.async_game_databases[_GAME].get_list_by_name(list_name))[0]
         if list_id is None:
             raise ValueError(f"No champion list found with the name `{list_name}` " + "{emote_sadge}")
 
@@ -175,11 +177,13 @@ class AddChampsCommand(AddOrRemoveCommand):
     MANDATORY_PARAMS = [CommandParam("list"), CommandParam("champion(s)")]
 
     async def handle(self, list_id: int, champ_ids: List[int]):
-        success, response = lists.add_champ_to_list(
-            self.message.author.id, list_id, champ_ids, self.client.api_clients[_GAME], self.client.game_databases[_GAME]
+        success, response = await self.client.async_game_databases[_GAME].write(
+            lambda database: lists.add_champ_to_list(
+                self.message.author.id, list_id, champ_ids, self.client.api_clients[_GAME], database
+            )
         )
         if success:
-            list_name = self.client.game_databases[_GAME].get_list_data(list_id)[0]
+            list_name = (await self.client.async_game_databases[_GAME].get_list_data(list_id))[0]
             response = f"{response} to `{list_name}`."
         else:
             response = f"Could not add champ to list: {response}."
@@ -196,11 +200,11 @@ class RemoveChampsCommand(AddOrRemoveCommand):
     MANDATORY_PARAMS = [CommandParam("list"), CommandParam("champion(s)")]
 
     async def handle(self, list_id: int, champ_ids: List[int]):
-        success, response = lists.delete_by_champ_ids(
-            self.message.author.id, list_id, champ_ids, self.client.game_databases[_GAME]
+        success, response = await self.client.async_game_databases[_GAME].write(
+            lambda database: lists.delete_by_champ_ids(self.message.author.id, list_id, champ_ids, database)
         )
         if success:
-            list_name = self.client.game_databases[_GAME].get_list_data(list_id)[0]
+            list_name = (await self.client.async_game_databases[_GAME].get_list_data(list_id))[0]
             response = f"{response} from `{list_name}`."
         else:
             response = f"Could not remove champ from list: {response}."
@@ -214,11 +218,13 @@ class DeleteListCommand(Command):
     MANDATORY_PARAMS = [CommandParam("list")]
 
     async def handle(self, list_name: str):
-        list_id = self.client.game_databases[_GAME].get_list_by_name(list_name)[0]
+        list_id = (await self.client.async_game_databases[_GAME].get_list_by_name(list_name))[0]
         if list_id is None:
             response = f"No champion list found with the name `{list_name}` " + "{emote_sadge}"
         else:
-            success, response = lists.delete_list(self.message.author.id, list_id, self.client.game_databases[_GAME])
+            success, response = await self.client.async_game_databases[_GAME].write(
+                lambda database: lists.delete_list(self.message.author.id, list_id, database)
+            )
             if success:
                 response = f"The list `{list_name}` has been deleted."
             else:
@@ -281,7 +287,7 @@ class BestNochestCommand(Command):
             response = "You have already earned a chest on every champ {emote_woahpikachu}"
         else:
             # Get highest winrate of all the champs with no chest gained.
-            result = self.client.game_databases[_GAME].get_min_or_max_winrate_played(
+            result = await self.client.async_game_databases[_GAME].get_min_or_max_winrate_played(
                 target_id, True, no_chest_champs, return_top_n=5, min_games=3
             )
 
@@ -62,7 +62,7 @@ class UnregisterCommand(Command):
                 "(that would be cheating {emote_im_nat_kda_player_yo})"
             )
         else:
-            self.client.game_databases[game].remove_user(self.message.author.id)
+            await self.client.async_game_databases[game].remove_user(self.message.author.id)
             game_name = api_util.SUPPORTED_GAMES[game]
             response = (
                 f"You are no longer registered to the Int-Far™ Tracker™ for {game_name} " + "{emote_sadge} " +
@@ -196,7 +196,7 @@ class StatusCommand(Command):
             longest_game_time, users, doinks_games,
             total_doinks, intfars, games_ratios,
             intfar_ratios, intfar_multi_ratios
-        ) = self.client.game_databases[game].get_meta_stats()
+        ) = await self.client.async_game_databases[game].get_meta_stats()
 
         pct_games_won = (games_won / games) * 100
         playtime_hours = playtime / 60 / 60
@@ -214,7 +214,7 @@ class StatusCommand(Command):
         earliest_time = datetime.fromtimestamp(earliest_game).strftime("%Y-%m-%d")
         latest_time = datetime.fromtimestamp(latest_game).strftime("%Y-%m-%d")
         doinks_emote = self.client.insert_emotes("{emote_Doinks}")
-        all_bets = self.client.game_databases[game].get_bets(False)
+        all_bets = await self.client.async_game_databases[game].get_bets(False)
 
         tokens_name = self.client.config.betting_tokens
         bets_won = 0
@@ -342,7 +342,7 @@ class VerifyCommand(Command):
         verifies a user and allows them to interact with the Int-Far website. This URL is
         then sent via. a Discord DM to the invoker of the command.
         """
-        client_secret = self.client.meta_database.get_client_secret(self.message.author.id)
+        client_secret = await self.client.async_meta_database.get_client_secret(self.message.author.id)
         url = f"{api_util.get_website_link(self.client.config)}/verify/{client_secret}"
         response_dm = "Go to this link to verify yourself (totally not a virus):\n"
         response_dm += url + "\n\n"
@@ -379,7 +379,7 @@ class DefaultGameCommand(Command):
             response = f"Your default game is *{game_name}*"
 
         else:
-            self.client.meta_database.set_default_game(self.message.author.id, game)
+            await self.client.async_meta_database.set_default_game(self.message.author.id, game)
             game_name = api_util.SUPPORTED_GAMES[game]
             response = f"Your default game is now set to *{game_name}*"
 
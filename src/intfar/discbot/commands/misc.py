@@ -94,7 +94,7 @@ class CommendCommand(Command):
         target_name = self.client.get_discord_nick(target_id, self.message.guild.id)
         mention = self.client.get_mention_str(target_id, self.message.guild.id)
 
-        total_commends, commends_from_user = self.client.meta_database.commend_user(self.commend_type, target_id, commender)
+        total_commends, commends_from_user = await self.client.async_meta_database.commend_user(self.commend_type, target_id, commender)
 
         emote = "{emote_woahpikachu}" if self.commend_type == "report" else "{emote_nazi}"
 
@@ -136,7 +136,7 @@ class CommendsCommand(Command):
         self.commend_name = f"{self.commend_type}ed"
 
     async def handle(self, target_id: int | None):
-        reports_for_user = self.client.meta_database.get_commendations(self.commend_type, commended=target_id)
+        reports_for_user = await self.client.async_meta_database.get_commendations(self.commend_type, commended=target_id)
 
         grouped_by_user = {}
         for disc_id, commends, _ in reports_for_user:
@@ -171,7 +171,7 @@ class CommendsCommand(Command):
 
         # Add info about who this person has reported
         if target_id is not None:
-            reports_by_user = self.client.meta_database.get_commendations(self.commend_type, commender=target_id)
+            reports_by_user = await self.client.async_meta_database.get_commendations(self.commend_type, commender=target_id)
             grouped_by_user = {}
             for _, commends, disc_id in reports_by_user:
                 if disc_id not in grouped_by_user:
@@ -243,27 +243,27 @@ class SummaryCommand(Command):
     OPTIONAL_PARAMS = [GameParam("game"), TargetParam("person")]
 
     async def handle(self, game: str, target_id: int):
-        database = self.client.game_databases[game]
+        database = self.client.async_game_databases[game]
 
         # Shows information about various stats a person has accrued.
+        summary = await database.get_summary_snapshot(target_id)
+        if summary is None:
+            # Calculate the summary in a reader thread, then save it for next time
+            summary = await database.get_summary_data(target_id)
+            await database.save_summary_snapshot(target_id, summary)
+
         nickname = self.client.get_discord_nick(target_id, self.message.guild.id)
-        games_played = database.get_intfar_stats(target_id)[0]
-        num_played_ids = len(database.get_played_ids(target_id))
+        games_played = summary["games_played"]
+        num_played_ids = summary["num_played_ids"]
 
-        total_winrate = database.get_total_winrate(target_id)
+        total_winrate = summary["total_winrate"]
         total_ids = self.client.api_clients[game].playable_count
 
-        longest_win_streak = database.get_longest_win_or_loss_streak(target_id, 1)
-        longest_loss_streak = database.get_longest_win_or_loss_streak(target_id, -1)
+        longest_win_streak = summary["longest_win_streak"]
+        longest_loss_streak = summary["longest_loss_streak"]
 
-        best_playable_wr, best_playable_games, best_playable_id = database.get_min_or_max_winrate_played(target_id, True)
-        worst_playable_wr, worst_playable_games, worst_playable_id = database.get_min_or_max_winrate_played(target_id, False)
-
-        if best_playable_id == worst_playable_id:
-            # Person has not played 10 games with any champ/on any map. Try to get stats with 5 minimum games.
-            worst_playable_wr, worst_playable_games, worst_playable_id = database.get_min_or_max_winrate_played(
-                target_id, False, min_games=5
-            )
+        best_playable_wr, best_playable_games, best_playable_id = summary["best_playable"]
+        worst_playable_wr, worst_playable_games, worst_playable_id = summary["worst_playable"]
 
         playable_name = "champions" if game == "lol" else "maps"
 
@@ -277,7 +277,7 @@ class SummaryCommand(Command):
 
         if game == "lol":
             main_player_id = database.game_users[target_id].player_id[0]
-            rank_solo, rank_flex = database.get_current_rank(main_player_id)
+            rank_solo, rank_flex = await database.get_current_rank(main_player_id)
             fmt_rank = get_formatted_stat_value(game, "rank_solo", rank_solo)
             response_1 += f"Their current rank in {fmt_stat_names['rank_solo']} is **{fmt_rank}**.\n"
 
@@ -288,7 +288,7 @@ class SummaryCommand(Command):
         response_1 += f"Their longest loss streak was **{longest_loss_streak}** games.\n"
 
         if game == "cs2":
-            ot_games, ot_winrate = database.get_overtime_winrate(target_id)
+            ot_games, ot_winrate = summary["overtime_winrate"]
             response_1 += f"Their winrate in overtime is **{ot_winrate}%** in **{ot_games}** games.\n\n"
 
         response_2 = ""
@@ -304,11 +304,8 @@ class SummaryCommand(Command):
                 f"**{worst_playable_wr:.1f}%** of **{worst_playable_games}** games).\n"
             )
 
-        best_person_id, best_person_games, best_person_wr = database.get_winrate_relation(target_id, True)
-        worst_person_id, worst_person_games, worst_person_wr = database.get_winrate_relation(target_id, False)
-
-        if best_person_id == worst_person_id:
-            worst_person_id, worst_person_games, worst_person_wr = database.get_winrate_relation(target_id, False, min_games=5)
+        best_person_id, best_person_games, best_person_wr = summary["best_person"]
+        worst_person_id, worst_person_games, worst_person_wr = summary["worst_person"]
 
         # If person has not played a minimum of 5 games with any person, skip person winrate stats.
         if best_person_wr is not None and worst_person_wr is not None and best_person_id != worst_person_id:
@@ -322,7 +319,7 @@ class SummaryCommand(Command):
             )
 
         if game == "lol":
-            role_stats = database.get_role_winrate(target_id)
+            role_stats = summary["role_winrates"]
 
             response_2 += "Their winrate playing different roles:\n"
 
@@ -335,7 +332,7 @@ class SummaryCommand(Command):
             response_2 += "\n"
 
         # Get performance score for person.
-        score, rank, num_scores = database.get_performance_score(target_id)()
+        score, rank, num_scores = await database.get_performance_score(target_id)
 
         response_2 += (
             f"The *Personally Evaluated Normalized Int-Far Score* for {nickname} is " +
@@ -69,7 +69,7 @@ class ShopCommand(Command):
             await self.message.channel.send(response)
             return
 
-        items = self.client.meta_database.get_items_in_shop()
+        items = await self.client.async_meta_database.get_items_in_shop()
 
         dt_now = datetime.now()
         time_to_closing = api_util.format_duration(dt_now, self.client.shop_handler.shop_closing_dt)
@@ -148,7 +148,7 @@ class InventoryCommand(Command):
     OPTIONAL_PARAMS = [TargetParam("person")]
 
     async def handle(self, target_id: int):
-        items = self.client.meta_database.get_items_for_user(target_id)
+        items = await self.client.async_meta_database.get_items_for_user(target_id)
         target_name = self.client.get_discord_nick(target_id, self.message.guild.id)
         if items == []:
             response = f"{target_name} currently owns no items."
@@ -5,6 +5,7 @@ from typing import List
 
 from intfar.api.util import SUPPORTED_GAMES, get_website_link
 from intfar.discbot.commands.base import *
+from intfar.discbot.pagination import ListPages
 
 class SetEventSoundCommand(Command):
     ACCESS_LEVEL = "all"
@@ -15,14 +16,14 @@ class SetEventSoundCommand(Command):
         self.event = event
 
     async def handle(self, game: str, sound: str | None = None):
-        database = self.client.game_databases[game]
+        database = self.client.async_game_databases[game]
         game_name = SUPPORTED_GAMES[game]
         response = ""
         event_fmt = "Int-Far" if self.event == "intfar" else "{emote_Doinks}"
         event_fmt = f"{event_fmt} in {game_name}"
 
         if sound is None: # Get current set sound for event.
-            current_sound = database.get_event_sound(self.message.author.id, self.event)
+            current_sound = await database.get_event_sound(self.message.author.id, self.event)
             example_cmd = f"!{self.event}_sound"
             if current_sound is None:
                 response = (
@@ -39,14 +40,14 @@ class SetEventSoundCommand(Command):
                 )
 
         elif sound == "remove":
-            database.remove_event_sound(self.message.author.id, self.event)
+            await database.remove_event_sound(self.message.author.id, self.event)
             response = f"Removed sound from triggering when getting {event_fmt}."
 
         elif not self.client.audio_handler.is_valid_sound(sound):
             response = f"Invalid sound: `{sound}`. See `!sounds` for a list of valid sounds."
 
         else:
-            database.set_event_sound(self.message.author.id, sound, self.event)
+            await database.set_event_sound(self.message.author.id, sound, self.event)
             response = (
                 f"The sound `{sound}` will now play when you get {event_fmt} " +
                 "{emote_poggers}"
@@ -78,7 +79,7 @@ class SetJoinSoundCommand(Command):
         response = ""
 
         if sound is None: # Get current set sound for joining.
-            current_sound = self.client.meta_database.get_join_sound(self.message.author.id)
+            current_sound = await self.client.async_meta_database.get_join_sound(self.message.author.id)
             if current_sound is None:
                 response = (
                     f"You have not yet set a sound that triggers when joining a voice channel. " +
@@ -94,14 +95,14 @@ class SetJoinSoundCommand(Command):
                 )
 
         elif sound == "remove":
-            self.client.meta_database.remove_join_sound(self.message.author.id)
+            await self.client.async_meta_database.remove_join_sound(self.message.author.id)
             response = "Removed sound from triggering when joining a voice channel."
 
         elif not self.client.audio_handler.is_valid_sound(sound):
             response = f"Invalid sound: `{sound}`. See `!sounds` for a list of valid sounds."
 
         else:
-            self.client.meta_database.set_join_sound(self.message.author.id, sound)
+            await self.client.async_meta_database.set_join_sound(self.message.author.id, sound)
             response = (
                 f"The sound `{sound}` will now play when you join a voice channel " +
                 "{emote_poggers}"
@@ -119,6 +120,7 @@ class PlaySoundCommand(Command):
         success, status = await self.client.audio_handler.play_sound(sound, voice_state, self.message)
 
         if success and self.client.audio_handler.is_valid_sound(sound):
+            # Sound hits are buffered in memory, so this doesn't write to the database
             self.client.meta_database.add_sound_hit(sound, datetime.now())
         elif status is not None:
             await self.message.channel.send(self.client.insert_emotes(status))
@@ -220,10 +222,13 @@ class SoundsCommand(Command):
             )
             return
 
-        sounds_list = [
-            f"- `{sound}` (uploaded **{timestamp}** by {self.client.get_discord_nick(owner_id, self.message.guild.id) or 'Unknown'}, **{plays}** plays)"
-            for sound, owner_id, plays, timestamp in self.client.audio_handler.get_sounds(ordering)
-        ]
+        def format_sound(sound_data):
+            sound, owner_id, plays, timestamp = sound_data
+            owner_name = self.client.get_discord_nick(owner_id, self.message.guild.id) or "Unknown"
+            return f"- `{sound}` (uploaded **{timestamp}** by {owner_name}, **{plays}** plays)"
+
+        # Sounds are formatted when the page they are on is shown
+        sounds_list = ListPages(self.client.audio_handler.get_sounds(ordering), format_sound)
         header = "Available sounds:"
         footer = f"Upload your own at `{get_website_link(self.client.config)}/soundboard`!"
 
@@ -234,21 +239,21 @@ class BillboardCommand(Command):
     DESCRIPTION = "View the hottest sounds of the last week!"
 
     async def handle(self):
-        database = self.client.meta_database
+        database = self.client.async_meta_database
         timestamp = datetime.now()
 
-        date_start_1, date_end_1 = database.get_weekly_timestamp(timestamp, 2)
+        date_start_1, date_end_1 = self.client.meta_database.get_weekly_timestamp(timestamp, 2)
         week_old = {
             sound: (plays, rank)
             for sound, plays, rank
-            in database.get_weekly_sound_hits(date_start_1, date_end_1)
+            in await database.get_weekly_sound_hits(date_start_1, date_end_1)
         }
 
-        date_start_2, date_end_2 = database.get_weekly_timestamp(timestamp, 1)
+        date_start_2, date_end_2 = self.client.meta_database.get_weekly_timestamp(timestamp, 1)
         week_new = [
             (sound, plays, rank)
             for sound, plays, rank
-            in database.get_weekly_sound_hits(date_start_2, date_end_2)
+            in await database.get_weekly_sound_hits(date_start_2, date_end_2)
         ]
 
         dt_start = datetime.fromtimestamp(date_start_2).strftime("%d/%m/%Y")
@@ -53,10 +53,14 @@ def get_val_str(val_before, val_now, maximize=True, fmt_func=None):
 
     return val_str
 
-def get_end_of_split_msg(database, api_client, disc_id, prev_split_start, curr_split_start):
-    stats_to_get = list(get_stat_quantity_descriptions("lol").keys())
+def get_split_stats():
+    return list(get_stat_quantity_descriptions("lol").keys())
+
+def get_end_of_split_msg(database, api_client, disc_id, prev_split_start, curr_split_start, split_data=None):
+    stats_to_get = get_split_stats()
     stat_names = get_formatted_stat_names("lol")
-    split_data = database.get_split_summary_data(disc_id, stats_to_get, prev_split_start, curr_split_start)
+    if split_data is None:
+        split_data = database.get_split_summary_data(disc_id, stats_to_get, prev_split_start, curr_split_start)
 
     logger.bind(event="end_of_split_data", split_data=split_data).info(f"End of split data: {split_data}")
 
@@ -1,20 +1,24 @@
 from datetime import datetime
 from time import time
+from typing import Callable
 
 from discord import Message
 
 from intfar.api import util as api_util
 from intfar.api.awards import get_intfar_reasons, get_doinks_reasons
 from intfar.api.game_data import (
+    get_stat_parser,
     get_stat_quantity_descriptions,
     stats_from_database,
     get_formatted_stat_names,
     get_formatted_stat_value
 )
 from intfar.api.game_data.cs2 import RANKS
+from intfar.api.game_stats import GameStats
 from intfar.discbot.commands.misc import get_winrate
 from intfar.discbot.commands.base import *
 from intfar.discbot.discord_bot import DiscordClient
+from intfar.discbot.pagination import get_memory_size
 
 class StatsCommand(Command):
     NAME = "stats"
@@ -63,7 +67,7 @@ class AverageCommand(Command):
             playable_name = self.client.api_clients[game].get_playable_name(playable_id)
 
         minimum_games = 10 if playable_id is None else 5
-        values = self.client.game_databases[game].get_average_stat(stat, disc_id, playable_id, min_games=minimum_games)()
+        values = await self.client.async_game_databases[game].get_average_stat(stat, disc_id, playable_id, min_games=minimum_games)
 
         for_all = disc_id is None
         readable_stat = stat_name_descs[stat]        
@@ -175,21 +179,21 @@ class BestOrWorstStatCommand(Command):
                 target_id, # <- Who got the highest/lowest stat ever
                 min_or_max_value, # <- The highest/lowest value of the stat
                 game_id # <- The game where it happened
-            ) = self.client.game_databases[game].get_most_extreme_stat(stat, maximize)
+            ) = await self.client.async_game_databases[game].get_most_extreme_stat(stat, maximize)
         else:
             (
                 stat_count, # <- How many times the stat has occured
                 game_count, # <- How many games were the stat was relevant
                 min_or_max_value, # <- Highest/lowest occurance of the stat value
                 game_id
-            ) = self.client.game_databases[game].get_best_or_worst_stat(stat, target_id, maximize)()
+            ) = await self.client.async_game_databases[game].get_best_or_worst_stat(stat, target_id, maximize)
 
         recepient = self.client.get_discord_nick(target_id, self.message.guild.id)
 
         game_summary = None
         if min_or_max_value is not None and game_id is not None:
             min_or_max_value = api_util.round_digits(min_or_max_value)
-            game_summary = self.get_game_summary(game, game_id, target_id, self.message.guild.id)
+            game_summary = await self.get_game_summary(game, game_id, target_id, self.message.guild.id)
 
         emote_to_use = "{emote_pog}" if self.best else "{emote_peberno}"
 
@@ -205,7 +209,7 @@ class BestOrWorstStatCommand(Command):
                 if game_summary is not None:
                     response += f"\nHe got this when playing {game_summary}"
         else:
-            played_id, played_count = self.client.game_databases[game].get_played_count_for_stat(
+            played_id, played_count = await self.client.async_game_databases[game].get_played_count_for_stat(
                 stat, maximize, target_id
             )
 
@@ -229,18 +233,20 @@ class BestOrWorstStatCommand(Command):
 
         await self.message.channel.send(response)
 
-    def get_game_summary(self, game: str, game_id: int, target_id: int, guild_id: int) -> str:
+    async def get_game_summary(self, game: str, game_id: int, target_id: int, guild_id: int) -> str:
         """
         Return a string describing the outcome of the game with the given game_id,
         for the given player, in the given guild.
         """
-        game_stats = stats_from_database(
-            game,
-            self.client.game_databases[game],
-            self.client.api_clients[game],
-            guild_id,
-            game_id,
-        )[0]
+        game_stats = (await self.client.async_game_databases[game].read(
+            lambda database: stats_from_database(
+                game,
+                database,
+                self.client.api_clients[game],
+                guild_id,
+                game_id,
+            )
+        ))[0]
         return game_stats.get_finished_game_summary(target_id)
 
 class BestStatCommand(BestOrWorstStatCommand):
@@ -269,6 +275,66 @@ class WorstStatCommand(BestOrWorstStatCommand):
     def __init__(self, client: DiscordClient, message: Message, called_name: str):
         super().__init__(client, message, called_name, False)
 
+class MatchHistoryPages:
+    """
+    Lines for `DiscordClient.paginate` with the match history of a player,
+    one formatted game per line. Games are loaded from the database a page
+    at a time, when a line on that page is shown, and only the most recently
+    loaded page is kept in memory.
+    """
+    def __init__(self, load_page: Callable, format_game: Callable[[GameStats], str], page_size: int = 10):
+        """
+        Initialize the MatchHistoryPages.
+
+        ### Parameters
+        :param load_page:   Async function that takes the key of a page (None for
+                            the first page) and a page size and returns the games
+                            on that page and the key of the next page
+        :param format_game: Function that formats a game as a line of text
+        :param page_size:   Amount of games to load from the database at a time
+        """
+        self.load_page = load_page
+        self.format_game = format_game
+        self.page_size = page_size
+        self._page_keys = [None]
+        self._page_index = None
+        self._page = []
+
+    @property
+    def memory_size(self) -> int:
+        return get_memory_size(self._page_keys) + sum(get_memory_size(game.__dict__) for game in self._page)
+
+    async def _load(self, page_index: int):
+        games, next_key = await self.load_page(self._page_keys[page_index], self.page_size)
+        self._page_index = page_index
+        self._page = games
+
+        if next_key is not None and len(self._page_keys) == page_index + 1:
+            self._page_keys.append(next_key)
+
+    async def _get_page(self, page_index: int) -> list[GameStats]:
+        # The key of a page comes from the page before it, so load pages in order
+        while len(self._page_keys) <= page_index:
+            pages_known = len(self._page_keys)
+            await self._load(pages_known - 1)
+
+            if len(self._page_keys) == pages_known: # No more pages
+                return []
+
+        if self._page_index != page_index:
+            await self._load(page_index)
+
+        return self._page
+
+    async def __call__(self, start: int, end: int) -> list[str]:
+        lines = []
+        for index in range(start, end):
+            page = await self._get_page(index // self.page_size)
+            if index % self.page_size < len(page):
+                lines.append(self.format_game(page[index % self.page_size]))
+
+        return lines
+
 class MatchHistoryCommand(Command):
     NAME = "match_history"
     DESCRIPTION = (
@@ -277,112 +343,110 @@ class MatchHistoryCommand(Command):
     ACCESS_LEVEL = "self"
     OPTIONAL_PARAMS = [GameParam("game"), TargetParam("person")]
 
-    async def handle(self, game: str, target_id: int = None):
+    def format_match(self, game: str, game_stats: GameStats, target_id: int) -> str:
         formatted_stat_names = get_formatted_stat_names(game)
 
-        all_game_stats = stats_from_database(
-            game,
-            self.client.game_databases[game],
-            self.client.api_clients[game],
-            self.message.guild.id,
-        )
-
-        formatted_entries = []
-        for game_stats in all_game_stats:
-            date = datetime.fromtimestamp(game_stats.timestamp).strftime("%Y/%m/%d")
-            dt_1 = datetime.fromtimestamp(time())
-            dt_2 = datetime.fromtimestamp(time() + game_stats.duration)
-            fmt_duration = api_util.format_duration(dt_1, dt_2)
+        date = datetime.fromtimestamp(game_stats.timestamp).strftime("%Y/%m/%d")
+        dt_1 = datetime.fromtimestamp(time())
+        dt_2 = datetime.fromtimestamp(time() + game_stats.duration)
+        fmt_duration = api_util.format_duration(dt_1, dt_2)
 
-            player_stats = game_stats.find_player_stats(target_id, game_stats.filtered_player_stats)
-
-            if player_stats is None: # Target player was not in the game
-                continue
+        player_stats = game_stats.find_player_stats(target_id, game_stats.filtered_player_stats)
 
-            if game == "lol":
-                map_or_champ = f"{player_stats.champ_name}"
-                if player_stats.role is not None:
-                    role = get_formatted_stat_value("lol", "role", player_stats.role)
-                    map_or_champ += f" {role}"
-            else:
-                map_or_champ = game_stats.map_name
+        if game == "lol":
+            map_or_champ = f"{player_stats.champ_name}"
+            if player_stats.role is not None:
+                role = get_formatted_stat_value("lol", "role", player_stats.role)
+                map_or_champ += f" {role}"
+        else:
+            map_or_champ = game_stats.map_name
 
-            win_str = "Won" if game_stats.win == 1 else "Lost"
+        win_str = "Won" if game_stats.win == 1 else "Lost"
 
-            # Int-Far description
-            if game_stats.intfar_id == target_id:
-                reasons = " and ".join(
-                    f"**{r}**" for c, r in zip(
-                        game_stats.intfar_reason, get_intfar_reasons(game).values()
-                    )
-                    if c == "1"
+        # Int-Far description
+        if game_stats.intfar_id == target_id:
+            reasons = " and ".join(
+                f"**{r}**" for c, r in zip(
+                    game_stats.intfar_reason, get_intfar_reasons(game).values()
                 )
-                intfar_description = f"Int-Far for {reasons}"
-            else:
-                intfar_description = "Not **Int-Far**"
-
-            # Doinks description
-            if player_stats.doinks is not None:
-                reasons = " and ".join(
-                    f"**{r}**" for c, r in zip(
-                        player_stats.doinks, get_doinks_reasons(game).values()
-                    )
-                    if c == "1"
+                if c == "1"
+            )
+            intfar_description = f"Int-Far for {reasons}"
+        else:
+            intfar_description = "Not **Int-Far**"
+
+        # Doinks description
+        if player_stats.doinks is not None:
+            reasons = " and ".join(
+                f"**{r}**" for c, r in zip(
+                    player_stats.doinks, get_doinks_reasons(game).values()
                 )
-                doinks_description = f"Big Doinks for {reasons}"
-            else:
-                emote = self.client.insert_emotes("{emote_Doinks}")
-                doinks_description = f"No {emote}"
-
-            # Participants description
-            other_players = []
-            for player_data in game_stats.filtered_player_stats:
-                if player_data.disc_id != target_id:
-                    other_players.append(self.client.get_discord_nick(player_data.disc_id, self.message.guild.id) or "Unknown")
-
-            if len(other_players) == 1:
-                participants = f"*{other_players[0]}*"
-            elif len(other_players) == 2:
-                participants = f"*{other_players[0]}* and *{other_players[1]}*" 
-            else:
-                participants = "*, *".join(other_players[:-1]) + f", and *{other_players[-1]}*"
-
-            match_str = (
-                f"- **{win_str}** in **{fmt_duration}** on **{date}** playing **{map_or_champ}**\n"
-                f"- {doinks_description}\n"
-                f"- {intfar_description}\n"
-                f"- With {participants}\n"
-                "```css\n"
+                if c == "1"
             )
+            doinks_description = f"Big Doinks for {reasons}"
+        else:
+            emote = self.client.insert_emotes("{emote_Doinks}")
+            doinks_description = f"No {emote}"
+
+        # Participants description
+        other_players = []
+        for player_data in game_stats.filtered_player_stats:
+            if player_data.disc_id != target_id:
+                other_players.append(self.client.get_discord_nick(player_data.disc_id, self.message.guild.id) or "Unknown")
+
+        if len(other_players) == 1:
+            participants = f"*{other_players[0]}*"
+        elif len(other_players) == 2:
+            participants = f"*{other_players[0]}* and *{other_players[1]}*" 
+        else:
+            participants = "*, *".join(other_players[:-1]) + f", and *{other_players[-1]}*"
+
+        match_str = (
+            f"- **{win_str}** in **{fmt_duration}** on **{date}** playing **{map_or_champ}**\n"
+            f"- {doinks_description}\n"
+            f"- {intfar_description}\n"
+            f"- With {participants}\n"
+            "```css\n"
+        )
+
+        # Get the formatted stat names and stat values and figure out the max width
+        # of the stat names to pad all stat entries to the same width
+        formatted_stats = []
+        formatted_values = []
+        for stat in formatted_stat_names:
+            if stat in ("game_id", "player_id", "doinks"):
+                continue
+
+            fmt_stat = formatted_stat_names[stat]
+            fmt_value = get_formatted_stat_value(game, stat, player_stats.__dict__[stat])
 
-            # Get the formatted stat names and stat values and figure out the max width
-            # of the stat names to pad all stat entries to the same width
-            formatted_stats = []
-            formatted_values = []
-            for stat in formatted_stat_names:
-                if stat in ("game_id", "player_id", "doinks"):
-                    continue
+            formatted_stats.append(fmt_stat)
+            formatted_values.append(fmt_value)
 
-                fmt_stat = formatted_stat_names[stat]
-                fmt_value = get_formatted_stat_value(game, stat, player_stats.__dict__[stat])
+        max_width = max(len(s) for s in formatted_stats)
 
-                formatted_stats.append(fmt_stat)
-                formatted_values.append(fmt_value)
+        for stat, value in zip(formatted_stats, formatted_values):
+            padding = " " * (max_width - len(stat))
 
-            max_width = max(len(s) for s in formatted_stats)
+            match_str += f"\n{stat}:{padding} {value}"
 
-            for stat, value in zip(formatted_stats, formatted_values):
-                padding = " " * (max_width - len(stat))
+        match_str += "\n```"
 
-                match_str += f"\n{stat}:{padding} {value}"
+        return match_str
 
-            match_str += "\n```"
+    async def handle(self, game: str, target_id: int = None):
+        database = self.client.async_game_databases[game]
+        parser = get_stat_parser(game, None, self.client.api_clients[game], database.game_users, self.message.guild.id)
+
+        async def get_page(before, page_size):
+            return await database.read(lambda db: parser.get_player_games_page(db, target_id, before, page_size))
 
-            formatted_entries.append(match_str)
+        pages = MatchHistoryPages(get_page, lambda game_stats: self.format_match(game, game_stats, target_id))
+        games_played = (await database.get_games_count(target_id))[0]
 
         header = f"--- Match history for **{api_util.SUPPORTED_GAMES[game]}** ---"
 
-        await self.client.paginate(self.message.channel, formatted_entries, 0, 1, header)
+        await self.client.paginate(self.message.channel, pages, 0, 1, header, num_lines=games_played)
 
 class ChampionCommand(Command):
     NAME = "champion"
@@ -406,98 +470,98 @@ class ChampionCommand(Command):
             target_id = role
             role = None
 
-        with self.client.game_databases["lol"] as database:
-            champ_name, winrate, games = get_winrate(self.client, champ_id, game, target_id, role)
-            user_name = self.client.get_discord_nick(target_id, self.message.guild.id)
-
-            if winrate is None or games == 0:
-                response = f"{user_name} has not played enough games on {champ_name}."
-                await self.message.channel.send(response)
-                return
-
-            doinks = database.get_played_doinks_count(target_id, champ_id, role)()
-            intfars = database.get_played_intfar_count(target_id, champ_id, role)()
-
-            game_description = champ_name
-            if role is not None:
-                game_description += f" {role}"
-
-            response = f"Stats for {user_name} on *{game_description}*:\n"
-            response += f"Winrate: **{winrate:.2f}%** in **{int(games)}** games.\n"
-            response += f"Doinks: **{doinks}**\n"
-            response += f"Int-Fars: **{intfars}**\n"
-
-            stats_to_get = [
-                "kills",
-                "deaths",
-                "assists",
-                "kda",
-                "cs",
-                "cs_per_min",
-                "damage",
-                "gold",
-                "vision_score",
-                "vision_wards"
+        database = self.client.async_game_databases["lol"]
+        champ_name, winrate, games = get_winrate(self.client, champ_id, game, target_id, role)
+        user_name = self.client.get_discord_nick(target_id, self.message.guild.id)
+
+        if winrate is None or games == 0:
+            response = f"{user_name} has not played enough games on {champ_name}."
+            await self.message.channel.send(response)
+            return
+
+        doinks = await database.get_played_doinks_count(target_id, champ_id, role)
+        intfars = await database.get_played_intfar_count(target_id, champ_id, role)
+
+        game_description = champ_name
+        if role is not None:
+            game_description += f" {role}"
+
+        response = f"Stats for {user_name} on *{game_description}*:\n"
+        response += f"Winrate: **{winrate:.2f}%** in **{int(games)}** games.\n"
+        response += f"Doinks: **{doinks}**\n"
+        response += f"Int-Fars: **{intfars}**\n"
+
+        stats_to_get = [
+            "kills",
+            "deaths",
+            "assists",
+            "kda",
+            "cs",
+            "cs_per_min",
+            "damage",
+            "gold",
+            "vision_score",
+            "vision_wards"
+        ]
+
+        show_best = not self.message.author.is_on_mobile()
+
+        if show_best:
+            text_rows = [
+                ["Stat", "Value", "Self", "Other", "All", "Best"]
             ]
+        else:
+            text_rows = ["Stat", "Value", "S", "O", "A"]
 
-            show_best = not self.message.author.is_on_mobile()
+        stats = {
+            stat: get_formatted_stat_value(
+                game,
+                stat,
+                (await database.get_average_stat(stat, target_id, champ_id, role, min_games=1))[0][1]
+            )
+            for stat in stats_to_get
+        }
 
-            if show_best:
-                text_rows = [
-                    ["Stat", "Value", "Self", "Other", "All", "Best"]
-                ]
-            else:
-                text_rows = ["Stat", "Value", "S", "O", "A"]
+        min_games = 5
 
-            stats = {
-                stat: get_formatted_stat_value(
-                    game,
-                    stat,
-                    database.get_average_stat(stat, target_id, champ_id, role, min_games=1)()[0][1]
+        if games < min_games:
+            response += (
+                f"Can't display stat rankings on {champ_name}, "
+                f"because {user_name} has not played at least {min_games} games with them."
+            )
+            await self.message.channel.send(response)
+            return
+
+        totals = []
+        formatted_stat_names = get_formatted_stat_names(game)
+        for index, stat in enumerate(stats):
+            stat_name = formatted_stat_names[stat]
+            if stat == "vision_score":
+                stat_name = "Vision"
+            elif stat == "vision_wards":
+                stat_name = "Pinks"
+            elif stat == "cs_per_min":
+                stat_name = "CS/Min"
+
+            row = [f"{stat_name}", f"{stats[stat]}"]
+            best_at_champ = None
+
+            for comparison in range(1, 4):
+                rank, best_id, total = await database.get_average_stat_rank(
+                    stat, target_id, champ_id, comparison, role, min_games
                 )
-                for stat in stats_to_get
-            }
+                row.append(str(rank))
 
-            min_games = 5
+                if index == 0:
+                    totals.append(total)
+                if comparison == 2:
+                    best_at_champ = best_id
 
-            if games < min_games:
-                response += (
-                    f"Can't display stat rankings on {champ_name}, "
-                    f"because {user_name} has not played at least {min_games} games with them."
-                )
-                await self.message.channel.send(response)
-                return
-
-            totals = []
-            formatted_stat_names = get_formatted_stat_names(game)
-            for index, stat in enumerate(stats):
-                stat_name = formatted_stat_names[stat]
-                if stat == "vision_score":
-                    stat_name = "Vision"
-                elif stat == "vision_wards":
-                    stat_name = "Pinks"
-                elif stat == "cs_per_min":
-                    stat_name = "CS/Min"
-
-                row = [f"{stat_name}", f"{stats[stat]}"]
-                best_at_champ = None
-
-                for comparison in range(1, 4):
-                    rank, best_id, total = database.get_average_stat_rank(
-                        stat, target_id, champ_id, comparison, role, min_games
-                    )()
-                    row.append(str(rank))
-
-                    if index == 0:
-                        totals.append(total)
-                    if comparison == 2:
-                        best_at_champ = best_id
-
-                if show_best:
-                    best_name = self.client.get_discord_nick(best_at_champ, self.message.guild.id)
-                    row.append(best_name or "Unknown")
-
-                text_rows.append(row)
+            if show_best:
+                best_name = self.client.get_discord_nick(best_at_champ, self.message.guild.id)
+                row.append(best_name or "Unknown")
+
+            text_rows.append(row)
 
         col_lengths = [max(len(row[col]) for row in text_rows) for col in range(len(text_rows[0]))]
         response += "```css\n"
@@ -533,9 +597,9 @@ class RankCommand(Command):
 
     async def handle(self, queue: str, game: str, target_id: int):
         nickname = self.client.get_discord_nick(target_id, self.message.guild.id)
-        database = self.client.game_databases[game]
+        database = self.client.async_game_databases[game]
         main_player_id = database.game_users[target_id].player_id[0]
-        rank_info = database.get_current_rank(main_player_id)
+        rank_info = await database.get_current_rank(main_player_id)
         fmt_stat_names = get_formatted_stat_names(game)
 
         if game == "lol":
@@ -1,7 +1,6 @@
 import asyncio
 from io import BytesIO
 import re
-from threading import Thread
 from time import time
 from math import ceil
 from datetime import datetime
@@ -13,8 +12,10 @@ from discord.errors import NotFound, DiscordException, HTTPException, Forbidden
 from mhooge_flask.logging import logger
 
 from intfar.discbot.montly_intfar import MonthlyIntfar
-from intfar.discbot.app_listener import listen_for_request
-from intfar.discbot.commands.split import should_send_split_message, get_end_of_split_msg, has_ranks_reset
+from intfar.discbot.app_listener import AppRequestServer
+from intfar.discbot.member_index import MemberIndex
+from intfar.discbot.pagination import ListPages, PaginationStore
+from intfar.discbot.commands.split import should_send_split_message, get_end_of_split_msg, get_split_stats, has_ranks_reset
 from intfar.api.award_qualifiers import AwardQualifiers
 from intfar.api.awards import get_awards_handler
 from intfar.api.game_api_client import GameAPIClient
@@ -27,9 +28,11 @@ from intfar.api.game_monitors.lol import LoLGameMonitor
 from intfar.api.game_monitors.cs2 import CS2GameMonitor
 from intfar.api.game_databases.lol import LoLGameDatabase
 from intfar.api.meta_database import MetaDatabase
+from intfar.api.async_database import AsyncDatabase
 from intfar.api.game_database import GameDatabase
 from intfar.api.betting import BettingHandler
 from intfar.api.audio_handler import AudioHandler
+from intfar.api.member_snapshot import MemberSnapshot
 from intfar.api.shop import ShopHandler
 from intfar.api.config import Config, Environment
 from intfar.discbot.commands import util as commands_util
@@ -93,12 +96,17 @@ class DiscordClient(discord.Client):
         self.betting_handlers = betting_handlers
         self.api_clients = api_clients
 
+        # Databases used by commands, which run queries in separate threads
+        self.async_meta_database = AsyncDatabase(self.meta_database)
+        self.async_game_databases = {game: AsyncDatabase(self.game_databases[game]) for game in self.game_databases}
+
         self.audio_handler = AudioHandler(self.config, self.meta_database)
         self.shop_handler = ShopHandler(self.config, self.meta_database)
 
         self.ai_conn = kwargs.get("ai_pipe")
         self.main_conn = kwargs.get("main_pipe")
         self.flask_conn = kwargs.get("flask_pipe")
+        self.app_request_server = None
 
         self.game_monitors = {
             game: get_game_monitor(
@@ -114,9 +122,11 @@ class DiscordClient(discord.Client):
         }
         self.polling_tasks = {}
 
-        self.pagination_data = {}
+        self.pagination_data = PaginationStore()
         self.audio_action_data = {}
         self.cached_avatars = {}
+        self.member_index = MemberIndex()
+        self.member_snapshot = MemberSnapshot(self.config.member_snapshot_file)
         self.channels_to_write = {}
         self.test_guild = None
         self.initialized = False
@@ -394,11 +404,9 @@ class DiscordClient(discord.Client):
         Return a string that allows for @mention of the given user.
         """
         # Try and find the person in the specified guild.
-        for guild in self.guilds:
-            if guild.id == guild_id:
-                for member in guild.members:
-                    if member.id == disc_id:
-                        return member.mention
+        guild = self.get_guild(guild_id)
+        if guild is not None and (member := self.member_index.get_guild_index(guild).get(disc_id)) is not None:
+            return member.mention
 
         # If person is not found, find nickname from any guild instead.
         return self.get_discord_nick(disc_id, guild_id)
@@ -418,9 +426,9 @@ class DiscordClient(discord.Client):
             if server is None:
                 return None
 
-            for member in server.members:
-                if member.id == disc_id:
-                    return member
+            member = self.member_index.get_guild_index(server).get(disc_id)
+            if member is not None:
+                return member
 
         return None
 
@@ -475,17 +483,17 @@ class DiscordClient(discord.Client):
         return avatar_paths if discord_id is None else avatar_paths[discord_id]
 
     def get_discord_id(self, nickname, guild_id=api_util.MAIN_GUILD_ID, exact_match=True):
-        matches = []
-        guild = self.get_guild(guild_id)
-        for member in guild.members:
-            for attribute in (member.global_name, member.nick, member.display_name, member.name):
-                if attribute is not None:
-                    if exact_match and attribute.lower() == nickname:
-                        return member.id
-                    elif not exact_match and nickname in attribute.lower():
-                        matches.append(member.id)
-                        break
+        """
+        Get the Discord ID of the member of the given guild with a global name,
+        nickname, display name, or username matching the given name, ignoring case.
+        If 'exact_match' is False, the ID is returned if exactly one member
+        has a name containing the given name.
+        """
+        member_index = self.member_index.get_guild_index(self.get_guild(guild_id))
+        if exact_match:
+            return member_index.find_exact(nickname)
 
+        matches = member_index.find_partial(nickname)
         return matches[0] if len(matches) == 1 else None
 
     def get_guilds_for_user(self, disc_id):
@@ -495,9 +503,8 @@ class DiscordClient(discord.Client):
             if guild is None:
                 continue
 
-            for member in guild.members:
-                if member.id == disc_id:
-                    guild_ids.append(guild_id)
+            if disc_id in self.member_index.get_guild_index(guild):
+                guild_ids.append(guild_id)
 
         return guild_ids
 
@@ -520,6 +527,27 @@ class DiscordClient(discord.Client):
 
         return guild_names if guild_id is None else guild_names[guild_id]
 
+    async def publish_member_snapshot(self):
+        """
+        Publish the nicknames, avatars, and guilds of all users, as well as the
+        names of all guilds, so the web app can look them up without a request
+        to this process.
+        """
+        nicknames = {}
+        guilds = {}
+        for disc_id in self.meta_database.all_users.keys():
+            nicknames[disc_id] = self.get_discord_nick(disc_id)
+            guilds[disc_id] = self.get_guilds_for_user(disc_id)
+
+        avatars = await self.get_discord_avatar()
+        guild_names = self.get_guild_name() or {}
+
+        try:
+            version = self.member_snapshot.publish(nicknames, avatars, guilds, guild_names)
+            logger.bind(event="member_snapshot", version=version).debug("Published member snapshot")
+        except OSError:
+            logger.exception("Could not publish member snapshot")
+
     def get_channel_name(self, guild_id=None):
         channel_names = []
         for g_id in api_util.GUILD_IDS:
@@ -727,50 +755,31 @@ class DiscordClient(discord.Client):
         max_tokens_holder = self.meta_database.get_max_tokens_details()[1]
         betting_handler = self.betting_handlers[game_stats.game]
 
+        # Resolve all bets and award tokens for playing. Marks bets as won/lost in database.
+        report = betting_handler.resolve_bets(game_stats, tokens_gained, bet_multiplier)
+        if report is None:
+            return response, max_tokens_holder, max_tokens_holder
+
         any_bets = False # Bool to indicate whether any bets were made.
         for disc_id in game_database.game_users.keys():
-            # See if the user corresponding to 'disc_id' was in-game.
-            player_stats = game_stats.find_player_stats(disc_id, game_stats.filtered_player_stats)
-
-            gain_for_user = 0
-            if player_stats is not None: # If current user was in-game, they gain tokens for playing.
-                gain_for_user = tokens_gained
-                if player_stats.doinks is not None: # If user was awarded doinks, they get more tokens.
-                    number_of_doinks = sum(map(int, player_stats.doinks))
-                    gain_for_user += (self.config.betting_tokens_for_doinks * number_of_doinks)
-
-                betting_handler.award_tokens_for_playing(disc_id, gain_for_user)
-
-            # Get list of active bets for the current user.
-            bets_made = game_database.get_bets(True, disc_id, guild_id)
-            balance_before = self.meta_database.get_token_balance(disc_id)
-            tokens_earned = gain_for_user # Variable for tracking tokens gained for the user.
+            bets_made = report.bets.get(disc_id)
+            balance_before = report.balances.get(disc_id, 0)
+            tokens_earned = report.tokens_for_playing.get(disc_id, 0) # Variable for tracking tokens gained for the user.
             tokens_lost = -1 # Variable for tracking tokens lost for the user.
-            disc_name = self.get_discord_nick(disc_id, guild_id)
 
             if bets_made is not None: # There are active bets for the current user.
+                disc_name = self.get_discord_nick(disc_id, guild_id)
                 mention = self.get_mention_str(disc_id, guild_id)
                 if any_bets:
                     response_bets += "-----------------------------\n"
                 response_bets += f"Result of bets {mention} made:\n"
 
-                for bet_ids, _, _, amounts, events, targets, bet_timestamp, _, _ in bets_made:
+                for resolved_bet in bets_made:
                     any_bets = True
-                    # Resolve current bet which the user made. Marks it as won/lost in database.
-                    bet_success, payout = betting_handler.resolve_bet(
-                        disc_id,
-                        bet_ids,
-                        amounts,
-                        bet_timestamp,
-                        events,
-                        targets,
-                        game_stats,
-                        bet_multiplier
-                    )
 
                     response_bets += "- "
                     total_cost = 0 # Track total cost of the current bet.
-                    for index, (amount, event, target) in enumerate(zip(amounts, events, targets)):
+                    for index, (amount, event, target) in enumerate(zip(resolved_bet.amounts, resolved_bet.events, resolved_bet.targets)):
                         person = None
                         if target is not None:
                             person = self.get_discord_nick(target, guild_id)
@@ -778,15 +787,16 @@ class DiscordClient(discord.Client):
                         bet_desc = betting_handler.get_dynamic_bet_desc(event, person)
 
                         response_bets += f"`{bet_desc}`"
-                        if index != len(amounts) - 1: # Bet was a multi-bet.
+                        if index != len(resolved_bet.amounts) - 1: # Bet was a multi-bet.
                             response_bets += " **and** "
 
                         total_cost += amount
 
-                    if len(amounts) > 1: # Again, bet was a multi-bet.
+                    if len(resolved_bet.amounts) > 1: # Again, bet was a multi-bet.
                         response_bets += " (multi-bet)"
 
-                    if bet_success: # Bet was won. Track how many tokens it awarded.
+                    payout = resolved_bet.payout
+                    if resolved_bet.success: # Bet was won. Track how many tokens it awarded.
                         response_bets += f": Bet was **won**! It awarded **{api_util.format_tokens_amount(payout)}** {tokens_name}!\n"
                         tokens_earned += payout
                     else: # Bet was lost. Track how many tokens it cost.
@@ -1553,15 +1563,30 @@ class DiscordClient(discord.Client):
         # If ranks are reset, get the start of the previous split and send
         # end of split summary to players with more than 10 games that split
         if has_ranks_reset(database, player_ranks):
-            for disc_id in database.game_users.keys():
-                if should_send_split_message(database, disc_id, prev_split_start, curr_split_start):
-                    try:
-                        message = get_end_of_split_msg(database, self.api_clients["lol"], disc_id, prev_split_start, curr_split_start)
-                        await self.send_dm(self.insert_emotes(message), disc_id)
-                        database.set_split_message_sent(disc_id, now)
-                        logger.bind(event="end_split_message_success").info(f"Sent end-of-split message to {disc_id}")
-                    except Exception:
-                        logger.bind(event="end_split_message_error").exception(f"Error when sending end-of-split message to {disc_id}")
+            disc_ids = [
+                disc_id for disc_id in database.game_users.keys()
+                if should_send_split_message(database, disc_id, prev_split_start, curr_split_start)
+            ]
+            if disc_ids == []:
+                return
+
+            # Summarize the splits of every player at once
+            try:
+                split_summaries = database.get_split_summaries(disc_ids, get_split_stats(), prev_split_start, curr_split_start)
+            except Exception:
+                logger.bind(event="end_split_message_error").exception("Error when summarizing splits for end-of-split messages")
+                return
+
+            for disc_id in disc_ids:
+                try:
+                    message = get_end_of_split_msg(
+                        database, self.api_clients["lol"], disc_id, prev_split_start, curr_split_start, split_summaries[disc_id]
+                    )
+                    await self.send_dm(self.insert_emotes(message), disc_id)
+                    database.set_split_message_sent(disc_id, now)
+                    logger.bind(event="end_split_message_success").info(f"Sent end-of-split message to {disc_id}")
+                except Exception:
+                    logger.bind(event="end_split_message_error").exception(f"Error when sending end-of-split message to {disc_id}")
 
     async def polling_loop(self):
         """
@@ -1836,6 +1861,8 @@ class DiscordClient(discord.Client):
         for guild in self.guilds:
             #await guild.chunk()
 
+            self.member_index.rebuild(guild)
+
             if guild.id in api_util.GUILD_IDS:
                 for voice_channel in guild.voice_channels:
                     members_in_voice = voice_channel.members
@@ -1858,27 +1885,49 @@ class DiscordClient(discord.Client):
         await self.emit_event("ready")
 
         asyncio.create_task(self.polling_loop())
+        asyncio.create_task(self.pagination_data.run_sweeper())
+        asyncio.create_task(self.flush_sound_hits_loop())
+
+        await self.publish_member_snapshot()
+
+        if self.flask_conn is not None: # Listen for requests from web page.
+            self.app_request_server = AppRequestServer(self)
+            address = await self.app_request_server.start()
+            self.flask_conn.send((address, self.app_request_server.authkey))
+
+    async def paginate(self, channel, data, chunk, lines_per_page, header=None, footer=None, message=None, num_lines=None):
+        """
+        Send a message with a page of lines from `data`, or edit `message` to show it,
+        with reactions for going to the previous and next page.
+
+        `data` is a page provider: an async function that takes the start and end
+        index of a page and returns the lines on it, like `ListPages`. A list of lines
+        is wrapped in `ListPages`. `num_lines` is the total amount of lines, which
+        is `len(data)` if not given.
+        """
+        if isinstance(data, list):
+            data = ListPages(data)
 
-        if self.flask_conn is not None: # Listen for external commands from web page.
-            event_loop = asyncio.get_event_loop()
-            Thread(target=listen_for_request, args=(self, event_loop)).start()
+        if num_lines is None:
+            num_lines = len(data)
 
-    async def paginate(self, channel, data, chunk, lines_per_page, header=None, footer=None, message=None):
         chunk_start = chunk * lines_per_page
         first_chunk = chunk_start == 0
 
         chunk_end = (chunk + 1) * lines_per_page
-        last_chunk = chunk_end >= len(data)
+        last_chunk = chunk_end >= num_lines
         if last_chunk:
-            chunk_end = len(data)
+            chunk_end = num_lines
+
+        lines = await data(chunk_start, chunk_end)
 
         text = ""
         if header is not None:
             text = header + "\n"
-        text += "\n".join(data[chunk_start:chunk_end])
+        text += "\n".join(lines)
         if footer is not None:
             text += "\n" + footer
-        text += f"\n**Page {chunk+1}/{ceil(len(data) / lines_per_page)}**"
+        text += f"\n**Page {chunk+1}/{ceil(num_lines / lines_per_page)}**"
 
         if message is None:
             message = await channel.send(text)
@@ -1886,10 +1935,11 @@ class DiscordClient(discord.Client):
             await message.clear_reactions()
             await message.edit(content=text)
 
-        self.pagination_data[message.id] = {
+        self.pagination_data.put(message.id, {
             "message": message, "data": data, "header": header,
-            "footer": footer, "chunk": chunk, "lines": lines_per_page
-        }
+            "footer": footer, "chunk": chunk, "lines": lines_per_page,
+            "num_lines": num_lines
+        })
 
         if not first_chunk:
             await message.add_reaction("◀")
@@ -1899,16 +1949,6 @@ class DiscordClient(discord.Client):
     async def on_raw_reaction_add(self, react_event):
         seconds_max = 60 * 60 * 12
 
-        # Clean up old pagination messages.
-        messages_to_remove = []
-        for message_id in self.pagination_data:
-            created_at = self.pagination_data[message_id]["message"].created_at
-            if time() - created_at.timestamp() > seconds_max:
-                messages_to_remove.append(message_id)
-
-        for message_id in messages_to_remove:
-            del self.pagination_data[message_id]
-
         # Clean up old audio control reacts
         messages_to_remove = []
         for message_id in self.audio_action_data:
@@ -1925,11 +1965,9 @@ class DiscordClient(discord.Client):
             react_event.event_type == "REACTION_ADD"
             and react_event.member != self.user
         ):
-            if (message_id in self.pagination_data 
-                and react_event.emoji.name in ("▶", "◀")
-                and self.pagination_data[message_id]["message"].created_at
+            if (react_event.emoji.name in ("▶", "◀")
+                and (message_data := self.pagination_data.get(message_id)) is not None
             ):
-                message_data = self.pagination_data[message_id]
                 reaction_next = react_event.emoji.name == "▶"
                 new_chunk = message_data["chunk"] + 1 if reaction_next else message_data["chunk"] - 1
                 await self.paginate(
@@ -1939,7 +1977,8 @@ class DiscordClient(discord.Client):
                     message_data["lines"],
                     message_data["header"],
                     message_data["footer"],
-                    message_data["message"]
+                    message_data["message"],
+                    message_data["num_lines"]
                 )
             elif (
                 self.audio_handler.audio_streams.get(guild_id) is not None
@@ -2090,7 +2129,87 @@ class DiscordClient(discord.Client):
             elif before.channel is not None and after.channel is None: # User left.
                 await self.user_left_voice(member.id, member.guild.id)
 
+    async def on_member_join(self, member):
+        self.member_index.add_member(member.guild.id, member)
+
+        if member.id in self.meta_database.all_users:
+            await self.publish_member_snapshot()
+
+    async def on_member_remove(self, member):
+        self.member_index.remove_member(member.guild.id, member.id)
+
+        if member.id in self.meta_database.all_users:
+            await self.publish_member_snapshot()
+
+    async def on_member_update(self, before, after):
+        self.member_index.add_member(after.guild.id, after)
+        await self.member_or_user_updated(before, after)
+
+    async def on_user_update(self, before, after):
+        self.member_index.update_user(after.id)
+        await self.member_or_user_updated(before, after)
+
+    async def on_guild_join(self, guild):
+        self.member_index.rebuild(guild)
+
+    async def on_guild_remove(self, guild):
+        self.member_index.remove_guild(guild.id)
+
+    async def member_or_user_updated(self, before, after):
+        if after.id not in self.meta_database.all_users:
+            return
+
+        avatar_changed = before.display_avatar != after.display_avatar
+        if avatar_changed:
+            # Download the new avatar instead of using the cached one
+            for key in list(self.cached_avatars):
+                if key.startswith(f"{after.id}_"):
+                    del self.cached_avatars[key]
+
+        if avatar_changed or before.display_name != after.display_name:
+            await self.publish_member_snapshot()
+
+    async def on_guild_update(self, before, after):
+        if after.id in api_util.GUILD_IDS and before.name != after.name:
+            await self.publish_member_snapshot()
+
+    async def flush_sound_hits_loop(self, interval: int = 60):
+        """
+        Periodically write the plays of sounds that are buffered in memory to the database.
+        """
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                await self.flush_sound_hits()
+            except Exception:
+                logger.bind(event="flush_sound_hits").exception("Could not flush sound hits, retrying later")
+
+    async def flush_sound_hits(self) -> int:
+        """
+        Write the plays of sounds that are buffered in memory to the database.
+        The buffer only exists in this process, so the web app calls this
+        through the AppRequestServer before it shows the plays of sounds.
+        """
+        rows = await self.async_meta_database.flush_sound_hits()
+        if rows > 0:
+            logger.bind(event="flush_sound_hits", rows=rows).debug("Flushed sound hits")
+
+        return rows
+
     async def close(self):
         await super().close()
 
+        if self.app_request_server is not None:
+            self.app_request_server.close()
+
+        try:
+            await self.async_meta_database.flush_sound_hits()
+        except Exception:
+            logger.bind(event="flush_sound_hits").exception("Could not flush sound hits on shutdown")
+
+        self.async_meta_database.close()
+        for database in self.async_game_databases.values():
+            database.close()
+
         self.api_clients["cs2"].close()
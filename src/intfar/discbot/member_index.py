@@ -0,0 +1,159 @@
+from itertools import count
+
+def normalize_name(name: str) -> str:
+    return name.lower()
+
+def _get_ngrams(name: str, size: int) -> set[str]:
+    return {name[index:index + size] for index in range(len(name) - size + 1)}
+
+class GuildMemberIndex:
+    """
+    Index of the members of a Discord guild, for looking them up by ID and by name.
+
+    Names of members (their global name, nickname, display name, and username)
+    are indexed both by their full normalized value, for exact matches, and by
+    their n-grams, so that names containing a search string can be found without
+    checking the names of every member.
+    """
+    NGRAM_SIZE = 3
+
+    def __init__(self, members=()):
+        """
+        Initialize the index.
+
+        ### Parameters
+        :param members: Members of the guild to add to the index
+        """
+        self.members = {}
+        self._order: dict[int, int] = {}
+        self._counter = count()
+        self._names: dict[int, list[str]] = {}
+        self._exact: dict[str, set[int]] = {}
+        self._ngrams: dict[str, set[int]] = {}
+
+        for member in members:
+            self.add(member)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, member_id: int):
+        return member_id in self.members
+
+    def get(self, member_id: int):
+        return self.members.get(member_id)
+
+    def add(self, member):
+        """
+        Add a member to the index, or update the names of a member already in it.
+        """
+        if member.id in self.members:
+            self._remove_names(member.id)
+        else:
+            # Members are kept in the order they were added, like in the guild
+            self._order[member.id] = next(self._counter)
+
+        self.members[member.id] = member
+
+        names = []
+        for attribute in (member.global_name, member.nick, member.display_name, member.name):
+            if attribute is not None and normalize_name(attribute) not in names:
+                names.append(normalize_name(attribute))
+
+        self._names[member.id] = names
+        for name in names:
+            self._exact.setdefault(name, set()).add(member.id)
+            for ngram in _get_ngrams(name, self.NGRAM_SIZE):
+                self._ngrams.setdefault(ngram, set()).add(member.id)
+
+    def remove(self, member_id: int):
+        if member_id not in self.members:
+            return
+
+        self._remove_names(member_id)
+        del self.members[member_id]
+        del self._order[member_id]
+
+    def _remove_names(self, member_id: int):
+        for name in self._names.pop(member_id):
+            self._discard(self._exact, name, member_id)
+            for ngram in _get_ngrams(name, self.NGRAM_SIZE):
+                self._discard(self._ngrams, ngram, member_id)
+
+    def _discard(self, index: dict[str, set[int]], key: str, member_id: int):
+        member_ids = index[key]
+        member_ids.discard(member_id)
+        if not member_ids:
+            del index[key]
+
+    def find_exact(self, name: str) -> int | None:
+        """
+        Get the ID of the first member with a name equal to `name`, ignoring case.
+        """
+        member_ids = self._exact.get(normalize_name(name))
+        if not member_ids:
+            return None
+
+        return min(member_ids, key=self._order.get)
+
+    def find_partial(self, name: str) -> list[int]:
+        """
+        Get the IDs of all members with a name containing `name`, ignoring case.
+        """
+        name = normalize_name(name)
+        ngrams = _get_ngrams(name, self.NGRAM_SIZE)
+
+        if ngrams:
+            # Only members that have every n-gram of the search string can match it
+            candidates = None
+            for ngram in sorted(ngrams, key=lambda ngram: len(self._ngrams.get(ngram, ()))):
+                member_ids = self._ngrams.get(ngram, set())
+                candidates = set(member_ids) if candidates is None else candidates & member_ids
+                if not candidates:
+                    return []
+        else:
+            candidates = self.members.keys()
+
+        matches = [member_id for member_id in candidates if any(name in member_name for member_name in self._names[member_id])]
+        return sorted(matches, key=self._order.get)
+
+class MemberIndex:
+    """
+    Indexes of the members of every guild that the Discord client is in.
+    The index for a guild is built from its members the first time it is used,
+    and is kept up to date by the member events of the Discord client.
+    """
+    def __init__(self):
+        self._guilds: dict[int, GuildMemberIndex] = {}
+
+    def rebuild(self, guild) -> GuildMemberIndex:
+        self._guilds[guild.id] = GuildMemberIndex(guild.members)
+        return self._guilds[guild.id]
+
+    def get_guild_index(self, guild) -> GuildMemberIndex:
+        index = self._guilds.get(guild.id)
+        if index is None:
+            index = self.rebuild(guild)
+
+        return index
+
+    def remove_guild(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def add_member(self, guild_id: int, member):
+        if guild_id in self._guilds:
+            self._guilds[guild_id].add(member)
+
+    def remove_member(self, guild_id: int, member_id: int):
+        if guild_id in self._guilds:
+            self._guilds[guild_id].remove(member_id)
+
+    def update_user(self, user_id: int):
+        """
+        Update the names of a user in every guild they are a member of,
+        fx. after they have changed their username.
+        """
+        for index in self._guilds.values():
+            member = index.get(user_id)
+            if member is not None:
+                index.add(member)
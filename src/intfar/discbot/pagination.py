@@ -0,0 +1,160 @@
+import asyncio
+import sys
+from collections import OrderedDict
+from time import time
+from typing import Any, Callable
+
+from mhooge_flask.logging import logger
+
+def get_memory_size(value: Any) -> int:
+    """
+    Get the approximate size in bytes of the given value,
+    including the items of lists, tuples and dicts in it.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(get_memory_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(get_memory_size(key) + get_memory_size(item) for key, item in value.items())
+
+    return size
+
+class ListPages:
+    """
+    Page provider for `DiscordClient.paginate` that shows a list of items,
+    fx. rows from the database. If `format_item` is given, items are only
+    formatted as lines of text when the page they are on is shown.
+    """
+    def __init__(self, items: list, format_item: Callable[[Any], str] = None):
+        """
+        Initialize the ListPages.
+
+        ### Parameters
+        :param items:       List of items to show
+        :param format_item: Function that formats an item as a line of text
+        """
+        self.items = items
+        self.format_item = format_item
+
+    @property
+    def memory_size(self) -> int:
+        return get_memory_size(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    async def __call__(self, start: int, end: int) -> list[str]:
+        lines = self.items[start:end]
+        if self.format_item is None:
+            return lines
+
+        return [self.format_item(item) for item in lines]
+
+class PaginationStore:
+    """
+    Stores the state of paginated messages, so that they can be flipped through
+    with reactions. The store is bounded both in the amount of messages and the
+    approximate memory used by their page providers. When it is full, the least
+    recently used messages are removed. Messages older than `ttl` are removed
+    by `sweep`, which is called periodically by `run_sweeper`.
+    """
+    def __init__(self, max_entries: int = 500, max_size: int = 32 * 1024 ** 2, ttl: int = 60 * 60 * 12):
+        """
+        Initialize the PaginationStore.
+
+        ### Parameters
+        :param max_entries: Maximum amount of paginated messages to store
+        :param max_size:    Maximum approximate memory size of all the stored
+                            page providers, in bytes
+        :param ttl:         Amount of seconds that paginated messages are stored for
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict[int, dict] = OrderedDict()
+
+        # Sizes of entries are calculated once, when they are stored
+        self._sizes: dict[int, int] = {}
+        self._total_size = 0
+
+    def _entry_size(self, entry: dict) -> int:
+        return getattr(entry["data"], "memory_size", 0)
+
+    def _remove(self, message_id: int) -> dict:
+        self._total_size -= self._sizes.pop(message_id)
+        return self._entries.pop(message_id)
+
+    def _is_expired(self, entry: dict, now: float) -> bool:
+        return now - entry["message"].created_at.timestamp() > self.ttl
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, message_id: int) -> dict:
+        """
+        Get the pagination data for the message with the given ID,
+        or None if the message is not stored or has expired.
+        """
+        entry = self._entries.get(message_id)
+        if entry is None:
+            return None
+
+        if self._is_expired(entry, time()):
+            self._remove(message_id)
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(message_id)
+        return entry
+
+    def put(self, message_id: int, entry: dict):
+        """
+        Store pagination data for the message with the given ID,
+        removing the least recently used messages if the store is full.
+        """
+        if message_id in self._entries:
+            self._remove(message_id)
+
+        size = self._entry_size(entry)
+        self._entries[message_id] = entry
+        self._sizes[message_id] = size
+        self._total_size += size
+
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._total_size > self.max_size):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def sweep(self):
+        """
+        Remove all expired messages.
+        """
+        now = time()
+        expired = [message_id for message_id, entry in self._entries.items() if self._is_expired(entry, now)]
+        for message_id in expired:
+            self._remove(message_id)
+
+        self.expirations += len(expired)
+
+    def get_metrics(self) -> dict[str, int]:
+        """
+        Get the amount of stored messages, the approximate memory used by them,
+        and how many messages have been evicted or have expired.
+        """
+        return {
+            "entries": len(self._entries),
+            "memory_size": self._total_size,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    async def run_sweeper(self, interval: int = 60 * 10):
+        """
+        Periodically remove expired messages and log metrics for the store.
+        """
+        while True:
+            await asyncio.sleep(interval)
+
+            self.sweep()
+            logger.bind(event="pagination_store", **self.get_metrics()).debug("Swept pagination store")
@@ -77,7 +77,6 @@ def main(flask_port: int):
     game_databases = {game: get_database_client(game, config) for game in SUPPORTED_GAMES}
 
     meta_database = MetaDatabase(config)
-    meta_database.clear_command_queue()
 
     # Convert database user dicts to synchronized proxies so they're synced across processes
     meta_database.all_users = sync_manager.dict(meta_database.all_users)
@@ -85,7 +84,7 @@ def main(flask_port: int):
         game_database.game_users = sync_manager.dict(game_database.game_users)
 
     logger.info("Initializing game API clients...")
-    proxy_manager = ProxyManager(SteamAPIClient, "cs2", meta_database)
+    proxy_manager = ProxyManager(SteamAPIClient, "cs2")
 
     api_clients = {
         "lol": RiotAPIClient("lol", config),
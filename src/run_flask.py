@@ -14,10 +14,12 @@ from intfar.api.game_apis import get_api_client
 from intfar.api.game_api_client import GameAPIClient
 from intfar.api.game_databases import get_database_client
 from intfar.api.meta_database import MetaDatabase
+from intfar.api.member_snapshot import MemberSnapshot
 from intfar.api.bets import get_betting_handler
 from intfar.api.game_database import GameDatabase
 from intfar.api.betting import BettingHandler
 from intfar.api.config import Config
+from intfar.discbot.app_listener import AppRequestClient
 
 def run_app(
     port: int,
@@ -66,15 +68,14 @@ def run_app(
         propagate_exceptions=False,
         app_config=config,
         bet_handlers=bet_handlers,
-        bot_conn=bot_pipe,
+        bot_conn=None if bot_pipe is None else AppRequestClient(bot_pipe),
         current_game=None,
-        logged_in_users={},
+        logged_in_users=util.UserDetailsCache(),
+        member_snapshot=MemberSnapshot(config.member_snapshot_file),
         game_api_clients=api_clients,
         active_game={guild_id: {} for guild_id in GUILD_IDS},
         game_prediction={},
         user_count=0,
-        conn_map={},
-        conn_lock=Lock(),
         max_content_length=1024 * 512, # 500 KB limit for uploaded sounds
         now_playing=None,
         jeoparty_info={},
@@ -87,6 +88,7 @@ def run_app(
 
     # Misc. routing handling.
     web_app.before_request(util.before_request)
+    web_app.after_request(util.log_discord_round_trips)
     web_app.register_error_handler(500, route_errors.handle_internal_error)
     web_app.register_error_handler(404, route_errors.handle_missing_page_error)
 
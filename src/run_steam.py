@@ -1,81 +1,126 @@
 import asyncio
 from inspect import iscoroutinefunction
 from time import time
-from gevent import monkey, sleep
+from gevent import monkey, spawn
+from gevent.lock import Semaphore
 monkey.patch_all()
 
+from multiprocessing.connection import Connection
+
 from mhooge_flask.logging import logger
 
 from intfar.api.config import Config, Environment
-from intfar.api.meta_database import MetaDatabase
+from intfar.api.proxy import connect_worker
 from intfar.api.game_apis.cs2 import SteamAPIClient
 from argparse import ArgumentParser
 
 RELOG_INTERVAL = 60 * 60 * 24
 
-async def listen(database: MetaDatabase, client: SteamAPIClient):
-    target_name = client.__class__.__name__
-    sleep_time = 0.25
-    time_since_relog = time()
-    close = False
-
-    while True:
-        for cmd_id, command, args in database.get_queued_commands(target_name):
-            if command == "close":
-                close = True
-                break
+# Results are sent from both greenlets and asyncio tasks, and sending a large
+# result can yield to another greenlet, so only one result is sent at a time
+_send_lock = Semaphore()
 
+def send_result(conn: Connection, cmd_id: int, result):
+    with _send_lock:
+        try:
+            conn.send((cmd_id, result))
+        except Exception:
+            logger.exception(f"Could not send result of command {cmd_id} from run_steam!")
             try:
-                result = getattr(client, command)
-
-                if (
-                    (iscoroutinefunction(result) or callable(result))
-                    and time() - time_since_relog > RELOG_INTERVAL
-                    and (not client.is_logged_in() or not client.cs_client.ready)
-                ):
-                    # Check if we need to relog (Steam sometimes disconnects randomly)
-                    logger.warning("Steam or CS2 client disconnected, trying to relog...")
-                    client.login()
-                    client.cs_client.launch()
-                    time_since_relog = time()
-
-                if iscoroutinefunction(result):
-                    result = await result(*args)
-                elif callable(result):
-                    result = result(*args)
-            except AttributeError:
-                result = None
+                conn.send((cmd_id, None))
             except Exception:
-                logger.exception(f"Error in run_steam when calling '{command}'!")
-                result = None
+                logger.exception(f"Could not send empty result of command {cmd_id} from run_steam!")
 
-            database.set_command_result(cmd_id, target_name, result)
+def run_command(conn: Connection, cmd_id: int, command: str, func, args):
+    try:
+        result = func(*args)
+    except Exception:
+        logger.exception(f"Error in run_steam when calling '{command}'!")
+        result = None
 
-        if close:
-            break
+    send_result(conn, cmd_id, result)
 
-        try:
-            sleep(sleep_time)
-            await asyncio.sleep(sleep_time)
-        except KeyboardInterrupt:
-            pass
+async def run_async_command(conn: Connection, cmd_id: int, command: str, func, args):
+    try:
+        result = await func(*args)
+    except Exception:
+        logger.exception(f"Error in run_steam when calling '{command}'!")
+        result = None
+
+    send_result(conn, cmd_id, result)
+
+async def listen(conn: Connection, client: SteamAPIClient):
+    time_since_relog = time()
+    tasks = set()
+
+    # Wake up when a command arrives. The event loop waits in a selector that is
+    # patched by gevent, so greenlets that are running commands keep going meanwhile.
+    loop = asyncio.get_running_loop()
+    readable = asyncio.Event()
+    loop.add_reader(conn.fileno(), readable.set)
+
+    try:
+        while True:
+            await readable.wait()
+            readable.clear()
+
+            while conn.poll():
+                cmd_id, command, args = conn.recv()
+                if command == "close":
+                    return
+
+                try:
+                    result = getattr(client, command)
+
+                    if (
+                        (iscoroutinefunction(result) or callable(result))
+                        and time() - time_since_relog > RELOG_INTERVAL
+                        and (not client.is_logged_in() or not client.cs_client.ready)
+                    ):
+                        # Check if we need to relog (Steam sometimes disconnects randomly)
+                        logger.warning("Steam or CS2 client disconnected, trying to relog...")
+                        client.login()
+                        client.cs_client.launch()
+                        time_since_relog = time()
+
+                    # Run commands concurrently, their results are sent back when they finish
+                    if iscoroutinefunction(result):
+                        task = asyncio.create_task(run_async_command(conn, cmd_id, command, result, args))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                        continue
+                    elif callable(result):
+                        spawn(run_command, conn, cmd_id, command, result, args)
+                        continue
+                except AttributeError:
+                    result = None
+                except Exception:
+                    logger.exception(f"Error in run_steam when calling '{command}'!")
+                    result = None
+
+                send_result(conn, cmd_id, result)
+
+    finally:
+        loop.remove_reader(conn.fileno())
 
 if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("game")
+    parser.add_argument("--address", required=True)
     args = parser.parse_args()
 
     logger.info("Starting Steam command handler process")
 
     config = Config()
-    database = MetaDatabase(config)
 
     if config.env is Environment.DEVELOPMENT:
         exit(0)
 
+    client = None
     try:
+        conn = connect_worker(args.address, SteamAPIClient.__name__)
         client = SteamAPIClient(args.game, config)
-        asyncio.run(listen(database, client))
+        asyncio.run(listen(conn, client))
 
     except Exception as exc:
         print(exc)
@@ -1,7 +1,6 @@
 from argparse import ArgumentParser
 import asyncio
 from glob import glob
-import bz2
 import os
 
 from intfar.api.config import Config
@@ -25,18 +24,12 @@ async def download_single_demo(config, steam_api, sharecode):
     round_stats = game_stats["matches"][0]["roundstatsall"]
     demo_url = round_stats[-1]["map"]
 
-    filename = await steam_api.download_demo_file(demo_file, demo_url)
-    with open(filename + ".dem.bz2", "rb") as fp:
-        all_bytes = fp.read()
-
-    # Decompress the gz2 compressed demo file
-    decompressed = bz2.decompress(all_bytes)
-    with open(filename + ".dem", "wb") as fp:
-        fp.write(decompressed)
-
-    os.remove(filename + ".dem.bz2")
+    # The demo is decompressed while downloading
+    stats = await steam_api.download_demo_file(demo_file, demo_url)
+    if stats is None:
+        return
 
-    print(f"Downloaded demo to {filename}.dem")
+    print(f"Downloaded demo to {demo_file}.dem")
 
 async def download_missing_demos(config, database, steam_api, sharecode):
     user = database.game_users[ADMIN_DISC_ID]
@@ -71,8 +64,13 @@ async def parse_missing_demos(config, database, steam_api, sharecode):
         game_data = await steam_api.get_basic_match_info(curr_sharecode)
         game_data["gameId"] = sharecode
 
-        parser = DemoParser(demofile=file)
-        game_data.update(parser.parse())
+        demo_game_data = steam_api.demo_cache.get(curr_sharecode)
+        if demo_game_data is None:
+            parser = DemoParser(demofile=file)
+            demo_game_data = parser.parse()
+            steam_api.demo_cache.put(curr_sharecode, demo_game_data)
+
+        game_data.update(demo_game_data)
         game_data["demo_parse_status"] = "parsed"
 
         active_players = []
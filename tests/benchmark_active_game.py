@@ -0,0 +1,145 @@
+"""
+Compare how long it takes to look for an active League game among the players in
+voice, when match histories are fetched one by one, like the game monitor used to do,
+and when they are fetched concurrently under the shared rate limits. Requests are
+answered by a simulated Riot API with latency and rate limits. Run from the root
+of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_active_game [--players 5 20 50] [--guilds 2]
+"""
+from argparse import ArgumentParser
+import asyncio
+from collections import deque
+import json
+from time import monotonic, perf_counter
+
+import httpx
+
+from intfar.api.config import Config
+from intfar.api.game_apis.lol import RiotAPIClient
+from intfar.api.game_databases import get_database_client
+from intfar.api.game_monitors.lol import LoLGameMonitor
+from intfar.api.meta_database import MetaDatabase
+from intfar.api.user import User
+from intfar.api.util import GUILD_IDS
+
+_RATE_LIMITS = [(500, 10), (30000, 600)]
+_LATENCY = 0.1
+_GAME_ID = 6000000001
+
+class _MockRiotServer:
+    def __init__(self):
+        self.requests = 0
+        self.rejected = 0
+        self._timestamps = deque()
+
+    async def handle(self, request: httpx.Request):
+        await asyncio.sleep(_LATENCY)
+
+        now = monotonic()
+        counts = [sum(1 for timestamp in self._timestamps if timestamp > now - seconds) for _, seconds in _RATE_LIMITS]
+        headers = {"X-App-Rate-Limit": ",".join(f"{count}:{seconds}" for count, seconds in _RATE_LIMITS)}
+
+        if any(count >= limit for count, (limit, _) in zip(counts, _RATE_LIMITS)):
+            self.rejected += 1
+            headers["Retry-After"] = "1"
+            return httpx.Response(429, headers=headers)
+
+        self.requests += 1
+        self._timestamps.append(now)
+        headers["X-App-Rate-Limit-Count"] = ",".join(
+            f"{count + 1}:{seconds}" for count, (_, seconds) in zip(counts, _RATE_LIMITS)
+        )
+
+        # Every other player has just played a game together
+        player = int(request.url.path.split("/")[-2].removeprefix("puuid_"))
+        matches = [f"EUW1_{_GAME_ID}"] if player % 2 == 0 and request.url.params.get("type") == "ranked" else []
+
+        return httpx.Response(200, headers=headers, text=json.dumps(matches))
+
+class _BenchmarkRiotAPI(RiotAPIClient):
+    def __init__(self, game: str, config: Config, server: _MockRiotServer):
+        self.server = server
+        super().__init__(game, config)
+
+    def _create_http_client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.server.handle))
+
+    def get_latest_data(self):
+        pass
+
+async def _get_active_game_info_serially(game_monitor: LoLGameMonitor, guild_id: int):
+    # The way match histories were fetched before they were fetched concurrently
+    user_dict = dict(game_monitor.users_in_voice.get(guild_id, {}))
+
+    game_ids = {}
+    for disc_id in user_dict:
+        user_data = user_dict[disc_id]
+
+        for puuid, name in zip(user_data.player_id, user_data.player_name):
+            matches = await game_monitor.api_client.get_match_history(puuid, game_monitor.latest_game_timestamp.get(guild_id))
+            await asyncio.sleep(0.5)
+            matches += await game_monitor.api_client.get_match_history(puuid, game_monitor.latest_game_timestamp.get(guild_id), game_type="normal")
+            matches = sorted(set(matches))
+
+            for game_id in matches:
+                if game_id not in game_monitor.latest_game_id[guild_id]:
+                    game_ids.setdefault(str(game_id), []).append(User(disc_id, user_data.secret, name, puuid))
+
+            await asyncio.sleep(1)
+
+        await asyncio.sleep(2)
+
+    for game_id, users_in_game in game_ids.items():
+        if len(users_in_game) > 1 and not game_monitor.game_database.game_exists(game_id):
+            return {"id": game_id}, users_in_game, None
+
+    return None, {}, None
+
+async def _run_poll(config: Config, meta_database, game_database, num_players: int, num_guilds: int, serially: bool):
+    server = _MockRiotServer()
+    api_client = _BenchmarkRiotAPI("lol", config, server)
+    game_monitor = LoLGameMonitor("lol", config, meta_database, game_database, api_client)
+
+    users = [User(disc_id, f"secret_{disc_id}", [f"name_{disc_id}"], [f"puuid_{disc_id}"]) for disc_id in range(num_players)]
+    guild_ids = GUILD_IDS[:num_guilds]
+    for guild_id in guild_ids:
+        game_monitor.users_in_voice[guild_id] = {user.disc_id: user for user in users}
+        game_monitor.latest_game_id[guild_id] = []
+
+    get_active_game_info = _get_active_game_info_serially if serially else LoLGameMonitor.get_active_game_info
+
+    # Every server polls for games at the same time
+    start = perf_counter()
+    results = await asyncio.gather(*[get_active_game_info(game_monitor, guild_id) for guild_id in guild_ids])
+    duration = perf_counter() - start
+
+    assert all(game_info["id"] == str(_GAME_ID) for game_info, _, _ in results)
+
+    return duration, server.requests, server.rejected, game_monitor.get_poll_interval(guild_ids[0])
+
+def run_benchmark(player_counts: list[int], num_guilds: int):
+    config = Config()
+    config.database_folder += "/benchmark"
+    meta_database = MetaDatabase(config)
+    game_database = get_database_client("lol", config)
+
+    for num_players in player_counts:
+        print(f"{num_players} players in voice in {num_guilds} servers:")
+        for name, serially in (("serial", True), ("concurrent", False)):
+            duration, requests, rejected, interval = asyncio.run(
+                _run_poll(config, meta_database, game_database, num_players, num_guilds, serially)
+            )
+            print(
+                f"{name:>12}: {duration:7.2f} s, {requests:4d} requests, {rejected:3d} rate limited, "
+                f"next poll in {interval:.0f} s"
+            )
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--players", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--guilds", type=int, default=2)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.players, args.guilds)
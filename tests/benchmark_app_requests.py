@@ -0,0 +1,190 @@
+"""
+Compare latency, throughput and idle CPU usage of requests from the web app to
+the Discord client, when they are sent through the old app listener, which polled
+a pipe per session, and through the AppRequestServer. A number of concurrent web
+sessions each send requests for nicknames, and sometimes avatars, which are slow.
+Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_app_requests [--sessions 50] [--requests 40]
+"""
+from argparse import ArgumentParser
+import asyncio
+from concurrent.futures import TimeoutError as FutureTimeout, CancelledError
+from multiprocessing import Pipe
+from multiprocessing.connection import wait
+from threading import Lock, Thread
+from time import perf_counter, process_time, sleep, time
+import random
+
+from tests.mocks.app_requests import MockDiscordClient, start_app_request_server, stop_app_request_server
+
+class _LegacyDiscordClient(MockDiscordClient):
+    def __init__(self, flask_conn, avatar_delay: float):
+        super().__init__(avatar_delay)
+        self.flask_conn = flask_conn
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+def _legacy_listen_for_request(disc_client, event_loop):
+    # Copy of the polling loop from the old app_listener.listen_for_request
+    max_timeout = 60
+    timeouts = {}
+    connections = {0: disc_client.flask_conn}
+
+    while not disc_client.is_closed():
+        for conn in wait(connections.values(), 0.001):
+            try:
+                conn_id, command_types, commands, paramses = conn.recv()
+            except EOFError:
+                for conn_id in [conn_id for conn_id in connections if connections[conn_id] == conn]:
+                    timeouts.pop(conn_id, None)
+                    connections.pop(conn_id).close()
+                continue
+
+            results = []
+
+            for (command_type, command, params) in zip(command_types, commands, paramses):
+                result = None
+                if command_type == "register":
+                    our_conn, new_conn = Pipe()
+                    connections[conn_id] = our_conn
+                    timeouts[conn_id] = time()
+                    result = new_conn
+
+                elif command_type == "func":
+                    result = getattr(disc_client, command)(*params)
+                    if asyncio.iscoroutine(result):
+                        try:
+                            future = asyncio.run_coroutine_threadsafe(result, event_loop)
+                            result = future.result(5)
+                        except (FutureTimeout, CancelledError):
+                            result = None
+
+                results.append(result)
+
+            conn.send(results)
+
+        now = time()
+        for conn_id in list(timeouts):
+            if now - timeouts[conn_id] > max_timeout:
+                del timeouts[conn_id]
+                connections.pop(conn_id).close()
+
+        sleep(0.01)
+
+class _LegacySession:
+    # Copy of the old register_discord_connection and discord_request for one session
+    def __init__(self, sess_id: int, bot_conn, conn_lock: Lock):
+        with conn_lock:
+            bot_conn.send((sess_id, ["register"], [None], [(None,)]))
+            bot_conn.poll(15)
+            self.pipe = bot_conn.recv()[0]
+
+        self.sess_id = sess_id
+
+    def request(self, command_types, commands, paramses):
+        self.pipe.send((self.sess_id, command_types, commands, paramses))
+        self.pipe.poll(15)
+        return self.pipe.recv()
+
+def _get_commands(num_requests: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        ("get_discord_avatar", (index, 64)) if rng.random() < 0.1 else ("get_discord_nick", (index,))
+        for index in range(num_requests)
+    ]
+
+def _run_sessions(create_session, num_sessions: int, num_requests: int, idle_time: float):
+    sessions = [create_session(sess_id) for sess_id in range(1, num_sessions + 1)]
+    latencies = {"get_discord_nick": [], "get_discord_avatar": []}
+    errors = []
+    lock = Lock()
+
+    def run_session(sess_id, session):
+        for command, params in _get_commands(num_requests, sess_id):
+            start = perf_counter()
+            result = session.request(["func"], [command], [params])
+            duration = perf_counter() - start
+
+            expected = MockDiscordClient().get_discord_nick(*params) if command == "get_discord_nick" else f"avatar_{params[0]}_64.png"
+            with lock:
+                latencies[command].append(duration)
+                if result != [expected]:
+                    errors.append((command, params, result))
+
+    threads = [Thread(target=run_session, args=args) for args in enumerate(sessions, start=1)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    total_time = perf_counter() - start
+
+    # Measure CPU usage while the sessions are still connected, but not sending requests
+    idle_cpu = _idle_cpu(idle_time)
+
+    return total_time, latencies, errors, idle_cpu
+
+def _idle_cpu(duration: float):
+    start = process_time()
+    sleep(duration)
+    return (process_time() - start) / duration
+
+def _percentile(values: list[float], percentile: float):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile))]
+
+def _print_results(name: str, total_time: float, latencies: dict, errors: list, idle_cpu: float, num_requests: int):
+    print(f"{name}:")
+    print(f"    Throughput: {num_requests / total_time:8.1f} requests/s ({total_time:.2f} s total)")
+    for command, values in latencies.items():
+        print(
+            f"    {command:>18}: p50 {_percentile(values, 0.5) * 1000:7.1f} ms, "
+            f"p95 {_percentile(values, 0.95) * 1000:7.1f} ms, max {max(values) * 1000:7.1f} ms"
+        )
+
+    print(f"    Idle CPU usage: {idle_cpu * 100:.1f}%")
+    print(f"    Wrong results: {len(errors)}")
+
+def run_benchmark(num_sessions: int, num_requests: int, avatar_delay: float, idle_time: float):
+    total_requests = num_sessions * num_requests
+    print(f"{num_sessions} sessions sending {num_requests} requests each, avatars take {avatar_delay * 1000:.0f} ms")
+
+    # Old app listener, polling a pipe per session in a thread
+    event_loop = asyncio.new_event_loop()
+    Thread(target=event_loop.run_forever, daemon=True).start()
+
+    flask_end, bot_end = Pipe()
+    legacy_client = _LegacyDiscordClient(bot_end, avatar_delay)
+    Thread(target=_legacy_listen_for_request, args=(legacy_client, event_loop), daemon=True).start()
+
+    conn_lock = Lock()
+    total_time, latencies, errors, idle_cpu = _run_sessions(
+        lambda sess_id: _LegacySession(sess_id, flask_end, conn_lock), num_sessions, num_requests, idle_time
+    )
+    legacy_client.closed = True
+    event_loop.call_soon_threadsafe(event_loop.stop)
+    _print_results("Pipe per session", total_time, latencies, errors, idle_cpu, total_requests)
+
+    sleep(0.1)
+
+    # AppRequestServer, with one connection shared by all sessions
+    client, server, event_loop = start_app_request_server(MockDiscordClient(avatar_delay))
+    total_time, latencies, errors, idle_cpu = _run_sessions(lambda _: client, num_sessions, num_requests, idle_time)
+    stop_app_request_server(client, server, event_loop)
+    _print_results("AppRequestServer", total_time, latencies, errors, idle_cpu, total_requests)
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--avatar-delay", type=float, default=0.05)
+    parser.add_argument("--idle-time", type=float, default=3)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.sessions, args.requests, args.avatar_delay, args.idle_time)
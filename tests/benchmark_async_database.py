@@ -0,0 +1,68 @@
+"""
+Compare how long the event loop is blocked when queries used by Discord commands
+are run directly on the database, like commands used to do, and when they are run
+through AsyncDatabase. Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_async_database [--game lol] [--games 20000]
+"""
+from argparse import ArgumentParser
+import asyncio
+from time import perf_counter
+
+from intfar.api.async_database import AsyncDatabase
+from intfar.api.util import EventLoopBlockingMonitor
+from tests.benchmark_performance_score import _create_database, _USERS
+
+_QUERIES = {
+    "intfar_relations": lambda database, disc_id: database.get_intfar_relations(disc_id),
+    "doinks_relations": lambda database, disc_id: database.get_doinks_relations(disc_id),
+    "performance_score": lambda database, disc_id: database.get_performance_score_query(disc_id)(),
+}
+
+async def _run_command(name: str, database, disc_id: int, use_facade: bool):
+    async with EventLoopBlockingMonitor() as monitor:
+        if use_facade:
+            await database.read(_QUERIES[name], disc_id)
+        else:
+            _QUERIES[name](database, disc_id)
+
+    return monitor.max_blocked_time
+
+async def _run_all(database, use_facade: bool):
+    # Run every command for every user at the same time, like in a busy server
+    commands = [(name, disc_id) for name in _QUERIES for disc_id, _ in _USERS]
+
+    start = perf_counter()
+    async with EventLoopBlockingMonitor() as monitor:
+        blocked_times = await asyncio.gather(
+            *[_run_command(name, database, disc_id, use_facade) for name, disc_id in commands]
+        )
+
+    per_command = {}
+    for (name, _), blocked_time in zip(commands, blocked_times):
+        per_command[name] = max(per_command.get(name, 0), blocked_time)
+
+    return per_command, monitor.max_blocked_time, perf_counter() - start
+
+def run_benchmark(game: str, num_games: int):
+    print(f"Creating {game} database with {num_games} games...")
+    database = _create_database(game, num_games)
+    async_database = AsyncDatabase(database)
+
+    for name, use_facade in (("sync", False), ("async", True)):
+        per_command, max_blocked, duration = asyncio.run(_run_all(async_database if use_facade else database, use_facade))
+
+        print(f"{name:>5}: total {duration:6.2f} s, longest event loop block {max_blocked * 1000:8.1f} ms")
+        for command, blocked_time in per_command.items():
+            print(f"       {command:>18}: longest block {blocked_time * 1000:8.1f} ms")
+
+    async_database.close()
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--game", default="lol")
+    parser.add_argument("--games", type=int, default=20000)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.game, args.games)
@@ -0,0 +1,109 @@
+"""
+Compare the gaps between sounds in a queue of URLs, and how long the event loop
+is blocked, when sounds are downloaded with blocking processes once they reach
+the front of the queue, like before, and when they are downloaded with async
+processes and prefetched by AudioIngestion. Downloads and playback are simulated
+with processes and sleeps of the given durations. Run from the root of the
+repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_audio_ingestion [--sounds 6] [--download-time 1.5]
+"""
+from argparse import ArgumentParser
+import asyncio
+from subprocess import Popen, PIPE
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from intfar.api.audio_ingestion import AudioIngestion, run_process
+
+def _download_args(folder: str, download_time: float):
+    path = f"{folder}/sound.mp3"
+    code = f"import time; time.sleep({download_time}); open({path!r}, 'wb').write(b'0' * 1000); print({path!r})"
+    return [sys.executable, "-c", code]
+
+async def _measure_loop_stall(stop: asyncio.Event):
+    # Longest time the event loop was unable to run a task that wakes up every 10 ms
+    longest = 0
+    while not stop.is_set():
+        before = perf_counter()
+        await asyncio.sleep(0.01)
+        longest = max(longest, perf_counter() - before - 0.01)
+
+    return longest
+
+async def _play_queue(get_sound, release_sound, on_dequeue, queue: list, play_time: float):
+    gaps = []
+    playback_ended = None
+    while queue:
+        entry = queue.pop(0)
+        on_dequeue(entry, queue)
+        path = await get_sound(entry)
+
+        if playback_ended is not None:
+            gaps.append(perf_counter() - playback_ended)
+
+        await asyncio.sleep(play_time)
+        playback_ended = perf_counter()
+        release_sound(entry, path)
+
+    return gaps
+
+async def _run_blocking(num_sounds: int, download_time: float, play_time: float, folder: str):
+    # Copy of how AudioHandler downloaded sounds before, with Popen in a coroutine
+    async def get_sound(entry):
+        process = Popen(_download_args(folder, download_time), stdout=PIPE, stderr=PIPE, text=True)
+        stdout, _ = process.communicate()
+        return stdout.strip()
+
+    queue = [(f"https://youtube.com/{index}", None, "url") for index in range(num_sounds)]
+    return await _play_queue(get_sound, lambda *_: None, lambda *_: None, queue, play_time)
+
+async def _run_prefetched(num_sounds: int, download_time: float, play_time: float, folder: str):
+    async def download(url: str, download_folder: str):
+        returncode, stdout, _ = await run_process(*_download_args(download_folder, download_time))
+        return returncode == 0, stdout.strip()
+
+    async def probe(path: str):
+        return play_time
+
+    ingestion = AudioIngestion(download, probe, temp_folder=folder)
+
+    async def get_sound(entry):
+        return (await ingestion.get(entry))[1]
+
+    def on_dequeue(entry, queue):
+        ingestion.start(entry)
+        ingestion.prefetch(queue)
+
+    queue = [(f"https://youtube.com/{index}", None, "url") for index in range(num_sounds)]
+    return await _play_queue(get_sound, lambda entry, _: ingestion.release(entry), on_dequeue, queue, play_time)
+
+async def _run(func, *args):
+    stop = asyncio.Event()
+    stall_task = asyncio.create_task(_measure_loop_stall(stop))
+    gaps = await func(*args)
+    stop.set()
+
+    return gaps, await stall_task
+
+def run_benchmark(num_sounds: int, download_time: float, play_time: float):
+    print(f"{num_sounds} sounds in queue, downloads take {download_time:.1f} s, sounds play for {play_time:.1f} s")
+
+    for name, func in (("Blocking, no prefetch", _run_blocking), ("AudioIngestion", _run_prefetched)):
+        with TemporaryDirectory() as folder:
+            gaps, stall = asyncio.run(_run(func, num_sounds, download_time, play_time, folder))
+
+        print(f"{name}:")
+        print(f"    Gap between sounds: avg {sum(gaps) / len(gaps) * 1000:7.1f} ms, max {max(gaps) * 1000:7.1f} ms")
+        print(f"    Longest event loop stall: {stall * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--sounds", type=int, default=6)
+    parser.add_argument("--download-time", type=float, default=1.5)
+    parser.add_argument("--play-time", type=float, default=2)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.sounds, args.download_time, args.play_time)
@@ -0,0 +1,129 @@
+"""
+Compare how long it takes to resolve the active bets after a game when bets are
+resolved one at a time, like DiscordClient.resolve_bets used to do, and when
+they are resolved in a batch by BettingHandler.resolve_bets. Return ratios are
+calculated without the bet odds cache in the one-at-a-time case, like they used to be.
+Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_bet_resolution [--bets 100 500] [--games 20000]
+"""
+from argparse import ArgumentParser
+import random
+
+from intfar.api.bets import get_betting_handler
+from intfar.api.betting import Bet, BettingHandler
+from intfar.api.game_data.lol import LoLGameStats, LoLPlayerStats
+from intfar.api.meta_database import MetaDatabase
+from intfar.api.util import MAIN_GUILD_ID
+from tests.benchmark_performance_score import _create_database, _time, _USERS
+
+class _NoOddsCache:
+    def get_odds(self, event_id, target_id, calculate):
+        return calculate()
+
+def _place_bets(betting_handler: BettingHandler, num_bets: int, seed: int = 0):
+    rng = random.Random(seed)
+    game_database = betting_handler.game_database
+    disc_ids = [disc_id for disc_id, _ in _USERS]
+    # Synthetic games have fewer doinks than there are doinks reasons for League
+    bets = [bet for bet in betting_handler.all_bets if bet.event_id != "doinks_cs"]
+
+    with game_database:
+        game_database.execute_query("DELETE FROM bets")
+
+    placed = 0
+    ticket = 0
+    while placed < num_bets:
+        disc_id = rng.choice(disc_ids)
+        amount_bets = rng.choice([1, 1, 1, 2, 3])
+        ticket += 1
+
+        for _ in range(amount_bets):
+            bet = rng.choice(bets)
+            target = None
+            if bet.target_required == Bet.TARGET_REQUIRED or (bet.target_required == Bet.TARGET_OPTIONAL and rng.random() < 0.5):
+                target = rng.choice(disc_ids)
+
+            game_database.make_bet(
+                disc_id, MAIN_GUILD_ID, bet.event_id, rng.randint(10, 50), 0, target, ticket if amount_bets > 1 else None
+            )
+            placed += 1
+
+def _create_game(betting_handler: BettingHandler, seed: int = 0) -> LoLGameStats:
+    rng = random.Random(seed)
+    game_database = betting_handler.game_database
+    # Every player gets a doinks string, since the League resolver for doinks reasons expects one
+    player_stats = [
+        LoLPlayerStats(
+            "benchmark_game", disc_id, game_database.game_users[disc_id].player_id[0], rng.randint(0, 15), rng.randint(0, 10), rng.randint(0, 20),
+            doinks=rng.choice(["00000000", "10000000", "01000000"]), kda=rng.randint(0, 10), kp=rng.randint(0, 100), damage=rng.randint(5000, 40000)
+        )
+        for disc_id, _ in _USERS
+    ]
+
+    return LoLGameStats("lol", "benchmark_game", 2000000000, 60 * 30, 1, MAIN_GUILD_ID, [], player_stats, intfar_id=_USERS[0][0], intfar_reason="1000")
+
+def _resolve_one_at_a_time(betting_handler: BettingHandler, game_stats: LoLGameStats, tokens_gained: int):
+    game_database = betting_handler.game_database
+    meta_database = betting_handler.meta_database
+
+    for disc_id in game_database.game_users:
+        player_stats = game_stats.find_player_stats(disc_id, game_stats.filtered_player_stats)
+        if player_stats is not None:
+            gain_for_user = tokens_gained
+            if player_stats.doinks is not None:
+                gain_for_user += betting_handler.config.betting_tokens_for_doinks * sum(map(int, player_stats.doinks))
+
+            betting_handler.award_tokens_for_playing(disc_id, gain_for_user)
+
+        bets_made = game_database.get_bets(True, disc_id, game_stats.guild_id)
+        meta_database.get_token_balance(disc_id)
+        for bet_ids, _, _, amounts, events, targets, bet_timestamp, _, _ in bets_made or []:
+            betting_handler.resolve_bet(disc_id, bet_ids, amounts, bet_timestamp, events, targets, game_stats)
+
+def _get_results(betting_handler: BettingHandler):
+    with betting_handler.game_database:
+        bets = betting_handler.game_database.execute_query("SELECT result, payout FROM bets ORDER BY id").fetchall()
+
+    return bets, sorted(betting_handler.meta_database.get_token_balance())
+
+def run_benchmark(bet_counts: list[int], num_games: int):
+    print(f"Creating lol database with {num_games} games...")
+    game_database = _create_database("lol", num_games)
+    meta_database = MetaDatabase(game_database.config)
+    meta_database.clear_tables()
+    for disc_id, _ in _USERS:
+        meta_database.add_user(disc_id)
+
+    betting_handler = get_betting_handler("lol", game_database.config, meta_database, game_database)
+    odds_cache = betting_handler.odds_cache
+    game_stats = _create_game(betting_handler)
+
+    for num_bets in bet_counts:
+        results = {}
+        for name in ("one at a time", "batch"):
+            _place_bets(betting_handler, num_bets)
+            with meta_database:
+                meta_database.execute_query("UPDATE betting_balance SET tokens=100000")
+
+            if name == "batch":
+                betting_handler.odds_cache = odds_cache
+                _, duration = _time(lambda: betting_handler.resolve_bets(game_stats, 8))
+            else:
+                betting_handler.odds_cache = _NoOddsCache()
+                _, duration = _time(lambda: _resolve_one_at_a_time(betting_handler, game_stats, 8))
+
+            results[name] = _get_results(betting_handler)
+            print(f"{num_bets:4d} bets, {name:>13}: {duration * 1000:8.1f} ms")
+
+        status = "identical" if results["batch"] == results["one at a time"] else "DIFFERENT"
+        print(f"{num_bets:4d} bets, results and balances {status}")
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--bets", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--games", type=int, default=20000)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.bets, args.games)
@@ -0,0 +1,112 @@
+"""
+Compare peak memory and time of the streaming demo download with the old way of
+downloading the whole .dem.bz2 file, reading it back, and decompressing it in one go.
+Each pipeline runs in its own process against a local HTTP server. Run from the
+root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_demo_stream [--size-mb 100]
+"""
+from argparse import ArgumentParser
+import asyncio
+import bz2
+import os
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from functools import partial
+from multiprocessing import get_context
+from tempfile import TemporaryDirectory
+from threading import Thread, Event
+from time import perf_counter
+
+import httpx
+
+from intfar.api.game_apis.demo_stream import download_demo, get_peak_rss
+
+async def _old_pipeline(url: str, filename: str):
+    # Copy of the old SteamAPIClient.download_demo_file and _parse_in_thread
+    async with httpx.AsyncClient() as client:
+        data = await client.get(url)
+        with open(f"{filename}.dem.bz2", "wb") as fp:
+            async for chunk in data.aiter_bytes(chunk_size=128):
+                fp.write(chunk)
+
+    with open(f"{filename}.dem.bz2", "rb") as fp:
+        all_bytes = fp.read()
+
+    decompressed = bz2.decompress(all_bytes)
+    with open(f"{filename}.dem", "wb") as fp:
+        fp.write(decompressed)
+
+async def _new_pipeline(url: str, filename: str):
+    async with httpx.AsyncClient() as client:
+        await download_demo(client, url, f"{filename}.dem")
+
+def _get_rss():
+    # Current resident set size (Linux only), unlike the peak it can go down again
+    with open("/proc/self/statm") as fp:
+        return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def _run_pipeline(name: str, url: str, filename: str, queue):
+    # The peak RSS of the process includes importing everything, so RSS is sampled instead
+    baseline = _get_rss()
+    samples = [baseline]
+    done = Event()
+
+    def sample():
+        while not done.wait(0.005):
+            samples.append(_get_rss())
+
+    sampler = Thread(target=sample)
+    sampler.start()
+    start = perf_counter()
+
+    asyncio.run(_old_pipeline(url, filename) if name == "old" else _new_pipeline(url, filename))
+
+    duration = perf_counter() - start
+    done.set()
+    sampler.join()
+
+    queue.put((duration, max(samples) - baseline, get_peak_rss()))
+
+def run_benchmark(size_mb: int):
+    with TemporaryDirectory() as folder:
+        print(f"Creating {size_mb} MB demo...")
+        blocks = [os.urandom(1024) for _ in range(64)]
+        content = b"".join(blocks[index * 7 % len(blocks)][:1024 - index % 512] for index in range(size_mb * 1400))
+        with open(f"{folder}/demo.dem.bz2", "wb") as fp:
+            fp.write(bz2.compress(content))
+
+        compressed_mb = os.path.getsize(f"{folder}/demo.dem.bz2") / 1024 ** 2
+        print(f"Demo is {len(content) / 1024 ** 2:.1f} MB, {compressed_mb:.1f} MB compressed")
+        del content
+
+        class QuietHandler(SimpleHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        handler = partial(QuietHandler, directory=folder)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/demo.dem.bz2"
+
+        context = get_context("spawn")
+        for name in ("old", "new"):
+            queue = context.Queue()
+            process = context.Process(target=_run_pipeline, args=(name, url, f"{folder}/{name}", queue))
+            process.start()
+            duration, rss_increase, peak_rss = queue.get()
+            process.join()
+
+            print(
+                f"{name:>4} pipeline: {duration:6.2f} s, RSS increase {rss_increase / 1024 ** 2:7.1f} MB, "
+                f"process peak RSS {peak_rss / 1024 ** 2:7.1f} MB"
+            )
+
+        server.shutdown()
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=100)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.size_mb)
@@ -0,0 +1,83 @@
+"""
+Compare the speed of the performance score SQL query with the PerformanceScoreEngine
+on a synthetic database. Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_performance_score [--game lol] [--games 50000]
+"""
+from argparse import ArgumentParser
+import os
+from time import perf_counter
+
+from intfar.api.config import Config
+from intfar.api.game_databases import get_database_client
+from intfar.api.game_database import GameDatabase
+from tests.synthetic_data.games import insert_random_games
+
+_USERS = [
+    (100 + index, {"player_name": f"Player {index}", "player_id": str(1000 + index), "match_auth_code": "0", "latest_match_token": "0"})
+    for index in range(6)
+]
+
+def _create_database(game: str, num_games: int) -> GameDatabase:
+    config = Config()
+    config.database_folder += "/benchmark"
+    os.makedirs(config.database_folder, exist_ok=True)
+
+    database_path = f"{config.database_folder}/{game}.db"
+    if os.path.exists(database_path):
+        os.remove(database_path)
+
+    database = get_database_client(game, config)
+    for disc_id, game_params in _USERS:
+        params = {key: value for key, value in game_params.items() if key in ("player_name", "player_id") or key in database.game_user_params}
+        database.add_user(disc_id, **params)
+
+    insert_random_games(database, num_games, seed=0)
+
+    return database
+
+def _time(func, repeats=1):
+    start = perf_counter()
+    for _ in range(repeats):
+        result = func()
+
+    return result, (perf_counter() - start) / repeats
+
+def run_benchmark(game: str, num_games: int, repeats: int):
+    print(f"Creating {game} database with {num_games} games...")
+    database = _create_database(game, num_games)
+
+    first_timestamp, last_timestamp = database.get_game_stats(["MIN(timestamp)", "MAX(timestamp)"])[0]
+    windows = {
+        "all time": (None, None, 0),
+        "last month": (last_timestamp - 60 * 60 * 24 * 30, last_timestamp + 1, 1),
+        "one day": (first_timestamp + 60 * 60 * 30, first_timestamp + 60 * 60 * 54, 1),
+    }
+
+    engine = database.performance_engine
+    _, rebuild_time = _time(engine.rebuild)
+    print(f"Engine rebuild: {rebuild_time * 1000:.1f} ms")
+
+    for name, args in windows.items():
+        expected, query_time = _time(lambda: database.get_performance_score_query(None, *args)(), repeats)
+        actual, engine_time = _time(lambda: engine.get_scores(*args), repeats)
+
+        status = "identical" if actual == expected else "DIFFERENT"
+        print(
+            f"{name:>10}: query {query_time * 1000:8.1f} ms, engine {engine_time * 1000:6.1f} ms "
+            f"({query_time / engine_time:6.1f}x), results {status}"
+        )
+
+    insert_random_games(database, 1, last_timestamp + 1, seed=1)
+    _, refresh_time = _time(engine.refresh)
+    print(f"Engine refresh after a new game: {refresh_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--game", default="lol")
+    parser.add_argument("--games", type=int, default=50000)
+    parser.add_argument("--repeats", type=int, default=3)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.game, args.games, args.repeats)
@@ -0,0 +1,87 @@
+"""
+Measure the latency of calls through a Proxy, and how long several slow calls
+take when they are made at the same time.
+Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_proxy [--calls 200] [--concurrent 8]
+"""
+from argparse import ArgumentParser
+import sys
+import shlex
+from threading import Thread, Lock
+from time import perf_counter, sleep
+
+from intfar.api.proxy import ProxyManager, connect_worker
+
+class EchoClient:
+    def echo(self, value):
+        return value
+
+    def slow_echo(self, value):
+        sleep(0.1)
+        return value
+
+def run_worker(address: str):
+    """
+    Stand-in for run_steam.py that runs commands on an EchoClient.
+    """
+    conn = connect_worker(address, EchoClient.__name__)
+    client = EchoClient()
+    send_lock = Lock()
+
+    def run_command(cmd_id, command, args):
+        result = getattr(client, command)(*args)
+        with send_lock:
+            conn.send((cmd_id, result))
+
+    while True:
+        cmd_id, command, args = conn.recv()
+        if command == "close":
+            return
+
+        Thread(target=run_command, args=(cmd_id, command, args)).start()
+
+def _time_concurrent(call, num_calls: int):
+    threads = [Thread(target=call, args=(index,)) for index in range(num_calls)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return perf_counter() - start
+
+def run_benchmark(num_calls: int, num_concurrent: int):
+    worker_command = f"{shlex.quote(sys.executable)} -m tests.benchmark_proxy --worker"
+    manager = ProxyManager(EchoClient, "cs2", worker_command)
+    proxy = manager.create_proxy()
+
+    try:
+        proxy.echo(0) # Wait for the worker to connect
+
+        start = perf_counter()
+        for index in range(num_calls):
+            assert proxy.echo(index) == index
+        proxy_latency = (perf_counter() - start) / num_calls
+
+        proxy_concurrent = _time_concurrent(lambda index: proxy.slow_echo(index), num_concurrent)
+    finally:
+        manager.kill()
+
+    print(f"Latency per call: {proxy_latency * 1000:.2f} ms")
+    print(f"{num_concurrent} concurrent calls of 100 ms: {proxy_concurrent * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrent", type=int, default=8)
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--address")
+
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.address)
+    else:
+        run_benchmark(args.calls, args.concurrent)
@@ -0,0 +1,92 @@
+"""
+Compare the time it takes to find sounds and champions by name when every name
+is compared to the search term, like before, and when the names are looked up
+in a SearchIndex that is built once. Also times building the indexes.
+Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_search_index [--sounds 500] [--champions 170] [--queries 500]
+"""
+from argparse import ArgumentParser
+import random
+import string
+
+from intfar.api.util import SearchIndex, get_closest_match
+from tests.benchmark_performance_score import _time
+from tests.test_search_index import _try_find_champ_id
+
+def _random_name(rng: random.Random, separators: str):
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 8))) for _ in range(rng.randint(1, 3))]
+    return rng.choice(separators).join(words)
+
+def _misspell(name: str, rng: random.Random):
+    index = rng.randrange(len(name))
+    return name[:index] + rng.choice(string.ascii_lowercase) + name[index + 1:]
+
+def _find_champ_id(indexes: tuple[SearchIndex, SearchIndex], search_term: str):
+    # Same lookup as RiotAPIClient.try_find_playable_id, without the patch check
+    search_name = search_term.strip().lower().replace("_", " ").replace("'", "")
+    names_index, stripped_names_index = indexes
+
+    if (champ_id := names_index.find_exact(search_name)) is not None:
+        return champ_id
+
+    prefix_candidates = names_index.find_prefix(search_name)
+    if len(prefix_candidates) == 1:
+        return prefix_candidates[0]
+
+    candidates = set(names_index.find_substring(search_name))
+    candidates.update(stripped_names_index.find_substring(search_name))
+    candidates.difference_update(prefix_candidates)
+
+    return candidates.pop() if len(candidates) == 1 else None
+
+def _print_times(name: str, num_queries: int, scan_time: float, index_time: float, build_time: float):
+    print(f"{name}:")
+    print(f"    Scan:  {scan_time / num_queries * 1e6:8.1f} us per lookup")
+    print(f"    Index: {index_time / num_queries * 1e6:8.1f} us per lookup ({build_time * 1000:.1f} ms to build)")
+
+def run_benchmark(num_sounds: int, num_champions: int, num_queries: int):
+    rng = random.Random(0)
+
+    # Misspelled sound names, which is when the closest match is searched for
+    sounds = list(dict.fromkeys(_random_name(rng, "_") for _ in range(num_sounds)))
+    queries = [_misspell(sound, rng)[1:] for sound in rng.choices(sounds, k=num_queries)]
+
+    index, build_time = _time(lambda: SearchIndex(sounds), 1)
+    expected = [get_closest_match(query, sounds) for query in queries]
+    assert [index.find_closest(query) for query in queries] == expected, "Index finds the same sounds"
+
+    _, scan_time = _time(lambda: [get_closest_match(query, sounds) for query in queries], 1)
+    _, index_time = _time(lambda: [index.find_closest(query) for query in queries], 1)
+    _print_times(f"Closest of {len(sounds)} sounds", len(queries), scan_time, index_time, build_time)
+
+    # Full, partial, and misspelled champion names
+    champ_names = {champ_id: _random_name(rng, " '.").title() for champ_id in range(num_champions)}
+    queries = []
+    for name in rng.choices(list(champ_names.values()), k=num_queries):
+        start = rng.randint(0, len(name) // 2)
+        queries.append(rng.choice([name, name[start:start + rng.randint(3, 6)], _misspell(name, rng)]))
+
+    def build_champ_indexes():
+        return (
+            SearchIndex((champ_id, name.lower()) for champ_id, name in champ_names.items()),
+            SearchIndex((champ_id, name.lower().replace("'", "").replace(".", "")) for champ_id, name in champ_names.items()),
+        )
+
+    indexes, build_time = _time(build_champ_indexes, 1)
+    expected = [_try_find_champ_id(champ_names, query) for query in queries]
+    assert [_find_champ_id(indexes, query) for query in queries] == expected, "Index finds the same champions"
+
+    _, scan_time = _time(lambda: [_try_find_champ_id(champ_names, query) for query in queries], 1)
+    _, index_time = _time(lambda: [_find_champ_id(indexes, query) for query in queries], 1)
+    _print_times(f"Lookup of {num_champions} champions", len(queries), scan_time, index_time, build_time)
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--sounds", type=int, default=500)
+    parser.add_argument("--champions", type=int, default=170)
+    parser.add_argument("--queries", type=int, default=500)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.sounds, args.champions, args.queries)
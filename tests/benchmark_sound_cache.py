@@ -0,0 +1,96 @@
+"""
+Compare the CPU time used to stream soundboard sounds to Discord when they are
+transcoded by FFmpegPCMAudio and encoded to Opus for every packet, like before,
+and when their pre-encoded Opus packets are sent as they are with OggOpusFileAudio.
+Several guilds play a sound at the same time, each in its own thread like
+discord.py's AudioPlayer. Requires FFmpeg and libopus. Run from the root of the
+repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_sound_cache [--guilds 8] [--duration 10] [--opus-lib path]
+"""
+from argparse import ArgumentParser
+import os
+import resource
+import subprocess
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+
+from discord import opus, PCMVolumeTransformer
+from discord.player import FFmpegPCMAudio
+
+from intfar.api.sound_cache import OggOpusFileAudio, SoundCache
+
+def _cpu_time():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def _stream(create_source, encoder):
+    # Read every packet of a source, the way the AudioPlayer of discord.py does
+    source = create_source()
+    packets = 0
+    while (data := source.read()) != b"":
+        if not source.is_opus():
+            data = encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+
+        packets += 1
+
+    source.cleanup()
+    return packets
+
+def _run_streams(create_source, num_guilds: int):
+    threads = [Thread(target=_stream, args=(create_source, opus.Encoder())) for _ in range(num_guilds)]
+
+    cpu_before = _cpu_time()
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return _cpu_time() - cpu_before, perf_counter() - start
+
+def run_benchmark(num_guilds: int, duration: float, opus_lib: str | None):
+    if opus_lib is not None:
+        opus.load_opus(opus_lib)
+
+    with TemporaryDirectory() as folder:
+        cache = SoundCache(folder)
+        subprocess.run(
+            [
+                "ffmpeg", "-v", "error", "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+                "-filter:a", "loudnorm", cache.get_sound_path("sound")
+            ],
+            check=True
+        )
+        cache.encode("sound")
+        opus_path, _ = cache.get("sound")
+        sound_path = cache.get_sound_path("sound")
+
+        print(
+            f"{num_guilds} guilds playing a {duration:.0f} s sound at the same time "
+            f"(mp3: {os.path.getsize(sound_path) // 1024} KB, ogg: {os.path.getsize(opus_path) // 1024} KB)"
+        )
+
+        sources = (
+            ("FFmpegPCMAudio", lambda: PCMVolumeTransformer(FFmpegPCMAudio(sound_path, executable="ffmpeg"), volume=1)),
+            ("OggOpusFileAudio", lambda: OggOpusFileAudio(opus_path)),
+        )
+        for name, create_source in sources:
+            cpu_time, wall_time = _run_streams(create_source, num_guilds)
+            cpu_per_stream = cpu_time / (num_guilds * duration)
+            print(f"{name}:")
+            print(f"    CPU time: {cpu_time:.3f} s total, {cpu_per_stream * 100:.3f}% of a core per playing stream")
+            print(f"    Wall time to stream all packets: {wall_time:.3f} s")
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--guilds", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--opus-lib", type=str, default=None)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.guilds, args.duration, args.opus_lib)
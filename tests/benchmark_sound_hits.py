@@ -0,0 +1,124 @@
+"""
+Compare the throughput of counting sound plays when every play is written to
+the database in its own transaction, like MetaDatabase.add_sound_hit used to do,
+and when plays are buffered in memory and flushed periodically with one UPSERT.
+Also times reading sound totals and weekly hits with plays in the buffer.
+Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_sound_hits [--plays 5000] [--sounds 200] [--flush-every 500]
+"""
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+import os
+import random
+
+from intfar.api.config import Config
+from intfar.api.meta_database import MetaDatabase
+from tests.benchmark_performance_score import _time
+
+def _create_database(num_sounds: int) -> MetaDatabase:
+    config = Config()
+    config.database_folder += "/benchmark"
+    os.makedirs(config.database_folder, exist_ok=True)
+
+    database_path = f"{config.database_folder}/meta.db"
+    if os.path.exists(database_path):
+        os.remove(database_path)
+
+    database = MetaDatabase(config)
+    for index in range(num_sounds):
+        database.add_sound(f"sound_{index}", 1, index)
+
+    return database
+
+def _add_sound_hit_unbuffered(database: MetaDatabase, sound: str, timestamp: datetime):
+    # Copy of MetaDatabase.add_sound_hit before plays were buffered
+    date_start, date_end = database.get_weekly_timestamp(timestamp, 0)
+    with database:
+        query_select = "SELECT plays FROM sound_hits WHERE sound = ? AND start_date = ? AND end_date = ?"
+
+        result = database.execute_query(query_select, sound, date_start, date_end).fetchone()
+
+        if result is None or result[0] is None:
+            query = """
+                INSERT INTO sound_hits (sound, start_date, end_date, plays)
+                VALUES (?, ?, ?, 1)
+            """
+        else:
+            query = """
+                UPDATE sound_hits
+                SET plays = plays + 1
+                WHERE sound = ? AND start_date = ? AND end_date = ?
+            """
+
+        database.execute_query(query, sound, date_start, date_end)
+
+def _get_plays(num_plays: int, num_sounds: int, seed: int = 0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    # Some sounds are played a lot more than others, spread over a few weeks
+    weights = [1 / (index + 1) for index in range(num_sounds)]
+    sounds = rng.choices([f"sound_{index}" for index in range(num_sounds)], weights, k=num_plays)
+
+    return [(sound, start + timedelta(minutes=rng.randint(0, 60 * 24 * 28))) for sound in sounds]
+
+def run_benchmark(num_plays: int, num_sounds: int, flush_every: int):
+    plays = _get_plays(num_plays, num_sounds)
+    print(f"{num_plays} plays of {num_sounds} sounds, flushing every {flush_every} plays")
+
+    database = _create_database(num_sounds)
+
+    def play_unbuffered():
+        for sound, timestamp in plays:
+            _add_sound_hit_unbuffered(database, sound, timestamp)
+
+    _, unbuffered_time = _time(play_unbuffered)
+    expected = sorted(database.get_sounds("most_played"))
+
+    database = _create_database(num_sounds)
+    flushes = 0
+
+    def play_buffered():
+        nonlocal flushes
+        for index, (sound, timestamp) in enumerate(plays, start=1):
+            database.add_sound_hit(sound, timestamp)
+            if index % flush_every == 0:
+                database.flush_sound_hits()
+                flushes += 1
+
+        database.flush_sound_hits()
+        flushes += 1
+
+    _, buffered_time = _time(play_buffered)
+    assert sorted(database.get_sounds("most_played")) == expected, "Buffered plays give the same totals"
+
+    print(f"Transaction per play: {num_plays / unbuffered_time:10.0f} plays/s, {num_plays} write transactions")
+    print(f"Buffered plays:       {num_plays / buffered_time:10.0f} plays/s, {flushes} write transactions")
+
+    # Reads with a full buffer of plays that are not flushed yet
+    for sound, timestamp in plays[:flush_every]:
+        database.add_sound_hit(sound, timestamp)
+
+    week = database.get_weekly_timestamp(plays[0][1] + timedelta(days=7), 0)
+    for name, func in (
+        ("get_sounds", lambda: database.get_sounds("most_played")),
+        ("get_weekly_sound_hits", lambda: database.get_weekly_sound_hits(*week)),
+    ):
+        buffered = len(database.sound_hit_buffer)
+        _, buffered_time = _time(func, 20)
+        database.flush_sound_hits()
+        _, flushed_time = _time(func, 20)
+        print(f"{name:>22}: {buffered_time * 1000:6.2f} ms with {buffered} buffered rows, {flushed_time * 1000:6.2f} ms with none")
+
+        for sound, timestamp in plays[:flush_every]:
+            database.add_sound_hit(sound, timestamp)
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--plays", type=int, default=5000)
+    parser.add_argument("--sounds", type=int, default=200)
+    parser.add_argument("--flush-every", type=int, default=500)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.plays, args.sounds, args.flush_every)
@@ -0,0 +1,75 @@
+"""
+Compare how long it takes to get the end-of-split summaries of every player when
+each player is summarized on their own with several queries per stat, like before,
+and when every player is summarized at once from one load of the split's games.
+Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_split_summary [--games 20000] [--repeats 3]
+"""
+from argparse import ArgumentParser
+
+from intfar.api.game_data import get_stat_quantity_descriptions
+from tests.benchmark_performance_score import _create_database, _time, _USERS
+from tests.test_split_summary import _get_split_summary_data
+
+def _count_queries(database, func):
+    execute_query = database.execute_query
+    num_queries = 0
+
+    def counting_execute_query(*args, **kwargs):
+        nonlocal num_queries
+        num_queries += 1
+        return execute_query(*args, **kwargs)
+
+    database.execute_query = counting_execute_query
+    try:
+        func()
+    finally:
+        del database.execute_query
+
+    return num_queries
+
+def run_benchmark(num_games: int, repeats: int):
+    print(f"Creating lol database with {num_games} games...")
+    database = _create_database("lol", num_games)
+    disc_ids = [disc_id for disc_id, _ in _USERS]
+    stats = list(get_stat_quantity_descriptions("lol"))
+
+    with database:
+        timestamps = [timestamp for timestamp, in database.execute_query("SELECT timestamp FROM games ORDER BY timestamp")]
+
+    # The previous and current split cover the last two thirds of the games
+    prev_split_start = timestamps[len(timestamps) // 3]
+    curr_split_start = timestamps[2 * len(timestamps) // 3]
+
+    def summarize_each():
+        return {
+            disc_id: _get_split_summary_data(database, disc_id, stats, prev_split_start, curr_split_start)
+            for disc_id in disc_ids
+        }
+
+    def summarize_all():
+        return database.get_split_summaries(disc_ids, stats, prev_split_start, curr_split_start)
+
+    with database:
+        expected, each_time = _time(summarize_each, repeats)
+        summaries, all_time = _time(summarize_all, repeats)
+
+        each_queries = _count_queries(database, summarize_each)
+        all_queries = _count_queries(database, summarize_all)
+
+    for disc_id in disc_ids:
+        assert summaries[disc_id]["games_after"] == expected[disc_id]["games_after"], "Batched summaries give the same games"
+
+    print(f"Summaries of {len(disc_ids)} players:")
+    print(f"    Per player: {each_time * 1000:8.1f} ms, {each_queries} queries")
+    print(f"    Batched:    {all_time * 1000:8.1f} ms, {all_queries} queries ({each_time / all_time:.1f}x faster)")
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--games", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=3)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.games, args.repeats)
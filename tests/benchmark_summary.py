@@ -0,0 +1,47 @@
+"""
+Compare how long it takes to get the stats for !summary when they are calculated
+(cold, as every call used to do) and when they are read from a saved snapshot
+(warm). Run from the root of the repository with:
+
+    PYTHONPATH=src python -m tests.benchmark_summary [--game lol] [--games 20000]
+"""
+from argparse import ArgumentParser
+
+from tests.benchmark_performance_score import _create_database, _time, _USERS
+
+def _get_summary(database, disc_id: int):
+    summary = database.get_summary_snapshot(disc_id)
+    if summary is None:
+        summary = database.get_summary_data(disc_id)
+        database.save_summary_snapshot(disc_id, summary)
+
+    return summary
+
+def run_benchmark(game: str, num_games: int, repeats: int):
+    print(f"Creating {game} database with {num_games} games...")
+    database = _create_database(game, num_games)
+
+    cold_times = []
+    warm_times = []
+    for disc_id, _ in _USERS:
+        database.invalidate_summary_snapshots([disc_id])
+        _, cold_time = _time(lambda: _get_summary(database, disc_id))
+        _, warm_time = _time(lambda: _get_summary(database, disc_id), repeats)
+
+        cold_times.append(cold_time)
+        warm_times.append(warm_time)
+
+    cold_avg = sum(cold_times) / len(cold_times)
+    warm_avg = sum(warm_times) / len(warm_times)
+    print(f"Cold: {cold_avg * 1000:8.1f} ms per user")
+    print(f"Warm: {warm_avg * 1000:8.2f} ms per user ({cold_avg / warm_avg:.0f}x faster)")
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--game", default="lol")
+    parser.add_argument("--games", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=20)
+
+    args = parser.parse_args()
+
+    run_benchmark(args.game, args.games, args.repeats)
@@ -0,0 +1,52 @@
+import asyncio
+from multiprocessing import Pipe
+from threading import Thread
+
+from intfar.discbot.app_listener import AppRequestClient, AppRequestServer
+
+class MockDiscordClient:
+    """
+    Stand-in for DiscordClient with functions that answer like it would,
+    with names made from the given IDs.
+    """
+    def __init__(self, avatar_delay: float = 0):
+        self.avatar_delay = avatar_delay
+
+    def get_discord_nick(self, disc_id=None):
+        return f"Nick {disc_id}"
+
+    async def get_discord_avatar(self, disc_id=None, size=64):
+        await asyncio.sleep(self.avatar_delay)
+        return f"avatar_{disc_id}_{size}.png"
+
+    def get_guilds_for_user(self, disc_id):
+        return []
+
+    def fail(self):
+        raise ValueError("Failed")
+
+def start_app_request_server(disc_client, **client_kwargs) -> tuple[AppRequestClient, AppRequestServer, asyncio.AbstractEventLoop]:
+    """
+    Start an AppRequestServer for the given client in an event loop in a separate thread,
+    and return a client connected to it, the server, and the event loop.
+    """
+    flask_end, bot_end = Pipe()
+    server = AppRequestServer(disc_client)
+    event_loop = asyncio.new_event_loop()
+    Thread(target=event_loop.run_forever, daemon=True).start()
+
+    address = asyncio.run_coroutine_threadsafe(server.start(), event_loop).result(5)
+    bot_end.send((address, server.authkey))
+
+    return AppRequestClient(flask_end, **client_kwargs), server, event_loop
+
+def stop_app_request_server(client: AppRequestClient, server: AppRequestServer, event_loop: asyncio.AbstractEventLoop):
+    """
+    Close the client and server started by `start_app_request_server` and stop the event loop.
+    """
+    client.close()
+    server.close()
+
+    # Let the server finish handling the closed connection
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), event_loop).result(5)
+    event_loop.call_soon_threadsafe(event_loop.stop)
@@ -0,0 +1,75 @@
+import random
+
+from intfar.api.game_database import GameDatabase
+from intfar.api.util import MAIN_GUILD_ID
+
+def _random_value(rng: random.Random, column_type: str, not_null: bool):
+    if not not_null and rng.random() < 0.05:
+        return None
+
+    if "INT" in column_type:
+        return rng.randint(0, 12)
+
+    if column_type == "REAL":
+        return round(rng.uniform(0, 10), 2)
+
+    return None if not not_null else ""
+
+def insert_random_games(database: GameDatabase, num_games: int, start_timestamp: int = 1600000000, seed: int = None):
+    """
+    Insert `num_games` games with random stats for random subsets of the
+    registered users of the given database directly into its tables.
+    Values are drawn from a small range, so ties between players are common.
+    """
+    rng = random.Random(seed)
+    accounts = [
+        (disc_id, player_id)
+        for disc_id, user in database.game_users.items()
+        for player_id in user.player_id
+    ]
+
+    with database:
+        game_columns = database.execute_query("PRAGMA table_info(games)").fetchall()
+        player_columns = database.execute_query("PRAGMA table_info(participants)").fetchall()
+        game_id_offset = database.execute_query("SELECT COUNT(*) FROM games").fetchone()[0]
+
+        games = []
+        participants = []
+        timestamp = start_timestamp
+        for index in range(num_games):
+            game_id = str(game_id_offset + index)
+            timestamp += rng.randint(60 * 20, 60 * 60 * 12)
+            players = rng.sample(accounts, rng.randint(1, len(accounts)))
+            disc_ids = [disc_id for disc_id, _ in players]
+
+            game_values = {
+                "game_id": game_id,
+                "timestamp": timestamp,
+                "duration": rng.randint(60 * 15, 60 * 50),
+                "intfar_id": rng.choice([None, None] + disc_ids),
+                "intfar_reason": "1000",
+                "win": rng.choice([1, -1]),
+                "guild_id": MAIN_GUILD_ID,
+                "first_blood": rng.choice([None] + disc_ids),
+            }
+            games.append(
+                tuple(
+                    game_values[name] if name in game_values else _random_value(rng, column_type, not_null)
+                    for _, name, column_type, not_null, _, _ in game_columns
+                )
+            )
+
+            for _, player_id in players:
+                doinks = rng.choice([None, "".join(rng.choice("0001") for _ in range(7))])
+                player_values = {"game_id": game_id, "player_id": player_id, "doinks": doinks}
+                participants.append(
+                    tuple(
+                        player_values[name] if name in player_values else _random_value(rng, column_type, not_null)
+                        for _, name, column_type, not_null, _, _ in player_columns
+                    )
+                )
+
+        game_qms = ", ".join("?" for _ in game_columns)
+        player_qms = ", ".join("?" for _ in player_columns)
+        database.execute_query(f"INSERT INTO games VALUES ({game_qms})", *games, commit=False)
+        database.execute_query(f"INSERT INTO participants VALUES ({player_qms})", *participants)
@@ -0,0 +1,73 @@
+from multiprocessing import Pipe
+from threading import Thread
+from time import monotonic, sleep
+
+from intfar.discbot.app_listener import AppRequestClient
+from tests.mocks.app_requests import MockDiscordClient, start_app_request_server, stop_app_request_server
+
+def test_requests():
+    client, server, event_loop = start_app_request_server(MockDiscordClient())
+
+    assert client.request(["func"], ["get_discord_nick"], [(1,)]) == ["Nick 1"]
+    assert client.request(["func"], ["get_discord_nick"], [(None,)]) == ["Nick None"], "Functions are called without parameters for None"
+    assert (
+        client.request(["func", "func"], ["get_discord_nick", "get_discord_avatar"], [(2,), (2, 128)])
+        == ["Nick 2", "avatar_2_128.png"]
+    ), "Several commands are handled in one request"
+
+    assert client.request(["func", "func"], ["fail", "get_discord_nick"], [(None,), (3,)]) == [None, "Nick 3"], "Failed commands return None"
+    assert client.request(["func"], ["missing_function"], [(None,)]) == [None], "Unknown commands return None"
+    assert server.requests_handled == 5
+
+    stop_app_request_server(client, server, event_loop)
+
+def test_concurrent_requests():
+    client, server, event_loop = start_app_request_server(MockDiscordClient(avatar_delay=1))
+    results = {}
+
+    def make_request(index, command):
+        results[index] = client.request(["func"], [command], [(index,)])[0]
+
+    slow_thread = Thread(target=make_request, args=(-1, "get_discord_avatar"))
+    slow_thread.start()
+
+    start = monotonic()
+    threads = [Thread(target=make_request, args=(index, "get_discord_nick")) for index in range(50)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert monotonic() - start < 0.5, "Fast requests are not held up by a slow request"
+    assert results == {index: f"Nick {index}" for index in range(50)}, "Every thread gets the result of its own request"
+
+    slow_thread.join()
+    assert results[-1] == "avatar_-1_64.png"
+
+    stop_app_request_server(client, server, event_loop)
+
+def test_authentication():
+    _, server, event_loop = start_app_request_server(MockDiscordClient())
+
+    flask_end, bot_end = Pipe()
+    bot_end.send((server.address, b"wrong key"))
+    client = AppRequestClient(flask_end, timeout=1)
+
+    # The server drops the connection after the failed authentication. Wait for that
+    # to be noticed before sending, so the request always finds the connection closed
+    connect = client._connect
+    def connect_and_wait():
+        sock = connect()
+        deadline = monotonic() + 5
+        while client._sock is not None and monotonic() < deadline:
+            sleep(0.01)
+
+        return sock
+
+    client._connect = connect_and_wait
+
+    assert client.request(["func"], ["get_discord_nick"], [(1,)]) is None, "Requests are not handled without the right key"
+    assert server.requests_handled == 0
+
+    stop_app_request_server(client, server, event_loop)
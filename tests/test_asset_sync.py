@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import monotonic
+
+import pytest
+
+from intfar.api.config import Config
+from intfar.api.game_apis import lol
+from intfar.api.game_apis.asset_sync import Asset, AssetManifest, AssetSynchronizer, RateLimiter
+
+class DDragonStandIn(BaseHTTPRequestHandler):
+    """
+    Serves files from `server.files` like ddragon.leagueoflegends.com would,
+    including support for range requests.
+    """
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        content = self.server.files.get(self.path)
+        if content is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        range_header = self.headers.get("Range")
+        if range_header is not None:
+            start = int(range_header.removeprefix("bytes=").removesuffix("-"))
+            content = content[start:]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{start + len(content) - 1}/*")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture()
+def ddragon(monkeypatch: pytest.MonkeyPatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DDragonStandIn)
+    server.files = {}
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(lol, "DDRAGON_URL", server.url)
+
+    yield server
+
+    server.shutdown()
+
+def _add_patch(server, patch: str, champions: dict[str, int], items: list[str]):
+    server.files["/api/versions.json"] = json.dumps([patch]).encode()
+
+    champion_data = {"data": {name: {"key": str(key), "name": name} for name, key in champions.items()}}
+    server.files[f"/cdn/{patch}/data/en_US/champion.json"] = json.dumps(champion_data).encode()
+
+    item_data = {"data": {item_id: {"name": f"Item {item_id}"} for item_id in items}}
+    server.files[f"/cdn/{patch}/data/en_US/item.json"] = json.dumps(item_data).encode()
+
+    for name in champions:
+        server.files[f"/cdn/{patch}/img/champion/{name}.png"] = f"portrait {name}".encode()
+        server.files[f"/cdn/img/champion/loading/{name}_0.jpg"] = f"splash {name}".encode()
+        details = {
+            "data": {
+                name: {
+                    "passive": {"name": "Passive", "image": {"full": f"{name}_P.png"}},
+                    "spells": [{"id": f"{name}Q", "name": "Q", "image": {"full": f"{name}Q.png"}}]
+                }
+            }
+        }
+        server.files[f"/cdn/{patch}/data/en_US/champion/{name}.json"] = json.dumps(details).encode()
+        server.files[f"/cdn/{patch}/img/passive/{name}_P.png"] = f"passive {name}".encode()
+        server.files[f"/cdn/{patch}/img/spell/{name}Q.png"] = f"spell {name}".encode()
+
+    for item_id in items:
+        server.files[f"/cdn/{patch}/img/item/{item_id}.png"] = f"item {item_id}".encode()
+
+def test_sync(ddragon, tmp_path):
+    assets = []
+    for index in range(20):
+        ddragon.files[f"/file_{index}.png"] = os.urandom(1000 + index)
+        assets.append(Asset(f"{ddragon.url}/file_{index}.png", f"{tmp_path}/files/file_{index}.png"))
+
+    manifest = AssetManifest(f"{tmp_path}/manifest.json")
+    downloaded = asyncio.run(AssetSynchronizer(manifest).sync(assets))
+
+    assert len(downloaded) == 20, "All assets are downloaded"
+    for index, asset in enumerate(assets):
+        with open(asset.filename, "rb") as fp:
+            content = fp.read()
+
+        assert content == ddragon.files[f"/file_{index}.png"], "Content is correct"
+        assert manifest.assets[asset.filename]["sha256"] == sha256(content).hexdigest(), "Hash is saved"
+
+    ddragon.requests.clear()
+    manifest = AssetManifest(f"{tmp_path}/manifest.json")
+    downloaded = asyncio.run(AssetSynchronizer(manifest).sync(assets))
+
+    assert downloaded == [], "Nothing is downloaded again"
+    assert ddragon.requests == [], "No requests are made for assets in the manifest"
+
+def test_sync_existing_files(ddragon, tmp_path):
+    ddragon.files["/file.png"] = b"content"
+    os.makedirs(f"{tmp_path}/files")
+    with open(f"{tmp_path}/files/file.png", "wb") as fp:
+        fp.write(b"content")
+
+    manifest = AssetManifest(f"{tmp_path}/manifest.json")
+    asset = Asset(f"{ddragon.url}/file.png", f"{tmp_path}/files/file.png")
+    downloaded = asyncio.run(AssetSynchronizer(manifest).sync([asset]))
+
+    assert downloaded == [], "Existing file is not downloaded"
+    assert asset.filename in manifest, "Existing file is added to manifest"
+
+def test_resume_download(ddragon, tmp_path):
+    content = os.urandom(200_000)
+    ddragon.files["/large.jpg"] = content
+
+    os.makedirs(f"{tmp_path}/files")
+    with open(f"{tmp_path}/files/large.jpg.part", "wb") as fp:
+        fp.write(content[:50_000])
+
+    manifest = AssetManifest(f"{tmp_path}/manifest.json")
+    asset = Asset(f"{ddragon.url}/large.jpg", f"{tmp_path}/files/large.jpg")
+    asyncio.run(AssetSynchronizer(manifest).sync([asset]))
+
+    with open(asset.filename, "rb") as fp:
+        assert fp.read() == content, "Resumed download is complete"
+
+    assert ddragon.requests == [("/large.jpg", "bytes=50000-")], "Only the missing part is requested"
+    assert manifest.assets[asset.filename]["sha256"] == sha256(content).hexdigest(), "Hash covers the whole file"
+    assert not os.path.exists(f"{asset.filename}.part"), "Partial file is removed"
+
+def test_missing_asset(ddragon, tmp_path):
+    manifest = AssetManifest(f"{tmp_path}/manifest.json")
+    asset = Asset(f"{ddragon.url}/missing.png", f"{tmp_path}/files/missing.png")
+    downloaded = asyncio.run(AssetSynchronizer(manifest).sync([asset]))
+
+    assert downloaded == [], "Missing asset is skipped"
+    assert asset.filename not in manifest, "Missing asset is not in manifest"
+
+def test_rate_limiter():
+    async def acquire_all(limiter, count):
+        for _ in range(count):
+            await limiter.acquire()
+
+    limiter = RateLimiter(rate=100, capacity=10)
+    start = monotonic()
+    asyncio.run(acquire_all(limiter, 40))
+
+    assert monotonic() - start >= 0.29, "Requests are limited after the first burst"
+
+def test_riot_client_sync(ddragon, tmp_path):
+    config = Config()
+    config.resources_folder = f"{tmp_path}/resources"
+    config.static_folder = f"{tmp_path}/static"
+
+    _add_patch(ddragon, "14.9.1", {"Annie": 1, "Ahri": 103}, ["1001"])
+
+    # With no data from a previous patch, the client waits for the download
+    client = lol.RiotAPIClient("lol", config)
+
+    assert client.latest_patch == "14.9.1", "Latest patch is used"
+    assert client.champ_names == {1: "Annie", 103: "Ahri"}, "Champions are loaded"
+    assert os.path.exists(client.get_champ_portrait_path(103)), "Portrait is downloaded"
+    assert os.path.exists(client.get_champ_splash_path(103)), "Splash is downloaded"
+    assert os.path.exists(client.get_champ_abilities_path(103, "AhriQ")), "Ability icon is downloaded"
+    assert os.path.exists(f"{client.item_icons_path}/1001.png"), "Item icon is downloaded"
+
+    _add_patch(ddragon, "14.10.1", {"Annie": 1, "Ahri": 103, "Aurora": 893}, ["1001"])
+    ddragon.requests.clear()
+
+    # With data from a previous patch, the client uses it while downloading the new patch
+    client = lol.RiotAPIClient("lol", config)
+    client._sync_thread.join()
+
+    assert client.latest_patch == "14.10.1", "New patch is used when downloaded"
+    assert client.get_champ_name(893) == "Aurora", "New champion is loaded"
+    assert os.path.exists(client.get_champ_portrait_path(893)), "New portrait is downloaded"
+    assert not os.path.exists(f"{config.resources_folder}/game_data/lol/champions-14.9.1.json"), "Old data is removed"
+
+    requested = {path for path, _ in ddragon.requests}
+    assert "/cdn/14.10.1/img/champion/Ahri.png" not in requested, "Unchanged assets are not downloaded again"
@@ -0,0 +1,115 @@
+import asyncio
+from threading import Thread, get_ident
+from time import sleep
+
+import pytest
+from mhooge_flask.database import DBException
+
+from intfar.api.async_database import AsyncDatabase
+from intfar.api.game_database import GameDatabase
+from intfar.api.meta_database import MetaDatabase
+from intfar.api.util import EventLoopBlockingMonitor
+from tests.synthetic_data.games import insert_random_games
+
+def _slow_query(database: MetaDatabase, disc_id: int):
+    sleep(0.5)
+    return database.get_join_sound(disc_id), get_ident()
+
+def test_read_does_not_block(meta_database: MetaDatabase):
+    disc_id = list(meta_database.all_users)[0]
+    meta_database.set_join_sound(disc_id, "sound")
+    database = AsyncDatabase(meta_database)
+
+    async def read():
+        async with EventLoopBlockingMonitor() as monitor:
+            results = await asyncio.gather(*[database.read(_slow_query, disc_id) for _ in range(4)])
+
+        return results, monitor
+
+    try:
+        results, monitor = asyncio.run(read())
+    finally:
+        database.close()
+
+    assert [sound for sound, _ in results] == ["sound"] * 4, "Correct data is read"
+    assert get_ident() not in [thread for _, thread in results], "Data is read in another thread"
+    assert monitor.blocked_time < 0.2, "Event loop is not blocked while reading"
+
+def test_read_and_write(meta_database: MetaDatabase):
+    disc_id = list(meta_database.all_users)[0]
+    database = AsyncDatabase(meta_database)
+
+    async def read_and_write():
+        before = await database.get_join_sound(disc_id)
+        await database.set_join_sound(disc_id, "sound")
+        await database.set_default_game(disc_id, "cs2")
+        after = await database.get_join_sound(disc_id)
+
+        with pytest.raises(DBException):
+            await database.read(lambda db: db.set_join_sound(disc_id, "other_sound"))
+
+        return before, after
+
+    try:
+        before, after = asyncio.run(read_and_write())
+    finally:
+        database.close()
+
+    assert before is None, "Join sound is read"
+    assert after == "sound", "Join sound is written"
+    assert meta_database.get_join_sound(disc_id) == "sound", "Readers can't write"
+    assert meta_database.all_users[disc_id].default_game == "cs2", "Writes update the wrapped database"
+    assert database.all_users is meta_database.all_users, "Attributes are from the wrapped database"
+
+def test_write_during_synchronous_call(meta_database: MetaDatabase):
+    disc_id_1, disc_id_2 = list(meta_database.all_users)[:2]
+    database = AsyncDatabase(meta_database)
+    write_thread = Thread(target=asyncio.run, args=(database.set_join_sound(disc_id_2, "sound_2"),))
+
+    try:
+        # A write runs in the writer thread while the wrapped database is in a transaction
+        with meta_database:
+            meta_database.execute_query(
+                "REPLACE INTO join_sounds(disc_id, sound) VALUES (?, ?)", disc_id_1, "sound_1", commit=False
+            )
+            write_thread.start()
+            sleep(0.2)
+
+            assert meta_database.connection is not None, "Connection of the synchronous call is kept open"
+            meta_database.connection.rollback()
+
+        write_thread.join()
+    finally:
+        database.close()
+
+    assert meta_database.get_join_sound(disc_id_1) is None, "The synchronous transaction is not committed by the writer"
+    assert meta_database.get_join_sound(disc_id_2) == "sound_2", "The write is done once the synchronous call is over"
+
+def test_performance_score(game_databases: dict[str, GameDatabase]):
+    game_database = game_databases["lol"]
+    insert_random_games(game_database, 100, seed=42)
+    database = AsyncDatabase(game_database, max_readers=2)
+
+    async def read_scores():
+        return await asyncio.gather(*[database.get_performance_score() for _ in range(4)])
+
+    try:
+        scores = asyncio.run(read_scores())
+    finally:
+        database.close()
+
+    expected = game_database.get_performance_score()()
+    assert all(score == expected for score in scores), "Performance scores are the same in all threads"
+
+def test_blocking_monitor():
+    async def block():
+        async with EventLoopBlockingMonitor() as monitor:
+            await asyncio.sleep(0.1)
+            sleep(0.3)
+
+        return monitor
+
+    monitor = asyncio.run(block())
+
+    assert 0.25 < monitor.blocked_time < 0.5, "Blocking time is measured"
+    assert 0.25 < monitor.max_blocked_time < 0.5, "Longest blocking time is measured"
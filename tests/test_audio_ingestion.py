@@ -0,0 +1,139 @@
+import asyncio
+import os
+import sys
+from time import monotonic
+
+from intfar.api.audio_ingestion import AudioIngestion, run_process
+
+class _MockDownloader:
+    def __init__(self, delay: float, size: int = 1000):
+        self.delay = delay
+        self.size = size
+        self.active = 0
+        self.max_active = 0
+        self.started = []
+
+    async def download(self, url: str, folder: str):
+        self.started.append(url)
+        self.active += 1
+        self.max_active = max(self.active, self.max_active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+
+        if url.endswith("invalid"):
+            return False, "Could not download"
+
+        path = f"{folder}/{url.split('/')[-1]}.mp3"
+        with open(path, "wb") as fp:
+            fp.write(b"0" * self.size)
+
+        return True, path
+
+    async def probe(self, path: str):
+        return 2.5
+
+def _create_queue(*names: str):
+    return [(f"https://youtube.com/{name}", None, "url") for name in names]
+
+def test_prefetch(tmp_path):
+    async def run():
+        downloader = _MockDownloader(0.2)
+        ingestion = AudioIngestion(downloader.download, downloader.probe, prefetch_count=2, max_downloads=2, temp_folder=tmp_path)
+        queue = _create_queue("a", "b", "c", "d")
+
+        current = queue.pop(0)
+        ingestion.start(current)
+        ingestion.prefetch(queue)
+
+        start = monotonic()
+        success, path, duration = await ingestion.get(current)
+        assert success and duration == 2.5
+        assert os.path.exists(path)
+        assert monotonic() - start < 0.3, "The current sound is downloaded before prefetched sounds"
+
+        await asyncio.sleep(0.3)
+        assert downloader.started == [current[0], queue[0][0], queue[1][0]], "The next sounds in the queue are prefetched"
+        assert downloader.max_active == 2, "No more than two sounds are downloaded at a time"
+
+        start = monotonic()
+        success, next_path, _ = await ingestion.get(queue[0])
+        assert success and monotonic() - start < 0.05, "Prefetched sounds are ready immediately"
+
+        ingestion.release(current)
+        assert not os.path.exists(path), "Released sounds are deleted"
+        assert ingestion.disk_used == 2000
+
+        ingestion.release(queue[0])
+        ingestion.release(queue[1])
+        assert not os.path.exists(next_path)
+        assert ingestion.disk_used == 0
+        assert os.listdir(tmp_path) == []
+
+    asyncio.run(run())
+
+def test_disk_budget(tmp_path):
+    async def run():
+        downloader = _MockDownloader(0.01, size=600)
+        ingestion = AudioIngestion(downloader.download, downloader.probe, prefetch_count=5, disk_budget=1000, temp_folder=tmp_path)
+        queue = _create_queue("a", "b", "c")
+
+        await ingestion.get(queue[0])
+        await ingestion.get(queue[1])
+        assert ingestion.disk_used == 1200
+
+        ingestion.prefetch(queue)
+        assert not ingestion.is_started(queue[2]), "Sounds are not prefetched when the disk budget is used"
+
+        success, _, _ = await ingestion.get(queue[2])
+        assert success, "Sounds that are about to be played are downloaded regardless of the budget"
+
+        for entry in queue:
+            ingestion.release(entry)
+
+        ingestion.prefetch(_create_queue("d"))
+        assert ingestion.get_metrics()["downloads"] == 1, "Sounds are prefetched when disk space is freed"
+
+    asyncio.run(run())
+
+def test_release_while_downloading(tmp_path):
+    async def run():
+        downloader = _MockDownloader(1)
+        ingestion = AudioIngestion(downloader.download, downloader.probe, temp_folder=tmp_path)
+        queue = _create_queue("a", "invalid")
+
+        ingestion.prefetch(queue)
+        await asyncio.sleep(0.05)
+        ingestion.release(queue[0])
+        await asyncio.sleep(0.05)
+
+        assert downloader.active == 1, "Released downloads are cancelled"
+        assert not ingestion.is_started(queue[0])
+
+        success, error, duration = await ingestion.get(queue[1])
+        assert not success and error == "Could not download" and duration is None
+
+        ingestion.release(queue[1])
+        assert os.listdir(tmp_path) == [], "Folders of cancelled and failed downloads are removed"
+
+    asyncio.run(run())
+
+def test_run_process_does_not_block():
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        returncode, stdout, _ = await run_process(sys.executable, "-c", "import time; time.sleep(0.3); print('done')")
+        ticker.cancel()
+
+        assert returncode == 0 and stdout.strip() == "done"
+        assert ticks > 10, "The event loop runs while the process runs"
+
+    asyncio.run(run())
@@ -4,7 +4,8 @@ from intfar.api.meta_database import MetaDatabase
 from intfar.api.game_database import GameDatabase
 from intfar.api.game_data.lol import LoLGameStats, LoLPlayerStats
 from intfar.api.game_data.cs2 import CS2GameStats, CS2PlayerStats
-from intfar.api.util import SUPPORTED_GAMES
+from intfar.api.util import SUPPORTED_GAMES, MAIN_GUILD_ID
+from tests.synthetic_data.games import insert_random_games
 
 def test_game_won_success(
     meta_database: MetaDatabase,
@@ -763,3 +764,101 @@ def test_bet_placed_fail(
 #         self.assert_equals(
 #             formatted, expected_format, f"Betting amount success - {expected_format}."
 #         )
+
+def _get_returns(bet_handler: BettingHandler, cached: bool) -> dict[tuple[str, int], float | str]:
+    returns = {}
+    for bet in bet_handler.all_bets:
+        for target_id in [None] + list(bet_handler.game_database.game_users):
+            try:
+                if cached:
+                    returns[(bet.event_id, target_id)] = bet_handler.get_dynamic_bet_return(bet, target_id)
+                else:
+                    # Calculate the return the same way as get_dynamic_bet_return, without the cache
+                    count, num_games = bet_handler.get_bet_odds(bet, None if bet.target_required == bet.TARGET_INVALID else target_id)
+                    if num_games == 0:
+                        returns[(bet.event_id, target_id)] = bet.base_return
+                    elif count == 0:
+                        returns[(bet.event_id, target_id)] = max(num_games, 1)
+                    else:
+                        returns[(bet.event_id, target_id)] = num_games / count
+            except Exception as exc:
+                returns[(bet.event_id, target_id)] = type(exc).__name__
+
+    return returns
+
+def test_bet_odds_cache(
+    game_databases: dict[str, GameDatabase],
+    betting_handlers: dict[str, BettingHandler]
+):
+    for game in SUPPORTED_GAMES:
+        insert_random_games(game_databases[game], 200, seed=3)
+        bet_handler = betting_handlers[game]
+
+        assert _get_returns(bet_handler, True) == _get_returns(bet_handler, False), f"Cached bet returns are correct for {game}"
+        assert _get_returns(bet_handler, True) == _get_returns(bet_handler, False), f"Bet returns are read from cache for {game}"
+
+    game_database = game_databases["lol"]
+    bet_handler = betting_handlers["lol"]
+    disc_ids = list(game_database.game_users)
+
+    player_stats = [
+        LoLPlayerStats("new_game", disc_id, game_database.game_users[disc_id].player_id[0], 12, 0, 3, doinks="10000000", kda=15, kp=90, champ_id=1)
+        for disc_id in disc_ids[:2]
+    ]
+    game_stats = LoLGameStats("lol", "new_game", 2000000000, 60 * 25, 1, MAIN_GUILD_ID, [], player_stats, intfar_id=disc_ids[1], intfar_reason="1000")
+    game_database.save_stats(game_stats)
+
+    bet_handler.odds_cache.refresh()
+    cached_targets = {target_id for _, target_id in bet_handler.odds_cache._odds}
+    assert cached_targets == set(disc_ids[2:]), "Only odds that the new game can change are removed"
+    assert _get_returns(bet_handler, True) == _get_returns(bet_handler, False), "Bet returns are correct after a game is saved"
+
+    game_database.delete_game("new_game")
+    assert _get_returns(bet_handler, True) == _get_returns(bet_handler, False), "Bet returns are correct after a game is deleted"
+
+def test_resolve_bets(
+    meta_database: MetaDatabase,
+    game_databases: dict[str, GameDatabase],
+    betting_handlers: dict[str, BettingHandler]
+):
+    game_database = game_databases["lol"]
+    bet_handler = betting_handlers["lol"]
+    disc_ids = list(game_database.game_users)
+    insert_random_games(game_database, 50, seed=5)
+
+    player_stats = [
+        LoLPlayerStats("game_1", disc_id, game_database.game_users[disc_id].player_id[0], 10 - index, 2, 5, doinks=doinks, champ_id=1)
+        for index, (disc_id, doinks) in enumerate(zip(disc_ids[:3], ["10000000", None, None]))
+    ]
+    game_stats = LoLGameStats("lol", "game_1", 2000000000, 60 * 25, 1, MAIN_GUILD_ID, [], player_stats, intfar_id=disc_ids[1], intfar_reason="1000")
+
+    game_database.make_bet(disc_ids[0], MAIN_GUILD_ID, "game_win", 20, 0)
+    game_database.make_bet(disc_ids[1], MAIN_GUILD_ID, "intfar", 10, 0, disc_ids[0], 1)
+    game_database.make_bet(disc_ids[1], MAIN_GUILD_ID, "game_win", 10, 0, None, 1)
+    game_database.make_bet(disc_ids[3], MAIN_GUILD_ID, "most_kills", 30, 0, disc_ids[0])
+
+    balances_before = dict((disc_id, tokens) for tokens, disc_id in meta_database.get_token_balance())
+    expected_outcomes = {
+        disc_id: [
+            bet_handler.get_bet_outcome(amounts, bet_timestamp, events, targets, game_stats)
+            for _, _, _, amounts, events, targets, bet_timestamp, _, _ in bets
+        ]
+        for disc_id, bets in game_database.get_bets(True, guild_id=MAIN_GUILD_ID).items()
+    }
+
+    report = bet_handler.resolve_bets(game_stats, 8)
+
+    assert game_database.get_bets(True) == {}, "No active bets after bets are resolved"
+    assert report.tokens_for_playing == {disc_ids[0]: 8 + 15, disc_ids[1]: 8, disc_ids[2]: 8}, "Tokens are awarded for playing and doinks"
+
+    for disc_id, outcomes in expected_outcomes.items():
+        resolved = [(resolved_bet.success, resolved_bet.payout) for resolved_bet in report.bets[disc_id]]
+        assert resolved == outcomes, "Bets are resolved like they are one at a time"
+
+        won = sum(payout for success, payout in outcomes if success)
+        gained = report.tokens_for_playing.get(disc_id, 0)
+        assert report.balances[disc_id] == balances_before[disc_id] + gained, "Balance before bets is reported"
+        assert meta_database.get_token_balance(disc_id) == balances_before[disc_id] + gained + won, "Winnings are awarded"
+
+    assert [len(report.bets[disc_id][0].bet_ids) for disc_id in disc_ids[:2]] == [1, 2], "Multi-bets are resolved together"
+    assert not report.bets[disc_ids[1]][0].success, "Multi-bet is lost if one of the bets is lost"
@@ -5,6 +5,7 @@ from intfar.api.game_database import GameDatabase
 from intfar.api.game_data.lol import LoLGameStats, LoLPlayerStats
 from intfar.api.game_data.cs2 import CS2GameStats, CS2PlayerStats
 from intfar.api.util import MAIN_GUILD_ID, SUPPORTED_GAMES
+from tests.synthetic_data.games import insert_random_games
 
 MY_DISC_ID = 267401734513491969
 GAME = "lol"
@@ -166,6 +167,78 @@ def test_game_queries(meta_database: MetaDatabase, game_databases: dict[str, Gam
         missed_games = database.get_missed_games()
         assert missed_games == [], "No missed games"
 
+def test_stat_records(game_databases: dict[str, GameDatabase]):
+    player_cls = {"lol": LoLPlayerStats, "cs2": CS2PlayerStats}
+    game_cls = {"lol": LoLGameStats, "cs2": CS2GameStats}
+    timestamp = int(time())
+    kills_per_game = [(3, 7), (10, 2), (5, 5), (1, 4)]
+
+    def assert_records_match(database: GameDatabase):
+        for maximize in (True, False):
+            expected = {
+                disc_id: value
+                for disc_id, _, _, value, _ in database.get_best_or_worst_stat("kills", maximize=maximize)()
+            }
+            actual = {
+                disc_id: value
+                for disc_id, (value, _) in database.get_stat_records("kills", maximize).items()
+            }
+            assert actual == expected, "Personal stat records match"
+
+            expected_global = database.get_most_extreme_stat("kills", maximize)[:2]
+            actual_global = database.get_global_stat_record("kills", maximize)[:2]
+            assert actual_global == expected_global, "Global stat record matches"
+
+    for game in SUPPORTED_GAMES:
+        database: GameDatabase = game_databases[game]
+        users = list(database.game_users.items())[:2]
+
+        for index, kills in enumerate(kills_per_game):
+            game_id = str(index)
+            player_stats = [
+                player_cls[game](game_id, disc_id, user.player_id[0], player_kills, 1, 1, None, 0, 0, 0)
+                for (disc_id, user), player_kills in zip(users, kills)
+            ]
+            game_stats = game_cls[game](
+                game, game_id, timestamp + index, 60 * 25, 1, MAIN_GUILD_ID, None, player_stats
+            )
+            database.save_stats(game_stats)
+
+            assert_records_match(database)
+
+        database.rebuild_stat_records()
+        assert_records_match(database)
+
+def test_performance_score_engine(game_databases: dict[str, GameDatabase]):
+    def assert_scores_match(database: GameDatabase, *args):
+        expected = database.get_performance_score_query(None, *args)()
+        actual = database.performance_engine.get_scores(*args)
+
+        assert [disc_id for disc_id, _ in actual] == [disc_id for disc_id, _ in expected], "Ranks match"
+        assert [score for _, score in actual] == [score for _, score in expected], "Scores match"
+
+    for game in SUPPORTED_GAMES:
+        database: GameDatabase = game_databases[game]
+        insert_random_games(database, 300, seed=42)
+
+        first_timestamp, last_timestamp = database.get_game_stats(["MIN(timestamp)", "MAX(timestamp)"])[0]
+        time_after = first_timestamp + (last_timestamp - first_timestamp) // 3
+        time_before = last_timestamp - (last_timestamp - first_timestamp) // 4
+
+        assert_scores_match(database, None, None, 0)
+        assert_scores_match(database, None, None, 10)
+        assert_scores_match(database, time_after, time_before, 1)
+        assert_scores_match(database, time_after + 0.5, time_before - 0.5, 1)
+
+        # New games are added to the existing aggregates
+        insert_random_games(database, 20, last_timestamp + 1, seed=1)
+        assert_scores_match(database, None, None, 0)
+
+        # Removing a user causes a full rebuild
+        database.remove_user(list(database.game_users)[-1])
+        assert_scores_match(database, None, None, 0)
+        assert_scores_match(database, time_after, time_before, 1)
+
 def test_stat_queries(self, game_databases: dict[str, GameDatabase]):
     disc_id = 1234567890
     player_id = "abcdef123-456"
@@ -0,0 +1,112 @@
+import json
+import os
+from time import perf_counter
+
+from intfar.api.game_apis.demo_cache import ParsedDemoCache
+
+def _parsed_demo(rounds: int) -> dict:
+    # Nested data with the same shape as the output of awpy
+    return {
+        "matchID": "match",
+        "mapName": "de_mirage",
+        "tickRate": 64,
+        "playerConnections": [
+            {"tick": 1, "steamID": 76561198000000000 + index, "action": "connect"}
+            for index in range(10)
+        ],
+        "gameRounds": [
+            {
+                "roundNum": number,
+                "winningSide": "CT" if number % 2 else "T",
+                "bombPlantTick": None if number % 3 else 5000.0,
+                "kills": [
+                    {"tick": tick, "attackerSteamID": 76561198000000000 + tick % 10, "isHeadshot": tick % 4 == 0}
+                    for tick in range(number * 10, number * 10 + 8)
+                ]
+            }
+            for number in range(rounds)
+        ]
+    }
+
+def _awpy_demo(rounds: int) -> dict:
+    # Parsed demo like awpy returns it, with NaN values for missing positions and
+    # stats, and rows with different keys depending on the events in the round
+    nan = float("nan")
+    game_rounds = []
+    for number in range(rounds):
+        kills = []
+        for tick in range(number * 10, number * 10 + number % 4):
+            kill = {"tick": tick, "attackerSteamID": 76561198000000000 + tick % 10, "attackerX": nan if tick % 3 else 120.5}
+            if tick % 2:
+                kill["assisterSteamID"] = 76561198000000000 + (tick + 1) % 10
+                kill["flashThrowerSteamID"] = None
+
+            kills.append(kill)
+
+        game_round = {"roundNum": number, "ctEqVal": 4200 if number else nan, "kills": kills}
+        if number % 5 == 0:
+            game_round["bombEvents"] = [{"tick": number * 10 + 9, "bombAction": "plant", "bombSite": "A"}]
+
+        game_rounds.append(game_round)
+
+    return {"matchID": "match", "mapName": "de_ancient", "tickRate": 64.0, "parserParameters": {"rollup": nan}, "gameRounds": game_rounds}
+
+def test_get_and_put(tmp_path):
+    cache = ParsedDemoCache(f"{tmp_path}/cache")
+    data = _parsed_demo(24)
+
+    assert cache.get("CSGO-abcde") is None, "Missing demo is not cached"
+    assert cache.put("CSGO-abcde", data), "Demo is cached"
+
+    start = perf_counter()
+    cached_data = cache.get("CSGO-abcde")
+
+    assert cached_data == data, "Cached demo is the same as the parsed demo"
+    assert perf_counter() - start < 1, "Cached demo is read quickly"
+    assert cache.get("CSGO-fghij") is None, "Other demo is not cached"
+
+def test_eviction(tmp_path):
+    cache = ParsedDemoCache(f"{tmp_path}/cache")
+    for index in range(3):
+        cache.put(f"CSGO-{index}", _parsed_demo(24))
+        os.utime(cache._get_path(f"CSGO-{index}"), (index, index))
+
+    # Use the oldest demo, so it is now the most recently used
+    cache.get("CSGO-0")
+
+    entry_size = os.path.getsize(cache._get_path("CSGO-0"))
+    cache.max_size = entry_size * 3.5
+    cache.put("CSGO-3", _parsed_demo(24))
+
+    assert cache.get("CSGO-1") is None, "Least recently used demo is evicted"
+    for key in ("CSGO-0", "CSGO-2", "CSGO-3"):
+        assert cache.get(key) is not None, "Recently used demos are kept"
+
+def test_corrupt_file(tmp_path):
+    cache = ParsedDemoCache(f"{tmp_path}/cache")
+    cache.put("CSGO-abcde", _parsed_demo(2))
+
+    with open(cache._get_path("CSGO-abcde"), "wb") as fp:
+        fp.write(b"not a cached demo")
+
+    assert cache.get("CSGO-abcde") is None, "Corrupt demo is not returned"
+    assert not os.path.exists(cache._get_path("CSGO-abcde")), "Corrupt demo is removed"
+
+def test_nan_and_ragged_rows(tmp_path):
+    cache = ParsedDemoCache(f"{tmp_path}/cache")
+    data = _awpy_demo(24)
+
+    assert cache.put("CSGO-abcde", data), "Demo with NaN values and ragged rows is cached"
+
+    # NaN is not equal to itself, JSON writes it the same way every time
+    cached_data = cache.get("CSGO-abcde")
+    assert json.dumps(cached_data) == json.dumps(data), "Cached demo is the same as the parsed demo"
+
+    assert cache.put("CSGO-fghij", {"values": [1, "two", {"three": 3}]}), "Mixed data is cached"
+    assert cache.get("CSGO-fghij") == {"values": [1, "two", {"three": 3}]}
+
+def test_uncacheable_data(tmp_path):
+    cache = ParsedDemoCache(f"{tmp_path}/cache")
+
+    assert not cache.put("CSGO-abcde", {"callback": lambda: None}), "Data that can't be pickled is not cached"
+    assert cache.get("CSGO-abcde") is None, "Data that can't be pickled is not cached"
@@ -0,0 +1,105 @@
+import asyncio
+import os
+from time import sleep, perf_counter
+
+import pytest
+
+from intfar.api.game_apis.demo_parse_service import (
+    DemoParseService,
+    DemoParseCancelledError,
+    DemoParseQueueFullError,
+    DemoParseTimeoutError
+)
+
+def _parse_slowly(demo_file: str):
+    # The 'demo file' is the amount of seconds to spend parsing it
+    if demo_file == "invalid":
+        raise ValueError("Invalid demo")
+
+    sleep(float(demo_file))
+    return {"demo_file": demo_file, "pid": os.getpid()}
+
+async def _run_and_close(service: DemoParseService, coroutine):
+    try:
+        return await coroutine
+    finally:
+        service.close()
+
+def test_parallel_parsing():
+    service = DemoParseService(_parse_slowly, max_workers=3)
+
+    async def parse_all():
+        # Start the workers first, so their startup time isn't measured
+        await asyncio.gather(*[service.parse("0") for _ in range(3)])
+
+        start = perf_counter()
+        results = await asyncio.gather(*[service.parse("1") for _ in range(3)])
+        return results, perf_counter() - start
+
+    results, duration = asyncio.run(_run_and_close(service, parse_all()))
+
+    assert [result["demo_file"] for result in results] == ["1", "1", "1"], "All demos are parsed"
+    assert len({result["pid"] for result in results}) == 3, "Demos are parsed in separate processes"
+    assert duration < 2, "Demos are parsed in parallel"
+
+def test_worker_reuse():
+    service = DemoParseService(_parse_slowly, max_workers=1)
+
+    async def parse_all():
+        return [await service.parse("0"), await service.parse("0")]
+
+    first, second = asyncio.run(_run_and_close(service, parse_all()))
+
+    assert first["pid"] == second["pid"], "Worker is reused"
+
+def test_failed_job():
+    service = DemoParseService(_parse_slowly, max_workers=1)
+
+    async def parse_all():
+        with pytest.raises(ValueError):
+            await service.parse("invalid")
+
+        return await service.parse("0")
+
+    result = asyncio.run(_run_and_close(service, parse_all()))
+
+    assert result["demo_file"] == "0", "Worker keeps working after a failed job"
+    assert [job["state"] for job in service.get_jobs()] == ["failed", "done"], "Job states are tracked"
+
+def test_timeout_and_cancel():
+    service = DemoParseService(_parse_slowly, max_workers=1)
+
+    async def parse_all():
+        with pytest.raises(DemoParseTimeoutError):
+            await service.parse("10", timeout=0.5)
+
+        job = service.submit("10")
+        await asyncio.sleep(0.5)
+        assert service.get_active_job("10") is job, "Job is active"
+        service.cancel(job.job_id)
+
+        with pytest.raises(DemoParseCancelledError):
+            await service.wait(job)
+
+        return await service.parse("0")
+
+    start = perf_counter()
+    result = asyncio.run(_run_and_close(service, parse_all()))
+
+    assert result["demo_file"] == "0", "New worker is started after the old one is killed"
+    assert perf_counter() - start < 10, "Worker is killed when job times out or is cancelled"
+    assert [job["state"] for job in service.get_jobs()] == ["timed_out", "cancelled", "done"], "Job states are tracked"
+
+def test_queue_full():
+    service = DemoParseService(_parse_slowly, max_workers=1, max_queued=1)
+
+    async def parse_all():
+        job = service.submit("0")
+        with pytest.raises(DemoParseQueueFullError):
+            service.submit("0")
+
+        return await service.wait(job)
+
+    result = asyncio.run(_run_and_close(service, parse_all()))
+
+    assert result["demo_file"] == "0", "Queued job is parsed"
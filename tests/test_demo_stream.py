@@ -0,0 +1,98 @@
+import asyncio
+import bz2
+import os
+import threading
+
+import httpx
+import pytest
+
+from intfar.api.game_apis.demo_stream import DemoWriter, download_demo
+
+def _demo_content(size: int) -> bytes:
+    # Repeat random blocks, so the data compresses a bit like a real demo
+    blocks = [os.urandom(1024) for _ in range(16)]
+    return b"".join(blocks[index % 7 % len(blocks)] for index in range(size // 1024))
+
+def _write_in_chunks(filename: str, compressed: bytes, chunk_size: int):
+    with DemoWriter(filename) as writer:
+        for index in range(0, len(compressed), chunk_size):
+            writer.write(compressed[index:index + chunk_size])
+
+    return writer
+
+@pytest.mark.parametrize("chunk_size", [1, 4096, 1024 * 1024])
+def test_demo_writer(tmp_path, chunk_size):
+    content = _demo_content(200 * 1024)
+    compressed = bz2.compress(content)
+    filename = f"{tmp_path}/demo.dem"
+
+    writer = _write_in_chunks(filename, compressed, chunk_size)
+
+    assert writer.compressed_size == len(compressed), "Compressed size is counted"
+    assert writer.demo_size == len(content), "Decompressed size is counted"
+    with open(filename, "rb") as fp:
+        assert fp.read() == content, "Decompressed content is written"
+
+def test_demo_writer_truncated(tmp_path):
+    compressed = bz2.compress(_demo_content(200 * 1024))
+
+    with pytest.raises(OSError):
+        _write_in_chunks(f"{tmp_path}/demo.dem", compressed[:len(compressed) // 2], 4096)
+
+def test_demo_writer_multiple_streams(tmp_path):
+    parts = [_demo_content(50 * 1024), _demo_content(30 * 1024)]
+    compressed = b"".join(bz2.compress(part) for part in parts)
+    filename = f"{tmp_path}/demo.dem"
+
+    _write_in_chunks(filename, compressed, 1000)
+
+    with open(filename, "rb") as fp:
+        assert fp.read() == b"".join(parts), "All streams are decompressed"
+
+def test_demo_writer_corrupt(tmp_path):
+    with pytest.raises(OSError):
+        _write_in_chunks(f"{tmp_path}/demo.dem", b"not a bz2 file" * 100, 100)
+
+def test_download_demo(tmp_path):
+    content = _demo_content(500 * 1024)
+    compressed = bz2.compress(content)
+
+    def handle_request(request: httpx.Request):
+        if request.url.path == "/demo.dem.bz2":
+            return httpx.Response(200, content=compressed)
+
+        return httpx.Response(404)
+
+    async def download(url):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle_request)) as client:
+            return await download_demo(client, url, f"{tmp_path}/demo.dem")
+
+    stats = asyncio.run(download("http://replay.valve.net/demo.dem.bz2"))
+
+    assert stats.compressed_size == len(compressed), "Compressed size is correct"
+    assert stats.demo_size == len(content), "Demo size is correct"
+    with open(f"{tmp_path}/demo.dem", "rb") as fp:
+        assert fp.read() == content, "Demo is decompressed"
+
+    assert asyncio.run(download("http://replay.valve.net/missing.dem.bz2")) is None, "Missing demo returns None"
+
+def test_download_demo_off_event_loop(tmp_path, monkeypatch):
+    compressed = bz2.compress(_demo_content(3 * 1024 * 1024))
+    write = DemoWriter.write
+    write_threads = set()
+
+    def recording_write(self, chunk):
+        write_threads.add(threading.get_ident())
+        write(self, chunk)
+
+    monkeypatch.setattr(DemoWriter, "write", recording_write)
+
+    async def download():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=compressed))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await download_demo(client, "http://replay.valve.net/demo.dem.bz2", f"{tmp_path}/demo.dem")
+
+    stats = asyncio.run(download())
+
+    assert stats.compressed_size == len(compressed), "Compressed size is correct"
+    assert write_threads and threading.get_ident() not in write_threads, "Chunks are written outside the event loop"
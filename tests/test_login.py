@@ -0,0 +1,43 @@
+from time import sleep
+
+from intfar.api.meta_database import MetaDatabase
+from intfar.api.util import get_hashed_secret
+from intfar.app.util import UserDetailsCache, get_logged_in_user
+
+def test_logged_in_user(meta_database: MetaDatabase):
+    for disc_id, user in meta_database.all_users.items():
+        assert get_logged_in_user(meta_database, get_hashed_secret(user.secret)) == disc_id, "User is found from hashed secret"
+
+    assert get_logged_in_user(meta_database, get_hashed_secret("wrong secret")) is None, "Unknown secret is not logged in"
+    assert get_logged_in_user(meta_database, None) is None, "No cookie is not logged in"
+
+    meta_database.add_user(1234)
+    hashed_secret = get_hashed_secret(meta_database.get_client_secret(1234))
+    assert get_logged_in_user(meta_database, hashed_secret) == 1234, "Added user is found from hashed secret"
+
+    assert MetaDatabase(meta_database.config).get_user_from_hashed_secret(hashed_secret) == 1234, "Hashed secrets are loaded with users"
+
+def test_user_details_cache():
+    cache = UserDetailsCache(max_entries=2, ttl=0.2)
+    cache.put(1, ("Name 1", None))
+    cache.put(2, ("Name 2", "avatar.png"))
+
+    assert cache.get(1) == ("Name 1", None), "Details are cached"
+
+    cache.put(3, ("Name 3", None))
+    assert cache.get(2) is None, "Least recently used user is removed"
+    assert cache.get(1) is not None and cache.get(3) is not None, "Other users are kept"
+
+    sleep(0.3)
+    assert cache.get(1) is None, "Details expire"
+
+def test_user_added_by_other_process(meta_database: MetaDatabase):
+    # Like the bot process, which shares all_users with the website through the sync manager
+    bot_database = MetaDatabase(meta_database.config)
+    bot_database.all_users = meta_database.all_users
+
+    bot_database.add_user(1234)
+    hashed_secret = get_hashed_secret(bot_database.get_client_secret(1234))
+
+    assert get_logged_in_user(meta_database, hashed_secret) == 1234, "User added by other process is found from hashed secret"
+    assert get_logged_in_user(meta_database, get_hashed_secret("wrong secret")) is None, "Unknown secret is not logged in"
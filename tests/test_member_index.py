@@ -0,0 +1,103 @@
+import random
+from types import SimpleNamespace
+
+from intfar.discbot.member_index import GuildMemberIndex, MemberIndex
+
+_SYLLABLES = ["ka", "mu", "rt", "ed", "die", "sl", "ug", "ger", "nø", "zik", "zak", "say", "wat", "Fe", "LI", "ne"]
+
+def _random_name(rng: random.Random):
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 4)))
+
+def _create_member(member_id: int, rng: random.Random):
+    name = _random_name(rng)
+    global_name = _random_name(rng) if rng.random() < 0.7 else None
+    nick = _random_name(rng) if rng.random() < 0.5 else None
+
+    return SimpleNamespace(
+        id=member_id, name=name, global_name=global_name, nick=nick, display_name=nick or global_name or name
+    )
+
+def _get_discord_id(members: list, nickname: str, exact_match: bool):
+    # Copy of how DiscordClient.get_discord_id found members before the member index
+    matches = []
+    for member in members:
+        for attribute in (member.global_name, member.nick, member.display_name, member.name):
+            if attribute is not None:
+                if exact_match and attribute.lower() == nickname:
+                    return member.id
+                elif not exact_match and nickname in attribute.lower():
+                    matches.append(member.id)
+                    break
+
+    return matches[0] if len(matches) == 1 else None
+
+def _find(index: GuildMemberIndex, nickname: str, exact_match: bool):
+    if exact_match:
+        return index.find_exact(nickname)
+
+    matches = index.find_partial(nickname)
+    return matches[0] if len(matches) == 1 else None
+
+def _assert_lookups_match(index: GuildMemberIndex, members: list, rng: random.Random, message: str):
+    assert list(index.members) == [member.id for member in members], f"Members are indexed in order {message}"
+
+    queries = [_random_name(rng).lower() for _ in range(200)]
+    for member in members:
+        queries.append(member.name.lower())
+        queries.append(member.display_name.lower()[1:3])
+        queries.append(member.display_name.lower()[:-1])
+
+    for query in queries:
+        for exact_match in (True, False):
+            assert _find(index, query, exact_match) == _get_discord_id(members, query, exact_match), f"Lookup of '{query}' matches {message}"
+
+    for member in members:
+        assert index.get(member.id) is member
+
+def test_lookups_match_scan():
+    for seed in range(5):
+        rng = random.Random(seed)
+        members = [_create_member(member_id, rng) for member_id in range(200)]
+        index = GuildMemberIndex(members)
+
+        _assert_lookups_match(index, members, rng, f"(seed {seed})")
+
+def test_member_updates():
+    rng = random.Random(42)
+    members = [_create_member(member_id, rng) for member_id in range(100)]
+    guild = SimpleNamespace(id=1, members=members)
+    member_index = MemberIndex()
+    index = member_index.get_guild_index(guild)
+
+    assert member_index.get_guild_index(guild) is index, "Index is only built once"
+
+    # Members change their names
+    for member in rng.sample(members, 20):
+        member.name = _random_name(rng)
+        member.display_name = member.name
+        member.nick = None
+        member_index.add_member(guild.id, member)
+
+    _assert_lookups_match(index, members, rng, "after members are updated")
+
+    changed = members[5]
+    changed.global_name = "Completely new name"
+    member_index.update_user(changed.id)
+    assert index.find_exact("completely new name") == changed.id, "Users are found by new names"
+
+    # Members leave and join the guild
+    removed = rng.sample(members, 30)
+    for member in removed:
+        members.remove(member)
+        member_index.remove_member(guild.id, member.id)
+
+    for member_id in range(100, 120):
+        member = _create_member(member_id, rng)
+        members.append(member)
+        member_index.add_member(guild.id, member)
+
+    _assert_lookups_match(index, members, rng, "after members leave and join")
+    assert all(member.id not in index for member in removed), "Members that left are removed"
+
+    member_index.remove_guild(guild.id)
+    assert member_index.get_guild_index(guild) is not index, "Index is rebuilt after guild is removed"
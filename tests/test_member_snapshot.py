@@ -0,0 +1,69 @@
+import flask
+
+from intfar.api.member_snapshot import MemberSnapshot
+from intfar.api.meta_database import MetaDatabase
+from intfar.app import util as app_util
+from tests.mocks.app_requests import MockDiscordClient, start_app_request_server, stop_app_request_server
+
+def test_publish_and_refresh(tmp_path):
+    path = f"{tmp_path}/member_snapshot.json"
+    publisher = MemberSnapshot(path)
+    reader = MemberSnapshot(path)
+
+    assert not reader.refresh(), "Missing snapshot is not loaded"
+    assert not reader.loaded
+
+    version = publisher.publish({1: "Name 1", 2: None}, {1: "avatar_1.png"}, {1: [100, 200]}, {100: "Guild"})
+    assert reader.refresh(), "Published snapshot is loaded"
+    assert reader.version == version == 1
+    assert reader.nicknames == {1: "Name 1", 2: None}, "Discord IDs are loaded as ints"
+    assert reader.avatars == {1: "avatar_1.png"}
+    assert reader.guilds == {1: [100, 200]}
+    assert reader.guild_names == {100: "Guild"}
+    assert not reader.refresh(), "Unchanged snapshot is not reloaded"
+
+    publisher.publish({1: "New name"}, {}, {}, {})
+    assert reader.refresh(), "New version of snapshot is loaded"
+    assert reader.version == 2
+    assert reader.nicknames == {1: "New name"}
+
+    assert MemberSnapshot(path).publish({}, {}, {}, {}) == 3, "Versions continue from existing snapshot"
+
+def test_lookup_from_snapshot(tmp_path, meta_database: MetaDatabase):
+    snapshot = MemberSnapshot(f"{tmp_path}/member_snapshot.json")
+    disc_ids = list(meta_database.all_users.keys())
+    snapshot.publish(
+        {disc_ids[0]: "Name 0", disc_ids[1]: None},
+        {disc_ids[0]: "avatar_0.png"},
+        {disc_ids[0]: [100]},
+        {100: "Guild"}
+    )
+
+    client, server, event_loop = start_app_request_server(MockDiscordClient())
+
+    app = flask.Flask(__name__)
+    app.config.update(BOT_CONN=client, DATABASE=meta_database, MEMBER_SNAPSHOT=snapshot)
+
+    with app.test_request_context("/"):
+        assert app_util.get_discord_nick(disc_ids[0]) == "Name 0"
+        assert app_util.get_discord_nick(disc_ids[1]) is None, "Users not found by the bot are in the snapshot"
+        assert app_util.get_discord_avatar(disc_ids[0]) == "avatar_0.png"
+        assert app_util.get_guilds_for_user(disc_ids[0]) == [100]
+        assert app_util.get_guild_name(100) == "Guild"
+        assert app_util.get_guild_name() == {100: "Guild"}
+        assert flask.g.get("discord_round_trips", 0) == 0, "Members in snapshot are found without requests to the bot"
+
+        nicknames = app_util.get_discord_nick()
+        assert nicknames[disc_ids[0]] == "Name 0"
+        assert nicknames[disc_ids[1]] == "Unnamed"
+        assert nicknames[disc_ids[2]] == f"Nick {disc_ids[2]}"
+        assert flask.g.discord_round_trips == 1, "Members missing from snapshot are requested in one batch"
+
+        names = app_util.get_discord_nick([disc_ids[3], disc_ids[0], disc_ids[3]])
+        assert names == [f"Nick {disc_ids[3]}", "Name 0", f"Nick {disc_ids[3]}"]
+        assert flask.g.discord_round_trips == 2
+
+        assert app_util.get_discord_avatar(disc_ids[0], 128) == f"avatar_{disc_ids[0]}_128.png", "Other sizes of avatars are requested"
+        assert flask.g.discord_round_trips == 3
+
+    stop_app_request_server(client, server, event_loop)
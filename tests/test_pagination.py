@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from intfar.discbot.pagination import ListPages, PaginationStore
+
+def _entry(lines: list[str], age: int = 0) -> dict:
+    message = SimpleNamespace(created_at=datetime.now() - timedelta(seconds=age))
+    return {"message": message, "data": ListPages(lines)}
+
+def test_list_pages():
+    formatted = []
+    def format_item(item):
+        formatted.append(item)
+        return f"- {item}"
+
+    pages = ListPages(list(range(25)), format_item)
+    lines = asyncio.run(pages(10, 20))
+
+    assert len(pages) == 25, "Length is the amount of items"
+    assert lines == [f"- {item}" for item in range(10, 20)], "Lines on the page are returned"
+    assert formatted == list(range(10, 20)), "Only items on the page are formatted"
+
+def test_least_recently_used_evicted():
+    store = PaginationStore(max_entries=3)
+    for message_id in range(3):
+        store.put(message_id, _entry(["line"]))
+
+    # Use the oldest message, so it is now the most recently used
+    store.get(0)
+    store.put(3, _entry(["line"]))
+
+    assert store.get(1) is None, "Least recently used message is evicted"
+    assert all(store.get(message_id) is not None for message_id in (0, 2, 3)), "Recently used messages are kept"
+    assert store.get_metrics()["evictions"] == 1, "Evictions are counted"
+
+def test_size_bounded():
+    store = PaginationStore()
+    store.put(0, _entry(["line"] * 1000))
+    store.max_size = store.get_metrics()["memory_size"] * 1.5
+    store.put(1, _entry(["line"] * 1000))
+
+    assert store.get(0) is None, "Messages are evicted when the store is too big"
+    assert store.get_metrics()["memory_size"] <= store.max_size, "Memory size of the store is bounded"
+
+def test_size_calculated_once():
+    store = PaginationStore(max_entries=3)
+    sizes_calculated = []
+
+    class Pages(ListPages):
+        @property
+        def memory_size(self):
+            sizes_calculated.append(self)
+            return 100
+
+    entries = [{**_entry([]), "data": Pages(["line"])} for _ in range(5)]
+    for message_id, entry in enumerate(entries):
+        store.put(message_id, entry)
+        store.get(message_id)
+
+    store.put(4, entries[4])
+    store.sweep()
+
+    assert len(sizes_calculated) == 6, "Size of an entry is only calculated when it is stored"
+    assert store.get_metrics()["memory_size"] == 300, "Total size is updated when messages are evicted or replaced"
+
+def test_sweep():
+    store = PaginationStore(ttl=60)
+    store.put(0, _entry(["line"], age=120))
+    store.put(1, _entry(["line"]))
+    store.sweep()
+
+    assert len(store) == 1, "Expired messages are removed"
+    assert store.get(1) is not None, "Other messages are kept"
+    assert store.get_metrics()["expirations"] == 1, "Expirations are counted"
+    assert store.get_metrics()["memory_size"] == store.get(1)["data"].memory_size, "Size of expired messages is removed"
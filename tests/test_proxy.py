@@ -0,0 +1,55 @@
+import asyncio
+import os
+import sys
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import pytest
+
+from intfar.api.proxy import ProxyManager
+from tests.benchmark_proxy import EchoClient
+
+@pytest.fixture(scope="module")
+def proxy_manager():
+    python_path = shlex.quote(os.pathsep.join(sys.path))
+    worker_command = f"PYTHONPATH={python_path} {shlex.quote(sys.executable)} -m tests.benchmark_proxy --worker"
+    proxy_manager = ProxyManager(EchoClient, "cs2", worker_command)
+
+    yield proxy_manager
+
+    proxy_manager.kill()
+
+def test_call(proxy_manager: ProxyManager):
+    proxy = proxy_manager.create_proxy()
+
+    assert proxy.echo("hello") == "hello", "Result is returned"
+    assert proxy.echo([1, 2, 3]) == [1, 2, 3], "Result is pickled"
+
+def test_concurrent_calls(proxy_manager: ProxyManager):
+    proxy = proxy_manager.create_proxy()
+    proxy.echo(0)
+
+    start = perf_counter()
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(proxy.slow_echo, range(8)))
+
+    assert results == list(range(8)), "Each call gets its own result"
+    assert perf_counter() - start < 0.5, "Calls are handled concurrently"
+
+@pytest.mark.asyncio
+async def test_concurrent_async_calls(proxy_manager: ProxyManager):
+    proxy = proxy_manager.create_proxy()
+
+    async def call(value):
+        return await proxy._acall_proxy("slow_echo", value)
+
+    results = await asyncio.gather(*[call(index) for index in range(8)])
+
+    assert results == list(range(8)), "Each call gets its own result"
+
+def test_timeout(proxy_manager: ProxyManager):
+    proxy = proxy_manager.create_proxy(func_timeouts={"slow_echo": 0})
+
+    assert proxy.slow_echo(1) is None, "Timed out call returns None"
+    assert proxy.echo(2) == 2, "Late result is not mixed up with the next call"
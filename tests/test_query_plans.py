@@ -0,0 +1,317 @@
+from time import time
+
+from mhooge_flask.database import SQLiteDatabase
+
+from intfar.api.meta_database import MetaDatabase
+from intfar.api.game_database import GameDatabase
+from intfar.api.game_databases.lol import LoLGameDatabase
+from intfar.api.game_databases.cs2 import CS2GameDatabase
+from intfar.api.game_data.lol import LoLGameStats, LoLPlayerStats
+from intfar.api.game_data.cs2 import CS2GameStats, CS2PlayerStats
+from intfar.api.query_plan import QueryPlanAuditor
+from intfar.api.util import MAIN_GUILD_ID, SUPPORTED_GAMES
+
+# Methods that are expected to do full table scans, i.e. ones that aggregate
+# over every row of a table anyway. A method that starts scanning a table
+# that isn't listed here should get an index or a narrower query instead.
+KNOWN_FULL_SCANS = {
+    "meta": {
+        "get_sounds_version": {"sounds"},
+    },
+    "game": {
+        "get_game_ids": {"games"},
+        "get_missed_games": {"missed_games"},
+        "inspect_missed_games": {"missed_games"},
+        "get_lifetime_activity": {"games"},
+        "get_weekday_activity": {"games"},
+        "get_hourly_activity": {"games"},
+        "get_performance_facts": {"games", "participants"},
+        "get_lists": {"champ_lists"},
+        "get_new_bingo_challenges": {"lan_bingo"},
+    }
+}
+
+# Tables that only hold a row per registered user. SQLite will happily scan
+# these instead of using an index, which is fine at their size.
+_SMALL_TABLES = {"users", "betting_balance", "default_game"}
+
+# Queries are run in the order they are listed, with the given arguments. Arguments
+# that depend on the state of the database are given as a function of the database.
+_META_QUERIES = [
+    ("get_base_users", ()),
+    ("user_exists", (2,)),
+    ("add_user", (7,)),
+    ("set_default_game", (2, "cs2")),
+    ("get_client_secret", (2,)),
+    ("get_user_from_secret", ("secret",)),
+    ("get_user_from_hashed_secret", ("secret",)),
+    ("add_sound", ("sound", 1, 0)),
+    ("add_sound_hit", ("sound",)),
+    ("get_sounds", ("most_played",)),
+    ("get_sounds_version", ()),
+    ("get_sound_owner", ("sound",)),
+    ("is_valid_sound", ("sound",)),
+    ("get_sound_hits", ("sound", 0, int(time()) + 1000)),
+    ("get_weekly_sound_hits", (0, int(time()) + 1000)),
+    ("get_total_sound_hits", ()),
+    ("get_total_sound_hits", ("sound",)),
+    ("flush_sound_hits", ()),
+    ("get_join_sound", (2,)),
+    ("set_join_sound", (2, "sound")),
+    ("remove_join_sound", (2,)),
+    ("remove_sound", ("sound",)),
+    ("get_token_balance", ()),
+    ("get_token_balance", (2,)),
+    ("get_max_tokens_details", ()),
+    ("update_token_balance", (2, 10)),
+    ("update_token_balances", ({2: 10, 3: 20},)),
+    ("give_tokens", (2, 10, 3)),
+    ("get_commendations", ("report", 1)),
+    ("get_commendations", ("report", 1, 2)),
+    ("get_max_commendation_details", ("report",)),
+    ("commend_user", ("honor", 1, 2)),
+    ("add_items_to_shop", ([("item", 10)],)),
+    ("get_item_by_name", ("item", "buy")),
+    ("get_items_for_user", (2,)),
+    ("get_items_in_shop", ()),
+    ("get_items_matching_price", ("item", 10, 1)),
+    ("get_matching_items_for_user", (2, "item", 1)),
+    ("buy_item", (2, [(1, 10, 3)], 10, "item")),
+    ("sell_item", (2, [(1,)], "item", 10)),
+    ("cancel_listings", ([2], "item", 2)),
+    ("reset_shop", ()),
+]
+
+# Public methods that are not audited, with the reason why
+_META_SKIPPED = {
+    "get_weekly_timestamp": "only calculates timestamps",
+    "get_best_comps": "queries tables that are only in the game databases",
+    "clear_tables": "deletes every row of every table",
+}
+
+_GAME_QUERIES = [
+    ("get_all_registered_users", ()),
+    ("user_exists", (2,)),
+    ("game_exists", ("0",)),
+    ("get_latest_game", ()),
+    ("get_latest_game", (0, int(time()) + 1000, MAIN_GUILD_ID)),
+    ("get_most_extreme_stat", ("kills", True)),
+    ("get_best_or_worst_stat", ("kills", 1, True)),
+    ("get_played_count", (2, 1)),
+    ("get_played_count_for_stat", ("kills", True, 1)),
+    ("get_average_stat", ("kills", 1)),
+    ("get_played_doinks_count", (2,)),
+    ("get_played_intfar_count", (2,)),
+    ("get_played_with_most_doinks", (2,)),
+    ("get_played_with_most_intfars", (2,)),
+    ("get_played_ids", (2,)),
+    ("get_played_winrate", (2, 1)),
+    ("get_min_or_max_winrate_played", (2, True)),
+    ("get_game_ids", ()),
+    ("get_doinks_count", (2,)),
+    ("get_max_doinks_details", ()),
+    ("get_doinks_reason_counts", ()),
+    ("get_recent_intfars_and_doinks", ()),
+    ("get_games_results", ()),
+    ("get_games_count", (2,)),
+    ("get_longest_game", ()),
+    ("get_intfar_count", (2,)),
+    ("get_intfar_reason_counts", ()),
+    ("get_total_winrate", (2,)),
+    ("get_winrate_relation", (2, True)),
+    ("get_meta_stats", ()),
+    ("get_intfars_of_the_month", ()),
+    ("get_streak_facts", ()),
+    ("get_streak_facts", (0,)),
+    ("get_performance_facts", (["kills"],)),
+    ("get_performance_facts", (["kills"], 0)),
+    ("get_longest_intfar_streak", (2,)),
+    ("get_longest_no_intfar_streak", (2,)),
+    ("get_current_intfar_streak", ()),
+    ("get_longest_win_or_loss_streak", (2, 1)),
+    ("get_current_win_or_loss_streak", (2, 1)),
+    ("get_max_intfar_details", ()),
+    ("get_intfar_stats", (2,)),
+    ("get_intfar_relations", (2,)),
+    ("get_doinks_stats", (2,)),
+    ("get_doinks_relations", (2,)),
+    ("get_max_games_count", ()),
+    ("get_performance_score", (2,)),
+    ("get_performance_score_query", (2,)),
+    ("get_stat_records", ("kills",)),
+    ("get_global_stat_record", ("kills",)),
+    ("rebuild_stat_records", ()),
+    ("get_performance_signature", ()),
+    ("get_summary_data", (2,)),
+    ("save_summary_snapshot", lambda database: (2, database.get_summary_data(2))),
+    ("get_summary_snapshot", (2,)),
+    ("invalidate_summary_snapshots", ([2, 3],)),
+    ("invalidate_summary_snapshots", ()),
+    ("save_missed_game", ("1", MAIN_GUILD_ID, 0)),
+    ("get_missed_games", ()),
+    ("inspect_missed_games", ()),
+    ("remove_missed_game", ("1",)),
+    ("get_game_stats", (["game_id", "timestamp"], "0")),
+    ("get_player_stats", (["game_id", "kills"], "0", 1)),
+    ("get_game_stats_for_player", (["game_id", "timestamp"], 2)),
+    ("get_game_stats_for_player", (["game_id", "timestamp"], 2, (int(time()) + 1000, "2"), 10)),
+    ("get_event_sound", (2, "intfar")),
+    ("set_event_sound", (2, "sound", "intfar")),
+    ("remove_event_sound", (2, "intfar")),
+    ("make_bet", (2, MAIN_GUILD_ID, "game_win", 10, 0)),
+    ("get_bets", (True, 1, MAIN_GUILD_ID)),
+    ("get_bets", (False, 1)),
+    ("generate_ticket_id", (2,)),
+    ("get_bet_id", (2, MAIN_GUILD_ID, "game_win")),
+    ("get_bet_id", (2, MAIN_GUILD_ID, "game_win", None, 0)),
+    ("get_better_id", (2,)),
+    ("mark_bet_as_resolved", (2, "0", 0, True, 10)),
+    ("mark_bets_as_resolved", ([(2, True, 10)], "0", 0)),
+    ("cancel_multi_bet", (0, 1)),
+    ("make_bet", (2, MAIN_GUILD_ID, "game_win", 10, 0)),
+    ("cancel_bet", (lambda database: (database.get_bet_id(2, MAIN_GUILD_ID, "game_win"), 2))),
+    ("get_lifetime_activity", ()),
+    ("get_weekday_activity", ()),
+    ("get_hourly_activity", ()),
+    ("get_most_games_in_a_day", ()),
+    ("set_user_name", (2, "20", "Slugger")),
+    ("delete_game", ("2",)),
+    ("remove_user", (4,)),
+]
+
+_LOL_QUERIES = [
+    ("add_user", (6,), {"player_name": "Zikzak", "player_id": "60"}),
+    ("get_current_rank", ("20",)),
+    ("set_current_rank", ("20", "gold_iv_0", None)),
+    ("get_highest_rank", ("20",)),
+    ("get_highest_rank", ("20", 0, int(time()) + 1000)),
+    ("get_player_ranks", ("20",)),
+    ("get_split_start", ()),
+    ("get_split_message_status", (2,)),
+    ("set_split_message_sent", (2, int(time()))),
+    ("get_split_summary_data", (2, ["kills"], 0, int(time()))),
+    ("get_split_summaries", ([2, 3], ["kills"], 0, int(time()))),
+    ("get_average_stat_rank", ("kills", 2, 1, 1)),
+    ("get_average_stat_rank", ("kills", 2, 1, 2, "mid")),
+    ("get_most_played_id", (2,)),
+    ("get_role_winrate", (2,)),
+    ("create_list", (2, "list")),
+    ("rename_list", (1, "champs")),
+    ("get_lists", ()),
+    ("get_lists", (2,)),
+    ("get_list_by_name", ("champs",)),
+    ("get_list_data", (1,)),
+    ("add_item_to_list", (1, 1)),
+    ("add_items_to_list", ([(2, 1), (3, 1)],)),
+    ("get_list_items", (1,)),
+    ("get_list_from_item_id", (1,)),
+    ("delete_item_from_list", (1,)),
+    ("delete_items_from_list", ([(2,), (3,)],)),
+    ("delete_list", (1,)),
+    ("insert_bingo_challenge", (1, "2024-01-01", "challenge", 10)),
+    ("update_bingo_challenge", (1, "2024-01-01", 1, 1)),
+    ("reset_bingo_new_progress", (1,)),
+    ("set_bingo_challenge_seen", (1,)),
+    ("get_new_bingo_challenges", (3,)),
+    ("get_active_bingo_challenges", ("2024-01-01",)),
+]
+
+_CS2_QUERIES = [
+    ("add_user", (5,), {"player_name": "Nønø", "player_id": "50", "match_auth_code": "500", "latest_match_token": "abc"}),
+    ("get_current_rank", ("20",)),
+    ("set_new_cs2_sharecode", (2, "20", "CSGO-abcde-abcde-abcde-abcde-abcde")),
+    ("get_latest_sharecode", ("20",)),
+    ("get_overtime_winrate", (2,)),
+]
+
+_GAME_SKIPPED = {
+    "get_delim_clause": "only builds a WHERE clause",
+    "get_delimeter": "only builds a WHERE clause",
+    "get_monthly_delimiter": "only builds a WHERE clause",
+    "game_user_data_from_discord_id": "looks up users in memory",
+    "discord_id_from_ingame_info": "looks up users in memory",
+    "save_stats": "run by _save_games before the other queries",
+    "get_beaten_stat_records": "run by save_stats",
+    "reset_bets": "updates betting balances, which are only in the meta database",
+    "clear_tables": "deletes every row of every table",
+}
+
+_LOL_SKIPPED = {
+    "get_teamcomp_winrates": "one-off analysis of hardcoded players, not used by the bot",
+}
+
+_GAME_CLASSES = {"lol": LoLGameDatabase, "cs2": CS2GameDatabase}
+_GAME_SPECIFIC_QUERIES = {"lol": _LOL_QUERIES, "cs2": _CS2_QUERIES}
+_GAME_SPECIFIC_SKIPPED = {"lol": _LOL_SKIPPED, "cs2": {}}
+
+def _save_games(game: str, database: GameDatabase):
+    player_cls = {"lol": LoLPlayerStats, "cs2": CS2PlayerStats}
+    game_cls = {"lol": LoLGameStats, "cs2": CS2GameStats}
+    timestamp = int(time())
+
+    for index in range(3):
+        game_id = str(index)
+        player_stats = [
+            player_cls[game](game_id, disc_id, user.player_id[0], index, 1, 1, None, 0, 0, 0)
+            for disc_id, user in database.game_users.items()
+        ]
+        game_stats = game_cls[game](
+            game, game_id, timestamp + index, 60 * 25, index % 2, MAIN_GUILD_ID, None, player_stats
+        )
+        database.save_stats(game_stats)
+
+def _run_queries(database, queries: list[tuple]):
+    for method, args, *kwargs in queries:
+        if callable(args):
+            args = args(database)
+
+        result = getattr(database, method)(*args, **(kwargs[0] if kwargs else {}))
+        if callable(result): # Query or other lazily evaluated result
+            result()
+
+def _get_new_full_scans(auditor: QueryPlanAuditor, known_scans: dict[str, set[str]]):
+    new_scans = {}
+    for method, tables in auditor.get_full_scans().items():
+        unexpected = tables - known_scans.get(method, set()) - _SMALL_TABLES
+        if unexpected:
+            new_scans[method] = unexpected
+
+    return new_scans
+
+def _get_unaudited_methods(database_cls: type, queries: list[tuple], skipped: dict[str, str]):
+    base_names = set(dir(SQLiteDatabase))
+    public_methods = {
+        name for name in dir(database_cls)
+        if not name.startswith("_") and name not in base_names and callable(getattr(database_cls, name))
+    }
+
+    return public_methods - {query[0] for query in queries} - set(skipped)
+
+def test_meta_query_plans(meta_database: MetaDatabase):
+    with QueryPlanAuditor(meta_database) as auditor:
+        _run_queries(meta_database, _META_QUERIES)
+
+    new_scans = _get_new_full_scans(auditor, KNOWN_FULL_SCANS["meta"])
+    assert new_scans == {}, f"Queries doing full table scans: {new_scans}"
+
+def test_game_query_plans(game_databases: dict[str, GameDatabase]):
+    for game in SUPPORTED_GAMES:
+        database = game_databases[game]
+
+        with QueryPlanAuditor(database) as auditor:
+            _save_games(game, database)
+            _run_queries(database, _GAME_QUERIES + _GAME_SPECIFIC_QUERIES[game])
+
+        new_scans = _get_new_full_scans(auditor, KNOWN_FULL_SCANS["game"])
+        assert new_scans == {}, f"Queries doing full table scans for {game}: {new_scans}"
+
+def test_all_methods_audited():
+    # Every method that queries the database should be run by the tests above
+    unaudited = _get_unaudited_methods(MetaDatabase, _META_QUERIES, _META_SKIPPED)
+    assert unaudited == set(), f"Methods of MetaDatabase that are not audited: {unaudited}"
+
+    for game in SUPPORTED_GAMES:
+        queries = _GAME_QUERIES + _GAME_SPECIFIC_QUERIES[game]
+        skipped = _GAME_SKIPPED | _GAME_SPECIFIC_SKIPPED[game]
+        unaudited = _get_unaudited_methods(_GAME_CLASSES[game], queries, skipped)
+        assert unaudited == set(), f"Methods of {_GAME_CLASSES[game].__name__} that are not audited: {unaudited}"
@@ -0,0 +1,93 @@
+import asyncio
+from time import monotonic
+
+from intfar.api.config import Config
+from intfar.api.meta_database import MetaDatabase
+from intfar.api.game_database import GameDatabase
+from intfar.api.game_apis.riot_rate_limit import RiotRateLimiter, parse_rate_limits
+from intfar.api.game_monitors.lol import LoLGameMonitor
+from intfar.api.user import User
+from intfar.api.util import GUILD_MAP
+
+class _MatchHistoryAPI:
+    def __init__(self, matches: dict[str, list[int]]):
+        self.matches = matches
+        self.requests = []
+        self.rate_limiter = RiotRateLimiter()
+
+    async def get_match_history(self, puuid, date_from=None, date_to=None, game_type="ranked"):
+        self.requests.append((puuid, game_type))
+        await asyncio.sleep(0.1)
+        return list(self.matches.get(puuid, [])) if game_type == "ranked" else []
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("20:1,100:120") == [(20, 1), (100, 120)], "Limits are parsed"
+    assert parse_rate_limits("500:10") == [(500, 10)], "Single limit is parsed"
+
+def test_acquire():
+    limiter = RiotRateLimiter([(5, 1)])
+
+    async def acquire(amount: int):
+        for _ in range(amount):
+            await limiter.acquire()
+
+    start = monotonic()
+    asyncio.run(acquire(5))
+    assert monotonic() - start < 0.1, "Requests within the limit don't wait"
+
+    asyncio.run(acquire(1))
+    assert monotonic() - start > 0.9, "Requests over the limit wait for the window to pass"
+
+def test_update_from_headers():
+    limiter = RiotRateLimiter()
+    limiter.update({"X-App-Rate-Limit": "10:1,50:60", "X-App-Rate-Limit-Count": "10:1,12:60"})
+
+    assert limiter.limits == [(10, 1), (50, 60)], "Limits are read from headers"
+    assert limiter._get_wait_time(monotonic()) > 0.5, "Requests counted by Riot are waited for"
+
+    limiter = RiotRateLimiter([(20, 1), (100, 120)])
+    limiter.update({"X-App-Rate-Limit-Count": "1:1,90:120"})
+    assert limiter._get_wait_time(monotonic()) <= 0, "Requests counted in the long window don't count in the short one"
+
+    async def acquire(amount: int):
+        for _ in range(amount):
+            await limiter.acquire()
+
+    start = monotonic()
+    asyncio.run(acquire(10))
+    assert monotonic() - start < 0.1, "Requests up to the long limit don't wait"
+    assert limiter._get_wait_time(monotonic()) > 100, "Requests counted by Riot and by us fill up the long window"
+
+    limiter = RiotRateLimiter()
+    limiter.pause(2)
+    assert limiter._get_wait_time(monotonic()) > 1.5, "Requests wait while paused"
+
+def test_concurrent_match_histories(
+    config: Config,
+    meta_database: MetaDatabase,
+    game_databases: dict[str, GameDatabase]
+):
+    guild_ids = [GUILD_MAP["core"], GUILD_MAP["nibs"]]
+    users = [User(disc_id, f"secret_{disc_id}", [f"name_{disc_id}"], [f"puuid_{disc_id}"]) for disc_id in range(1, 9)]
+    api_client = _MatchHistoryAPI({user.player_id[0]: [1234] for user in users[:3]})
+
+    game_monitor = LoLGameMonitor("lol", config, meta_database, game_databases["lol"], api_client)
+    for guild_id in guild_ids:
+        game_monitor.users_in_voice[guild_id] = {user.disc_id: user for user in users}
+        game_monitor.latest_game_id[guild_id] = []
+
+    async def get_active_games():
+        return await asyncio.gather(*[game_monitor.get_active_game_info(guild_id) for guild_id in guild_ids])
+
+    start = monotonic()
+    results = asyncio.run(get_active_games())
+
+    assert monotonic() - start < 1, "Match histories are fetched concurrently"
+    assert len(api_client.requests) == len(users) * 2, "Players in several servers are only looked up once"
+
+    for game_info, users_in_game, _ in results:
+        assert game_info["id"] == "1234", "Game is found in all servers"
+        assert [user.disc_id for user in users_in_game] == [1, 2, 3], "Users in game are found"
+
+    interval = game_monitor.get_poll_interval(guild_ids[0])
+    assert interval < config.status_interval_dormant, "Poll more often after a game was played"
@@ -0,0 +1,102 @@
+import json
+import os
+import random
+from tempfile import TemporaryDirectory
+
+from intfar.api.game_apis.mocks.riot_api import MockRiotAPI
+from intfar.api.util import SearchIndex, get_closest_match
+
+_SYLLABLES = ["ka", "mu", "rt", "ed", "die", "sl", "ug", "ger", "'", ".", " ", "zik", "zak", "say", "wat", "fe", "li", "ne"]
+
+def _random_name(rng: random.Random):
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 5))).strip() or "ka"
+
+def _get_queries(names: list[str], rng: random.Random):
+    queries = [_random_name(rng) for _ in range(200)] + [""]
+    for name in names:
+        queries.append(name)
+        queries.append(name[1:-1])
+        queries.append(name[:2])
+        queries.append(name[:-1] + "x")
+
+    return queries
+
+def _try_find_champ_id(champ_names: dict[int, str], search_term: str):
+    # Copy of how RiotAPIClient.try_find_playable_id found champions before the search index
+    search_name = search_term.strip().lower().replace("_", " ").replace("'", "")
+    candidates = {0: [], 1: []}
+
+    for champ_id, champ_name in champ_names.items():
+        lowered = champ_name.lower()
+        if search_name == lowered:
+            return champ_id
+
+        if lowered.startswith(search_name):
+            candidates[0].append(champ_id)
+            continue
+
+        if search_name in lowered:
+            candidates[1].append(champ_id)
+            continue
+
+        if search_name in lowered.replace("'", "").replace(".", ""):
+            candidates[1].append(champ_id)
+
+    for priority in candidates:
+        if len(candidates[priority]) == 1:
+            return candidates[priority][0]
+
+    return None
+
+def test_searches_match_scan():
+    for seed in range(5):
+        rng = random.Random(seed)
+        names = [_random_name(rng) for _ in range(300)]
+        index = SearchIndex((name_id, name) for name_id, name in enumerate(names))
+
+        for query in _get_queries(names, rng):
+            exact = [name_id for name_id, name in enumerate(names) if name == query]
+            assert index.find_exact(query) == (exact[0] if exact else None), f"Exact search for '{query}'"
+
+            prefix = [name_id for name_id, name in enumerate(names) if name.startswith(query)]
+            assert index.find_prefix(query) == prefix, f"Prefix search for '{query}'"
+
+            substring = [name_id for name_id, name in enumerate(names) if query in name]
+            assert index.find_substring(query) == substring, f"Substring search for '{query}'"
+
+def test_closest_match_is_unchanged():
+    for seed in range(5):
+        rng = random.Random(seed)
+        # Duplicate names and names at the same distance are returned in the order they were given
+        names = [_random_name(rng) for _ in range(300)]
+        index = SearchIndex(names)
+
+        for query in _get_queries(names, rng):
+            for max_score in (8, 3, 0):
+                expected = get_closest_match(query, names, max_score)
+                assert index.find_closest(query, max_score) == expected, f"Closest match of '{query}' with max score {max_score}"
+
+    assert SearchIndex([]).find_closest("sound") is None
+
+def test_champion_lookups_are_unchanged(config):
+    rng = random.Random(0)
+    champ_names = {}
+    while len(champ_names) < 170:
+        champ_names[rng.randint(1, 1000)] = _random_name(rng).title()
+
+    # MockRiotAPI reads the patch from the first '-' in the path of the champions file
+    with TemporaryDirectory() as folder:
+        config.resources_folder = folder
+        os.makedirs(f"{folder}/game_data/lol")
+        champion_data = {"data": {f"Champ{champ_id}": {"key": str(champ_id), "name": name} for champ_id, name in champ_names.items()}}
+        with open(f"{folder}/game_data/lol/champions-14.1.1.json", "w", encoding="utf-8") as fp:
+            json.dump(champion_data, fp)
+
+        api_client = MockRiotAPI("lol", config)
+
+    assert api_client.champ_names == champ_names
+
+    for query in _get_queries(list(champ_names.values()), rng):
+        for search_term in (query, query.upper(), query.replace(" ", "_")):
+            expected = _try_find_champ_id(champ_names, search_term)
+            assert api_client.try_find_playable_id(search_term) == expected, f"Lookup of champion '{search_term}'"
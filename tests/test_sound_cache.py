@@ -0,0 +1,101 @@
+import os
+import shutil
+import struct
+import subprocess
+
+import pytest
+
+from intfar.api.sound_cache import OggOpusFileAudio, SoundCache, get_ogg_opus_duration
+
+def _create_ogg_page(packets: list[bytes], granule_pos: int, page_num: int):
+    segment_table = b""
+    for packet in packets:
+        segment_table += bytes([255] * (len(packet) // 255) + [len(packet) % 255])
+
+    header = b"OggS" + struct.pack("<BBQIIIB", 0, 0, granule_pos, 1, page_num, 0, len(segment_table))
+    return header + segment_table + b"".join(packets)
+
+def _write_ogg_opus(path: str, packets: list[bytes], pre_skip: int = 312):
+    opus_head = b"OpusHead" + struct.pack("<BBHIhB", 1, 2, pre_skip, 48000, 0, 0)
+    pages = [
+        _create_ogg_page([opus_head], 0, 0),
+        _create_ogg_page([b"OpusTags"], 0, 1),
+    ]
+
+    # Every packet is 20 ms, or 960 samples at 48 kHz
+    for page_num, start in enumerate(range(0, len(packets), 10), start=2):
+        page_packets = packets[start:start + 10]
+        pages.append(_create_ogg_page(page_packets, pre_skip + (start + len(page_packets)) * 960, page_num))
+
+    with open(path, "wb") as fp:
+        fp.write(b"".join(pages))
+
+def test_read_ogg_opus(tmp_path):
+    path = f"{tmp_path}/sound.ogg"
+    packets = [bytes([index]) * (100 + index * 3) for index in range(55)]
+    _write_ogg_opus(path, packets)
+
+    assert get_ogg_opus_duration(path) == pytest.approx(55 * 0.02)
+
+    source = OggOpusFileAudio(path)
+    assert source.is_opus()
+
+    read_packets = []
+    while (packet := source.read()) != b"":
+        read_packets.append(packet)
+
+    source.cleanup()
+
+    assert read_packets[0].startswith(b"OpusHead")
+    assert read_packets[2:] == packets, "Packets are read as they are stored, including ones longer than 255 bytes"
+
+def test_cache_is_invalidated(tmp_path):
+    cache = SoundCache(str(tmp_path))
+    sound_path = cache.get_sound_path("sound")
+    with open(sound_path, "wb") as fp:
+        fp.write(b"mp3 data")
+
+    assert cache.get("sound") is None, "Sounds are not cached before they are encoded"
+
+    os.makedirs(cache.cache_path)
+    _write_ogg_opus(cache.get_opus_path("sound"), [b"data"] * 10)
+    with open(f"{cache.cache_path}/sound.json", "w", encoding="utf-8") as fp:
+        fp.write(f'{{"duration": 0.2, "source_mtime": {os.stat(sound_path).st_mtime_ns}}}')
+
+    assert cache.get("sound") == (cache.get_opus_path("sound"), 0.2)
+
+    os.utime(sound_path, ns=(0, 0))
+    assert cache.get("sound") is None, "Sounds are not used if their mp3 file has changed"
+
+    cache.remove("sound")
+    assert os.listdir(cache.cache_path) == []
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+def test_encode(tmp_path):
+    cache = SoundCache(str(tmp_path))
+    for sound, duration in (("short", 1.5), ("long", 4)):
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}", cache.get_sound_path(sound)],
+            check=True
+        )
+
+    with open(cache.get_sound_path("broken"), "wb") as fp:
+        fp.write(b"not an mp3 file")
+
+    encoded = cache.encode_missing(["short", "long", "broken", "missing"])
+    assert sorted(encoded) == ["long", "short"]
+
+    opus_path, duration = cache.get("long")
+    assert duration == pytest.approx(4, abs=0.05)
+    assert cache.get("broken") is None
+    assert not os.path.exists(f"{opus_path}.tmp")
+
+    source = OggOpusFileAudio(opus_path)
+    num_packets = 0
+    while source.read() != b"":
+        num_packets += 1
+
+    source.cleanup()
+    assert num_packets == pytest.approx(4 / 0.02 + 2, abs=2), "Sounds are encoded as 20 ms packets"
+
+    assert cache.encode_missing(["short", "long"]) == [], "Encoded sounds are not encoded again"
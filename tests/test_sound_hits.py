@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+from threading import Thread
+
+import pytest
+
+from intfar.api.meta_database import MetaDatabase
+
+_NOW = datetime(2024, 5, 15, 20)
+_SOUNDS = ["sound_1", "sound_2", "sound_3", "sound_4"]
+
+def _add_sounds(meta_database: MetaDatabase):
+    for index, sound in enumerate(_SOUNDS):
+        meta_database.add_sound(sound, 2, index)
+
+def _get_weekly_hits(meta_database: MetaDatabase):
+    return [
+        sorted(meta_database.get_weekly_sound_hits(*meta_database.get_weekly_timestamp(_NOW, week_offset)))
+        for week_offset in (0, 1)
+    ]
+
+def test_unflushed_hits_are_visible(meta_database: MetaDatabase):
+    _add_sounds(meta_database)
+
+    plays = {"sound_1": 3, "sound_2": 5, "sound_3": 1}
+    for sound, count in plays.items():
+        for _ in range(count):
+            meta_database.add_sound_hit(sound, _NOW)
+
+    meta_database.add_sound_hit("sound_4", _NOW - timedelta(days=7))
+    assert meta_database.flush_sound_hits() == 4
+
+    # Hits that are not flushed yet, for both new and already saved rows
+    for sound, timestamp in [("sound_3", _NOW), ("sound_3", _NOW), ("sound_3", _NOW), ("sound_3", _NOW), ("sound_4", _NOW)]:
+        meta_database.add_sound_hit(sound, timestamp)
+
+    sounds = meta_database.get_sounds("most_played")
+    assert {sound: plays for sound, _, plays, _ in sounds} == {"sound_1": 3, "sound_2": 5, "sound_3": 5, "sound_4": 2}, "Totals include unflushed hits"
+    assert [plays for _, _, plays, _ in sounds] == [5, 5, 3, 2], "Sounds are ordered by plays including unflushed hits"
+
+    assert meta_database.get_sound_hits("sound_3") == (5,)
+
+    weekly_hits = _get_weekly_hits(meta_database)
+    assert [(sound, plays) for sound, plays, _ in weekly_hits[0]] == [("sound_1", 3), ("sound_2", 5), ("sound_3", 5), ("sound_4", 1)]
+    assert [rank for sound, _, rank in weekly_hits[0] if sound in ("sound_1", "sound_4")] == [3, 4], "Ranks include unflushed hits"
+    assert [(sound, plays) for sound, plays, _ in weekly_hits[1]] == [("sound_4", 1)]
+
+    assert meta_database.flush_sound_hits() == 2
+    assert len(meta_database.sound_hit_buffer) == 0
+    assert _get_weekly_hits(meta_database) == weekly_hits, "Hits are the same after they are flushed"
+
+def test_failed_flush(meta_database: MetaDatabase, config):
+    _add_sounds(meta_database)
+
+    for sound in _SOUNDS:
+        meta_database.add_sound_hit(sound, _NOW)
+
+    meta_database.flush_sound_hits()
+    for sound in _SOUNDS:
+        meta_database.add_sound_hit(sound, _NOW)
+        meta_database.add_sound_hit(sound, _NOW - timedelta(days=7))
+
+    # Fail on the second of several queries in the same flush
+    execute_query = meta_database.execute_query
+    queries = []
+    def failing_execute_query(query, *params, **kwargs):
+        queries.append(query)
+        if len(queries) == 2:
+            raise OSError("Disk on fire")
+
+        return execute_query(query, *params, **kwargs)
+
+    meta_database.execute_query = failing_execute_query
+    with pytest.raises(OSError):
+        meta_database.flush_sound_hits(max_rows=3)
+
+    del meta_database.execute_query
+
+    # A new database client sees what is on disk, like after a crash
+    restarted_database = MetaDatabase(config)
+    assert restarted_database.get_sound_hits() == [(sound, 1) for sound in _SOUNDS], "Nothing is written by a failed flush"
+    assert len(meta_database.sound_hit_buffer) == 8, "Hits are kept in the buffer when flushing fails"
+
+    assert meta_database.flush_sound_hits(max_rows=3) == 8
+    restarted_database = MetaDatabase(config)
+    assert sorted(restarted_database.get_sound_hits()) == sorted([(sound, 2) for sound in _SOUNDS] + [(sound, 1) for sound in _SOUNDS])
+
+    # Hits of removed sounds are not flushed
+    meta_database.add_sound_hit("sound_1", _NOW)
+    meta_database.remove_sound("sound_1")
+    assert meta_database.flush_sound_hits() == 0
+
+def test_concurrent_flushes(meta_database: MetaDatabase):
+    _add_sounds(meta_database)
+
+    def add_hits(sound):
+        for index in range(200):
+            meta_database.add_sound_hit(sound, _NOW - timedelta(days=7 * (index % 3)))
+
+    threads = [Thread(target=add_hits, args=(sound,)) for sound in _SOUNDS]
+    for thread in threads:
+        thread.start()
+
+    while any(thread.is_alive() for thread in threads):
+        meta_database.flush_sound_hits()
+
+    for thread in threads:
+        thread.join()
+
+    meta_database.flush_sound_hits()
+
+    totals = {sound: plays for sound, _, plays, _ in meta_database.get_sounds("alphabetical")}
+    assert totals == {sound: 200 for sound in _SOUNDS}, "No hits are lost or counted twice"
+
+def test_flush_while_getting_hits(meta_database: MetaDatabase):
+    _add_sounds(meta_database)
+
+    meta_database.add_sound_hit("sound_1", _NOW)
+    meta_database.flush_sound_hits()
+    meta_database.add_sound_hit("sound_1", _NOW)
+
+    # Flush the buffered hit from another thread while the hits are being read
+    flush_thread = Thread(target=meta_database.flush_sound_hits)
+    execute_query = meta_database.execute_query
+    def flushing_execute_query(query, *params, **kwargs):
+        if flush_thread.ident is None:
+            flush_thread.start()
+            flush_thread.join(0.5)
+
+        return execute_query(query, *params, **kwargs)
+
+    meta_database.execute_query = flushing_execute_query
+    try:
+        hits = meta_database.get_sound_hits("sound_1")
+    finally:
+        flush_thread.join()
+        del meta_database.execute_query
+
+    assert hits == (2,), "Flushed hits are not counted twice"
+    assert meta_database.get_sound_hits("sound_1") == (2,)
+
+class _BotConnection:
+    """
+    Stands in for the AppRequestClient that the web app sends requests to the bot with.
+    """
+    def __init__(self, bot_database: MetaDatabase):
+        self.bot_database = bot_database
+
+    def request(self, command_types, commands, paramses):
+        assert commands == ["flush_sound_hits"]
+        return [self.bot_database.flush_sound_hits()]
+
+def test_web_sees_hits_of_bot(meta_database: MetaDatabase, config):
+    flask = pytest.importorskip("flask")
+    from intfar.api.audio_handler import AudioHandler
+    from intfar.app.routes import soundboard
+
+    _add_sounds(meta_database)
+
+    # Sounds are played in the bot process, which has its own buffer of hits
+    bot_database = MetaDatabase(config)
+    for _ in range(3):
+        bot_database.add_sound_hit("sound_2", _NOW)
+
+    assert {sound: plays for sound, _, plays, _ in meta_database.get_sounds("newest")}["sound_2"] == 0, "Buffered hits are only seen by the bot"
+
+    app = flask.Flask(__name__)
+    app.config["BOT_CONN"] = _BotConnection(bot_database)
+    with app.app_context():
+        sounds = soundboard.get_sounds(AudioHandler(config, meta_database))
+
+    assert {sound: plays for sound, _, plays, _ in sounds}["sound_2"] == 3, "Website asks the bot to flush its hits"
+    assert len(bot_database.sound_hit_buffer) == 0
@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from intfar.api.game_data import get_stat_quantity_descriptions
+from intfar.api.game_databases.lol import LoLGameDatabase
+from tests.synthetic_data.games import insert_random_games
+
+_ROLES = [None, "top", "jungle", "mid", "adc", "support"]
+_RANKS = [None, "silver_iv_20", "gold_ii_50", "gold_i_0", "platinum_iii_75"]
+
+def _get_split_summary_data(database: LoLGameDatabase, disc_id, stats, prev_split_start, curr_split_start):
+    # Copy of how LoLGameDatabase.get_split_summary_data summarized a player before summaries were batched
+    no_previous = curr_split_start == prev_split_start
+
+    avg_stats_before = {}
+    avg_stats_now = {}
+    for stat in stats:
+        avg_prev_split = None if no_previous else database.get_average_stat(stat, disc_id, time_after=prev_split_start, time_before=curr_split_start)()
+        avg_curr_split = database.get_average_stat(stat, disc_id, time_after=curr_split_start)()
+
+        avg_stats_before[stat] = avg_prev_split[0] if avg_prev_split else (None, None, None)
+        avg_stats_now[stat] = avg_curr_split[0]
+
+    main_player_id = database.game_users[disc_id].player_id[0]
+    solo_current, flex_current = database.get_current_rank(main_player_id)
+    solo_highest, flex_highest = database.get_highest_rank(main_player_id, curr_split_start)
+
+    return {
+        "avg_stats_before": avg_stats_before,
+        "avg_stats_now": avg_stats_now,
+        "intfars_before": None if no_previous else database.get_intfar_count(disc_id, prev_split_start, curr_split_start),
+        "intfars_after": database.get_intfar_count(disc_id, curr_split_start),
+        "doinks_before": None if no_previous else database.get_doinks_count(disc_id, prev_split_start, curr_split_start),
+        "doinks_after": database.get_doinks_count(disc_id, curr_split_start),
+        "games_before": None if no_previous else database.get_games_count(disc_id, prev_split_start, curr_split_start),
+        "games_after": database.get_games_count(disc_id, curr_split_start),
+        "best_wr_champ": database.get_min_or_max_winrate_played(disc_id, True, min_games=5, time_after=prev_split_start),
+        "worst_wr_champ": database.get_min_or_max_winrate_played(disc_id, False, min_games=5, time_after=prev_split_start),
+        "role_winrates": database.get_role_winrate(disc_id, curr_split_start),
+        "solo_current": solo_current,
+        "solo_highest": solo_highest,
+        "flex_current": flex_current,
+        "flex_highest": flex_highest,
+        "played_before": None if no_previous else len(database.get_played_ids(disc_id, prev_split_start, curr_split_start)),
+        "played_after": len(database.get_played_ids(disc_id, curr_split_start)),
+    }
+
+def _approx(value):
+    # Stats are summed in a different order by SQLite and Polars
+    if isinstance(value, float):
+        return pytest.approx(value)
+    if isinstance(value, (tuple, list)):
+        return type(value)(_approx(elem) for elem in value)
+    if isinstance(value, dict):
+        return {key: _approx(elem) for key, elem in value.items()}
+
+    return value
+
+def _insert_split_games(database: LoLGameDatabase, num_games: int, seed: int):
+    insert_random_games(database, num_games, seed=seed)
+
+    rng = random.Random(seed)
+    with database:
+        rows = database.execute_query("SELECT game_id, player_id FROM participants").fetchall()
+        updates = [
+            (rng.choice(_ROLES), rng.choice(_RANKS), rng.choice(_RANKS), rng.randint(1, 30), game_id, player_id)
+            for game_id, player_id in rows
+        ]
+        database.execute_query(
+            "UPDATE participants SET role = ?, rank_solo = ?, rank_flex = ?, champ_id = ? WHERE game_id = ? AND player_id = ?",
+            *updates
+        )
+        database.execute_query("UPDATE users SET rank_solo = 'gold_iv_10' WHERE disc_id = ?", list(database.game_users)[0])
+        database.execute_query("UPDATE users SET active = 0 WHERE disc_id = ?", list(database.game_users)[-1])
+
+        timestamps = [timestamp for timestamp, in database.execute_query("SELECT timestamp FROM games ORDER BY timestamp")]
+
+    return timestamps
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_summaries_are_unchanged(game_databases, seed):
+    database: LoLGameDatabase = game_databases["lol"]
+    timestamps = _insert_split_games(database, 400, seed)
+    stats = list(get_stat_quantity_descriptions("lol"))
+    disc_ids = list(database.game_users)
+
+    # Splits starting on a game, between games, and with no previous split
+    split_starts = [
+        (timestamps[50], timestamps[200]),
+        (timestamps[100] + 1, timestamps[380] - 1),
+        (timestamps[300], timestamps[300]),
+    ]
+    for prev_split_start, curr_split_start in split_starts:
+        summaries = database.get_split_summaries(disc_ids, stats, prev_split_start, curr_split_start)
+        assert list(summaries) == disc_ids
+
+        for disc_id in disc_ids:
+            expected = _get_split_summary_data(database, disc_id, stats, prev_split_start, curr_split_start)
+            for key, value in summaries[disc_id].items():
+                assert value == _approx(expected[key]), f"'{key}' is unchanged for {disc_id} with splits {prev_split_start}, {curr_split_start}"
+
+            assert summaries[disc_id] == database.get_split_summary_data(disc_id, stats, prev_split_start, curr_split_start)
+
+def test_no_games(game_databases):
+    database: LoLGameDatabase = game_databases["lol"]
+    stats = list(get_stat_quantity_descriptions("lol"))
+    disc_id = list(database.game_users)[0]
+
+    summary = database.get_split_summary_data(disc_id, stats, 1000, 2000)
+    assert summary == _get_split_summary_data(database, disc_id, stats, 1000, 2000)
@@ -0,0 +1,32 @@
+from intfar.api.game_data import get_stat_parser, stats_from_database
+from intfar.api.game_database import GameDatabase
+from intfar.api.util import MAIN_GUILD_ID
+from tests.synthetic_data.games import insert_random_games
+
+class _MockSteamAPI:
+    map_names = {}
+
+def test_player_games_pages(game_databases: dict[str, GameDatabase]):
+    database = game_databases["cs2"]
+    insert_random_games(database, 50, seed=42)
+
+    api_client = _MockSteamAPI()
+    parser = get_stat_parser("cs2", None, api_client, database.game_users, MAIN_GUILD_ID)
+    all_games = stats_from_database("cs2", database, api_client, MAIN_GUILD_ID)
+
+    for disc_id in database.game_users:
+        expected = [
+            game_stats for game_stats in all_games
+            if game_stats.find_player_stats(disc_id, game_stats.filtered_player_stats) is not None
+        ]
+        games = list(parser.iter_player_games(database, disc_id, page_size=7))
+
+        assert [game.game_id for game in games] == [game.game_id for game in expected], "Games of the player are loaded newest first"
+        assert games == expected, "Stats for the games are loaded"
+
+    disc_id = list(database.game_users)[0]
+    first_page, next_page = parser.get_player_games_page(database, disc_id, page_size=5)
+    second_page, _ = parser.get_player_games_page(database, disc_id, next_page, page_size=5)
+
+    assert len(first_page) == len(second_page) == 5, "Pages have the given size"
+    assert first_page[-1].timestamp >= second_page[0].timestamp, "Pages continue where the previous page ended"
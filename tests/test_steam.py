@@ -6,7 +6,6 @@ import pytest
 
 from intfar.api.game_apis.cs2 import SteamAPIClient
 from intfar.api.config import Config
-from intfar.api.meta_database import MetaDatabase
 from intfar.api.game_databases.cs2 import CS2GameDatabase
 from intfar.api.proxy import ProxyManager
 
@@ -23,23 +22,13 @@ def send_from_proc(proxy, conn):
     conn.send(success)
 
 @pytest.fixture(scope="module")
-def metadatabase():
-    conf = Config()
-    return MetaDatabase(conf)
-
-@pytest.fixture(scope="module")
-def steam_proxy(metadatabase: MetaDatabase):
-    config = Config()
-    proxy_manager = ProxyManager(SteamAPIClient, "cs2", metadatabase, config)
+def steam_proxy():
+    proxy_manager = ProxyManager(SteamAPIClient, "cs2")
 
     yield proxy_manager.create_proxy()
 
     proxy_manager.kill()
 
-@pytest.fixture(autouse=True)
-def clear_db(metadatabase: MetaDatabase):
-    metadatabase.clear_command_queue()
-
 def test_get_map_name(steam_proxy: SteamAPIClient):
     map_name = steam_proxy.get_map_name("dust2")
     assert map_name == "Dust II", "Correct map name"
@@ -0,0 +1,192 @@
+from datetime import datetime
+
+from intfar.api.game_database import GameDatabase
+from intfar.api.game_data.lol import LoLGameStats, LoLPlayerStats
+from intfar.api.util import MAIN_GUILD_ID
+from tests.synthetic_data.games import insert_random_games
+
+# Streaks calculated the way GameDatabase did before the streak engine, by walking through every game.
+# Games are walked through in the order they were played, with the game ID breaking ties.
+
+def _longest_intfar_streak(database: GameDatabase, disc_id: int):
+    with database:
+        int_fars = database.execute_query("SELECT intfar_id, timestamp FROM games ORDER BY timestamp, game_id").fetchall()
+
+    max_count = 0
+    timestamp_ended = None
+    count = 0
+    for int_far, timestamp in int_fars:
+        count = 0 if int_far is None or disc_id != int_far else count + 1
+        if count > max_count:
+            max_count = count
+            timestamp_ended = timestamp
+
+    if timestamp_ended is not None:
+        timestamp_ended = datetime.fromtimestamp(timestamp_ended).strftime("%Y-%m-%d")
+
+    return max_count, timestamp_ended
+
+def _longest_no_intfar_streak(database: GameDatabase, disc_id: int):
+    query = """
+        SELECT intfar_id, timestamp
+        FROM participants AS p
+        INNER JOIN games AS g ON g.game_id = p.game_id
+        INNER JOIN users AS u ON u.player_id = p.player_id
+        WHERE u.disc_id = ?
+        ORDER BY g.timestamp ASC, g.game_id ASC
+    """
+    with database:
+        int_fars = database.execute_query(query, disc_id).fetchall()
+
+    max_count = 0
+    timestamp_ended = None
+    count = 0
+    for int_far, timestamp in int_fars:
+        count = 0 if disc_id == int_far else count + 1
+        if count > max_count:
+            max_count = count
+            timestamp_ended = timestamp
+
+    if timestamp_ended is not None:
+        if timestamp_ended == timestamp:
+            timestamp_ended = None
+        else:
+            timestamp_ended = datetime.fromtimestamp(timestamp_ended).strftime("%Y-%m-%d")
+
+    return max_count, timestamp_ended
+
+def _current_intfar_streak(database: GameDatabase):
+    query = """
+        SELECT g.intfar_id
+        FROM games AS g
+        LEFT JOIN users AS u ON g.intfar_id = u.disc_id
+        WHERE u.active = 1
+        GROUP BY game_id
+        ORDER BY g.timestamp DESC, g.game_id DESC
+    """
+    with database:
+        int_fars = database.execute_query(query).fetchall()
+
+    if int_fars == []:
+        return 0, None
+
+    prev_intfar = int_fars[0][0]
+    for count, int_far in enumerate(int_fars[1:], start=1):
+        if int_far[0] is None or prev_intfar != int_far[0]:
+            return count, prev_intfar
+
+    return len(int_fars), prev_intfar
+
+def _get_results(database: GameDatabase, disc_id: int, order_by: str):
+    query = f"""
+        SELECT g.win
+        FROM games AS g
+        INNER JOIN participants AS p ON p.game_id = g.game_id
+        INNER JOIN users AS u ON p.player_id = u.player_id
+        WHERE u.disc_id = ? AND u.active = 1
+        GROUP BY g.game_id
+        ORDER BY {order_by}
+    """
+    with database:
+        return database.execute_query(query, disc_id).fetchall()
+
+def _longest_win_or_loss_streak(database: GameDatabase, disc_id: int, win: int):
+    max_count = 0
+    count = 0
+    for row in _get_results(database, disc_id, "g.timestamp DESC, g.game_id DESC"):
+        count = 0 if win != row[0] else count + 1
+        max_count = max(count, max_count)
+
+    return max_count
+
+def _current_win_or_loss_streak(database: GameDatabase, disc_id: int, win: int, offset=0):
+    games = _get_results(database, disc_id, "timestamp DESC")
+    count_offset = 1 if offset == 0 else 0
+
+    for count, row in enumerate(games[offset:], start=count_offset):
+        if row[0] != win:
+            return count
+
+    return len(games) + (-offset if offset > 0 else 1)
+
+def _assert_streaks_match(database: GameDatabase, message: str):
+    for disc_id in list(database.game_users) + [12345]:
+        assert database.get_longest_intfar_streak(disc_id) == _longest_intfar_streak(database, disc_id), f"Longest Int-Far streak {message}"
+        if database.user_exists(disc_id):
+            assert database.get_longest_no_intfar_streak(disc_id) == _longest_no_intfar_streak(database, disc_id), f"Longest no Int-Far streak {message}"
+
+        for win in (1, -1):
+            assert database.get_longest_win_or_loss_streak(disc_id, win) == _longest_win_or_loss_streak(database, disc_id, win), f"Longest win/loss streak {message}"
+            for offset in (0, 1, 2, 5):
+                assert (
+                    database.get_current_win_or_loss_streak(disc_id, win, offset)
+                    == _current_win_or_loss_streak(database, disc_id, win, offset)
+                ), f"Current win/loss streak {message}"
+
+    assert database.get_current_intfar_streak() == _current_intfar_streak(database), f"Current Int-Far streak {message}"
+
+def _save_game(database: GameDatabase, game_id: str, timestamp: int, disc_ids: list[int], intfar_id: int, win: int):
+    player_stats = [
+        LoLPlayerStats(game_id, disc_id, database.game_users[disc_id].player_id[0], 1, 1, 1, None, 0, 0, 0)
+        for disc_id in disc_ids
+    ]
+    game_stats = LoLGameStats("lol", game_id, timestamp, 60 * 25, win, MAIN_GUILD_ID, [], player_stats, intfar_id=intfar_id)
+    database.save_stats(game_stats)
+
+def test_streaks_match_queries(game_databases: dict[str, GameDatabase]):
+    for seed in range(5):
+        for game, database in game_databases.items():
+            with database:
+                database.execute_query("DELETE FROM participants", commit=False)
+                database.execute_query("DELETE FROM games")
+
+            _assert_streaks_match(database, f"with no games for {game}")
+
+            insert_random_games(database, 150, seed=seed)
+            _assert_streaks_match(database, f"with random games for {game} (seed {seed})")
+
+def test_streaks_after_saved_games(game_databases: dict[str, GameDatabase]):
+    database = game_databases["lol"]
+    insert_random_games(database, 100, seed=7)
+    disc_ids = list(database.game_users)
+
+    _assert_streaks_match(database, "before games are saved")
+    signature = database.streak_engine._signature
+
+    for index in range(6):
+        intfar_id = disc_ids[0] if index < 4 else None
+        _save_game(database, f"99{index:08d}", 2000000000 + index * 3600, disc_ids[:3], intfar_id, 1 if index % 3 else -1)
+        _assert_streaks_match(database, f"after saving game {index + 1}")
+
+    assert database.get_current_intfar_streak() == (4, disc_ids[0]), "Int-Far streak continues after saved games"
+    assert database.streak_engine._signature != signature, "Streaks are updated when games are saved"
+
+    database.delete_game("9900000005")
+    _assert_streaks_match(database, "after a game is deleted")
+
+    database.remove_user(disc_ids[0])
+    _assert_streaks_match(database, "after a user is removed")
+
+def test_streaks_with_unordered_game_ids(game_databases: dict[str, GameDatabase]):
+    database = game_databases["lol"]
+    insert_random_games(database, 50, seed=3)
+    disc_ids = list(database.game_users)
+
+    _assert_streaks_match(database, "before games are saved")
+
+    rebuilds = 0
+    rebuild = database.streak_engine.rebuild
+    def counting_rebuild():
+        nonlocal rebuilds
+        rebuilds += 1
+        rebuild()
+
+    database.streak_engine.rebuild = counting_rebuild
+
+    # Game IDs that don't increase with time, like CS2 sharecodes
+    for index, game_id in enumerate(["CSGO-zzzzz", "CSGO-aaaaa", "0000", "CSGO-mmmmm"]):
+        _save_game(database, game_id, 2000000000 + index * 3600, disc_ids[:3], disc_ids[1], 1)
+        _assert_streaks_match(database, f"after saving game {game_id}")
+
+    assert database.get_current_intfar_streak() == (4, disc_ids[1]), "Int-Far streak follows the order games were played"
+    assert rebuilds == 0, "Games played after every other game are added without a rebuild"
@@ -0,0 +1,70 @@
+import json
+
+from intfar.api.game_database import GameDatabase
+from intfar.api.game_data.lol import LoLGameStats, LoLPlayerStats
+from intfar.api.util import MAIN_GUILD_ID
+from tests.synthetic_data.games import insert_random_games
+
+def _save_game(database: GameDatabase, game_id: str, disc_ids: list[int]):
+    player_stats = [
+        LoLPlayerStats(game_id, disc_id, database.game_users[disc_id].player_id[0], 1, 1, 1, None, 0, 0, 0)
+        for disc_id in disc_ids
+    ]
+    game_stats = LoLGameStats("lol", game_id, 2000000000, 60 * 25, 1, MAIN_GUILD_ID, None, player_stats)
+    database.save_stats(game_stats)
+
+def test_summary_data(game_databases: dict[str, GameDatabase]):
+    for game, database in game_databases.items():
+        insert_random_games(database, 200, seed=42)
+
+        for disc_id in database.game_users:
+            summary = database.get_summary_data(disc_id)
+
+            assert summary["games_played"] == database.get_intfar_stats(disc_id)[0], f"Games played are summarized for {game}"
+            assert summary["total_winrate"] == database.get_total_winrate(disc_id), f"Winrate is summarized for {game}"
+            assert summary["longest_win_streak"] == database.get_longest_win_or_loss_streak(disc_id, 1), f"Win streak is summarized for {game}"
+            assert summary["best_person"] == database.get_winrate_relation(disc_id, True), f"Winrate with others is summarized for {game}"
+
+def test_snapshot(game_databases: dict[str, GameDatabase]):
+    database = game_databases["lol"]
+    insert_random_games(database, 100, seed=42)
+    disc_id = list(database.game_users)[0]
+
+    assert database.get_summary_snapshot(disc_id) is None, "Summary is not saved before it is calculated"
+
+    summary = database.get_summary_data(disc_id)
+    assert database.save_summary_snapshot(disc_id, summary), "Summary is saved"
+    assert database.get_summary_snapshot(disc_id) == json.loads(json.dumps(summary)), "Saved summary is returned"
+
+def test_snapshot_invalidated(game_databases: dict[str, GameDatabase]):
+    database = game_databases["lol"]
+    insert_random_games(database, 100, seed=42)
+    disc_ids = list(database.game_users)
+
+    for disc_id in disc_ids:
+        database.save_summary_snapshot(disc_id, database.get_summary_data(disc_id))
+
+    _save_game(database, "new_game", disc_ids[:2])
+
+    for disc_id in disc_ids[:2]:
+        assert database.get_summary_snapshot(disc_id) is None, "Summary of players in a saved game is invalidated"
+    for disc_id in disc_ids[2:]:
+        assert database.get_summary_snapshot(disc_id) is not None, "Summary of other players is kept"
+
+    database.save_summary_snapshot(disc_ids[0], database.get_summary_data(disc_ids[0]))
+    database.delete_game("new_game")
+
+    assert database.get_summary_snapshot(disc_ids[0]) is None, "Summary of players in a deleted game is invalidated"
+    assert database.get_summary_snapshot(disc_ids[2]) is not None, "Summary of other players is kept"
+
+def test_outdated_snapshot_not_saved(game_databases: dict[str, GameDatabase]):
+    database = game_databases["lol"]
+    insert_random_games(database, 100, seed=42)
+    disc_ids = list(database.game_users)
+
+    # A game is saved while the summary is being calculated
+    summary = database.get_summary_data(disc_ids[0])
+    _save_game(database, "new_game", disc_ids[:2])
+
+    assert not database.save_summary_snapshot(disc_ids[0], summary), "Outdated summary is not saved"
+    assert database.get_summary_snapshot(disc_ids[0]) is None, "Outdated summary is not saved"